@@ -1,8 +1,11 @@
 import sqlite3
+from datetime import datetime
 
 import pandas as pd
 
+from jolteon.core.event.parquet_sink import ParquetSink
 from jolteon.core.side import MarketSide
+from jolteon.market_data.trade_file import TradeFile
 
 
 class DatabaseTool:
@@ -114,6 +117,57 @@ class DatabaseTool:
         else:
             return pd.DataFrame()
 
+    @staticmethod
+    def load_market_trade_file(
+        path: str,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> pd.DataFrame:
+        """
+        Load market trades from a binary trade file converted from the
+        market_trade_feed table
+        Args:
+            path: Path to the binary trade file
+            start_time: Only load market trades at or after this time
+            end_time: Only load market trades at or before this time
+        Returns:
+            A DataFrame sorted by transaction time
+        """
+        trade_file = TradeFile(path)
+        if len(trade_file) == 0:
+            return pd.DataFrame()
+
+        records = trade_file.slice(
+            start_time or trade_file.start_time(),
+            end_time or trade_file.end_time(),
+        )
+        return trade_file.to_dataframe(records)
+
+    @staticmethod
+    def load_parquet(
+        directory: str,
+        signal_name: str,
+        columns: list[str] | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> pd.DataFrame:
+        """
+        Load a signal recorded as Parquet files. Column selection and time
+        range are pushed down, so only the needed columns of the needed days
+        are read from the disk.
+        Args:
+            directory: Root directory of the Parquet files
+            signal_name: The name of the signal, e.g. market_trade_feed
+            columns: Columns to load, all columns if None
+            start_time: Only load rows recorded at or after this time
+            end_time: Only load rows recorded at or before this time
+        Returns:
+            A DataFrame of the signal
+        """
+        return ParquetSink.read(
+            directory, signal_name, columns, start_time, end_time
+        )
+
     def load_trade_result(self, table_name="bull_trend_rider_trade_result"):
         df = self.load_table(table_name)
         if len(df) == 0:
@@ -0,0 +1,87 @@
+"""
+Measures the cost of detecting bull flag patterns on every new candlestick
+during a long replay, comparing the incremental detection with a full
+backward scan over all recent candlesticks.
+
+    python -m benchmarks.benchmark_bull_flag --candlesticks 20000
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.benchmark_indicators import generate_candlesticks
+from jolteon.core.time.time_manager import time_manager
+from jolteon.strategy.core.patterns.bull_flag.parameters import (
+    BullFlagParameters,
+)
+from jolteon.strategy.core.patterns.bull_flag.pattern import RecognitionResult
+from jolteon.strategy.core.patterns.bull_flag.recognizer import (
+    BullFlagRecognizer,
+)
+
+
+class FullScanBullFlagRecognizer(BullFlagRecognizer):
+    def _detect(self):
+        completed_candlesticks = [
+            c for c in self._all_candlesticks.candlesticks if c.is_completed()
+        ]
+        for i in range(0, len(completed_candlesticks)):
+            index = len(completed_candlesticks) - 1 - i
+            pattern = self._is_bull_flag_pattern(
+                candlesticks=completed_candlesticks[index:]
+            )
+            if pattern and (
+                self._params.verbose
+                or pattern.result == RecognitionResult.BULL_FLAG
+            ):
+                self.bull_flag_signal.send(
+                    self.bull_flag_signal, pattern=pattern
+                )
+
+
+async def replay(recognizer_type: type, params, candlesticks) -> float:
+    recognizer = recognizer_type(params)
+    time_manager().claim_admin(recognizer)
+    try:
+        start = time.perf_counter()
+        for candlestick in candlesticks:
+            # Same as a replay, the previous candlestick is completed when a
+            # new one starts
+            time_manager().use_fake_time(candlestick.start_time, recognizer)
+            recognizer.on_candlestick("benchmark", candlestick)
+        return (time.perf_counter() - start) / len(candlesticks)
+    finally:
+        time_manager().reset(recognizer)
+
+
+async def run(args):
+    candlesticks = generate_candlesticks(args.candlesticks)
+
+    print(f"{'Window':>8}{'Verbose':>9}{'Full Scan':>12}{'Incremental':>14}")
+    for window in [15, 60, 240]:
+        for verbose in [False, True]:
+            params = BullFlagParameters(
+                verbose=verbose,
+                max_number_of_recent_candlesticks=window,
+            )
+            full_scan = await replay(
+                FullScanBullFlagRecognizer, params, candlesticks
+            )
+            incremental = await replay(
+                BullFlagRecognizer, params, candlesticks
+            )
+            print(
+                f"{window:>8}{str(verbose):>9}"
+                f"{full_scan * 1e6:>12.2f}{incremental * 1e6:>14.2f}"
+            )
+    print("(us/candle)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bull Flag Benchmark")
+    parser.add_argument("--candlesticks", type=int, default=20_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
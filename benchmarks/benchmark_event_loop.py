@@ -0,0 +1,99 @@
+"""
+Measures the websocket message throughput and the timer precision of each
+available event loop implementation. Messages are Kraken trade updates sent
+by a local websocket server, and decoded with json like the public feed.
+
+    python -m benchmarks.benchmark_event_loop --messages 100000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import websockets
+
+from jolteon.core.event_loop import EventLoop, run
+
+TRADE_MESSAGE = json.dumps(
+    {
+        "channel": "trade",
+        "type": "update",
+        "data": [
+            {
+                "symbol": "BTC/USD",
+                "side": "buy",
+                "price": 42000.1,
+                "qty": 0.00123,
+                "ord_type": "market",
+                "trade_id": 1,
+                "timestamp": "2024-01-01T00:00:00.000000Z",
+            }
+        ],
+    }
+)
+
+
+async def websocket_throughput(n_messages: int) -> float:
+    """
+    Returns:
+        Number of messages received and decoded per second
+    """
+
+    async def send(websocket):
+        for _ in range(n_messages):
+            await websocket.send(TRADE_MESSAGE)
+
+    async with websockets.serve(send, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        async with websockets.connect(f"ws://127.0.0.1:{port}") as websocket:
+            start = time.perf_counter()
+            for _ in range(n_messages):
+                json.loads(await websocket.recv())
+            return n_messages / (time.perf_counter() - start)
+
+
+async def timer_lateness(n_timers: int, interval: float) -> list[float]:
+    """
+    Returns:
+        How late in microseconds each timer fires after its deadline
+    """
+    loop = asyncio.get_running_loop()
+    lateness = list[float]()
+    for _ in range(n_timers):
+        fired = loop.create_future()
+        deadline = time.perf_counter() + interval
+        loop.call_later(interval, fired.set_result, None)
+        await fired
+        lateness.append((time.perf_counter() - deadline) * 1e6)
+    return lateness
+
+
+async def benchmark(args) -> tuple[float, list[float]]:
+    throughput = await websocket_throughput(args.messages)
+    lateness = await timer_lateness(args.timers, args.interval)
+    return throughput, lateness
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event Loop Benchmark")
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--timers", type=int, default=1000)
+    parser.add_argument("--interval", type=float, default=0.001)
+    args = parser.parse_args()
+
+    print(
+        f"{'Event Loop':<12}{'Messages/s':>12}"
+        f"{'Timer p50 (us)':>16}{'Timer p99 (us)':>16}"
+    )
+    for event_loop in EventLoop.available():
+        throughput, lateness = run(benchmark(args), event_loop)
+        percentiles = statistics.quantiles(lateness, n=100)
+        print(
+            f"{event_loop.lower():<12}{throughput:>12.0f}"
+            f"{percentiles[49]:>16.1f}{percentiles[98]:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Measures the cold-start cost of the entry points, and checks it against the
+import time budget of each module.
+
+    python -m benchmarks.benchmark_import_time --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Max cumulative import time in milliseconds, measured by `-X importtime`
+IMPORT_TIME_BUDGETS = {
+    "jolteon.cli": 150,
+    "jolteon.app.kraken": 450,
+    "jolteon.app.coinbase": 450,
+}
+
+# Max wall time in milliseconds of running a command from a cold interpreter
+STARTUP_TIME_BUDGETS = {
+    "jolteon.cli --help": 400,
+}
+
+# Heavy modules shall never be imported by an entry point
+FORBIDDEN_MODULES = ["pandas", "pyarrow", "sklearn", "joblib"]
+
+
+def import_time(module: str) -> dict[str, float]:
+    """
+    Args:
+        module: Name of the module to import in a new interpreter
+    Returns:
+        Cumulative import time in milliseconds of every imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_times = dict[str, float]()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            cumulative_times[name.strip()] = int(cumulative) / 1000
+    return cumulative_times
+
+
+def startup_time(command: str) -> float:
+    """
+    Args:
+        command: Module and its arguments to run with `python -m`
+    Returns:
+        Wall time in milliseconds of running the command
+    """
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", *command.split()],
+        capture_output=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import Time Benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = list[str]()
+
+    print(f"{'Import':<24}{'Median (ms)':>12}{'Budget (ms)':>12}")
+    for module, budget in IMPORT_TIME_BUDGETS.items():
+        samples = [import_time(module) for _ in range(args.repeat)]
+        cost = statistics.median(sample[module] for sample in samples)
+        print(f"{module:<24}{cost:>12.1f}{budget:>12}")
+        if cost > budget:
+            failures.append(f"{module} takes {cost:.1f}ms to import")
+        for forbidden in FORBIDDEN_MODULES:
+            if forbidden in samples[0]:
+                failures.append(f"{module} imports {forbidden}")
+
+    print(f"{'Startup':<24}{'Median (ms)':>12}{'Budget (ms)':>12}")
+    for command, budget in STARTUP_TIME_BUDGETS.items():
+        cost = statistics.median(
+            startup_time(command) for _ in range(args.repeat)
+        )
+        print(f"{command:<24}{cost:>12.1f}{budget:>12}")
+        if cost > budget:
+            failures.append(f"{command} takes {cost:.1f}ms to start")
+
+    for failure in failures:
+        print(f"Over budget: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
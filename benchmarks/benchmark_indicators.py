@@ -0,0 +1,95 @@
+"""
+Measures the cost of updating each streaming indicator with one candlestick,
+and the cost of the batch counterpart over the same candlesticks.
+
+    python -m benchmarks.benchmark_indicators --candlesticks 100000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.indicator.bollinger_bands import (
+    BollingerBandsCalculator,
+    calculate_bollinger_bands,
+)
+from jolteon.market_data.core.indicator.ema import EMACalculator, calculate_ema
+from jolteon.market_data.core.indicator.macd import (
+    MACDCalculator,
+    calculate_macd,
+)
+from jolteon.market_data.core.indicator.obv import OBVCalculator, calculate_obv
+from jolteon.market_data.core.indicator.rsi import RSICalculator
+from jolteon.market_data.core.indicator.sma import SMACalculator, calculate_sma
+from jolteon.market_data.core.indicator.volatility import (
+    VolatilityCalculator,
+    calculate_volatility,
+)
+from jolteon.market_data.core.indicator.vwap import (
+    VWAPCalculator,
+    calculate_vwap,
+)
+
+
+def generate_candlesticks(n: int) -> list[Candlestick]:
+    random.seed(0)
+    candlesticks = []
+    close = 40000.0
+    for i in range(n):
+        open = close
+        close = open * (1 + random.gauss(0, 0.002))
+        candlesticks.append(
+            Candlestick(
+                start=datetime(2024, 1, 1) + timedelta(minutes=i),
+                duration_in_seconds=60,
+                open=open,
+                high=max(open, close) + random.uniform(0, 10),
+                low=min(open, close) - random.uniform(0, 10),
+                close=close,
+                volume=random.uniform(0, 5),
+            )
+        )
+    return candlesticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicator Benchmark")
+    parser.add_argument("--candlesticks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    candlesticks = generate_candlesticks(args.candlesticks)
+    df = pd.DataFrame([vars(c) for c in candlesticks])
+
+    benchmarks = [
+        ("RSI", RSICalculator, None),
+        ("SMA", SMACalculator, calculate_sma),
+        ("EMA", EMACalculator, calculate_ema),
+        ("VWAP", VWAPCalculator, calculate_vwap),
+        ("Bollinger", BollingerBandsCalculator, calculate_bollinger_bands),
+        ("MACD", MACDCalculator, calculate_macd),
+        ("Volatility", VolatilityCalculator, calculate_volatility),
+        ("OBV", OBVCalculator, calculate_obv),
+    ]
+
+    print(f"{'Indicator':<12}{'Stream (us/candle)':>20}{'Batch (ms)':>12}")
+    for name, calculator_type, batch in benchmarks:
+        calculator = calculator_type()
+        start = time.perf_counter()
+        for candlestick in candlesticks:
+            calculator.on_candlestick("benchmark", candlestick)
+        stream_cost = (time.perf_counter() - start) / len(candlesticks)
+
+        batch_cost = float("nan")
+        if batch is not None:
+            start = time.perf_counter()
+            batch(df)
+            batch_cost = time.perf_counter() - start
+
+        print(f"{name:<12}{stream_cost * 1e6:>20.2f}{batch_cost * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measures the cost of scoring opportunities one by one and in a batch, with
+scikit-learn and with the compiled forest.
+
+    python -m benchmarks.benchmark_score_model --opportunities 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from jolteon.strategy.bull_trend_rider.models.score_model import (
+    ModelFormat,
+    ScoreModel,
+)
+
+MODEL_NAME = "random_forest_model-2024-01-29.joblib"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score Model Benchmark")
+    parser.add_argument("--opportunities", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack(
+        [
+            rng.uniform(0.0, 1.0, args.opportunities),
+            rng.uniform(-5.0, 5.0, args.opportunities),
+            rng.integers(0, 2, args.opportunities),
+            rng.uniform(0.0, 10.0, args.opportunities),
+        ]
+    )
+
+    print(f"{'Model':<12}{'Single (us/row)':>17}{'Batch (us/row)':>16}")
+    for name, model_format in [
+        ("scikit", ModelFormat.JOBLIB),
+        ("compiled", ModelFormat.COMPILED),
+    ]:
+        model = ScoreModel(MODEL_NAME, model_format)
+
+        start = time.perf_counter()
+        for row in X:
+            model._predict(row[np.newaxis])
+        single_cost = (time.perf_counter() - start) / len(X)
+
+        start = time.perf_counter()
+        model._predict(X)
+        batch_cost = (time.perf_counter() - start) / len(X)
+
+        print(f"{name:<12}{single_cost * 1e6:>17.2f}{batch_cost * 1e6:>16.2f}")
+
+    model = ScoreModel(MODEL_NAME, ModelFormat.COMPILED)
+    model.score_batch(X)
+    start = time.perf_counter()
+    for row in X:
+        model.score_batch(row[np.newaxis])
+    memo_cost = (time.perf_counter() - start) / len(X)
+    print(f"{'memoized':<12}{memo_cost * 1e6:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import random
+from dataclasses import astuple, dataclass, field
+
+import numpy as np
+
+from jolteon.app.base import ApplicationBase
+from jolteon.core.event.signal import subscribe
+from jolteon.core.event.signal_subscriber import SignalSubscriber
+from jolteon.core.id_generator import id_generator
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.order import Order
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.data_source import IDataSource
+
+
+@dataclass
+class BacktestResult:
+    orders: list[Order] = field(default_factory=list)
+    fills: list[Trade] = field(default_factory=list)
+    pnl: float = 0.0
+    # SHA-256 of the orders, fills and PnL
+    fingerprint: str = ""
+
+
+class BacktestRunner(SignalSubscriber):
+    """
+    Replays historical market data in a repeatable way, and fingerprints the
+    orders, fills and PnL of each replay. The same replay always has the
+    same fingerprint, so a refactoring which changes the fingerprint also
+    changes the trading behavior.
+
+    A replay depends on global states, which are scoped to each run:
+        - Ids restart from 1
+        - The fake time is not in use by another replay
+        - Cached market trades of previous replays are not visible
+        - Random number generators are seeded
+
+    Orders are only seen when strategies run in the same process, and shard
+    workers fill mock orders from fewer cached market trades, see
+    `ShardWorker._cache_market_trades`. Only compare fingerprints of runs
+    with the same number of shards.
+    """
+
+    def __init__(self, seed: int = 0):
+        """
+        Args:
+            seed: Seed of the random number generators
+        """
+        self._seed = seed
+        self._result = BacktestResult()
+
+    @subscribe("order")
+    def on_order(self, _: object, order: Order):
+        self._result.orders.append(order)
+
+    @subscribe("order_fill")
+    def on_fill(self, _: str, trade: Trade):
+        self._result.fills.append(trade)
+
+    async def run(self, application: ApplicationBase, *args) -> BacktestResult:
+        """
+        Runs one replay of the application.
+
+        Args:
+            application: A newly created application using mock execution
+            args: Either a database to replay locally, or the start and end
+                  time to replay market data downloaded from the exchange
+        Returns:
+            Orders, fills, PnL and the fingerprint of the replay
+        """
+        assert len(args) in (1, 2), "Please specify a database or a time range"
+        if time_manager().is_using_fake_time():
+            raise RuntimeError("Another replay is using the fake time")
+
+        id_generator().reset()
+        random.seed(self._seed)
+        np.random.seed(self._seed)
+        trade_cache = dict(IDataSource.TRADE_CACHE)
+        IDataSource.TRADE_CACHE.clear()
+
+        self._result = BacktestResult()
+        # The application disconnects every subscriber once it stops
+        self.connect()
+        try:
+            if len(args) == 1:
+                pnl = await application.run_local_replay(*args)
+            else:
+                pnl = await application.run_replay(*args)
+        finally:
+            IDataSource.TRADE_CACHE.clear()
+            IDataSource.TRADE_CACHE.update(trade_cache)
+
+        result = self._result
+        result.pnl = pnl
+        result.fingerprint = BacktestRunner.fingerprint(result)
+        logging.info(
+            f"Backtest placed {len(result.orders)} orders with "
+            f"{len(result.fills)} fills, PnL {result.pnl}, "
+            f"fingerprint {result.fingerprint}"
+        )
+        return result
+
+    @staticmethod
+    def fingerprint(result: BacktestResult) -> str:
+        """
+        Args:
+            result: Orders, fills and PnL of a replay
+        Returns:
+            SHA-256 in hex of the orders, fills and PnL, in the order they
+            happened. Floats are compared exactly.
+        """
+        digest = hashlib.sha256()
+        for order in result.orders:
+            digest.update(f"order {astuple(order)!r}\n".encode())
+        for fill in result.fills:
+            digest.update(f"fill {astuple(fill)!r}\n".encode())
+        digest.update(f"pnl {result.pnl!r}\n".encode())
+        return digest.hexdigest()
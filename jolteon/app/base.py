@@ -1,47 +1,56 @@
 import asyncio
 import logging
-import threading
+from dataclasses import replace
 from datetime import datetime
+from typing import Union
 
 import pytz
 
+from jolteon.app.shard_coordinator import ShardCoordinator
+from jolteon.app.shard_worker import ShardConfig
+from jolteon.app.symbol_pipeline import SymbolPipeline
 from jolteon.core.event.signal_manager import SignalManager
 from jolteon.core.event.signal_recorder import SignalRecorder
+from jolteon.core.event_loop import EventLoop
 from jolteon.core.logging.logger import setup_global_logger
-from jolteon.market_data.core.indicator.rsi import RSICalculator
 from jolteon.market_data.data_source import DatabaseDataSource
 from jolteon.market_data.historical_feed import HistoricalFeed
 from jolteon.position.position_manager import PositionManager
-from jolteon.risk_limit.order_frequency_limit import OrderFrequencyLimit
-from jolteon.strategy.bull_trend_rider.strategy import BullTrendRiderStrategy
-from jolteon.strategy.core.patterns.bull_flag.recognizer import (
-    BullFlagRecognizer,
-)
-from jolteon.strategy.core.patterns.shooting_star.recognizer import (
-    ShootingStarRecognizer,
-)
 
 
 class ApplicationBase(SignalManager):
-    THREAD_ENABLED: bool = True
-    THREAD_SYNC_INTERVAL: float = 10
-
     def __init__(
         self,
-        symbol: str,
+        symbol: Union[str, list[str]],
         database_name,
         logfile_name,
         candlestick_interval_in_seconds,
         bull_flag_params,
         shooting_star_params,
         strategy_params,
+        shards: int = 1,
+        replay_speed: Union[float, None] = None,
     ):
         """
         Connects different components to build the trading engine. It supports
-        one symbol and one strategy.
+        one symbol or a list of symbols, and each symbol is traded by its own
+        strategy. Market data of all symbols is received from one market data
+        service.
+
+        With more than one shard, strategies are traded in worker processes
+        instead, each trading a subset of the symbols.
+
+        Replays run as fast as possible, unless a replay speed is given to
+        replay at a multiple of the wall clock speed, e.g. for soak tests.
         """
         self._symbol = symbol
+        self._symbols = [symbol] if isinstance(symbol, str) else list(symbol)
+        assert len(self._symbols) > 0, "Please specify at least one symbol"
+        assert len(set(self._symbols)) == len(
+            self._symbols
+        ), f"Duplicate symbols in {self._symbols}"
         self._candlestick_interval_in_seconds = candlestick_interval_in_seconds
+        self._replay_speed = replay_speed
 
         # Data Dumping Setup
         setup_global_logger(
@@ -57,29 +66,39 @@ class ApplicationBase(SignalManager):
         # Position Manager Setup
         self._position_manager = PositionManager()
 
-        # Strategy Setup
-        self._bull_flag_recognizer = BullFlagRecognizer(
-            params=bull_flag_params
-        )
-        self._shooting_star_recognizer = ShootingStarRecognizer(
-            params=shooting_star_params
-        )
-        self._strategy = BullTrendRiderStrategy(
-            symbol,
-            risk_limits=[
-                OrderFrequencyLimit(number_of_orders=1, in_seconds=60 * 2),
-                OrderFrequencyLimit(number_of_orders=2, in_seconds=60 * 10),
-            ],
-            parameters=strategy_params,
-        )
-
-        # Indicators
-        self._rsi_calculator = RSICalculator()
+        # Strategy Setup, one pipeline per symbol
+        self._pipelines = dict[str, SymbolPipeline]()
+        self._shard_coordinator: Union[ShardCoordinator, None] = None
+        if shards > 1:
+            self._shard_coordinator = ShardCoordinator(
+                self._symbols, shards, self._position_manager
+            )
+            self._shard_config = ShardConfig(
+                candlestick_interval_in_seconds,
+                bull_flag_params=bull_flag_params,
+                shooting_star_params=shooting_star_params,
+                strategy_params=strategy_params,
+            )
+        else:
+            self._pipelines = {
+                symbol: SymbolPipeline(
+                    symbol,
+                    candlestick_interval_in_seconds,
+                    bull_flag_params=bull_flag_params,
+                    shooting_star_params=shooting_star_params,
+                    strategy_params=strategy_params,
+                    position_manager=self._position_manager,
+                )
+                for symbol in self._symbols
+            }
 
         # Per Exchange Setup (Decided Later)
         self._exec_service: object = None
         self._md: object = None
 
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self._stop_requested = asyncio.Event()
+
     def use_execution_service(self, service: object):
         print(f"Using {type(service).__name__}")
         self._exec_service = service
@@ -92,28 +111,51 @@ class ApplicationBase(SignalManager):
 
     async def run_start(self, *args):
         self._connect_signals()
-
-        if ApplicationBase.THREAD_ENABLED:
-            # Start receiving market data
-            md_thread = self._start_thread(
-                "MD", self._md.connect(self._symbol, *args)
+        if len(args) > 0 and self._replay_speed is not None:
+            # Replays with realistic timing save recorded data periodically,
+            # the same as running live
+            self._signal_recorder.enable_auto_save(auto_save_interval=30)
+        if self._shard_coordinator is not None:
+            # Workers create their own execution services of the same type
+            self._shard_coordinator.start(
+                replace(
+                    self._shard_config,
+                    execution_service_type=type(self._exec_service),
+                    replay=len(args) > 0,
+                    # Workers run the same event loop implementation
+                    event_loop=EventLoop.current(),
+                )
             )
+            if len(args) > 0:
+                # Replays wait for the workers instead of queueing all
+                # market trades in memory
+                self._md.use_back_pressure(self._shard_coordinator.drain)
 
-            # Start other asyncio tasks (heartbeating, ..., etc)
-            async def main_asyncio_tasks() -> None:
-                while md_thread.is_alive():
-                    await asyncio.sleep(self.THREAD_SYNC_INTERVAL)
+        try:
+            await self._run_market_data(*args)
+        finally:
+            if self._shard_coordinator is not None:
+                # Wait for the fills of the last market trades
+                await self._shard_coordinator.stop()
 
-            await main_asyncio_tasks()
-        else:
-            await self._md.connect(self._symbol, *args)
+            for symbol, position in self._position_manager.positions.items():
+                print(f"{symbol}: {position.volume}")
 
-        for symbol, position in self._position_manager.positions.items():
-            print(f"{symbol}: {position.volume}")
+            self.stop()
+            self._stop_requested.clear()
 
-        self.stop()
         return self._position_manager.pnl
 
+    def request_stop(self):
+        """
+        Stops receiving market data as soon as possible. It is safe to call
+        from any thread, e.g. from a signal handler.
+        """
+        if self._loop is None:
+            self._stop_requested.set()
+        else:
+            self._loop.call_soon_threadsafe(self._stop_requested.set)
+
     async def run_local_replay(self, db: str):
         data_source = DatabaseDataSource(db)
         start = data_source.start_time()
@@ -123,6 +165,7 @@ class ApplicationBase(SignalManager):
             HistoricalFeed(
                 data_source,
                 self._candlestick_interval_in_seconds,
+                replay_speed=self._replay_speed,
             )
         )
 
@@ -134,37 +177,38 @@ class ApplicationBase(SignalManager):
     def stop(self):
         # Disconnect every blinker signal from its receivers
         self._disconnect_signals()
+        # Stop receiving fills of orders in the background, if any
+        stop_execution_service = getattr(self._exec_service, "stop", None)
+        if stop_execution_service is not None:
+            stop_execution_service()
 
     def _connect_signals(self):
         self.connect_all()
+        for pipeline in self._pipelines.values():
+            pipeline.connect()
         self._signal_recorder.start_recording()
 
     def _disconnect_signals(self):
         self.disconnect_all()
         self._signal_recorder.stop_recording()
 
-    @staticmethod
-    def _start_thread(name: str, task):
-        def run_task():
-            # Create a new event loop for the thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            # Run the first async task with arguments in the event loop
-            try:
-                loop.run_until_complete(task)
-            except asyncio.CancelledError:
-                pass  # Ignore CancelledError on cleanup
-            except Exception as e:
-                logging.error(f"{name} got exception: {e}", exc_info=True)
-                raise e
-
-            loop.close()
-
-        thread = threading.Thread(
-            name=name,
-            target=run_task,
+    async def _run_market_data(self, *args):
+        # Market data, heartbeats and auto-saving share one event loop, while
+        # CPU heavy stages run in their own threads
+        self._loop = asyncio.get_running_loop()
+        md_task = asyncio.create_task(
+            self._md.connect(self._symbol, *args), name="MD"
         )
-        thread.start()
-
-        return thread
+        stop_task = asyncio.create_task(self._stop_requested.wait())
+        try:
+            await asyncio.wait(
+                {md_task, stop_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            stop_task.cancel()
+            md_task.cancel()
+
+        try:
+            await md_task
+        except asyncio.CancelledError:
+            logging.info("Stopped receiving market data on request")
@@ -3,6 +3,7 @@ Application interface for Jolteon
 """
 import logging
 from datetime import datetime
+from typing import Union
 
 import pytz
 
@@ -15,6 +16,7 @@ from jolteon.market_data.coinbase.data_source import (
 )
 from jolteon.market_data.coinbase.public_feed import PublicFeed
 from jolteon.market_data.historical_feed import HistoricalFeed
+from jolteon.market_data.trade_chunk_store import TradeChunkStore
 from jolteon.strategy.bull_trend_rider.strategy_parameters import (
     StrategyParameters,
 )
@@ -29,7 +31,7 @@ from jolteon.strategy.core.patterns.shooting_star.parameters import (
 class CoinbaseApplication(ApplicationBase):
     def __init__(
         self,
-        symbol: str,
+        symbol: Union[str, list[str]],
         use_mock_execution: bool = True,
         database_name="/tmp/jolteon.sqlite",
         logfile_name="/tmp/jolteon.log",
@@ -37,6 +39,8 @@ class CoinbaseApplication(ApplicationBase):
         bull_flag_params=BullFlagParameters(),
         shooting_star_params=ShootingStarParameters(),
         strategy_params=StrategyParameters(),
+        shards: int = 1,
+        replay_speed: Union[float, None] = None,
     ):
         print(f"Using {type(self).__name__}")
         super().__init__(
@@ -47,6 +51,8 @@ class CoinbaseApplication(ApplicationBase):
             bull_flag_params=bull_flag_params,
             shooting_star_params=shooting_star_params,
             strategy_params=strategy_params,
+            shards=shards,
+            replay_speed=replay_speed,
         )
         if use_mock_execution:
             super().use_execution_service(MockExecutionService())
@@ -67,8 +73,11 @@ class CoinbaseApplication(ApplicationBase):
         logging.info(f"Replaying {self._symbol} from {start} to {end}")
         super().use_market_data_service(
             HistoricalFeed(
-                CoinbaseHistoricalDataSource(),
+                CoinbaseHistoricalDataSource(
+                    store=TradeChunkStore("coinbase")
+                ),
                 self._candlestick_interval_in_seconds,
+                replay_speed=self._replay_speed,
             )
         )
         now = datetime.now(tz=pytz.utc)
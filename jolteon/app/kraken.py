@@ -3,6 +3,7 @@ Application interface for Jolteon
 """
 import logging
 from datetime import datetime
+from typing import Union
 
 import pytz
 
@@ -14,6 +15,7 @@ from jolteon.execution.kraken.mock_execution_service import (
 from jolteon.market_data.historical_feed import HistoricalFeed
 from jolteon.market_data.kraken.data_source import KrakenHistoricalDataSource
 from jolteon.market_data.kraken.public_feed import PublicFeed
+from jolteon.market_data.trade_chunk_store import TradeChunkStore
 from jolteon.strategy.bull_trend_rider.strategy_parameters import (
     StrategyParameters,
 )
@@ -28,7 +30,7 @@ from jolteon.strategy.core.patterns.shooting_star.parameters import (
 class KrakenApplication(ApplicationBase):
     def __init__(
         self,
-        symbol: str,
+        symbol: Union[str, list[str]],
         use_mock_execution: bool = True,
         database_name="/tmp/jolteon.sqlite",
         logfile_name="/tmp/jolteon.log",
@@ -36,16 +38,24 @@ class KrakenApplication(ApplicationBase):
         bull_flag_params=BullFlagParameters(),
         shooting_star_params=ShootingStarParameters(),
         strategy_params=StrategyParameters(),
+        shards: int = 1,
+        replay_speed: Union[float, None] = None,
     ):
         print(f"Using {type(self).__name__}")
         super().__init__(
-            symbol=symbol.replace("-", "/"),
+            symbol=(
+                symbol.replace("-", "/")
+                if isinstance(symbol, str)
+                else [s.replace("-", "/") for s in symbol]
+            ),
             database_name=database_name,
             logfile_name=logfile_name,
             candlestick_interval_in_seconds=candlestick_interval_in_seconds,
             bull_flag_params=bull_flag_params,
             shooting_star_params=shooting_star_params,
             strategy_params=strategy_params,
+            shards=shards,
+            replay_speed=replay_speed,
         )
         if use_mock_execution:
             super().use_execution_service(MockExecutionService())
@@ -68,8 +78,9 @@ class KrakenApplication(ApplicationBase):
     async def run_replay(self, start: datetime, end: datetime):
         super().use_market_data_service(
             HistoricalFeed(
-                KrakenHistoricalDataSource(),
+                KrakenHistoricalDataSource(store=TradeChunkStore("kraken")),
                 self._candlestick_interval_in_seconds,
+                replay_speed=self._replay_speed,
             )
         )
 
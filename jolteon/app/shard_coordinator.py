@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+from collections import deque
+from dataclasses import replace
+from enum import Enum
+from typing import Any, Union
+
+from jolteon.app.shard_worker import ShardConfig, ShardWorker, run_shard
+from jolteon.core.event.signal import signal, subscribe
+from jolteon.core.event.signal_subscriber import SignalSubscriber
+from jolteon.core.health_monitor.heartbeat import (
+    Heartbeat,
+    HeartbeatLevel,
+    Heartbeater,
+)
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.core.trade_ring_buffer import TradeRingBuffer
+from jolteon.position.position_manager import PositionManager
+
+
+class ShardCoordinator(Heartbeater, SignalSubscriber):
+    """
+    Splits symbols into shards and trades each shard in its own worker
+    process, so that strategies of different symbols are not limited by one
+    GIL.
+
+    The coordinator keeps the exchange connections. It forwards decoded
+    market trades of each shard through a shared memory ring buffer, and
+    re-sends fills and heartbeats received from the workers, so that the
+    position manager of the coordinator holds the positions of all shards.
+    """
+
+    class ErrorCode(Enum):
+        SHARD_EXITED = "Shard exited unexpectedly"
+        SHARD_STALLED = "Shard stopped reading market trades"
+        SHARD_TERMINATED = "Shard terminated after not stopping in time"
+
+    RING_BUFFER_CAPACITY = 65536
+    # Market trades of each shard waiting for room in its ring buffer
+    MAX_PENDING_TRADES = 65536
+    # A shard not reading any market trade for this long is stalled
+    STALL_TIMEOUT_IN_SECONDS = 30
+    # Max time for workers to trade the remaining market trades and stop
+    STOP_TIMEOUT_IN_SECONDS = 60
+    # Max time for a worker process to exit after it stops or is terminated
+    JOIN_TIMEOUT_IN_SECONDS = 5
+    POLL_INTERVAL_IN_SECONDS = 0.01
+
+    def __init__(
+        self,
+        symbols: list[str],
+        n_shards: int,
+        position_manager: Union[PositionManager, None] = None,
+    ):
+        """
+        Args:
+            symbols: All symbols to trade
+            n_shards: Number of worker processes, at most one per symbol
+            position_manager: Positions of all shards, whose drawdown is
+                              checked by the risk limits of every worker
+        """
+        super().__init__(type(self).__name__, interval_in_seconds=10)
+        assert n_shards > 0, "Please use at least one shard"
+        n_shards = min(n_shards, len(symbols))
+        self.shard_symbols = [symbols[i::n_shards] for i in range(n_shards)]
+        self._shard_of = {
+            symbol: i
+            for i, shard_symbols in enumerate(self.shard_symbols)
+            for symbol in shard_symbols
+        }
+        self._ring_buffers = list[TradeRingBuffer]()
+        # Market trades are queued locally while a ring buffer is full, so
+        # that the event loop never waits for a worker
+        self._pending_trades = list[deque[Trade]]()
+        self._blocked_since = dict[int, float]()
+        self._processes = list[multiprocessing.Process]()
+        self._outbox: Union[multiprocessing.Queue, None] = None
+        self._receiving_task: Union[asyncio.Task, None] = None
+        # Shards stopped, with the number of market trades they traded
+        self.stopped = dict[int, int]()
+        self._stalled = set[int]()
+        self._order_fill_event = signal("order_fill")
+        # Drawdown of the whole account in shared memory, written by the
+        # coordinator and read by the workers
+        self._position_manager = position_manager
+        self._account_drawdown: Any = None
+
+    def start(self, config: ShardConfig) -> None:
+        """
+        Starts one worker process per shard.
+
+        Args:
+            config: Parameters shared by all shards
+        """
+        # Worker processes shall not inherit threads and event loops of the
+        # coordinator
+        context = multiprocessing.get_context("spawn")
+        self._outbox = context.Queue()
+        self._account_drawdown = context.Value("d", 0.0)
+        for i, symbols in enumerate(self.shard_symbols):
+            ring_buffer = TradeRingBuffer(
+                symbols, ShardCoordinator.RING_BUFFER_CAPACITY
+            )
+            process = context.Process(
+                target=run_shard,
+                name=f"Shard-{i}",
+                args=(
+                    replace(
+                        config,
+                        index=i,
+                        n_shards=len(self.shard_symbols),
+                        symbols=symbols,
+                        ring_buffer_name=ring_buffer.name,
+                    ),
+                    self._outbox,
+                    self._account_drawdown,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._ring_buffers.append(ring_buffer)
+            self._pending_trades.append(deque[Trade]())
+            self._processes.append(process)
+
+        self._receiving_task = asyncio.create_task(self._receive_forever())
+
+    async def stop(self) -> None:
+        """
+        Waits for all workers to trade the remaining market trades, and
+        then releases the ring buffers. Workers not stopped in time are
+        terminated.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ShardCoordinator.STOP_TIMEOUT_IN_SECONDS
+        await self.drain()
+        for ring_buffer in self._ring_buffers:
+            ring_buffer.close()
+
+        while not self._is_stopped() and loop.time() < deadline:
+            self._receive()
+            await asyncio.sleep(ShardCoordinator.POLL_INTERVAL_IN_SECONDS)
+        self._receive()
+
+        if self._receiving_task:
+            self._receiving_task.cancel()
+        for i, process in enumerate(self._processes):
+            if i not in self.stopped:
+                self._terminate(i)
+        for process in self._processes:
+            await asyncio.to_thread(
+                process.join, ShardCoordinator.JOIN_TIMEOUT_IN_SECONDS
+            )
+            if process.is_alive():
+                logging.error(f"{process.name} is killed")
+                process.kill()
+                await asyncio.to_thread(process.join)
+        for ring_buffer in self._ring_buffers:
+            ring_buffer.release()
+        self._ring_buffers.clear()
+        self._pending_trades.clear()
+        self._blocked_since.clear()
+        self._processes.clear()
+
+    async def drain(self) -> None:
+        """
+        Waits until market trades queued locally are put into the ring
+        buffers, or their shards are stalled. Replays wait for the workers
+        this way instead of queueing all market trades in memory.
+        """
+        while any(self._pending_trades):
+            self._forward()
+            if any(self._pending_trades):
+                await asyncio.sleep(ShardCoordinator.POLL_INTERVAL_IN_SECONDS)
+
+    @subscribe("market_trade_feed")
+    def on_market_trade(self, _: str, market_trade: Trade):
+        self._publish_drawdown()
+        shard = self._shard_of.get(market_trade.symbol)
+        if (
+            shard is None
+            or shard >= len(self._ring_buffers)
+            or shard in self.stopped
+            or shard in self._stalled
+        ):
+            return
+
+        pending_trades = self._pending_trades[shard]
+        if not pending_trades and self._ring_buffers[shard].try_put(
+            market_trade
+        ):
+            return
+
+        if len(pending_trades) >= ShardCoordinator.MAX_PENDING_TRADES:
+            self._stall(shard, f"{len(pending_trades)} market trades queued")
+            return
+        pending_trades.append(market_trade)
+        self._blocked_since.setdefault(
+            shard, asyncio.get_running_loop().time()
+        )
+
+    def _forward(self):
+        """
+        Moves market trades queued locally into the ring buffers as the
+        workers make room.
+        """
+        now = asyncio.get_running_loop().time()
+        for shard, pending_trades in enumerate(self._pending_trades):
+            if pending_trades and shard in self.stopped:
+                # Nobody will read them
+                pending_trades.clear()
+                self._blocked_since.pop(shard, None)
+            if not pending_trades:
+                continue
+            n_pending = len(pending_trades)
+            while pending_trades and self._ring_buffers[shard].try_put(
+                pending_trades[0]
+            ):
+                pending_trades.popleft()
+
+            if not pending_trades:
+                self._blocked_since.pop(shard, None)
+            elif len(pending_trades) < n_pending:
+                self._blocked_since[shard] = now
+            elif (
+                now - self._blocked_since[shard]
+                > ShardCoordinator.STALL_TIMEOUT_IN_SECONDS
+            ):
+                self._stall(
+                    shard,
+                    f"No market trade is read in "
+                    f"{ShardCoordinator.STALL_TIMEOUT_IN_SECONDS} seconds",
+                )
+
+    def _stall(self, shard: int, reason: str):
+        # Don't wait for the same shard again
+        self._stalled.add(shard)
+        self._pending_trades[shard].clear()
+        self._blocked_since.pop(shard, None)
+        logging.error(f"Fail to send market trades to Shard-{shard}: {reason}")
+        self.add_issue(
+            HeartbeatLevel.ERROR,
+            f"{ShardCoordinator.ErrorCode.SHARD_STALLED.value}: "
+            f"Shard-{shard}",
+        )
+
+    def _terminate(self, shard: int):
+        # Report once, the shard will not come back
+        self.stopped[shard] = 0
+        logging.error(
+            f"Shard-{shard} is terminated after not stopping in "
+            f"{ShardCoordinator.STOP_TIMEOUT_IN_SECONDS} seconds"
+        )
+        self.add_issue(
+            HeartbeatLevel.CRITICAL,
+            f"{ShardCoordinator.ErrorCode.SHARD_TERMINATED.value}: "
+            f"Shard-{shard}",
+        )
+        self._processes[shard].terminate()
+
+    def _publish_drawdown(self):
+        if self._position_manager is None or self._account_drawdown is None:
+            return
+        self._account_drawdown.value = self._position_manager.drawdown()
+
+    def _is_stopped(self) -> bool:
+        return len(self.stopped) == len(self._processes)
+
+    async def _receive_forever(self):
+        while True:
+            self._forward()
+            self._receive()
+            await asyncio.sleep(ShardCoordinator.POLL_INTERVAL_IN_SECONDS)
+
+    def _receive(self):
+        assert self._outbox is not None
+        # A worker sends all its messages before exiting, so check the
+        # workers before receiving their last messages
+        exited = [
+            i
+            for i, process in enumerate(self._processes)
+            if i not in self.stopped and not process.is_alive()
+        ]
+        while True:
+            try:
+                message, payload = self._outbox.get_nowait()
+            except queue.Empty:
+                break
+            self._on_message(message, payload)
+
+        for i in exited:
+            if i in self.stopped:
+                continue
+            # Report once, the shard will not come back
+            self.stopped[i] = 0
+            logging.error(
+                f"Shard-{i} exited with code {self._processes[i].exitcode}"
+            )
+            self.add_issue(
+                HeartbeatLevel.CRITICAL,
+                f"{ShardCoordinator.ErrorCode.SHARD_EXITED.value}: "
+                f"Shard-{i}",
+            )
+
+    def _on_message(self, message: ShardWorker.Message, payload: object):
+        if message == ShardWorker.Message.FILL:
+            assert isinstance(payload, Trade)
+            self._order_fill_event.send(payload.symbol, trade=payload)
+            self._publish_drawdown()
+        elif message == ShardWorker.Message.HEARTBEAT:
+            assert isinstance(payload, Heartbeat)
+            self._heartbeat_signal.send(
+                self._heartbeat_signal, heartbeat=payload
+            )
+        elif message == ShardWorker.Message.STOPPED:
+            assert isinstance(payload, tuple)
+            shard, n_market_trades = payload
+            self.stopped[shard] = n_market_trades
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Union
+
+from jolteon.app.symbol_pipeline import SymbolPipeline
+from jolteon.core.event.signal import subscribe
+from jolteon.core.event.signal_manager import SignalManager
+from jolteon.core.event.signal_subscriber import SignalSubscriber
+from jolteon.core.event_loop import EventLoop, run
+from jolteon.core.health_monitor.heartbeat import Heartbeat, Heartbeater
+from jolteon.core.id_generator import id_generator
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.candlestick_generator import (
+    CandlestickGenerator,
+)
+from jolteon.market_data.core.events import Events
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.core.trade_ring_buffer import TradeRingBuffer
+from jolteon.market_data.data_source import IDataSource
+from jolteon.position.position_manager import PositionManager
+from jolteon.strategy.bull_trend_rider.strategy_parameters import (
+    StrategyParameters,
+)
+from jolteon.strategy.core.patterns.bull_flag.parameters import (
+    BullFlagParameters,
+)
+from jolteon.strategy.core.patterns.shooting_star.parameters import (
+    ShootingStarParameters,
+)
+
+
+@dataclass
+class ShardConfig:
+    """
+    Everything a worker process needs to trade its symbols. It is pickled
+    and sent to the worker process when the process starts.
+    """
+
+    candlestick_interval_in_seconds: int
+    bull_flag_params: BullFlagParameters
+    shooting_star_params: ShootingStarParameters
+    strategy_params: StrategyParameters
+    # Type of the execution service, created in the worker process
+    execution_service_type: Union[type, None] = None
+    # Whether market trades are replayed and the time shall be faked
+    replay: bool = False
+    # Implementation of the event loop running the worker
+    event_loop: EventLoop = EventLoop.ASYNCIO
+    # Filled by the coordinator for each shard
+    index: int = 0
+    n_shards: int = 1
+    symbols: list[str] = field(default_factory=list)
+    ring_buffer_name: str = ""
+
+
+class ShardWorker(Heartbeater, SignalSubscriber):
+    """
+    Runs strategies of a subset of symbols in a worker process. Market
+    trades are read from a shared memory ring buffer written by the
+    coordinator, while fills and heartbeats are sent back to the coordinator
+    through the outbox.
+    """
+
+    class Message(Enum):
+        FILL = "FILL"
+        HEARTBEAT = "HEARTBEAT"
+        STOPPED = "STOPPED"
+
+    POLL_INTERVAL_IN_SECONDS = 0.001
+
+    def __init__(
+        self, config: ShardConfig, outbox: Any, account_drawdown: Any = None
+    ):
+        """
+        Args:
+            config: Symbols and strategy parameters of this shard
+            outbox: A queue to send messages to the coordinator
+            account_drawdown: A shared `multiprocessing.Value` holding the
+                              drawdown of all shards, written by the
+                              coordinator
+        """
+        super().__init__(f"Shard-{config.index}", interval_in_seconds=1)
+        self._config = config
+        self._outbox = outbox
+        self.events = Events()
+        # Positions of the symbols of this shard, checked by the position
+        # limits. As every symbol is traded by one shard only, they are the
+        # same as the positions of the whole account. The drawdown is only
+        # known by the coordinator, which keeps the positions of all shards.
+        self.position_manager = PositionManager()
+        drawdown = (
+            (lambda: account_drawdown.value)
+            if account_drawdown is not None
+            else None
+        )
+        self.pipelines = {
+            symbol: SymbolPipeline(
+                symbol,
+                config.candlestick_interval_in_seconds,
+                bull_flag_params=config.bull_flag_params,
+                shooting_star_params=config.shooting_star_params,
+                strategy_params=config.strategy_params,
+                position_manager=self.position_manager,
+                drawdown=drawdown,
+            )
+            for symbol in config.symbols
+        }
+        self._candlestick_generators = defaultdict[str, CandlestickGenerator](
+            lambda: CandlestickGenerator(
+                interval_in_seconds=config.candlestick_interval_in_seconds
+            )
+        )
+        self._last_cache_keys = dict[str, tuple]()
+        self.n_market_trades = 0
+
+    @subscribe("order_fill")
+    def on_fill(self, _: str, trade: Trade):
+        self._outbox.put((ShardWorker.Message.FILL, trade))
+
+    @subscribe("heartbeat")
+    def on_heartbeat(self, _: object, heartbeat: Heartbeat):
+        # Components of different shards share the same names
+        if heartbeat.sender != self._name:
+            heartbeat = Heartbeat(
+                level=heartbeat.level,
+                sender=f"{self._name}/{heartbeat.sender}",
+                message=heartbeat.message,
+                report_time=heartbeat.report_time,
+            )
+        self._outbox.put((ShardWorker.Message.HEARTBEAT, heartbeat))
+
+    async def run(self) -> None:
+        """
+        Trades market trades from the ring buffer until the coordinator
+        closes it.
+        """
+        config = self._config
+        # Orders of all shards are sent with the same account
+        id_generator().reset(start=config.index + 1, step=config.n_shards)
+
+        assert (
+            config.execution_service_type is not None
+        ), "Please specify the execution service of the shard"
+        execution_service = config.execution_service_type()
+        self.connect()
+        execution_service.connect()
+        self.position_manager.connect()
+        for pipeline in self.pipelines.values():
+            pipeline.connect()
+
+        ring_buffer = TradeRingBuffer(
+            config.symbols, name=config.ring_buffer_name
+        )
+        if config.replay:
+            time_manager().claim_admin(self)
+        try:
+            while True:
+                market_trades = ring_buffer.get()
+                if not market_trades:
+                    # The producer never puts after closing the ring buffer
+                    if ring_buffer.is_closed() and len(ring_buffer) == 0:
+                        break
+                    await asyncio.sleep(ShardWorker.POLL_INTERVAL_IN_SECONDS)
+                    continue
+
+                self._replay(market_trades)
+
+                # Let other tasks, e.g. heartbeats, make progress
+                await asyncio.sleep(0)
+        finally:
+            if config.replay:
+                time_manager().reset(admin=self)
+            ring_buffer.release()
+            SignalManager.disconnect_all()
+            # Stop receiving fills of orders in the background, if any
+            stop_execution_service = getattr(execution_service, "stop", None)
+            if stop_execution_service is not None:
+                stop_execution_service()
+            for key in self._last_cache_keys.values():
+                IDataSource.TRADE_CACHE.pop(key, None)
+
+        logging.info(
+            f"{self._name} traded {self.n_market_trades} market trades "
+            f"of {config.symbols}"
+        )
+        self._outbox.put(
+            (ShardWorker.Message.STOPPED, (config.index, self.n_market_trades))
+        )
+
+    def _replay(self, market_trades: list[Trade]):
+        if self._config.replay:
+            self._cache_market_trades(market_trades)
+
+        for market_trade in market_trades:
+            if self._config.replay:
+                time_manager().use_fake_time(
+                    market_trade.transaction_time, admin=self
+                )
+            self.events.market_trade.send(
+                market_trade.symbol, market_trade=market_trade
+            )
+
+            candlesticks = self._candlestick_generators[
+                market_trade.symbol
+            ].on_market_trade(market_trade)
+            for candlestick in candlesticks:
+                self.events.candlestick.send(
+                    market_trade.symbol, candlestick=candlestick
+                )
+        self.n_market_trades += len(market_trades)
+
+    def _cache_market_trades(self, market_trades: list[Trade]):
+        # Mock execution services fill orders at prices of cached market
+        # trades, which are downloaded by the coordinator. Cache the last
+        # batch of market trades read of each symbol instead. Unlike the
+        # downloaded chunks, a batch ends at the latest market trade read, so
+        # orders may be filled at different prices than in a single process.
+        by_symbol = defaultdict[str, list[Trade]](list)
+        for market_trade in market_trades:
+            by_symbol[market_trade.symbol].append(market_trade)
+
+        for symbol, trades in by_symbol.items():
+            if symbol in self._last_cache_keys:
+                IDataSource.TRADE_CACHE.pop(
+                    self._last_cache_keys[symbol], None
+                )
+            key = (
+                symbol,
+                trades[0].transaction_time,
+                trades[-1].transaction_time,
+            )
+            IDataSource.TRADE_CACHE[key] = trades
+            self._last_cache_keys[symbol] = key
+
+
+def run_shard(
+    config: ShardConfig, outbox: Any, account_drawdown: Any = None
+) -> None:
+    """
+    Entry point of a worker process.
+    """
+
+    async def main():
+        await ShardWorker(config, outbox, account_drawdown).run()
+
+    run(main(), config.event_loop)
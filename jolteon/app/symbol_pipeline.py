@@ -0,0 +1,103 @@
+from typing import Callable, Union
+
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.indicator.rsi import RSICalculator
+from jolteon.position.position_manager import PositionManager
+from jolteon.risk_limit.order_frequency_limit import OrderFrequencyLimit
+from jolteon.risk_limit.position_limit import (
+    MaxDrawdownLimit,
+    MaxPositionLimit,
+)
+from jolteon.strategy.bull_trend_rider.strategy import BullTrendRiderStrategy
+from jolteon.strategy.bull_trend_rider.strategy_parameters import (
+    StrategyParameters,
+)
+from jolteon.strategy.core.patterns.bull_flag.parameters import (
+    BullFlagParameters,
+)
+from jolteon.strategy.core.patterns.bull_flag.recognizer import (
+    BullFlagRecognizer,
+)
+from jolteon.strategy.core.patterns.shooting_star.parameters import (
+    ShootingStarParameters,
+)
+from jolteon.strategy.core.patterns.shooting_star.recognizer import (
+    ShootingStarRecognizer,
+)
+
+
+class SymbolPipeline:
+    """
+    Candlesticks, indicators, pattern recognizers and the strategy trading
+    one symbol. Pipelines of different symbols share the same signals, but
+    each pipeline only receives signals sent by its symbol.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        candlestick_interval_in_seconds: int,
+        bull_flag_params: BullFlagParameters,
+        shooting_star_params: ShootingStarParameters,
+        strategy_params: StrategyParameters,
+        position_manager: PositionManager,
+        drawdown: Union[Callable[[], float], None] = None,
+    ):
+        """
+        Args:
+            position_manager: Positions checked by the risk limits
+            drawdown: Drawdown of the whole account when the position manager
+                      only holds some of the positions, defaults to the
+                      drawdown of the position manager
+        """
+        self.symbol = symbol
+
+        # Candlesticks and indicators shared by all strategies
+        self.candlestick_hub = CandlestickHub(
+            symbol, candlestick_interval_in_seconds
+        )
+
+        # Strategy Setup
+        self.bull_flag_recognizer = BullFlagRecognizer(
+            params=bull_flag_params, hub=self.candlestick_hub
+        )
+        self.shooting_star_recognizer = ShootingStarRecognizer(
+            params=shooting_star_params
+        )
+        # Positions are shared by the pipelines of all symbols
+        self.position_limit = MaxPositionLimit(
+            position_manager, strategy_params.max_position_volume
+        )
+        self.strategy = BullTrendRiderStrategy(
+            symbol,
+            risk_limits=[
+                OrderFrequencyLimit(number_of_orders=1, in_seconds=60 * 2),
+                OrderFrequencyLimit(number_of_orders=2, in_seconds=60 * 10),
+                self.position_limit,
+                MaxDrawdownLimit(
+                    drawdown or position_manager.drawdown,
+                    strategy_params.max_drawdown,
+                ),
+            ],
+            parameters=strategy_params,
+            hub=self.candlestick_hub,
+        )
+
+        # Indicators
+        self.rsi_calculator = self.candlestick_hub.indicator(RSICalculator)
+
+    def connect(self) -> None:
+        """
+        Connect every component of the pipeline to the signals sent by the
+        symbol of this pipeline.
+        """
+        for component in (
+            self.candlestick_hub,
+            self.bull_flag_recognizer,
+            self.shooting_star_recognizer,
+            self.strategy,
+        ):
+            component.connect(sender=self.symbol)
+        # Rejects and expiries are not sent by the symbol, and the limit only
+        # tracks orders of this pipeline
+        self.position_limit.connect()
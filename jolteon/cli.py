@@ -12,7 +12,9 @@ from datetime import datetime, timezone
 import pytz
 
 from jolteon.app.progress_bar import ProgressBar
+from jolteon.core.event_loop import EVENT_LOOP_ENV_VARIABLE, EventLoop, run
 from jolteon.core.market import Market
+from jolteon.core.time.replay_clock import ReplayClock
 from jolteon.market_data.data_source import DatabaseDataSource
 
 
@@ -26,6 +28,16 @@ def graceful_exit(signum, frame):
 signal.signal(signal.SIGINT, graceful_exit)
 
 
+def stop_on_interrupt(app) -> None:
+    """
+    Once the application is running, Ctrl+C stops it instead of exiting
+    immediately, so that recorded data is still saved.
+    """
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGINT, app.request_stop
+    )
+
+
 async def main():
     app_start_time = datetime.now(tz=pytz.utc)
 
@@ -34,6 +46,37 @@ async def main():
     parser.add_argument("--replay-start", help="Start time in ISO format")
     parser.add_argument("--replay-end", help="End time in ISO format")
     parser.add_argument("--exchange", help="Name of the exchange")
+    parser.add_argument(
+        "--symbol",
+        nargs="+",
+        default=["BTC-USD"],
+        help="One or more symbols to trade, e.g. BTC-USD ETH-USD",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Number of worker processes trading the symbols",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        default="max",
+        help="Replay speed as a multiple of the wall clock speed, e.g. 1x "
+        "or 10x. Defaults to max, which replays as fast as possible",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="Replay repeatably and print the fingerprint of the orders, "
+        "fills and PnL",
+    )
+    parser.add_argument(
+        "--event-loop",
+        type=str.upper,
+        choices=list(EventLoop),
+        help="Implementation of the event loop, AUTO uses uvloop if it is "
+        f"installed. Defaults to ${EVENT_LOOP_ENV_VARIABLE} or ASYNCIO",
+    )
 
     # Access the arguments
     args = parser.parse_args()
@@ -52,7 +95,8 @@ async def main():
             f"Application is not implemented for market {args.exchange}"
         )
 
-    symbol = "BTC-USD"
+    # Symbols share one market data connection, but each has its own strategy
+    symbol = args.symbol[0] if len(args.symbol) == 1 else args.symbol
 
     if replay_start and replay_end and replay_db:
         assert False, (
@@ -79,18 +123,32 @@ async def main():
             symbol,
             use_mock_execution=True,
             candlestick_interval_in_seconds=60,
+            shards=args.shards,
+            replay_speed=ReplayClock.parse(args.replay_speed),
             database_name="/tmp/replay.sqlite",
             logfile_name="/tmp/replay.log",
         )
+        stop_on_interrupt(app)
         profiler = cProfile.Profile()
         profiler.enable()
 
         pb = ProgressBar(replay_start_time, replay_end_time)
         pb.start()
-        if replay_start and replay_end:
-            pnl = await app.run_replay(replay_start_time, replay_end_time)
+        replay_args = (
+            (replay_start_time, replay_end_time)
+            if replay_start and replay_end
+            else (replay_db,)
+        )
+        if args.fingerprint:
+            from jolteon.app.backtest import BacktestRunner
+
+            result = await BacktestRunner().run(app, *replay_args)
+            pnl = result.pnl
+            print(f"Fingerprint: {result.fingerprint}")
+        elif replay_start and replay_end:
+            pnl = await app.run_replay(*replay_args)
         else:
-            pnl = await app.run_local_replay(replay_db)
+            pnl = await app.run_local_replay(*replay_args)
         pb.stop()
 
         profiler.disable()
@@ -101,9 +159,11 @@ async def main():
             symbol,
             use_mock_execution=False,
             candlestick_interval_in_seconds=60,
+            shards=args.shards,
             database_name="/tmp/jolteon.sqlite",
             logfile_name="/tmp/jolteon.log",
         )
+        stop_on_interrupt(app)
         pnl = await app.start()
 
     print(f"PnL: {pnl}")
@@ -112,5 +172,16 @@ async def main():
     print(f"Total Runtime: {app_end_time - app_start_time}")
 
 
+def run_main():
+    """
+    Runs the CLI in the event loop selected by `--event-loop`, which has to
+    be chosen before any event loop is created.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--event-loop")
+    args, _ = parser.parse_known_args()
+    run(main(), args.event_loop)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_main()
@@ -0,0 +1,133 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+class ParquetSink:
+    """
+    Save recorded signals into Parquet files partitioned by signal name and
+    by day:
+
+        <directory>/signal=<name>/date=<YYYY-MM-DD>/<uuid>-0.parquet
+
+    Every call to `write` adds new files, existing files are never rewritten.
+    """
+
+    def __init__(self, directory: str):
+        assert directory, "Require a valid directory"
+        self._directory = directory
+
+    def write(self, name: str, df: pd.DataFrame) -> None:
+        """
+        Append rows of a signal to its Parquet dataset. Columns named
+        `timestamp` or ending with `time` holding seconds since epoch are
+        stored as UTC timestamps.
+
+        Args:
+            name: Name of the signal
+            df: Flattened payloads of the signal, including a `timestamp`
+                column
+        Returns:
+            None
+        """
+        if len(df) == 0:
+            return
+
+        df = df.copy()
+        for column in df.columns:
+            if (
+                column == "timestamp" or column.endswith("time")
+            ) and pd.api.types.is_numeric_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column], unit="s", utc=True)
+        df["date"] = df["timestamp"].dt.strftime("%Y-%m-%d")
+
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            root_path=f"{self._directory}/signal={name}",
+            partition_cols=["date"],
+            basename_template=f"{uuid.uuid4().hex}-{{i}}.parquet",
+        )
+        logging.debug(f"Saved {len(df)} rows of {name} to {self._directory}")
+
+    @staticmethod
+    def read(
+        directory: str,
+        name: str,
+        columns: Union[list[str], None] = None,
+        start_time: Union[datetime, None] = None,
+        end_time: Union[datetime, None] = None,
+    ) -> pd.DataFrame:
+        """
+        Read rows of a signal from its Parquet dataset. Only the requested
+        columns are read, and partitions outside the time range are skipped
+        without being opened.
+
+        Args:
+            directory: Root directory of the Parquet datasets
+            name: Name of the signal
+            columns: Columns to read, all columns if None
+            start_time: Only read rows recorded at or after this time
+            end_time: Only read rows recorded at or before this time
+        Returns:
+            A DataFrame of the signal, empty if nothing was recorded
+        """
+        partitioning = ds.partitioning(
+            pa.schema([("date", pa.string())]), flavor="hive"
+        )
+        try:
+            dataset = ds.dataset(
+                f"{directory}/signal={name}",
+                format="parquet",
+                partitioning=partitioning,
+            )
+        except FileNotFoundError:
+            return pd.DataFrame()
+
+        # Files written at different times might have different columns
+        schema = pa.unify_schemas(
+            [fragment.physical_schema for fragment in dataset.get_fragments()]
+            + [partitioning.schema],
+            promote_options="permissive",
+        )
+        dataset = ds.dataset(
+            f"{directory}/signal={name}",
+            schema=schema,
+            format="parquet",
+            partitioning=partitioning,
+        )
+
+        timestamp_type = schema.field("timestamp").type
+        filters = list[ds.Expression]()
+        if start_time is not None:
+            start = ParquetSink._to_utc(start_time)
+            filters.append(ds.field("date") >= start.strftime("%Y-%m-%d"))
+            filters.append(
+                ds.field("timestamp") >= pa.scalar(start, timestamp_type)
+            )
+        if end_time is not None:
+            end = ParquetSink._to_utc(end_time)
+            filters.append(ds.field("date") <= end.strftime("%Y-%m-%d"))
+            filters.append(
+                ds.field("timestamp") <= pa.scalar(end, timestamp_type)
+            )
+
+        expression = None
+        for condition in filters:
+            expression = (
+                condition if expression is None else expression & condition
+            )
+
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    @staticmethod
+    def _to_utc(time: datetime) -> pd.Timestamp:
+        time = pd.Timestamp(time)
+        if time.tzinfo is None:
+            return time.tz_localize("UTC")
+        return time.tz_convert("UTC")
@@ -1,6 +1,5 @@
 import logging
-
-from blinker import ANY
+import weakref
 
 from jolteon.core.event.signal import signal_namespace
 from jolteon.core.event.signal_subscriber import SignalSubscriber
@@ -36,12 +35,17 @@ class SignalManager:
             None
         """
         for named_signal in signal_namespace.values():
-            receivers = named_signal.receivers_for(ANY)
+            # Receivers connected to one sender only, e.g. one symbol, are
+            # not returned by `receivers_for(ANY)`
+            receivers = [
+                receiver() if isinstance(receiver, weakref.ref) else receiver
+                for receiver in list(named_signal.receivers.values())
+            ]
             if receivers:
                 logging.info(
                     f"Disconnecting signal {named_signal.name} "
                     f"from its {len(named_signal.receivers.values())} "
                     f"receivers"
                 )
-            for receiver in receivers:
+            for receiver in filter(None, receivers):
                 named_signal.disconnect(receiver=receiver)
@@ -3,14 +3,13 @@ import atexit
 import logging
 import sqlite3
 import threading
-from copy import copy
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from functools import partial
+from typing import Any, Callable
 
 import flatdict
-import pandas as pd
-from blinker import NamedSignal
 
 from jolteon.core.event.signal import signal_namespace
 from jolteon.core.time.time_manager import time_manager
@@ -22,18 +21,46 @@ class SignalRecorder:
     database
     """
 
-    def __init__(self, database_name="/tmp/jolteon.sqlite"):
+    def __init__(
+        self,
+        database_name="/tmp/jolteon.sqlite",
+        parquet_directory: str | None = None,
+    ):
+        """
+        Args:
+            database_name: Path to the SQLite database to save signals
+            parquet_directory: If set, signals are also saved as Parquet files
+                               partitioned by signal and by day under this
+                               directory
+        """
         self._database_name = database_name
+        self._parquet_sink: Any = None
+        if parquet_directory:
+            # Only pay for importing pyarrow when saving Parquet files
+            from jolteon.core.event.parquet_sink import ParquetSink
+
+            self._parquet_sink = ParquetSink(parquet_directory)
         self._events = dict[str, list]()
+        # Index of the last row of each signal and symbol in `_events`
+        self._last_rows = dict[tuple[str, Any], int]()
         self._events_lock = threading.Lock()
+        # Signals may be sent by a symbol instead of by the signal itself,
+        # hence every signal is connected to its own receiver
+        self._receivers = dict[str, Callable]()
         self._auto_save_interval = 0
         self._auto_save_task = None
+        # Saving is slow, hence it runs in its own thread instead of blocking
+        # the event loop. The thread is created on demand, since recording
+        # may start again after it stops.
+        self._save_executor: ThreadPoolExecutor | None = None
 
         atexit.register(self.stop_recording)
 
     def __del__(self):
         if self._auto_save_task is not None:
             self._auto_save_task.cancel()
+        if self._save_executor is not None:
+            self._save_executor.shutdown(wait=False)
 
     def enable_auto_save(self, auto_save_interval: float = 30):
         self._auto_save_task = asyncio.create_task(
@@ -47,14 +74,18 @@ class SignalRecorder:
         PRIMARY_KEY is set, duplicate rows will be removed from the DataFrame
         based on values in PRIMARY_KEY column. The sender shall invoke the
         `send` method with exactly one positional argument which is the sender,
-        and exactly one keyword argument which is the payload.
+        and exactly one keyword argument which is the payload. If the sender
+        is a symbol, it is saved in a `symbol` column unless the payload
+        already has one.
 
         Returns:
             None
         """
         for name, signal in signal_namespace.items():
             logging.debug(f"Connecting to signal {name} for recording")
-            signal.connect(receiver=self._handle_signal)
+            if name not in self._receivers:
+                self._receivers[name] = partial(self._handle_signal, name)
+            signal.connect(receiver=self._receivers[name], weak=False)
 
     def stop_recording(self):
         """
@@ -65,13 +96,38 @@ class SignalRecorder:
         """
         for name, signal in signal_namespace.items():
             logging.debug(f"Disconnecting from signal {name} for recording")
-            signal.disconnect(receiver=self._handle_signal)
-        self._save_data()
+            if name in self._receivers:
+                signal.disconnect(receiver=self._receivers[name])
+        if self._auto_save_task is not None:
+            self._auto_save_task.cancel()
+            self._auto_save_task = None
+
+        # A save already running in the thread finishes before the last one
+        try:
+            future = self._get_save_executor().submit(self._save_data)
+        except RuntimeError:
+            # No thread could be started while the interpreter exits, and
+            # the previous saves are already finished
+            self._save_data()
+        else:
+            future.result()
+        self._save_executor.shutdown()
+        self._save_executor = None
 
     async def _auto_save_data(self, auto_save_interval):
+        loop = asyncio.get_running_loop()
         while True:
             await asyncio.sleep(auto_save_interval)
-            self._save_data()
+            await loop.run_in_executor(
+                self._get_save_executor(), self._save_data
+            )
+
+    def _get_save_executor(self) -> ThreadPoolExecutor:
+        if self._save_executor is None:
+            self._save_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=type(self).__name__
+            )
+        return self._save_executor
 
     def _save_data(self) -> None:
         """
@@ -80,9 +136,14 @@ class SignalRecorder:
         Returns:
             None
         """
+        import pandas as pd
+
         conn = sqlite3.connect(self._database_name)
+        # Take over the recorded rows, signals received while saving are
+        # recorded into a new dict
         with self._events_lock:
-            events = copy(self._events)
+            events, self._events = self._events, dict[str, list]()
+            self._last_rows.clear()
         for name, payload_list in events.items():
             df = pd.DataFrame(payload_list)
 
@@ -126,15 +187,17 @@ class SignalRecorder:
             except Exception as e:
                 logging.error(f"Cannot save DataFrame {name}: '{e}'")
 
-        # Clear all saved data
-        with self._events_lock:
-            self._events.clear()
-        conn.close()
+            if self._parquet_sink is not None:
+                try:
+                    self._parquet_sink.write(name, df)
+                except Exception as e:
+                    logging.error(
+                        f"Cannot save DataFrame {name} as Parquet: '{e}'"
+                    )
 
-    def _handle_signal(self, sender: NamedSignal | str, **kwargs):
-        assert isinstance(sender, NamedSignal)
-        name = sender.name
+        conn.close()
 
+    def _handle_signal(self, name: str, sender: Any, **kwargs):
         logging.debug("Received signal %s from %s", kwargs, name)
 
         if len(kwargs.values()) != 1:
@@ -146,6 +209,9 @@ class SignalRecorder:
             return
 
         for payload in kwargs.values():
+            if isinstance(payload, list):
+                # A batch of payloads, which are also sent one by one
+                return
             if not hasattr(payload, "__dict__") and not isinstance(
                 payload, dict
             ):
@@ -165,27 +231,29 @@ class SignalRecorder:
             # as time series
             if "timestamp" not in row_data:
                 row_data["timestamp"] = time_manager().now().timestamp()
+            if isinstance(sender, str) and "symbol" not in row_data:
+                row_data["symbol"] = sender
 
             with self._events_lock:
-                if name not in self._events:
-                    self._events[name] = [row_data]
+                payload_list = self._events.setdefault(name, [])
+                key = (name, row_data.get("symbol"))
+                last_row = self._last_rows.get(key)
+                if (
+                    hasattr(data, "PRIMARY_KEY")
+                    and last_row is not None
+                    and payload_list[last_row][data.PRIMARY_KEY]
+                    == row_data[data.PRIMARY_KEY]
+                ):
+                    # If PRIMARY_KEY is set, remove duplicates based on
+                    # PRIMARY_KEY.
+                    # However, for performance reasons, only the last
+                    # element of the same symbol is checked.
+                    # We don't have any other use case than the Candlestick
+                    # event. Hence, we will treat it as a special case.
+                    payload_list[last_row] = row_data
                 else:
-                    payload_list = self._events[name]
-                    if (
-                        hasattr(data, "PRIMARY_KEY")
-                        and len(payload_list) > 0
-                        and payload_list[-1][data.PRIMARY_KEY]
-                        == row_data[data.PRIMARY_KEY]
-                    ):
-                        # If PRIMARY_KEY is set, remove duplicates based on
-                        # PRIMARY_KEY.
-                        # However, for performance reasons, only the last
-                        # element is checked.
-                        # We don't have any other use case than the Candlestick
-                        # event. Hence, we will treat it as a special case.
-                        payload_list[-1] = row_data
-                    else:
-                        payload_list.append(row_data)
+                    payload_list.append(row_data)
+                    self._last_rows[key] = len(payload_list) - 1
 
     @staticmethod
     def _to_dict(obj: Any):
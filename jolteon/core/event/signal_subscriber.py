@@ -1,15 +1,25 @@
+from typing import Any
+
+from blinker import ANY
+
+
 class SignalSubscriber:
     """
     Base class for signal subscribers
     """
 
-    def connect(self) -> None:
+    def connect(self, sender: Any = ANY) -> None:
         """
         Automatically connect signals to its receivers that are marked by
         @subscribe.
+
+        Args:
+            sender: If set, receivers only receive signals sent by this
+                    sender. Signals about one symbol are sent by the symbol,
+                    so a subscriber of one symbol ignores the other symbols.
         """
         for attr_name in dir(self):
             receiver = getattr(self, attr_name)
             signal = getattr(receiver, "__signal__", None)
             if signal and callable(receiver):
-                signal.connect(receiver)
+                signal.connect(receiver, sender=sender)
@@ -0,0 +1,95 @@
+import asyncio
+import importlib.util
+import os
+from enum import StrEnum
+from typing import Any, Callable, Coroutine, Union
+
+# Environment variable to select the event loop without the CLI
+EVENT_LOOP_ENV_VARIABLE = "JOLTEON_EVENT_LOOP"
+
+
+class EventLoop(StrEnum):
+    """
+    Implementations of the event loop running the application.
+    """
+
+    # uvloop if it is installed, otherwise asyncio
+    AUTO = "AUTO"
+    ASYNCIO = "ASYNCIO"
+    UVLOOP = "UVLOOP"
+
+    @staticmethod
+    def parse(value: Union[str, None]):
+        if not value:
+            value = os.environ.get(EVENT_LOOP_ENV_VARIABLE, EventLoop.ASYNCIO)
+        try:
+            return EventLoop[value.upper()]
+        except KeyError:
+            raise RuntimeError(f"Unsupported event loop {value}")
+
+    @staticmethod
+    def available() -> list["EventLoop"]:
+        """
+        Returns:
+            Event loops which can be created in this environment
+        """
+        event_loops = [EventLoop.ASYNCIO]
+        if importlib.util.find_spec("uvloop") is not None:
+            event_loops.append(EventLoop.UVLOOP)
+        return event_loops
+
+    @staticmethod
+    def current() -> "EventLoop":
+        """
+        Returns:
+            Implementation of the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        if type(loop).__module__.startswith("uvloop"):
+            return EventLoop.UVLOOP
+        return EventLoop.ASYNCIO
+
+    def loop_factory(self) -> Callable[[], asyncio.AbstractEventLoop]:
+        """
+        Returns:
+            A function creating a new event loop of this implementation
+        """
+        if self == EventLoop.AUTO:
+            return EventLoop.available()[-1].loop_factory()
+        if self == EventLoop.UVLOOP:
+            # Only imported when selected, it is an optional dependency
+            try:
+                import uvloop
+            except ImportError:
+                raise RuntimeError(
+                    "Please install uvloop to use the uvloop event loop"
+                )
+            return uvloop.new_event_loop
+        return asyncio.new_event_loop
+
+
+def run(
+    main: Coroutine[Any, Any, Any],
+    event_loop: Union[EventLoop, str, None] = None,
+) -> Any:
+    """
+    Same as `asyncio.run`, but runs the coroutine in the selected event loop.
+
+    Args:
+        main: The coroutine to run
+        event_loop: Implementation of the event loop, read from the
+                    environment variable if not specified
+    Returns:
+        Result of the coroutine
+    """
+    try:
+        if not isinstance(event_loop, EventLoop):
+            event_loop = EventLoop.parse(event_loop)
+        loop_factory = event_loop.loop_factory()
+    except RuntimeError:
+        # Don't leave a coroutine never awaited
+        main.close()
+        raise
+
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(main)
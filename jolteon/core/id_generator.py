@@ -11,6 +11,15 @@ class IdGenerator:
         with self._lock:
             return next(self._counter)
 
+    def reset(self, start: int = 1, step: int = 1):
+        """
+        Restarts the ids from `start`. Processes sharing the same exchange
+        account use the same step and different starts, so that their ids
+        never collide.
+        """
+        with self._lock:
+            self._counter = count(start=start, step=step)
+
 
 def id_generator(singleton=IdGenerator()):
     return singleton
@@ -0,0 +1,77 @@
+import bisect
+import math
+
+
+class LatencyHistogram:
+    """
+    Counts latencies into buckets whose bounds grow exponentially, so that a
+    histogram uses a fixed amount of memory no matter how many latencies are
+    added. Percentiles are estimated by the upper bound of their bucket.
+    """
+
+    # Upper bounds in seconds of all buckets but the last one, from 0.5ms to
+    # about 16s. The last bucket holds every latency above the highest bound.
+    BUCKET_BOUNDS = [0.0005 * 2**i for i in range(16)]
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts = [0] * (len(self.BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, latency_in_seconds: float) -> None:
+        """
+        Args:
+            latency_in_seconds: A measured latency
+        Returns:
+            None
+        """
+        self.counts[
+            bisect.bisect_left(self.BUCKET_BOUNDS, latency_in_seconds)
+        ] += 1
+        self.count += 1
+        self.total += latency_in_seconds
+        self.min = min(self.min, latency_in_seconds)
+        self.max = max(self.max, latency_in_seconds)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, q: float) -> float:
+        """
+        Args:
+            q: Percentile between 0 and 100
+        Returns:
+            Upper bound of the bucket holding the percentile, but never more
+            than the max latency seen
+        """
+        assert 0 <= q <= 100, "Percentile shall be between 0 and 100"
+        if self.count == 0:
+            return math.nan
+
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if i == len(self.BUCKET_BOUNDS):
+                    return self.max
+                return min(self.BUCKET_BOUNDS[i], self.max)
+        return self.max  # pragma: no cover
+
+    def summary(self) -> dict[str, float]:
+        """
+        Returns:
+            Count, mean, min, max and common percentiles in seconds
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min if self.count else math.nan,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else math.nan,
+        }
@@ -6,8 +6,7 @@ import threading
 from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime
-
-import pandas as pd
+from typing import Union
 
 
 class SQLiteHandler(logging.Handler):
@@ -44,23 +43,27 @@ class SQLiteHandler(logging.Handler):
         self._buffer = list[dict]()
         self._buffer_lock = threading.Lock()
         self._table_name = "logs"
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
 
         assert self._batch_size > 0
 
     def emit(self, record):
         with self._buffer_lock:
             self._buffer.append(record.__dict__)
+            n_records = len(self._buffer)
 
-        if len(self._buffer) == 1:
-            asyncio.create_task(self.delayed_flush(delay=self._delay_seconds))
+        if n_records == 1:
+            self._schedule_delayed_flush()
 
-        if len(self._buffer) > self._batch_size:
+        if n_records > self._batch_size:
             self.flush()
 
     def flush(self):
+        if not self._buffer:
+            return
+
         with closing(sqlite3.connect(self._db_path)) as conn:
-            if not self._buffer:
-                return
+            import pandas as pd
 
             with self._buffer_lock:
                 try:
@@ -79,9 +82,24 @@ class SQLiteHandler(logging.Handler):
                 finally:
                     self._buffer.clear()
 
-    async def delayed_flush(self, delay: float):
-        await asyncio.sleep(delay)
-        self.flush()
+    def _schedule_delayed_flush(self):
+        """
+        Flushes after a delay in the event loop. Log lines written by other
+        threads are handed over to the event loop of the last caller having
+        one, or wait for the next flush if there has never been one.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            self._loop = loop
+            loop.call_later(self._delay_seconds, self.flush)
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(
+                self._loop.call_later, self._delay_seconds, self.flush
+            )
 
 
 class SmartFormatter(logging.Formatter):
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime
+from typing import Union
+
+
+class ReplayClock:
+    """
+    Paces a replay of historical events at a multiple of the wall clock
+    speed, e.g. 1x replays one hour of market data in one hour.
+
+    Events are delayed with asyncio timers, so other tasks like heartbeats
+    and timeouts keep running while waiting. A replay falling behind, e.g.
+    while downloading market data, catches up without waiting.
+    """
+
+    def __init__(self, speed: float):
+        """
+        Args:
+            speed: Replay time elapsed per second of wall clock time
+        """
+        assert speed > 0, "Replay speed shall be a positive number"
+        self.speed = speed
+        # The wall clock time at which the replay time started
+        self._anchor: Union[tuple[float, datetime], None] = None
+
+    async def wait_until(self, replay_time: datetime) -> None:
+        """
+        Waits until the replay time is reached. The first replay time starts
+        the clock.
+
+        Args:
+            replay_time: Time of the next event to replay
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        if self._anchor is None:
+            self._anchor = (loop.time(), replay_time)
+            return
+
+        anchor_loop_time, anchor_replay_time = self._anchor
+        delay = (
+            anchor_loop_time
+            + (replay_time - anchor_replay_time).total_seconds() / self.speed
+            - loop.time()
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def parse(value: Union[str, None]) -> Union[float, None]:
+        """
+        Args:
+            value: A speed multiplier like "10", "10x" or "max"
+        Returns:
+            The replay speed, or None to replay as fast as possible
+        """
+        if value is None or value.lower() == "max":
+            return None
+        try:
+            speed = float(value.lower().removesuffix("x"))
+        except ValueError:
+            raise RuntimeError(f"Unsupported replay speed {value}")
+        if speed <= 0:
+            raise RuntimeError(f"Unsupported replay speed {value}")
+        return speed
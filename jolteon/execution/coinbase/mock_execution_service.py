@@ -1,12 +1,10 @@
 import logging
+import math
 import os
-import uuid
 from copy import copy
 from datetime import timedelta
 from typing import Union
 
-import numpy as np
-from coinbase.rest import RESTClient
 
 from jolteon.core.event.signal import signal, subscribe
 from jolteon.core.event.signal_subscriber import SignalSubscriber
@@ -40,6 +38,8 @@ class MockExecutionService(Heartbeater, SignalSubscriber):
         price level using market orders. Keep this limitation in mind when
         testing your strategy.
         """
+        from coinbase.rest import RESTClient
+
         super().__init__(type(self).__name__, interval_in_seconds=10)
         self._client = RESTClient(
             api_key=(api_key if api_key else os.getenv("COINBASE_API_KEY")),
@@ -192,7 +192,7 @@ class MockExecutionService(Heartbeater, SignalSubscriber):
         logging.error(
             f"No valid trades found for '{symbol}' at {now}", exc_info=True
         )
-        return np.nan
+        return math.nan
 
     def _generate_order_fill(
         self,
@@ -206,8 +206,9 @@ class MockExecutionService(Heartbeater, SignalSubscriber):
             trade_id=id_generator().next(),
             client_order_id=client_order_id,
             symbol=symbol,
-            maker_order_id=str(uuid.uuid4()),
-            taker_order_id=str(uuid.uuid4()),
+            # Ids are not random, so that replays are repeatable
+            maker_order_id=str(id_generator().next()),
+            taker_order_id=str(id_generator().next()),
             side=side,
             price=price,
             fee=0.0,
@@ -216,6 +217,6 @@ class MockExecutionService(Heartbeater, SignalSubscriber):
         )
 
         self.order_fill_event.send(
-            self.order_fill_event,
+            trade.symbol,
             trade=trade,
         )
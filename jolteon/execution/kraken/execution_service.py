@@ -1,21 +1,29 @@
 import asyncio
 import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
 from enum import StrEnum
+from typing import TYPE_CHECKING, Union
 
 import pytz
-from requests import Response
 
 from jolteon.core.event.signal import signal, subscribe
 from jolteon.core.event.signal_subscriber import SignalSubscriber
 from jolteon.core.health_monitor.heartbeat import Heartbeater, HeartbeatLevel
-from jolteon.core.retry import Retry
+from jolteon.execution.kraken.private_feed import PrivateFeed
 from jolteon.execution.kraken.rest_client import KrakenRESTClient
+from jolteon.execution.order_gateway import (
+    OrderAck,
+    OrderGateway,
+    OrderReject,
+)
 from jolteon.market_data.core.order import Order
 from jolteon.market_data.core.trade import Trade
 
+if TYPE_CHECKING:
+    from requests import Response
+
 
 class ExecutionService(Heartbeater, SignalSubscriber):
     @dataclass
@@ -23,7 +31,26 @@ class ExecutionService(Heartbeater, SignalSubscriber):
         CREATE_ORDER_FAILURE = "CREATE_ORDER_FAILURE"
         GET_TRADE_FAILURE = "GET_TRADE_FAILURE"
 
-    def __init__(self, dry_run=False, poll_interval=1):
+    @dataclass
+    class PendingFill:
+        order: Order
+        transaction_ids: list[str]
+        # Event loop time when fills of the order could be polled
+        poll_after: float
+        attempts: int = 0
+
+    # Kraken accepts up to 50 transaction IDs in one QueryOrders request
+    MAX_TRANSACTION_IDS_PER_QUERY = 50
+    # Times to poll fills of an order again when not all fills are found
+    MAX_POLL_RETRIES = 5
+
+    def __init__(
+        self,
+        dry_run=False,
+        poll_interval=1,
+        private_feed_uri: Union[str, None] = PrivateFeed.PRODUCTION_URI,
+        reconcile_delay=5,
+    ):
         """
         Creates an execution service to act as the exchange. It will
         respond to requests such as buy and sell.
@@ -33,15 +60,45 @@ class ExecutionService(Heartbeater, SignalSubscriber):
                      order validation
             poll_interval: Interval in seconds to poll trade information for
                            the just sent orders
+            private_feed_uri: URI of the authenticated websocket pushing
+                              fills of our orders, or None to only poll
+                              trade information
+            reconcile_delay: Delay in seconds after an order is acknowledged
+                             before polling trade information for fills not
+                             pushed by the websocket
 
         """
         super().__init__(type(self).__name__, interval_in_seconds=10)
         self._dry_run = dry_run
         self._client = KrakenRESTClient()
         self._poll_interval = poll_interval
+        self._reconcile_delay = reconcile_delay
+        self._private_feed = (
+            PrivateFeed(self._client, self._on_execution, private_feed_uri)
+            if private_feed_uri
+            else None
+        )
+        self._private_feed_task: Union[asyncio.Task, None] = None
+        # Event loop of the service, where issues are added and removed
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+
+        # Orders not completely filled yet and the filled quantity of each
+        # order, so that a fill is never sent twice when both the websocket
+        # and polling find it
+        self._unfilled_orders = dict[str, Order]()
+        self._filled_quantity = dict[str, float]()
+
+        # Orders whose fills are polled by a single task for all of them
+        self._pending_fills = dict[str, ExecutionService.PendingFill]()
+        self._fill_poller_task: Union[asyncio.Task, None] = None
 
         self.order_history = dict[str, Order]()
         self.order_fill_event = signal("order_fill")
+        # Orders whose remaining quantity will never be reported as filled
+        self.order_expire_event = signal("order_expire")
+        self.order_gateway = OrderGateway(
+            self._submit_order, on_ack=self._on_ack, on_reject=self._on_reject
+        )
         assert os.environ.get(
             "KRAKEN_API_KEY"
         ), "Please set the KRAKEN_API_KEY environment variable"
@@ -52,8 +109,11 @@ class ExecutionService(Heartbeater, SignalSubscriber):
     @subscribe("order")
     def on_order(self, sender: object, order: Order):
         """
-        Place an order in the market. Signals will be sent to
-        `order_fill_event` if there will be a trade or several trades.
+        Place an order in the market without waiting for the exchange to
+        respond. Signals will be sent to `order_ack` or `order_reject` once
+        the exchange responds, and to `order_fill_event` if there will be a
+        trade or several trades. If fills of the order could not be found,
+        a signal will be sent to `order_expire_event`.
 
         Args:
             sender: Name of the sender of the order request
@@ -63,28 +123,66 @@ class ExecutionService(Heartbeater, SignalSubscriber):
             None
 
         """
-        try:
-            response = self.send_order(order)
-            transaction_ids = response.get("result", {}).get("txid", [])
-
-            if not self._dry_run:
-                asyncio.create_task(
-                    self._poll_fills(
-                        transaction_ids=transaction_ids, order=order
-                    )
-                )
+        self._loop = asyncio.get_running_loop()
+        if not self._dry_run:
+            # Fills may be pushed before the exchange acknowledges the order
+            self._unfilled_orders[order.client_order_id] = order
+            self._filled_quantity.setdefault(order.client_order_id, 0.0)
+            self._connect_private_feed()
+        self.order_gateway.submit(order)
+
+    def stop(self):
+        """
+        Stops sending orders, receiving and polling fills of orders, and
+        closes all connections to the exchange.
+        """
+        self.order_gateway.stop()
+        for task in (self._private_feed_task, self._fill_poller_task):
+            if task is not None:
+                task.cancel()
+        self._private_feed_task = None
+        self._fill_poller_task = None
+        self._client.close()
+
+    def _connect_private_feed(self):
+        if self._private_feed is None or self._private_feed_task is not None:
+            return
+        self._private_feed_task = asyncio.create_task(
+            self._private_feed.connect()
+        )
 
-        except Exception as e:
-            logging.error(f"Fail to send order: {e}", exc_info=True)
+    def _submit_order(self, order: Order) -> list[str]:
+        """
+        Sends an order to the exchange, called by the order gateway in a
+        separate thread.
 
-            self.add_issue(
-                HeartbeatLevel.ERROR, self.ErrorCode.CREATE_ORDER_FAILURE.name
-            )
-            return
+        Args:
+            order: The order to send
+        Returns:
+            Transaction IDs of the order
+        """
+        response = self.send_order(order)
+        if response is None:
+            raise RuntimeError("AddOrder request returned an error")
+        return response.get("result", {}).get("txid", [])
 
+    def _on_ack(self, order: Order, ack: OrderAck):
         # Record every order in history
         self.order_history[order.client_order_id] = order
 
+        if not self._dry_run:
+            self._poll_fills(
+                transaction_ids=ack.exchange_order_ids, order=order
+            )
+
+    def _on_reject(self, order: Order, reject: OrderReject):
+        self._unfilled_orders.pop(order.client_order_id, None)
+        self._filled_quantity.pop(order.client_order_id, None)
+        logging.error(f"Fail to send order: {reject.reason}")
+        self.add_issue(
+            HeartbeatLevel.ERROR, self.ErrorCode.CREATE_ORDER_FAILURE.name
+        )
+
     def send_order(self, order):
         """
         Using the following API to send an order to the exchange.
@@ -117,63 +215,228 @@ class ExecutionService(Heartbeater, SignalSubscriber):
         ):
             return
 
-        self.remove_issue(self.ErrorCode.CREATE_ORDER_FAILURE)
+        self._call_in_loop(
+            self.remove_issue, self.ErrorCode.CREATE_ORDER_FAILURE
+        )
         logging.debug(
             f"AddOrder request received response from exchange: "
             f"{response.json()}"
         )
         return response.json()
 
+    def _on_execution(self, exchange_order_id: str, trade: Trade):
+        """
+        Called by the private feed whenever one of our orders is executed.
+
+        Args:
+            exchange_order_id: Order ID assigned by the exchange
+            trade: The execution, whose client order ID is the userref of
+                   the order
+        Returns:
+            None
+        """
+        order = self._unfilled_orders.get(trade.client_order_id)
+        if order is None:
+            # Orders sent by others or already reconciled by polling
+            logging.debug(
+                f"Ignore execution of unknown order {exchange_order_id}"
+            )
+            return
+
+        # Symbols from websocket may be formatted differently. For example:
+        # BTC/USD vs. BTC-USD
+        self._send_fills(order, [replace(trade, symbol=order.symbol)])
+
+    def _send_fills(self, order: Order, trades: list[Trade]):
+        filled_quantity = self._filled_quantity[order.client_order_id]
+        for trade in trades:
+            filled_quantity += trade.quantity
+            self.order_fill_event.send(
+                trade.symbol,
+                trade=trade,
+            )
+
+        self._filled_quantity[order.client_order_id] = filled_quantity
+        if filled_quantity >= order.quantity:
+            self._forget_order(order)
+
+    def _forget_order(self, order: Order):
+        """
+        Stops tracking fills of an order once it is completely filled or
+        abandoned. Later executions of the order are ignored.
+        """
+        self._unfilled_orders.pop(order.client_order_id, None)
+        self._filled_quantity.pop(order.client_order_id, None)
+
     # Poll for trade confirmations
-    async def _poll_fills(self, transaction_ids: list[str], order: Order):
+    def _poll_fills(self, transaction_ids: list[str], order: Order):
         # In case of dry run or order sent failure, no transaction ID will be
         # returned, and we don't need to retrieve fill notice.
         if len(transaction_ids) == 0:
             return
+        if order.client_order_id not in self._unfilled_orders:
+            return
 
-        async with Retry(
-            max_retries=5, delay_seconds=self._poll_interval
-        ) as retry:
-            await retry.execute(
-                self._get_fills, transaction_ids=transaction_ids, order=order
+        # Fills are normally pushed by the websocket, polling only
+        # reconciles fills which are missing after a while
+        delay = self._reconcile_delay if self._private_feed else 0
+        self._pending_fills[order.client_order_id] = self.PendingFill(
+            order=order,
+            transaction_ids=transaction_ids,
+            poll_after=asyncio.get_running_loop().time() + delay,
+        )
+        if self._fill_poller_task is None or self._fill_poller_task.done():
+            self._fill_poller_task = asyncio.create_task(
+                self._run_fill_poller()
             )
 
-    def _get_fills(self, transaction_ids: list[str], order: Order):
+    async def _run_fill_poller(self):
+        """
+        Polls fills of all outstanding orders until there is none left.
+        Transaction IDs of outstanding orders are queried together in as few
+        requests as possible, and requests are spread out so that on average
+        one request is sent per poll interval no matter how many orders are
+        outstanding.
+        """
+        loop = asyncio.get_running_loop()
+        while self._pending_fills:
+            for client_order_id in list(self._pending_fills.keys()):
+                if client_order_id not in self._unfilled_orders:
+                    # All fills are pushed by the websocket
+                    del self._pending_fills[client_order_id]
+
+            now = loop.time()
+            batches = list[list[ExecutionService.PendingFill]]()
+            if any(
+                pending_fill.poll_after <= now
+                for pending_fill in self._pending_fills.values()
+            ):
+                # Orders due before the next poll are polled now as well,
+                # instead of in separate requests shortly after
+                batches = self._batch_pending_fills(
+                    [
+                        pending_fill
+                        for pending_fill in self._pending_fills.values()
+                        if pending_fill.poll_after <= now + self._poll_interval
+                    ]
+                )
+            for batch in batches:
+                await self._get_fills(batch)
+
+            if batches:
+                await asyncio.sleep(
+                    max(
+                        0.0,
+                        now + self._poll_interval * len(batches) - loop.time(),
+                    )
+                )
+            elif self._pending_fills:
+                next_poll = min(
+                    pending_fill.poll_after
+                    for pending_fill in self._pending_fills.values()
+                )
+                await asyncio.sleep(
+                    min(self._poll_interval, max(0.0, next_poll - now))
+                )
+
+    def _batch_pending_fills(
+        self, pending_fills: list["ExecutionService.PendingFill"]
+    ) -> list[list["ExecutionService.PendingFill"]]:
+        batches = list[list[ExecutionService.PendingFill]]()
+        n_transaction_ids = 0
+        for pending_fill in pending_fills:
+            if (
+                not batches
+                or n_transaction_ids + len(pending_fill.transaction_ids)
+                > self.MAX_TRANSACTION_IDS_PER_QUERY
+            ):
+                batches.append([])
+                n_transaction_ids = 0
+            batches[-1].append(pending_fill)
+            n_transaction_ids += len(pending_fill.transaction_ids)
+        return batches
+
+    async def _get_fills(self, batch: list["ExecutionService.PendingFill"]):
         """
         Use the following API to get fill notice.
         https://docs.kraken.com/rest/#tag/Account-Data/operation/getOrdersInfo
 
         Args:
-            transaction_ids: A list of transaction IDs returned from the
-                             exchange when market order is sent.
-            order: The original market order sent to the exchange
+            batch: Outstanding orders and their transaction IDs returned from
+                   the exchange when orders are sent.
         Returns:
             None
         """
 
-        assert len(transaction_ids) > 0
-        response = self._client.send_request(
+        assert len(batch) > 0
+        response = await self._client.send_request_async(
             "/0/private/QueryOrders",
             {
-                "txid": ",".join(transaction_ids),
-                "userref": order.client_order_id,
+                "txid": ",".join(
+                    transaction_id
+                    for pending_fill in batch
+                    for transaction_id in pending_fill.transaction_ids
+                ),
             },
         )
 
         if self._handle_possible_error(
             response, self.ErrorCode.GET_TRADE_FAILURE
         ):
-            raise RuntimeError(
-                "REST API returned an error on fetching trades."
-            )
+            for pending_fill in batch:
+                self._retry_poll(pending_fill)
+            return
 
         self.remove_issue(self.ErrorCode.GET_TRADE_FAILURE)
         logging.debug(
             f"QueryOrders received response from exchange " f"{response}"
         )
 
+        json_orders = response.json()["result"]
+        for pending_fill in batch:
+            if self._reconcile_fills(
+                pending_fill.order,
+                [
+                    json_orders[transaction_id]
+                    for transaction_id in pending_fill.transaction_ids
+                    if transaction_id in json_orders
+                ],
+            ):
+                self._pending_fills.pop(
+                    pending_fill.order.client_order_id, None
+                )
+            else:
+                self._retry_poll(pending_fill)
+
+    def _retry_poll(self, pending_fill: "ExecutionService.PendingFill"):
+        pending_fill.attempts += 1
+        if pending_fill.attempts > self.MAX_POLL_RETRIES:
+            logging.error(
+                f"Fail to poll fills of {pending_fill.order} "
+                f"after {pending_fill.attempts} attempts"
+            )
+            self._pending_fills.pop(pending_fill.order.client_order_id, None)
+            self._forget_order(pending_fill.order)
+            self.order_expire_event.send(
+                self.order_expire_event, order=pending_fill.order
+            )
+
+    def _reconcile_fills(self, order: Order, json_trades: list[dict]) -> bool:
+        """
+        Sends fills of an order found by polling but not sent yet.
+
+        Args:
+            order: The original market order sent to the exchange
+            json_trades: Information of the order's transactions
+        Returns:
+            Whether all fills of the order are sent
+        """
+        if order.client_order_id not in self._unfilled_orders:
+            # All fills are pushed by the websocket while polling
+            return True
+
         trades = list[Trade]()
-        for json_trade in response.json()["result"].values():
+        for json_trade in json_trades:
             logging.info(f"Found trade {json_trade}")
 
             # Symbol and pair may not 100% match. For example: BTC/USD vs.
@@ -203,24 +466,35 @@ class ExecutionService(Heartbeater, SignalSubscriber):
                 )
             )
 
-        if sum([trade.quantity for trade in trades]) >= order.quantity:
-            for trade in trades:
-                self.order_fill_event.send(
-                    self.order_fill_event,
-                    trade=trade,
-                )
-            return
-
-        raise RuntimeError(
-            "REST API doesn't return all trades associated with this order"
-        )
+        if sum([trade.quantity for trade in trades]) < order.quantity:
+            logging.warning(
+                "REST API doesn't return all trades associated with "
+                f"{order}"
+            )
+            return False
+
+        # Only send the quantity not sent by the websocket yet
+        sent_quantity = self._filled_quantity[order.client_order_id]
+        missing_trades = list[Trade]()
+        for trade in trades:
+            if sent_quantity >= trade.quantity:
+                sent_quantity -= trade.quantity
+                continue
+            missing_trades.append(
+                replace(trade, quantity=trade.quantity - sent_quantity)
+            )
+            sent_quantity = 0.0
+        self._send_fills(order, missing_trades)
+        return True
 
     def _handle_possible_error(
-        self, response: Response, error_code: ErrorCode
+        self, response: "Response", error_code: ErrorCode
     ):
         if response.status_code != 200:
             logging.error(f"REST API returned error: {response}")
-            self.add_issue(HeartbeatLevel.ERROR, error_code.name)
+            self._call_in_loop(
+                self.add_issue, HeartbeatLevel.ERROR, error_code.name
+            )
             return True
 
         possible_error = response.json().get("error")
@@ -229,6 +503,22 @@ class ExecutionService(Heartbeater, SignalSubscriber):
                 f"REST API returned error: {possible_error}, "
                 f"full response: {response.json()}"
             )
-            self.add_issue(HeartbeatLevel.ERROR, error_code.name)
+            self._call_in_loop(
+                self.add_issue, HeartbeatLevel.ERROR, error_code.name
+            )
             return True
         return False
+
+    def _call_in_loop(self, callback, *args):
+        """
+        Calls back in the event loop of the service, as orders are sent by
+        the order gateway in a separate thread.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._loop is None or loop is self._loop:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
@@ -1,9 +1,7 @@
 import logging
-import uuid
 from datetime import datetime
 
 import pytz
-import requests
 
 from jolteon.core.event.signal import signal, subscribe
 from jolteon.core.event.signal_subscriber import SignalSubscriber
@@ -60,11 +58,18 @@ class MockExecutionService(Heartbeater, SignalSubscriber):
     # noinspection PyArgumentList
     @staticmethod
     def _get_closest_market_trade_price(order: Order) -> float:
-        cached_trades = IDataSource.TRADE_CACHE.values()
+        # Every cache key starts with the symbol of its trades
+        cached_trades = [
+            trades
+            for key, trades in IDataSource.TRADE_CACHE.items()
+            if key[0] == order.symbol
+        ]
 
         # First search in the cache
         for trades in cached_trades:
             for trade in trades:
+                if trade.symbol != order.symbol:
+                    continue
                 time_difference = (
                     trade.transaction_time - order.creation_time
                 ).total_seconds()
@@ -78,6 +83,8 @@ class MockExecutionService(Heartbeater, SignalSubscriber):
         )
 
         # Second search using Kraken's API
+        import requests
+
         response = requests.get(
             f"https://api.kraken.com/0/public/Trades?"
             f"pair={order.symbol}&"
@@ -109,8 +116,9 @@ class MockExecutionService(Heartbeater, SignalSubscriber):
             trade_id=id_generator().next(),
             client_order_id=order.client_order_id,
             symbol=order.symbol,
-            maker_order_id=str(uuid.uuid4()),
-            taker_order_id=str(uuid.uuid4()),
+            # Ids are not random, so that replays are repeatable
+            maker_order_id=str(id_generator().next()),
+            taker_order_id=str(id_generator().next()),
             side=order.side,
             price=filled_price,
             # Based on https://www.kraken.com/features/fee-schedule
@@ -120,6 +128,6 @@ class MockExecutionService(Heartbeater, SignalSubscriber):
         )
 
         self.order_fill_event.send(
-            self.order_fill_event,
+            trade.symbol,
             trade=trade,
         )
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+from typing import Union
+
+import websockets
+
+
+class MockPrivateFeedServer:
+    """
+    A local websocket server acting as Kraken's authenticated websocket.
+    Clients subscribing to the `executions` channel with the expected token
+    receive every execution pushed by `send_execution`.
+    """
+
+    def __init__(self, token: str = "mock-token"):
+        self.token = token
+        self._server = None
+        self._clients = set()
+        self._subscribed: Union[asyncio.Event, None] = None
+
+    async def start(self) -> str:
+        """
+        Returns:
+            URI of the server listening on a free local port
+        """
+        self._subscribed = asyncio.Event()
+        self._server = await websockets.serve(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def wait_for_subscription(self, timeout: float = 5) -> None:
+        assert self._subscribed is not None, "Server is not started"
+        await asyncio.wait_for(self._subscribed.wait(), timeout)
+
+    async def send_execution(self, **execution) -> None:
+        """
+        Pushes an execution to all subscribed clients.
+
+        Args:
+            **execution: Fields of the execution, see `execution`
+        Returns:
+            None
+        """
+        message = json.dumps(
+            {
+                "channel": "executions",
+                "type": "update",
+                "data": [MockPrivateFeedServer.execution(**execution)],
+            }
+        )
+        for client in list(self._clients):
+            await client.send(message)
+
+    @staticmethod
+    def execution(
+        order_id: str,
+        order_userref: int,
+        last_qty: float,
+        last_price: float,
+        side: str = "buy",
+        symbol: str = "BTC/USD",
+        trade_id: int = 1,
+        fee: float = 0.0,
+        timestamp: str = "2024-01-01T00:00:00.000000Z",
+    ) -> dict:
+        return {
+            "order_id": order_id,
+            "order_userref": order_userref,
+            "symbol": symbol,
+            "side": side,
+            "exec_id": f"EXEC-{trade_id}",
+            "exec_type": "trade",
+            "trade_id": trade_id,
+            "last_qty": last_qty,
+            "last_price": last_price,
+            "fees": [{"asset": "USD", "qty": fee}],
+            "timestamp": timestamp,
+        }
+
+    async def _handle(self, websocket):
+        try:
+            async for data in websocket:
+                request = json.loads(data)
+                params = request.get("params", {})
+                if (
+                    request.get("method") != "subscribe"
+                    or params.get("channel") != "executions"
+                ):
+                    continue
+
+                if params.get("token") != self.token:
+                    await websocket.send(
+                        json.dumps(
+                            {
+                                "error": "EAPI:Invalid token",
+                                "method": "subscribe",
+                                "success": False,
+                            }
+                        )
+                    )
+                    continue
+
+                self._clients.add(websocket)
+                await websocket.send(
+                    json.dumps(
+                        {
+                            "method": "subscribe",
+                            "result": {"channel": "executions"},
+                            "success": True,
+                            "req_id": request.get("req_id"),
+                        }
+                    )
+                )
+                assert self._subscribed is not None
+                self._subscribed.set()
+        except websockets.exceptions.ConnectionClosed as e:
+            logging.info(f"Mock private feed client disconnected: {e}")
+        finally:
+            self._clients.discard(websocket)
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from enum import Enum
+from typing import Callable
+
+import websockets
+
+from jolteon.core.health_monitor.heartbeat import Heartbeater, HeartbeatLevel
+from jolteon.core.id_generator import id_generator
+from jolteon.core.side import MarketSide
+from jolteon.execution.kraken.rest_client import KrakenRESTClient
+from jolteon.market_data.core.trade import Trade
+
+
+class PrivateFeed(Heartbeater):
+    """
+    Receive executions of our own orders from Kraken's authenticated
+    websocket, so that fills are known as soon as they happen instead of
+    being polled. This class implements the `executions` channel of the v2
+    version of Kraken's websocket API.
+
+    See more: https://docs.kraken.com/websockets-v2/#executions
+    """
+
+    PRODUCTION_URI = "wss://ws-auth.kraken.com/v2"
+
+    class ErrorCode(Enum):
+        CONNECTION_LOST = "Connection Lost"
+        MALFORMAT_RESPONSE = "Malformatted Response from Kraken"
+        GET_TOKEN_FAILURE = "Fail to Get a Websocket Token"
+
+    def __init__(
+        self,
+        client: KrakenRESTClient,
+        on_execution: Callable[[str, Trade], None],
+        uri: str = PRODUCTION_URI,
+    ):
+        """
+        Args:
+            client: REST client to request an authentication token
+            on_execution: Called with the exchange order ID and the trade
+                          whenever one of our orders is executed. The client
+                          order ID of the trade is the `userref` of the order.
+            uri: URI of the authenticated websocket
+        """
+        super().__init__(type(self).__name__, interval_in_seconds=10)
+        self._client = client
+        self._on_execution = on_execution
+        self._uri = uri
+        # Whether executions are being received
+        self.subscribed = False
+        # Number of successful subscriptions, to reset the reconnect backoff
+        self._n_subscriptions = 0
+
+    async def connect(
+        self,
+        retry_interval_in_seconds: float = 5,
+        max_retry_interval_in_seconds: float = 60,
+    ):
+        """
+        Keeps connecting to the authenticated websocket until cancelled.
+        Reconnects are delayed exponentially while the websocket is
+        unavailable, and an issue is reported while disconnected as fills are
+        then only found by polling.
+
+        Args:
+            retry_interval_in_seconds: Delay of the first reconnect
+            max_retry_interval_in_seconds: Maximum delay of a reconnect
+        Returns:
+            None
+        """
+        retry_interval = retry_interval_in_seconds
+        while True:
+            n_subscriptions = self._n_subscriptions
+            try:
+                await self.connect_once()
+            except Exception as e:
+                logging.warning(
+                    "Schedule a reconnect after encountering an error "
+                    f"while connecting to Kraken's private websocket: {e}"
+                )
+
+            # Report the disconnection only once however long it takes
+            self.remove_issue(PrivateFeed.ErrorCode.CONNECTION_LOST.value)
+            self.add_issue(
+                HeartbeatLevel.ERROR,
+                PrivateFeed.ErrorCode.CONNECTION_LOST.value,
+            )
+            if self._n_subscriptions > n_subscriptions:
+                # The last connection worked, so reconnect without backoff
+                retry_interval = retry_interval_in_seconds
+            await asyncio.sleep(retry_interval)
+            retry_interval = min(
+                retry_interval * 2, max_retry_interval_in_seconds
+            )
+
+    async def connect_once(self):
+        """
+        Establish a connection to the authenticated websocket and subscribe
+        to executions of our orders.
+
+        Returns:
+            None
+        """
+        token = await self._get_token()
+
+        async with websockets.connect(self._uri) as websocket:
+            await websocket.send(
+                json.dumps(
+                    {
+                        "method": "subscribe",
+                        "params": {
+                            "channel": "executions",
+                            "token": token,
+                            # Executions before connecting are reconciled
+                            # by polling the REST API
+                            "snap_orders": False,
+                            "snap_trades": False,
+                        },
+                        "req_id": id_generator().next(),
+                    }
+                )
+            )
+
+            try:
+                async for data in websocket:
+                    response = json.loads(data)
+                    try:
+                        self._decode_message(response)
+                    except Exception as e:
+                        logging.error(
+                            f"Error '{e}' when decoding message '{response}'",
+                            exc_info=True,
+                        )
+                        self.add_issue(
+                            HeartbeatLevel.ERROR,
+                            PrivateFeed.ErrorCode.MALFORMAT_RESPONSE.value,
+                        )
+            except websockets.exceptions.ConnectionClosedError as e:
+                self.add_issue(
+                    HeartbeatLevel.ERROR,
+                    PrivateFeed.ErrorCode.CONNECTION_LOST.value,
+                )
+                logging.error(f"Connection Closed: {e}", exc_info=True)
+                raise e
+            finally:
+                self.subscribed = False
+
+    async def _get_token(self) -> str:
+        """
+        Use the following API to get a token for the websocket.
+        https://docs.kraken.com/rest/#tag/Websockets-Authentication
+
+        Returns:
+            The authentication token
+        """
+        response = await self._client.send_request_async(
+            "/0/private/GetWebSocketsToken", {}
+        )
+        if response.status_code != 200 or response.json().get("error"):
+            self.add_issue(
+                HeartbeatLevel.ERROR,
+                PrivateFeed.ErrorCode.GET_TOKEN_FAILURE.value,
+            )
+            raise RuntimeError(f"Fail to get a websocket token: {response}")
+
+        self.remove_issue(PrivateFeed.ErrorCode.GET_TOKEN_FAILURE.value)
+        return response.json()["result"]["token"]
+
+    def _decode_message(self, response):
+        possible_error = response.get("error")
+        if possible_error:
+            logging.error(f"Encountered error: {possible_error}")
+            self.add_issue(
+                HeartbeatLevel.ERROR,
+                PrivateFeed.ErrorCode.CONNECTION_LOST.value,
+            )
+            return
+
+        possible_method = response.get("method")
+        if possible_method == "pong":
+            return
+        elif possible_method == "subscribe":
+            self.subscribed = True
+            self._n_subscriptions += 1
+            self.remove_issue(PrivateFeed.ErrorCode.CONNECTION_LOST.value)
+            return
+
+        if response.get("channel") != "executions":
+            return
+
+        """
+        Below is an example of one execution message from Kraken:
+        {
+          "channel": "executions",
+          "type": "update",
+          "data": [
+            {
+              "order_id": "OK4GJX-KSTLS-7DZZO5",
+              "order_userref": 3,
+              "symbol": "BTC/USD",
+              "side": "sell",
+              "exec_id": "7KB5GR-GQSKK-QAROEL",
+              "exec_type": "trade",
+              "trade_id": 365573,
+              "last_qty": 0.0001,
+              "last_price": 26999.7,
+              "fees": [{"asset": "USD", "qty": 0.0432}],
+              "order_status": "filled",
+              "timestamp": "2023-09-22T10:33:05.709993Z"
+            }
+          ]
+        }
+        """
+        for execution in response["data"]:
+            # Other execution types are changes of order status
+            if execution.get("exec_type") != "trade":
+                continue
+
+            trade = Trade(
+                trade_id=execution["trade_id"],
+                client_order_id=str(execution.get("order_userref", "")),
+                symbol=execution["symbol"],
+                maker_order_id="",
+                taker_order_id="",
+                side=MarketSide(execution["side"].upper()),
+                price=float(execution["last_price"]),
+                fee=sum(
+                    float(fee["qty"]) for fee in execution.get("fees", [])
+                ),
+                quantity=float(execution["last_qty"]),
+                transaction_time=datetime.fromisoformat(
+                    execution["timestamp"]
+                ),
+            )
+            logging.info(f"Received execution {trade}")
+            self._on_execution(execution["order_id"], trade)
@@ -1,19 +1,27 @@
+import asyncio
 import base64
 import hashlib
 import hmac
 import logging
 import os
+import threading
+import time
 import urllib.parse
+from typing import TYPE_CHECKING, Union
 
-import requests
-
+from jolteon.core.latency_histogram import LatencyHistogram
 from jolteon.core.time.time_manager import time_manager
 
+if TYPE_CHECKING:
+    from requests import Response, Session
+
 
 class KrakenRESTClient:
     API_URL = "https://api.kraken.com"
+    # Seconds to wait for establishing a connection and for a response
+    TIMEOUT = (3.05, 10.0)
 
-    def __init__(self):
+    def __init__(self, timeout: tuple[float, float] = TIMEOUT):
         assert os.environ.get(
             "KRAKEN_API_KEY"
         ), "Please set the KRAKEN_API_KEY environment variable"
@@ -21,9 +29,22 @@ class KrakenRESTClient:
             "KRAKEN_API_SECRET"
         ), "Please set the KRAKEN_API_SECRET environment variable"
         self._api_key = os.environ.get("KRAKEN_API_KEY")
-        self._api_secret = os.environ.get("KRAKEN_API_SECRET")
+        # Decode the secret once instead of on every request
+        self._hmac_key = base64.b64decode(os.environ["KRAKEN_API_SECRET"])
+        self._timeout = timeout
+
+        # Connections are kept alive and reused by all requests
+        self._session: Union["Session", None] = None
+        self._lock = threading.Lock()
+        self._last_nonce = 0
+        # Requests are sent from several threads, and must reach the
+        # exchange in the order of their nonces
+        self._request_lock = threading.Lock()
+
+        # Round trip time of requests to each endpoint
+        self.latency = dict[str, LatencyHistogram]()
 
-    def send_request(self, uri_path: str, data: dict):
+    def send_request(self, uri_path: str, data: dict) -> "Response":
         # A nonce is a number that uniquely identifies each call to the REST
         # API private endpoints. A nonce is required for all authenticated
         # calls to the REST API.
@@ -37,18 +58,24 @@ class KrakenRESTClient:
         # persistent, which means the most recently used nonce will remain
         # unchanged even if an API key is not used for some time.
         assert not hasattr(data, "nonce"), "Please don't set nonce manually!"
-        nonce = str(int(time_manager().now().timestamp() * 1000))
-        data["nonce"] = nonce
+        with self._request_lock:
+            data["nonce"] = str(self._next_nonce())
 
-        logging.info(f"Sending request to {uri_path} with payload {data}")
+            logging.info(f"Sending request to {uri_path} with payload {data}")
 
-        headers = {
-            "API-Key": self._api_key,
-            "API-Sign": self._create_signature(uri_path, data),
-        }
-        response = requests.post(
-            (KrakenRESTClient.API_URL + uri_path), headers=headers, data=data
-        )
+            headers = {
+                "API-Key": self._api_key,
+                "API-Sign": self._create_signature(uri_path, data),
+            }
+
+            start = time.perf_counter()
+            response = self._get_session().post(
+                (KrakenRESTClient.API_URL + uri_path),
+                headers=headers,
+                data=data,
+                timeout=self._timeout,
+            )
+            self._latency_of(uri_path).add(time.perf_counter() - start)
 
         logging.info(
             f"Receive {response.status_code} response "
@@ -56,6 +83,47 @@ class KrakenRESTClient:
         )
         return response
 
+    async def send_request_async(self, uri_path: str, data: dict):
+        """
+        Same as `send_request`, but waits for the response in a separate
+        thread so that the event loop is not blocked. Requests share the same
+        pool of connections, and are sent one at a time in the order of their
+        nonces.
+        """
+        return await asyncio.to_thread(self.send_request, uri_path, data)
+
+    def close(self) -> None:
+        """
+        Closes all pooled connections.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _get_session(self) -> "Session":
+        with self._lock:
+            if self._session is None:
+                import requests
+
+                self._session = requests.Session()
+            return self._session
+
+    def _next_nonce(self) -> int:
+        # Requests sent in the same millisecond still get increasing nonces
+        with self._lock:
+            nonce = max(
+                int(time_manager().now().timestamp() * 1000),
+                self._last_nonce + 1,
+            )
+            self._last_nonce = nonce
+            return nonce
+
+    def _latency_of(self, uri_path: str) -> LatencyHistogram:
+        if uri_path not in self.latency:
+            self.latency[uri_path] = LatencyHistogram(uri_path)
+        return self.latency[uri_path]
+
     def _create_signature(self, urlpath: str, data: dict) -> str:
         assert "nonce" in data
 
@@ -63,8 +131,6 @@ class KrakenRESTClient:
         encoded = (str(data["nonce"]) + post_data).encode()
         message = urlpath.encode() + hashlib.sha256(encoded).digest()
 
-        mac = hmac.new(
-            base64.b64decode(self._api_secret), message, hashlib.sha512
-        )
+        mac = hmac.new(self._hmac_key, message, hashlib.sha512)
         signature_digest = base64.b64encode(mac.digest())
         return signature_digest.decode()
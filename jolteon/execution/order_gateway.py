@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Union
+
+from jolteon.core.event.signal import signal
+from jolteon.core.latency_histogram import LatencyHistogram
+from jolteon.market_data.core.order import Order
+
+
+@dataclass
+class OrderAck:
+    client_order_id: str
+    # Order IDs assigned by the exchange, empty for a dry run
+    exchange_order_ids: list[str]
+    latency_in_seconds: float
+
+
+@dataclass
+class OrderReject:
+    client_order_id: str
+    reason: str
+    latency_in_seconds: float
+
+
+class OrderGateway:
+    """
+    Sends orders to an exchange without blocking the caller. Orders are put
+    into a queue and sent one after another by a worker task, with the
+    blocking request running in a separate thread so that the event loop
+    keeps processing market data in the meantime.
+
+    When the exchange responds, an `order_ack` or an `order_reject` signal is
+    sent, and the time between submitting the order and receiving the
+    response is added to the latency histogram.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Order], list[str]],
+        on_ack: Union[Callable[[Order, OrderAck], Any], None] = None,
+        on_reject: Union[Callable[[Order, OrderReject], Any], None] = None,
+    ):
+        """
+        Args:
+            send: Blocking function sending an order, which returns order
+                  IDs assigned by the exchange or raises on any failure
+            on_ack: Called in the event loop after an order is accepted
+            on_reject: Called in the event loop after an order is rejected
+        """
+        self._send = send
+        self._on_ack = on_ack
+        self._on_reject = on_reject
+
+        self.order_ack_event = signal("order_ack")
+        self.order_reject_event = signal("order_reject")
+        self.latency = LatencyHistogram("order_submission")
+
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self._queue: Union[asyncio.Queue, None] = None
+        self._worker: Union[asyncio.Task, None] = None
+
+    def submit(self, order: Order) -> None:
+        """
+        Queues an order and returns immediately. The worker is started in the
+        event loop of the first caller, and orders submitted from other
+        threads are handed over to that event loop.
+
+        Args:
+            order: The order to send
+        Returns:
+            None
+        """
+        request = (order, time.perf_counter())
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if self._loop is None:
+            assert loop is not None, "Require an event loop to send orders"
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        assert self._queue is not None
+        if loop is self._loop:
+            self._queue.put_nowait(request)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, request)
+
+    async def join(self) -> None:
+        """
+        Waits until all queued orders are responded by the exchange.
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stop(self) -> None:
+        """
+        Stops the worker, orders not sent yet are dropped.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+    async def _run(self):
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            order, submit_time = await queue.get()
+            try:
+                await self._process(order, submit_time)
+            except Exception as e:
+                logging.error(
+                    f"Fail to process response of {order}: {e}", exc_info=True
+                )
+            finally:
+                queue.task_done()
+
+    async def _process(self, order: Order, submit_time: float):
+        try:
+            exchange_order_ids = await asyncio.to_thread(self._send, order)
+        except Exception as e:
+            reject = OrderReject(
+                client_order_id=order.client_order_id,
+                reason=str(e),
+                latency_in_seconds=time.perf_counter() - submit_time,
+            )
+            self.latency.add(reject.latency_in_seconds)
+            logging.error(f"Order rejected: {reject}")
+            self.order_reject_event.send(
+                self.order_reject_event, reject=reject
+            )
+            if self._on_reject:
+                self._on_reject(order, reject)
+            return
+
+        ack = OrderAck(
+            client_order_id=order.client_order_id,
+            exchange_order_ids=exchange_order_ids,
+            latency_in_seconds=time.perf_counter() - submit_time,
+        )
+        self.latency.add(ack.latency_in_seconds)
+        logging.info(f"Order acknowledged: {ack}")
+        self.order_ack_event.send(self.order_ack_event, ack=ack)
+        if self._on_ack:
+            self._on_ack(order, ack)
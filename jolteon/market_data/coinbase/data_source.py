@@ -1,18 +1,22 @@
+import asyncio
 import logging
 import os
 from datetime import datetime
-
-from coinbase.rest import RESTClient
+from typing import AsyncIterator, Union
 
 from jolteon.core.id_generator import id_generator
 from jolteon.core.side import MarketSide
 from jolteon.core.time.time_range import TimeRange
 from jolteon.market_data.core.trade import Trade
 from jolteon.market_data.data_source import IDataSource
+from jolteon.market_data.trade_chunk_store import TradeChunkStore
 
 
 class CoinbaseHistoricalDataSource(IDataSource):
-    def __init__(self):
+    def __init__(self, store: Union[TradeChunkStore, None] = None):
+        from coinbase.rest import RESTClient
+
+        super().__init__(store)
         self._client = RESTClient(
             api_key=os.getenv("COINBASE_API_KEY"),
             api_secret=os.getenv("COINBASE_API_SECRET"),
@@ -24,16 +28,36 @@ class CoinbaseHistoricalDataSource(IDataSource):
         key = (symbol, start_time, end_time)
         if self.TRADE_CACHE.get(key) is not None:
             return self.TRADE_CACHE[key]
+
+        market_trades = await self._download_with_store(
+            symbol, start_time, end_time, self._download_range
+        )
+
+        # Save in the cache to reduce calls to Coinbase API
+        self.TRADE_CACHE[key] = market_trades
+        return market_trades
+
+    async def stream_market_trades(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ) -> AsyncIterator[list[Trade]]:
+        async for market_trades in self._stream_with_store(
+            symbol, start_time, end_time, self._download_range
+        ):
+            yield market_trades
+
+    async def _download_range(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ) -> list[Trade]:
         market_trades = list[Trade]()
 
         # Begin download
         time_range = TimeRange(start_time, end_time)
         for period in time_range.generate_time_ranges(interval_in_minutes=1):
-            new_trades = self._download(symbol, period.start, period.end)
+            new_trades = await asyncio.to_thread(
+                self._download, symbol, period.start, period.end
+            )
             market_trades = market_trades + new_trades
 
-        # Save in the cache to reduce calls to Coinbase API
-        self.TRADE_CACHE[key] = market_trades
         return market_trades
 
     def _download(
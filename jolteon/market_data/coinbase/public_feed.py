@@ -1,7 +1,9 @@
 import json
 import logging
+from collections import defaultdict
 from datetime import datetime
 from enum import Enum
+from typing import Union
 
 import websockets
 
@@ -45,17 +47,21 @@ class PublicFeed(Heartbeater):
         super().__init__(type(self).__name__, interval_in_seconds=10)
         self.events = Events()
         self._env = env
-        self._candlestick_generator = CandlestickGenerator(
-            interval_in_seconds=candlestick_interval_in_seconds
+        # Candlesticks are generated for each product separately
+        self._candlestick_generators = defaultdict[str, CandlestickGenerator](
+            lambda: CandlestickGenerator(
+                interval_in_seconds=candlestick_interval_in_seconds
+            )
         )
 
-    async def connect(self, product_id: str):
+    async def connect(self, product_id: Union[str, list[str]]):
         """
         Establish a connection to the remote service and subscribe to the
-        public market data feed.
+        public market data feed. All products share the same connection.
 
         Args:
-            product_id: A product id(symbols) to subscribe to.
+            product_id: A product id(symbols) or a list of product ids to
+                        subscribe to.
         Returns:
             An asyncio task to be waiting for incoming messages
         """
@@ -72,7 +78,9 @@ class PublicFeed(Heartbeater):
             # Define the message to subscribe to a specific product's channel
             subscribe_message = {
                 "type": "subscribe",
-                "product_ids": [product_id],
+                "product_ids": (
+                    [product_id] if isinstance(product_id, str) else product_id
+                ),
                 "channels": ["heartbeat", "ticker", "matches"],
             }
 
@@ -102,7 +110,7 @@ class PublicFeed(Heartbeater):
 
                     elif response["type"] == "ticker":
                         self.events.ticker.send(
-                            self.events.ticker, payload=response
+                            response["product_id"], payload=response
                         )
                     elif response["type"] == "match":
                         """
@@ -137,21 +145,21 @@ class PublicFeed(Heartbeater):
                                 response["time"]
                             ),
                         )
+                        # Market data is sent by its product id, so that
+                        # subscribers of one product don't receive the others
                         self.events.market_trade.send(
-                            self.events.market_trade, market_trade=market_trade
+                            market_trade.symbol, market_trade=market_trade
                         )
                         logging.debug(
                             "Received Market Trade: %s", market_trade
                         )
 
-                        candlesticks = (
-                            self._candlestick_generator.on_market_trade(
-                                market_trade
-                            )
-                        )
+                        candlesticks = self._candlestick_generators[
+                            market_trade.symbol
+                        ].on_market_trade(market_trade)
                         for candlestick in candlesticks:
                             self.events.candlestick.send(
-                                self.events.candlestick,
+                                market_trade.symbol,
                                 candlestick=candlestick,
                             )
                     else:
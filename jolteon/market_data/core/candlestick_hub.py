@@ -0,0 +1,178 @@
+from itertools import islice
+from typing import Any, Iterable, Union
+
+from blinker import ANY
+
+from jolteon.core.event.signal_subscriber import SignalSubscriber
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_list import CandlestickList
+
+
+class CandlestickView:
+    """
+    A read-only view of the most recent candlesticks in a CandlestickHub. It
+    supports the same read and add operations as a CandlestickList, so a
+    consumer can use either of them interchangeably.
+    """
+
+    def __init__(self, hub: "CandlestickHub", max_length: int):
+        self._hub = hub
+        self._max_length = max_length
+        # Sequence number of the last candlestick update seen by this view
+        self._sequence = 0
+
+    def __len__(self):
+        return min(len(self._hub.candlesticks), self._max_length)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self.candlesticks)[index]
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("CandlestickView index out of range")
+        candlesticks = self._hub.candlesticks
+        return candlesticks[len(candlesticks) - length + index]
+
+    @property
+    def candlesticks(self) -> Iterable[Candlestick]:
+        candlesticks = self._hub.candlesticks
+        if len(candlesticks) <= self._max_length:
+            return candlesticks.candlesticks
+        return islice(
+            candlesticks.candlesticks,
+            len(candlesticks) - self._max_length,
+            None,
+        )
+
+    def is_full(self):
+        return len(self) == self._max_length
+
+    def add_candlestick(
+        self, candlestick: Candlestick
+    ) -> CandlestickList.AddResult:
+        """
+        Adds a candlestick to the hub. If another view already added the same
+        candlestick update, the result is reused without validating and
+        storing the candlestick again.
+
+        Args:
+            candlestick: A new or updated candlestick
+        Returns:
+            Whether the candlestick is appended or merged
+        """
+        return self._hub.add_candlestick(candlestick, view=self)
+
+    def atr(self, period: int = -1) -> float:
+        if period < 0:
+            period = len(self)
+        assert period <= len(self), (
+            f"Insufficient data to calculate ATR: "
+            f"trying to calculate ATR for {len(self)} candlesticks "
+            f"with a period {period}"
+        )
+        return self._hub.candlesticks.atr(period)
+
+
+class CandlestickHub(SignalSubscriber):
+    """
+    A candlestick buffer shared by all consumers of one symbol and one
+    candlestick interval. Each consumer reads the candlesticks through its own
+    view, and each indicator is created once no matter how many consumers ask
+    for it.
+
+    Every consumer still subscribes to the candlestick feed by itself, and
+    the first one receiving a candlestick update adds it to the hub.
+    """
+
+    def __init__(self, symbol: str, interval_in_seconds: int):
+        self.symbol = symbol
+        self.interval_in_seconds = interval_in_seconds
+        self.candlesticks = CandlestickList(max_length=1)
+        self._sequence = 0
+        self._last_candlestick: Union[Candlestick, None] = None
+        self._last_result: Union[CandlestickList.AddResult, None] = None
+        self._indicators = dict[tuple, Any]()
+
+    def connect(self, sender: Any = ANY) -> None:
+        """
+        Connect all indicators created by this hub to their signals.
+        """
+        super().connect(sender)
+        for indicator in self._indicators.values():
+            if isinstance(indicator, SignalSubscriber):
+                indicator.connect(sender)
+
+    def view(self, max_length: int) -> CandlestickView:
+        """
+        Creates a view of the most recent `max_length` candlesticks. The
+        buffer grows to fit the longest view.
+
+        Args:
+            max_length: Max number of candlesticks visible in the view
+        Returns:
+            A read-only view
+        """
+        assert max_length > 0
+        if max_length > self.candlesticks.candlesticks.maxlen:
+            candlesticks = CandlestickList(max_length=max_length)
+            for candlestick in self.candlesticks.candlesticks:
+                candlesticks.add_candlestick(candlestick)
+            self.candlesticks = candlesticks
+
+        view = CandlestickView(self, max_length)
+        view._sequence = self._sequence
+        return view
+
+    def indicator(self, indicator_type: type, **kwargs) -> Any:
+        """
+        Gets the indicator of the given type and parameters, and creates it
+        if no one asked for it before. The indicator reads candlesticks
+        from this hub.
+
+        Args:
+            indicator_type: Type of the indicator, its constructor shall
+                            accept a `hub` keyword argument
+            **kwargs: Parameters of the indicator
+        Returns:
+            The shared indicator
+        """
+        key = (indicator_type, tuple(sorted(kwargs.items())))
+        if key not in self._indicators:
+            self._indicators[key] = indicator_type(hub=self, **kwargs)
+        return self._indicators[key]
+
+    def add_candlestick(
+        self,
+        candlestick: Candlestick,
+        view: Union[CandlestickView, None] = None,
+    ) -> CandlestickList.AddResult:
+        """
+        Adds a candlestick update on behalf of a view. The same candlestick
+        object is resent by the candlestick generator whenever it is updated,
+        so an update is only considered a duplicate if the view has not seen
+        the latest update yet.
+
+        Args:
+            candlestick: A new or updated candlestick
+            view: The view adding the candlestick
+        Returns:
+            Whether the candlestick is appended or merged
+        """
+        if (
+            view is not None
+            and view._sequence < self._sequence
+            and candlestick is self._last_candlestick
+        ):
+            view._sequence = self._sequence
+            assert self._last_result is not None
+            return self._last_result
+
+        self._last_result = self.candlesticks.add_candlestick(candlestick)
+        self._last_candlestick = candlestick
+        self._sequence += 1
+        if view is not None:
+            view._sequence = self._sequence
+        return self._last_result
@@ -1,8 +1,9 @@
+import math
 from collections import deque
 from enum import Enum, auto
+from typing import Union
 
 from jolteon.market_data.core.candlestick import Candlestick
-from jolteon.strategy.core.algorithms import calculate_atr
 
 
 class CandlestickList:
@@ -10,10 +11,29 @@ class CandlestickList:
         APPENDED = auto()
         MERGED = auto()
 
-    def __init__(self, max_length: int):
+    def __init__(
+        self, max_length: int, wilder_atr_period: Union[int, None] = None
+    ):
+        """
+        Args:
+            max_length: Max number of candlesticks to keep
+            wilder_atr_period: If set, a Wilder-smoothed ATR of this period
+                               is also maintained, see `wilder_atr`
+        """
+        assert wilder_atr_period is None or wilder_atr_period > 0
         self.candlesticks = deque[Candlestick](
             maxlen=max_length,
         )
+        # Running sums of true ranges, one per candlestick, so that the sum
+        # of true ranges of any window is the difference of two elements.
+        # NaN true ranges are counted separately to not poison the sums.
+        self._true_range_sums = deque[float](maxlen=max_length)
+        self._nan_true_range_counts = deque[int](maxlen=max_length)
+
+        self._wilder_atr_period = wilder_atr_period
+        self._wilder_atr_count = 0
+        self._wilder_atr = math.nan
+        self._wilder_atr_before_last = math.nan
 
     def __len__(self):
         return len(self.candlesticks)
@@ -48,14 +68,115 @@ class CandlestickList:
                 f"last candlestick is {self.candlesticks[-1]}, "
                 f" next candlestick is {candlestick}"
             )
+            true_range = self._true_range(candlestick, -1)
             self.candlesticks.append(candlestick)
+            self._append_true_range(true_range)
             return CandlestickList.AddResult.APPENDED
         else:
             assert self.candlesticks[-1].start_time == candlestick.start_time
+            true_range = self._true_range(candlestick, -2)
             self.candlesticks[-1] = candlestick
+            self._replace_last_true_range(true_range)
             return CandlestickList.AddResult.MERGED
 
     def atr(self, period: int = -1) -> float:
+        """
+        Average true range of the last `period` candlesticks in O(1). Same as
+        `calculate_atr`, the true ranges of the last `period - 1`
+        candlesticks are averaged over `period`.
+
+        Args:
+            period: Number of candlesticks, all candlesticks if negative
+        Returns:
+            The average true range
+        """
         if period < 0:
             period = len(self.candlesticks)
-        return calculate_atr(list(self.candlesticks), period)
+
+        assert period > 0, "Cannot calculate ATR for a period less than 1"
+        assert len(self.candlesticks) >= period, (
+            f"Insufficient data to calculate ATR: "
+            f"trying to calculate ATR for {len(self.candlesticks)} "
+            f"candlesticks with a period {period}"
+        )
+
+        if (
+            self._nan_true_range_counts[-1]
+            - self._nan_true_range_counts[-period]
+            > 0
+        ):
+            return math.nan
+
+        return (
+            self._true_range_sums[-1] - self._true_range_sums[-period]
+        ) / period
+
+    def wilder_atr(self) -> float:
+        """
+        Wilder-smoothed average true range of all candlesticks ever added.
+        The first `wilder_atr_period` true ranges are averaged, then each
+        true range updates the average by
+        `(previous * (period - 1) + true_range) / period`.
+
+        Returns:
+            The Wilder-smoothed ATR, or NaN before any true range is known
+        """
+        assert (
+            self._wilder_atr_period is not None
+        ), "Wilder ATR period is not set!"
+        return self._wilder_atr
+
+    def _true_range(self, candlestick: Candlestick, previous: int) -> float:
+        if len(self.candlesticks) < -previous:
+            return 0.0  # No previous candlestick
+
+        close_prev = self.candlesticks[previous].close
+        high_low = candlestick.high - candlestick.low
+        high_close_prev = abs(candlestick.high - close_prev)
+        low_close_prev = abs(candlestick.low - close_prev)
+        return max(high_low, high_close_prev, low_close_prev)
+
+    def _append_true_range(self, true_range: float) -> None:
+        has_previous = len(self._true_range_sums) > 0
+        self._push_true_range(true_range)
+
+        if has_previous and self._wilder_atr_period is not None:
+            self._wilder_atr_before_last = self._wilder_atr
+            self._wilder_atr_count += 1
+            self._wilder_atr = self._smooth(
+                self._wilder_atr_before_last, true_range
+            )
+
+    def _replace_last_true_range(self, true_range: float) -> None:
+        self._true_range_sums.pop()
+        self._nan_true_range_counts.pop()
+        self._push_true_range(true_range)
+
+        if self._wilder_atr_count > 0:
+            self._wilder_atr = self._smooth(
+                self._wilder_atr_before_last, true_range
+            )
+
+    def _push_true_range(self, true_range: float) -> None:
+        last_sum, last_nan_count = 0.0, 0
+        if len(self._true_range_sums) > 0:
+            last_sum = self._true_range_sums[-1]
+            last_nan_count = self._nan_true_range_counts[-1]
+
+        if math.isnan(true_range):
+            self._true_range_sums.append(last_sum)
+            self._nan_true_range_counts.append(last_nan_count + 1)
+        else:
+            self._true_range_sums.append(last_sum + true_range)
+            self._nan_true_range_counts.append(last_nan_count)
+
+    def _smooth(self, previous: float, true_range: float) -> float:
+        assert self._wilder_atr_period is not None
+        if self._wilder_atr_count == 1:
+            return true_range
+        if self._wilder_atr_count <= self._wilder_atr_period:
+            # Simple average of the first true ranges
+            return previous + (true_range - previous) / self._wilder_atr_count
+        return (
+            previous * (self._wilder_atr_period - 1) + true_range
+        ) / self._wilder_atr_period
@@ -5,6 +5,9 @@ class Events:
     """
     A list of common events provided by most exchanges' in their
     market data feeds.
+
+    Events about one symbol are sent by the symbol, so that a receiver could
+    connect to the events of one symbol only.
     """
 
     channel_heartbeat = signal("channel_heartbeat_feed")
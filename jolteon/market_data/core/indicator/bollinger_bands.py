@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+
+import pandas as pd
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.indicator.indicator_calculator import (
+    IndicatorCalculator,
+    RollingStatistics,
+)
+
+
+@dataclass
+class BollingerBands:
+    timestamp: datetime
+    period: int
+    middle: float
+    upper: float
+    lower: float
+
+
+class BollingerBandsCalculator(IndicatorCalculator):
+    """
+    Bollinger bands are `num_std` population standard deviations above and
+    below the simple moving average of the close prices.
+    """
+
+    def __init__(
+        self,
+        period: int = 20,
+        num_std: float = 2.0,
+        hub: Union[CandlestickHub, None] = None,
+    ):
+        super().__init__("bollinger_bands", hub)
+        self._period = period
+        self._num_std = num_std
+        self._statistics = RollingStatistics(period)
+
+    def update(self, candlestick: Candlestick) -> Union[BollingerBands, None]:
+        self._statistics.add(candlestick.close)
+        if not self._statistics.is_full():
+            return None
+
+        middle = self._statistics.mean
+        width = self._num_std * self._statistics.std()
+        return BollingerBands(
+            timestamp=time_manager().now(),
+            period=self._period,
+            middle=middle,
+            upper=middle + width,
+            lower=middle - width,
+        )
+
+
+def calculate_bollinger_bands(
+    df: pd.DataFrame, period: int = 20, num_std: float = 2.0
+) -> pd.DataFrame:
+    """
+    Batch counterpart of BollingerBandsCalculator.
+
+    Args:
+        df: Completed candlesticks with a `close` column
+        period: Number of candlesticks in the moving window
+        num_std: Width of the bands in standard deviations
+    Returns:
+        `middle`, `upper` and `lower` columns, NaN while warming up
+    """
+    rolling = df["close"].rolling(period)
+    middle = rolling.mean()
+    width = num_std * rolling.std(ddof=0)
+    return pd.DataFrame(
+        {"middle": middle, "upper": middle + width, "lower": middle - width}
+    )
@@ -0,0 +1,84 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+
+import pandas as pd
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.indicator.indicator_calculator import (
+    IndicatorCalculator,
+)
+
+
+@dataclass
+class EMA:
+    timestamp: datetime
+    period: int
+    ema: float
+
+
+class ExponentialMovingAverage:
+    """
+    Exponential moving average with a smoothing factor of 2 / (period + 1),
+    seeded with the first value.
+    """
+
+    def __init__(self, period: int):
+        assert period > 0, "Period shall be a positive number"
+        self.period = period
+        self.count = 0
+        self.value = math.nan
+        self._alpha = 2.0 / (period + 1)
+
+    def is_ready(self) -> bool:
+        return self.count >= self.period
+
+    def add(self, value: float) -> float:
+        self.count += 1
+        if self.count == 1:
+            self.value = value
+        else:
+            self.value = (1 - self._alpha) * self.value + self._alpha * value
+        return self.value
+
+
+class EMACalculator(IndicatorCalculator):
+    """
+    Exponential moving average of the close prices. Values are sent after
+    `period` candlesticks.
+    """
+
+    def __init__(
+        self, period: int = 20, hub: Union[CandlestickHub, None] = None
+    ):
+        super().__init__("ema", hub)
+        self._ema = ExponentialMovingAverage(period)
+
+    def update(self, candlestick: Candlestick) -> Union[EMA, None]:
+        self._ema.add(candlestick.close)
+        if not self._ema.is_ready():
+            return None
+
+        return EMA(
+            timestamp=time_manager().now(),
+            period=self._ema.period,
+            ema=self._ema.value,
+        )
+
+
+def calculate_ema(df: pd.DataFrame, period: int = 20) -> pd.Series:
+    """
+    Batch counterpart of EMACalculator.
+
+    Args:
+        df: Completed candlesticks with a `close` column
+        period: Span of the exponential moving average
+    Returns:
+        EMA of every candlestick, NaN while warming up
+    """
+    return (
+        df["close"].ewm(span=period, adjust=False, min_periods=period).mean()
+    )
@@ -0,0 +1,111 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Union
+
+from jolteon.core.event.signal import signal, subscribe
+from jolteon.core.event.signal_subscriber import SignalSubscriber
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import (
+    CandlestickHub,
+    CandlestickView,
+)
+from jolteon.market_data.core.candlestick_list import CandlestickList
+
+
+class IndicatorCalculator(SignalSubscriber, ABC):
+    """
+    Base class of streaming indicators. Same as RSICalculator, an indicator
+    is updated once per completed candlestick in O(1), and the result is
+    sent as the only payload of a signal named after the indicator.
+
+    The last candlestick is potentially incomplete, hence a candlestick is
+    only considered as completed when the next one arrives.
+    """
+
+    def __init__(self, name: str, hub: Union[CandlestickHub, None] = None):
+        """
+        Args:
+            name: Name of the signal to send indicator values
+            hub: If set, candlesticks are read from the shared hub instead
+                 of a private copy
+        """
+        self._candlesticks: Union[CandlestickList, CandlestickView] = (
+            hub.view(max_length=2) if hub else CandlestickList(max_length=2)
+        )
+        self.event = signal(name)
+
+    @subscribe("calculated_candlestick_feed")
+    def on_candlestick(self, sender: str, candlestick: Candlestick):
+        """
+        Update the indicator on receiving a new candlestick.
+
+        Args:
+            sender: Symbol of the candlestick, which also sends the indicator
+            candlestick: A new candlestick
+
+        Returns:
+            None
+        """
+        added = self._candlesticks.add_candlestick(candlestick=candlestick)
+        if (
+            added == CandlestickList.AddResult.MERGED
+            or len(self._candlesticks) < 2
+        ):
+            return
+
+        result = self.update(self._candlesticks[-2])
+        if result is not None:
+            self.event.send(sender, **{self.event.name: result})
+
+    @abstractmethod
+    def update(self, candlestick: Candlestick) -> Union[Any, None]:
+        """
+        Update the indicator with a completed candlestick.
+
+        Args:
+            candlestick: A completed candlestick
+
+        Returns:
+            The new indicator value, or None if it is still warming up
+        """
+        raise NotImplementedError
+
+
+class RollingStatistics:
+    """
+    Mean and variance of a sliding window updated in O(1) with Welford's
+    algorithm, which is numerically stable for prices far from zero.
+    """
+
+    def __init__(self, period: int):
+        assert period > 0, "Period shall be a positive number"
+        self.period = period
+        self._values = deque[float](maxlen=period)
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self):
+        return len(self._values)
+
+    def is_full(self) -> bool:
+        return len(self._values) == self.period
+
+    def add(self, value: float) -> None:
+        if self.is_full():
+            oldest = self._values[0]
+            self._values.append(value)
+            mean = self.mean + (value - oldest) / self.period
+            self._m2 += (value - oldest) * (value - mean + oldest - self.mean)
+            self.mean = mean
+        else:
+            self._values.append(value)
+            delta = value - self.mean
+            self.mean += delta / len(self._values)
+            self._m2 += delta * (value - self.mean)
+
+    def std(self, ddof: int = 0) -> float:
+        if len(self._values) <= ddof:
+            return math.nan
+        # Rounding errors might make a constant window slightly negative
+        return math.sqrt(max(0.0, self._m2) / (len(self._values) - ddof))
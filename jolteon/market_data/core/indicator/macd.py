@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+
+import pandas as pd
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.indicator.ema import ExponentialMovingAverage
+from jolteon.market_data.core.indicator.indicator_calculator import (
+    IndicatorCalculator,
+)
+
+
+@dataclass
+class MACD:
+    timestamp: datetime
+    macd: float
+    signal: float
+    histogram: float
+
+
+class MACDCalculator(IndicatorCalculator):
+    """
+    Moving average convergence/divergence. The MACD line is the difference
+    between the fast and the slow EMA of the close prices, and the signal
+    line is an EMA of the MACD line starting once the slow EMA is ready.
+    """
+
+    def __init__(
+        self,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        hub: Union[CandlestickHub, None] = None,
+    ):
+        assert fast_period < slow_period
+        super().__init__("macd", hub)
+        self._fast = ExponentialMovingAverage(fast_period)
+        self._slow = ExponentialMovingAverage(slow_period)
+        self._signal = ExponentialMovingAverage(signal_period)
+
+    def update(self, candlestick: Candlestick) -> Union[MACD, None]:
+        self._fast.add(candlestick.close)
+        self._slow.add(candlestick.close)
+        if not self._slow.is_ready():
+            return None
+
+        macd = self._fast.value - self._slow.value
+        self._signal.add(macd)
+        if not self._signal.is_ready():
+            return None
+
+        return MACD(
+            timestamp=time_manager().now(),
+            macd=macd,
+            signal=self._signal.value,
+            histogram=macd - self._signal.value,
+        )
+
+
+def calculate_macd(
+    df: pd.DataFrame,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+) -> pd.DataFrame:
+    """
+    Batch counterpart of MACDCalculator.
+
+    Args:
+        df: Completed candlesticks with a `close` column
+        fast_period: Span of the fast EMA
+        slow_period: Span of the slow EMA
+        signal_period: Span of the signal line
+    Returns:
+        `macd`, `signal` and `histogram` columns, NaN while warming up
+    """
+    close = df["close"]
+    macd = (
+        close.ewm(span=fast_period, adjust=False).mean()
+        - close.ewm(span=slow_period, adjust=False).mean()
+    )
+    # The signal line starts once the slow EMA is ready
+    macd = macd.iloc[slow_period - 1 :]  # noqa: E203
+    signal = macd.ewm(
+        span=signal_period, adjust=False, min_periods=signal_period
+    ).mean()
+
+    result = pd.DataFrame(
+        {"macd": macd, "signal": signal, "histogram": macd - signal},
+        index=df.index,
+    )
+    return result.where(result["signal"].notna())
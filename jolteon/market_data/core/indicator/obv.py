@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.indicator.indicator_calculator import (
+    IndicatorCalculator,
+)
+
+
+@dataclass
+class OBV:
+    timestamp: datetime
+    obv: float
+
+
+class OBVCalculator(IndicatorCalculator):
+    """
+    On-balance volume adds the volume of a candlestick closing higher than
+    the previous one, and subtracts the volume of one closing lower.
+    """
+
+    def __init__(self, hub: Union[CandlestickHub, None] = None):
+        super().__init__("obv", hub)
+        self._obv = 0.0
+        self._previous_close: Union[float, None] = None
+
+    def update(self, candlestick: Candlestick) -> OBV:
+        if self._previous_close is not None:
+            if candlestick.close > self._previous_close:
+                self._obv += candlestick.volume
+            elif candlestick.close < self._previous_close:
+                self._obv -= candlestick.volume
+        self._previous_close = candlestick.close
+
+        return OBV(timestamp=time_manager().now(), obv=self._obv)
+
+
+def calculate_obv(df: pd.DataFrame) -> pd.Series:
+    """
+    Batch counterpart of OBVCalculator.
+
+    Args:
+        df: Completed candlesticks with `close` and `volume` columns
+    Returns:
+        OBV of every candlestick, starting from zero
+    """
+    direction = np.sign(df["close"].diff()).fillna(0.0)
+    return (direction * df["volume"]).cumsum()
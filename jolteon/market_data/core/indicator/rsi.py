@@ -7,6 +7,10 @@ from jolteon.core.event.signal import signal, subscribe
 from jolteon.core.event.signal_subscriber import SignalSubscriber
 from jolteon.core.time.time_manager import time_manager
 from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import (
+    CandlestickHub,
+    CandlestickView,
+)
 from jolteon.market_data.core.candlestick_list import CandlestickList
 
 
@@ -29,21 +33,33 @@ class RSICalculator(SignalSubscriber):
     overvalued or undervalued conditions in the price of that security.
     """
 
-    def __init__(self, period: int = 14):
+    def __init__(
+        self, period: int = 14, hub: Union[CandlestickHub, None] = None
+    ):
+        """
+        Args:
+            period: Number of price changes to average
+            hub: If set, candlesticks are read from the shared hub instead
+                 of a private copy
+        """
         self._period: int = period
-        self._candlesticks = CandlestickList(max_length=period + 2)
+        self._candlesticks: Union[CandlestickList, CandlestickView] = (
+            hub.view(max_length=period + 2)
+            if hub
+            else CandlestickList(max_length=period + 2)
+        )
         self._gains = deque[float](maxlen=period)
         self._losses = deque[float](maxlen=period)
         self._previous_rsi: Union[RSI, None] = None
         self.rsi_event = signal("rsi")
 
     @subscribe("calculated_candlestick_feed")
-    def on_candlestick(self, _: str, candlestick: Candlestick):
+    def on_candlestick(self, sender: str, candlestick: Candlestick):
         """
         Calculate RSI on receiving a new candlestick.
 
         Args:
-            _: Unused argument
+            sender: Symbol of the candlestick, which also sends the RSI
             candlestick: A new candlestick
 
         Returns:
@@ -68,11 +84,11 @@ class RSICalculator(SignalSubscriber):
 
         if not self._previous_rsi and self._candlesticks.is_full():
             rsi = self._calculate_rsi()
-            self.rsi_event.send(self.rsi_event, rsi=rsi)
+            self.rsi_event.send(sender, rsi=rsi)
             self._previous_rsi = rsi
         elif self._previous_rsi:
             rsi = self._calculate_rsi_from(previous_rsi=self._previous_rsi)
-            self.rsi_event.send(self.rsi_event, rsi=rsi)
+            self.rsi_event.send(sender, rsi=rsi)
             self._previous_rsi = rsi
         else:
             pass
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+
+import pandas as pd
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.indicator.indicator_calculator import (
+    IndicatorCalculator,
+    RollingStatistics,
+)
+
+
+@dataclass
+class SMA:
+    timestamp: datetime
+    period: int
+    sma: float
+
+
+class SMACalculator(IndicatorCalculator):
+    """
+    Simple moving average of the close prices of the last `period`
+    candlesticks.
+    """
+
+    def __init__(
+        self, period: int = 20, hub: Union[CandlestickHub, None] = None
+    ):
+        super().__init__("sma", hub)
+        self._period = period
+        self._statistics = RollingStatistics(period)
+
+    def update(self, candlestick: Candlestick) -> Union[SMA, None]:
+        self._statistics.add(candlestick.close)
+        if not self._statistics.is_full():
+            return None
+
+        return SMA(
+            timestamp=time_manager().now(),
+            period=self._period,
+            sma=self._statistics.mean,
+        )
+
+
+def calculate_sma(df: pd.DataFrame, period: int = 20) -> pd.Series:
+    """
+    Batch counterpart of SMACalculator.
+
+    Args:
+        df: Completed candlesticks with a `close` column
+        period: Number of candlesticks to average
+    Returns:
+        SMA of every candlestick, NaN while warming up
+    """
+    return df["close"].rolling(period).mean()
@@ -0,0 +1,68 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.indicator.indicator_calculator import (
+    IndicatorCalculator,
+    RollingStatistics,
+)
+
+
+@dataclass
+class Volatility:
+    timestamp: datetime
+    period: int
+    volatility: float
+
+
+class VolatilityCalculator(IndicatorCalculator):
+    """
+    Rolling volatility as the sample standard deviation of the log returns
+    of the last `period` candlesticks.
+    """
+
+    def __init__(
+        self, period: int = 20, hub: Union[CandlestickHub, None] = None
+    ):
+        assert period > 1, "Period shall be greater than 1"
+        super().__init__("volatility", hub)
+        self._period = period
+        self._statistics = RollingStatistics(period)
+        self._previous_close: Union[float, None] = None
+
+    def update(self, candlestick: Candlestick) -> Union[Volatility, None]:
+        previous_close = self._previous_close
+        self._previous_close = candlestick.close
+        if previous_close is None:
+            return None
+
+        self._statistics.add(math.log(candlestick.close / previous_close))
+        if not self._statistics.is_full():
+            return None
+
+        return Volatility(
+            timestamp=time_manager().now(),
+            period=self._period,
+            volatility=self._statistics.std(ddof=1),
+        )
+
+
+def calculate_volatility(df: pd.DataFrame, period: int = 20) -> pd.Series:
+    """
+    Batch counterpart of VolatilityCalculator.
+
+    Args:
+        df: Completed candlesticks with a `close` column
+        period: Number of log returns in the moving window
+    Returns:
+        Volatility of every candlestick, NaN while warming up
+    """
+    log_returns = np.log(df["close"] / df["close"].shift(1))
+    return log_returns.rolling(period).std(ddof=1)
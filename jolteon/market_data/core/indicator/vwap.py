@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+
+import pandas as pd
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.indicator.indicator_calculator import (
+    IndicatorCalculator,
+)
+
+
+@dataclass
+class VWAP:
+    timestamp: datetime
+    vwap: float
+
+
+class VWAPCalculator(IndicatorCalculator):
+    """
+    Volume weighted average price since the first candlestick, using the
+    typical price (high + low + close) / 3 of each candlestick.
+    """
+
+    def __init__(self, hub: Union[CandlestickHub, None] = None):
+        super().__init__("vwap", hub)
+        self._total_price_volume = 0.0
+        self._total_volume = 0.0
+
+    def update(self, candlestick: Candlestick) -> VWAP:
+        typical_price = (
+            candlestick.high + candlestick.low + candlestick.close
+        ) / 3.0
+        self._total_price_volume += typical_price * candlestick.volume
+        self._total_volume += candlestick.volume
+
+        return VWAP(
+            timestamp=time_manager().now(),
+            vwap=self._total_price_volume / self._total_volume
+            if self._total_volume > 0
+            else float("nan"),
+        )
+
+
+def calculate_vwap(df: pd.DataFrame) -> pd.Series:
+    """
+    Batch counterpart of VWAPCalculator.
+
+    Args:
+        df: Completed candlesticks with `high`, `low`, `close` and `volume`
+            columns
+    Returns:
+        VWAP of every candlestick, NaN before any volume is traded
+    """
+    typical_price = (df["high"] + df["low"] + df["close"]) / 3.0
+    total_volume = df["volume"].cumsum()
+    return ((typical_price * df["volume"]).cumsum() / total_volume).where(
+        total_volume > 0
+    )
@@ -0,0 +1,217 @@
+import time
+from datetime import datetime, timedelta
+from multiprocessing.shared_memory import SharedMemory
+from typing import Union
+
+import numpy as np
+import pytz
+
+from jolteon.core.side import MarketSide
+from jolteon.market_data.core.trade import Trade
+
+
+class TradeRingBuffer:
+    """
+    A single-producer single-consumer queue of market trades in shared
+    memory, which passes decoded market trades to another process without
+    pickling them.
+
+        +-----------------------------------+
+        | Header (32 bytes)                 |
+        +-----------------------------------+
+        | Records (35 bytes each)           |  `capacity` records
+        +-----------------------------------+
+
+    `head` is only written by the producer and `tail` is only written by the
+    consumer, hence no lock is needed. A record is written before `head`
+    moves past it, and it is copied out before `tail` moves past it.
+    """
+
+    HEADER_DTYPE = np.dtype(
+        [
+            ("head", "<i8"),
+            ("tail", "<i8"),
+            ("capacity", "<i8"),
+            ("closed", "<i8"),
+        ]
+    )
+    RECORD_DTYPE = np.dtype(
+        [
+            ("time", "<i8"),
+            ("price", "<f8"),
+            ("quantity", "<f8"),
+            ("side", "u1"),
+            ("trade_id", "<i8"),
+            ("symbol", "<u2"),
+        ]
+    )
+
+    SIDES = [MarketSide.UNKNOWN, MarketSide.BUY, MarketSide.SELL]
+    EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+    def __init__(
+        self,
+        symbols: list[str],
+        capacity: int = 65536,
+        name: Union[str, None] = None,
+    ):
+        """
+        Creates a new ring buffer, or attaches to an existing one.
+
+        Args:
+            symbols: Symbols of all market trades in the ring buffer, both
+                     sides shall use the same list
+            capacity: Max number of market trades not read yet, ignored when
+                      attaching to an existing ring buffer
+            name: Name of an existing ring buffer to attach to
+        """
+        assert len(symbols) > 0, "Please specify at least one symbol"
+        self.symbols = symbols
+        self._symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        self._owner = name is None
+
+        if self._owner:
+            assert capacity > 0, "Capacity shall be a positive number"
+            self._shm = SharedMemory(
+                create=True,
+                size=TradeRingBuffer.HEADER_DTYPE.itemsize
+                + TradeRingBuffer.RECORD_DTYPE.itemsize * capacity,
+            )
+        else:
+            self._shm = SharedMemory(name=name)
+
+        self._header = np.ndarray(
+            (1,), dtype=TradeRingBuffer.HEADER_DTYPE, buffer=self._shm.buf
+        )
+        if self._owner:
+            self._header[0] = (0, 0, capacity, 0)
+        self.capacity = int(self._header["capacity"][0])
+        self._records = np.ndarray(
+            (self.capacity,),
+            dtype=TradeRingBuffer.RECORD_DTYPE,
+            buffer=self._shm.buf,
+            offset=TradeRingBuffer.HEADER_DTYPE.itemsize,
+        )
+
+    def __len__(self):
+        return int(self._header["head"][0] - self._header["tail"][0])
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def is_closed(self) -> bool:
+        """
+        Returns:
+            Whether the producer will not put any more market trades
+        """
+        return bool(self._header["closed"][0])
+
+    def put(self, trade: Trade, timeout: float = 30) -> None:
+        """
+        Appends a market trade. Market trades are never dropped, the
+        producer waits until the consumer has read enough market trades.
+        It blocks the calling thread, so producers running in an event loop
+        shall use `try_put` instead.
+
+        Args:
+            trade: A market trade of one of the symbols
+            timeout: Max time in seconds to wait for the consumer
+        Returns:
+            None
+        """
+        deadline = time.monotonic() + timeout
+        while not self.try_put(trade):
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"No market trade is read from {self.name} "
+                    f"in {timeout} seconds"
+                )
+            time.sleep(0.0001)
+
+    def try_put(self, trade: Trade) -> bool:
+        """
+        Appends a market trade without waiting for the consumer.
+
+        Args:
+            trade: A market trade of one of the symbols
+        Returns:
+            Whether the market trade is appended, False if the ring buffer
+            is full
+        """
+        head = int(self._header["head"][0])
+        if head - int(self._header["tail"][0]) >= self.capacity:
+            return False
+
+        self._records[head % self.capacity] = (
+            (trade.transaction_time - TradeRingBuffer.EPOCH)
+            // timedelta(microseconds=1)
+            * 1000,
+            trade.price,
+            trade.quantity,
+            TradeRingBuffer.SIDES.index(trade.side),
+            int(trade.trade_id),
+            self._symbol_index[trade.symbol],
+        )
+        self._header["head"][0] = head + 1
+        return True
+
+    def get(self, max_count: int = 1024) -> list[Trade]:
+        """
+        Reads market trades in the order they are put.
+
+        Args:
+            max_count: Max number of market trades to read
+        Returns:
+            Market trades, or an empty list if nothing is available yet
+        """
+        tail = int(self._header["tail"][0])
+        count = min(int(self._header["head"][0]) - tail, max_count)
+        if count <= 0:
+            return []
+
+        # Copy the records out before releasing their slots to the producer
+        records = self._records[(tail + np.arange(count)) % self.capacity]
+        self._header["tail"][0] = tail + count
+
+        return [
+            Trade(
+                trade_id=trade_id,
+                client_order_id="",
+                symbol=self.symbols[symbol],
+                maker_order_id="",
+                taker_order_id="",
+                side=TradeRingBuffer.SIDES[side],
+                price=price,
+                fee=0.0,
+                quantity=quantity,
+                transaction_time=TradeRingBuffer.EPOCH
+                + timedelta(microseconds=ns // 1000),
+            )
+            for ns, price, quantity, side, trade_id, symbol in zip(
+                records["time"].tolist(),
+                records["price"].tolist(),
+                records["quantity"].tolist(),
+                records["side"].tolist(),
+                records["trade_id"].tolist(),
+                records["symbol"].tolist(),
+            )
+        ]
+
+    def close(self) -> None:
+        """
+        Tells the consumer no more market trades will be put.
+        """
+        self._header["closed"][0] = 1
+
+    def release(self) -> None:
+        """
+        Detaches from the shared memory, and frees it if this ring buffer
+        created it.
+        """
+        # Views of the shared memory must be released before closing it
+        self._header = None
+        self._records = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
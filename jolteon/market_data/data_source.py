@@ -1,17 +1,38 @@
+import asyncio
 import sqlite3
 from abc import ABC, abstractmethod
+from collections import defaultdict, deque
 from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Union
 
-import pandas as pd
 import pytz
 
 from jolteon.core.side import MarketSide
 from jolteon.market_data.core.events import Events
 from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.trade_chunk_store import TradeChunkStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from jolteon.market_data.trade_file import TradeFile
 
 
 class IDataSource(ABC):
     TRADE_CACHE = dict[tuple, list[Trade]]()
+    # Maximum number of streamed chunks kept in TRADE_CACHE per symbol
+    STREAM_CACHE_SIZE: int = 4
+
+    def __init__(self, store: Union[TradeChunkStore, None] = None):
+        """
+        Args:
+            store: An optional local store to save downloaded market trades.
+                   When provided, market trades will be downloaded chunk by
+                   chunk and completed chunks will be loaded from the store
+                   instead of being downloaded again.
+        """
+        self._store = store
+        self._streamed_keys = defaultdict[str, deque[tuple]](deque)
 
     @abstractmethod
     async def download_market_trades(
@@ -19,6 +40,145 @@ class IDataSource(ABC):
     ):
         raise NotImplementedError
 
+    async def stream_market_trades(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ) -> AsyncIterator[list[Trade]]:
+        """
+        Yields market trades chunk by chunk in time order, so that a consumer
+        could start processing the first chunk while the next one is still
+        being downloaded. By default, all market trades are yielded as one
+        chunk.
+
+        Args:
+            symbol: Symbol of the market trades
+            start_time: Start time of the market trades
+            end_time: End time of the market trades
+        Returns:
+            An async iterator of market trade chunks
+        """
+        yield await self.download_market_trades(symbol, start_time, end_time)
+
+    async def _download_with_store(
+        self,
+        symbol: str,
+        start_time: datetime,
+        end_time: datetime,
+        download: Callable[[str, datetime, datetime], Awaitable[list[Trade]]],
+    ) -> list[Trade]:
+        """
+        Downloads market trades chunk by chunk using the given download
+        function, see `_chunks_with_store`.
+
+        Returns:
+            A list of market trades sorted by transaction time
+        """
+        market_trades = list[Trade]()
+        async for _, trades in self._chunks_with_store(
+            symbol, start_time, end_time, download
+        ):
+            market_trades += trades
+        return market_trades
+
+    async def _stream_with_store(
+        self,
+        symbol: str,
+        start_time: datetime,
+        end_time: datetime,
+        download: Callable[[str, datetime, datetime], Awaitable[list[Trade]]],
+    ) -> AsyncIterator[list[Trade]]:
+        """
+        Streams market trades chunk by chunk using the given download
+        function, see `_chunks_with_store`. Only the most recently streamed
+        chunks are kept in TRADE_CACHE to bound the memory usage.
+
+        Returns:
+            An async iterator of market trade chunks
+        """
+        if self._store is None:
+            yield await self.download_market_trades(
+                symbol, start_time, end_time
+            )
+            return
+
+        async for key, trades in self._chunks_with_store(
+            symbol, start_time, end_time, download
+        ):
+            # Streamed chunks may be partial, so they are tagged to never be
+            # mistaken for a complete time range of `download_market_trades`
+            self._cache_streamed_trades((*key, "stream"), trades)
+            yield trades
+
+    def _cache_streamed_trades(self, key: tuple, trades: list[Trade]):
+        """
+        Saves a streamed chunk in TRADE_CACHE and evicts the oldest chunks
+        of the same symbol, so that replaying several symbols together
+        won't evict the chunks of each other.
+
+        Args:
+            key: Cache key of the chunk, starting with its symbol
+            trades: Market trades of the chunk
+        """
+        streamed_keys = self._streamed_keys[key[0]]
+        self.TRADE_CACHE[key] = trades
+        streamed_keys.append(key)
+        while len(streamed_keys) > self.STREAM_CACHE_SIZE:
+            self.TRADE_CACHE.pop(streamed_keys.popleft(), None)
+
+    async def _chunks_with_store(
+        self,
+        symbol: str,
+        start_time: datetime,
+        end_time: datetime,
+        download: Callable[[str, datetime, datetime], Awaitable[list[Trade]]],
+    ) -> AsyncIterator[tuple[tuple, list[Trade]]]:
+        """
+        Downloads market trades chunk by chunk using the given download
+        function. Chunks already in the store are loaded from the disk, and
+        every newly downloaded chunk is saved before the next one is
+        requested.
+
+        Args:
+            symbol: Symbol of the market trades
+            start_time: Start time of the market trades
+            end_time: End time of the market trades
+            download: Function to download market trades of a time range
+        Returns:
+            An async iterator of (cache key, market trades) for every chunk
+        """
+        if self._store is None:
+            yield (symbol, start_time, end_time), await download(
+                symbol, start_time, end_time
+            )
+            return
+
+        for chunk in self._store.chunks(start_time, end_time):
+            key = (symbol, chunk.start, chunk.end)
+
+            # Chunks only partially covered by the requested time range are
+            # downloaded as needed but never saved.
+            is_partial = chunk.start < start_time or chunk.end > end_time
+            if not is_partial and self._store.has(symbol, chunk):
+                yield key, await asyncio.to_thread(
+                    self._store.load, symbol, chunk
+                )
+                continue
+
+            trades = await download(
+                symbol,
+                max(start_time, chunk.start),
+                min(end_time, chunk.end),
+            )
+            trades = [
+                trade
+                for trade in trades
+                if chunk.start <= trade.transaction_time < chunk.end
+            ]
+            # Chunks in the future may still receive new trades
+            if not is_partial and chunk.end <= datetime.now(tz=pytz.utc):
+                self._store.save(symbol, chunk, trades)
+
+            yield key, trades
+
 
 class DatabaseDataSource(IDataSource):
     """
@@ -26,10 +186,35 @@ class DatabaseDataSource(IDataSource):
     """
 
     def __init__(self, database_name: str):
+        """
+        Args:
+            database_name: Path to a SQLite database, or to a binary market
+                           trade file converted from a SQLite database
+        """
+        super().__init__()
         self._database_name = database_name
         self._table_name = Events().market_trade.name
+        self._trade_file_opened = False
+        self._opened_trade_file: Union["TradeFile", None] = None
+
+    @property
+    def _trade_file(self) -> Union["TradeFile", None]:
+        # NumPy and pandas are only needed when reading the database, so the
+        # file is opened on the first read
+        if not self._trade_file_opened:
+            from jolteon.market_data.trade_file import TradeFile
+
+            self._trade_file_opened = True
+            if TradeFile.is_trade_file(self._database_name):
+                self._opened_trade_file = TradeFile(self._database_name)
+        return self._opened_trade_file
 
     def start_time(self):
+        if self._trade_file is not None:
+            return self._trade_file.start_time()
+
+        import pandas as pd
+
         conn = sqlite3.connect(self._database_name)
         df = pd.read_sql(
             f"select * from {self._table_name} "
@@ -40,6 +225,11 @@ class DatabaseDataSource(IDataSource):
         return trades[0].transaction_time
 
     def end_time(self):
+        if self._trade_file is not None:
+            return self._trade_file.end_time()
+
+        import pandas as pd
+
         conn = sqlite3.connect(self._database_name)
         df = pd.read_sql(
             f"select * from {self._table_name} "
@@ -52,6 +242,15 @@ class DatabaseDataSource(IDataSource):
     async def download_market_trades(
         self, symbol: str, start_time: datetime, end_time: datetime
     ):
+        if self._trade_file is not None:
+            market_trades = self._trade_file.to_trades(
+                self._trade_file.slice(start_time, end_time)
+            )
+            self.TRADE_CACHE[(symbol, start_time, end_time)] = market_trades
+            return market_trades
+
+        import pandas as pd
+
         conn = sqlite3.connect(self._database_name)
         df = pd.read_sql(
             f"select * from {Events().market_trade.name}", con=conn
@@ -64,8 +263,28 @@ class DatabaseDataSource(IDataSource):
 
         return market_trades
 
+    async def stream_market_trades(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ) -> AsyncIterator[list[Trade]]:
+        if self._trade_file is None:
+            yield await self.download_market_trades(
+                symbol, start_time, end_time
+            )
+            return
+
+        # Only create trade objects for the blocks being replayed
+        for records in self._trade_file.iter_blocks(start_time, end_time):
+            market_trades = self._trade_file.to_trades(records)
+            key = (
+                symbol,
+                market_trades[0].transaction_time,
+                market_trades[-1].transaction_time,
+            )
+            self._cache_streamed_trades(key, market_trades)
+            yield market_trades
+
     @staticmethod
-    def to_trades(df: pd.DataFrame) -> list[Trade]:
+    def to_trades(df: "pd.DataFrame") -> list[Trade]:
         """
         Converts a pandas dataframe to a list of trades
         Args:
@@ -1,12 +1,19 @@
+import asyncio
+import bisect
+import heapq
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from enum import StrEnum, auto
+from typing import Awaitable, Callable, Iterable, Union
 
 from jolteon.core.health_monitor.heartbeat import Heartbeater, HeartbeatLevel
+from jolteon.core.time.replay_clock import ReplayClock
 from jolteon.core.time.time_manager import time_manager
 from jolteon.market_data.core.candlestick_generator import CandlestickGenerator
 from jolteon.market_data.core.events import Events
+from jolteon.market_data.core.trade import Trade
 from jolteon.market_data.data_source import IDataSource
 
 
@@ -19,10 +26,15 @@ class HistoricalFeed(Heartbeater):
     Download and replay the historical market data feed.
     """
 
+    # Market trades replayed between two waits for slow consumers
+    BACK_PRESSURE_INTERVAL = 1024
+
     def __init__(
         self,
         data_source: IDataSource,
         candlestick_interval_in_seconds: int = 60,
+        prefetch_chunks: int = 2,
+        replay_speed: Union[float, None] = None,
     ):
         """
         Creates a historical market data feed client for the given time frame.
@@ -30,86 +42,243 @@ class HistoricalFeed(Heartbeater):
         Args:
             candlestick_interval_in_seconds: Granularity of the candlesticks in
                                              seconds.
+            prefetch_chunks: Max number of market trade chunks downloaded
+                             ahead of the replay. It bounds the memory usage
+                             regardless of the length of the replay.
+            replay_speed: Replay time elapsed per second of wall clock time,
+                          e.g. 1 for realistic timing. Market trades are
+                          replayed as fast as possible if not specified.
         """
+        assert prefetch_chunks > 0
         super().__init__(type(self).__name__, interval_in_seconds=10)
         self.events = Events()
         self._data_source = data_source
-        self._candlestick_generator = CandlestickGenerator(
-            interval_in_seconds=candlestick_interval_in_seconds
+        self._prefetch_chunks = prefetch_chunks
+        self._replay_speed = replay_speed
+        self._back_pressure: Union[Callable[[], Awaitable[None]], None] = None
+        # Candlesticks are generated for each symbol separately
+        self._candlestick_generators = defaultdict[str, CandlestickGenerator](
+            lambda: CandlestickGenerator(
+                interval_in_seconds=candlestick_interval_in_seconds
+            )
         )
 
+    def use_back_pressure(self, wait: Callable[[], Awaitable[None]]):
+        """
+        Args:
+            wait: Awaited after every `BACK_PRESSURE_INTERVAL` market trades
+                  before replaying more, e.g. until worker processes catch up
+        """
+        self._back_pressure = wait
+
     async def connect(
         self,
-        symbol: str,
+        symbol: Union[str, list[str]],
         start_time: datetime,
         end_time: datetime,
     ):
         """
         Download the historical market data feed for the given symbol and
-        time frame. Replay the candlesticks at the specified replay speed.
+        time frame. Replay the market trades at the specified replay speed.
+        Market trades are downloaded chunk by chunk in the background while
+        the already downloaded chunks are being replayed.
+
+        Market trades of several symbols are downloaded separately and
+        replayed together in the order of their transaction time.
+
         Args:
-            symbol: Symbol of the product to download historical market data
+            symbol: Symbol or a list of symbols of the products to download
+                    historical market data
             start_time: Start time of the historical market data feed.
             end_time: End time of the historical market data feed.
         Returns:
             A asyncio task to be waiting for incoming messages
         """
+        symbols = [symbol] if isinstance(symbol, str) else list(symbol)
         time_manager().claim_admin(self)
         time_manager().use_fake_time(start_time, admin=self)
 
-        self.add_issue(
-            HeartbeatLevel.WARN, HistoricalFeed.ErrorCode.DOWNLOADING.name
-        )
-        market_trades = await self._data_source.download_market_trades(
-            symbol, start_time, end_time
+        queues = {
+            symbol: asyncio.Queue[list[Trade] | None](
+                maxsize=self._prefetch_chunks
+            )
+            for symbol in symbols
+        }
+        producers = [
+            asyncio.create_task(
+                self._download(queues[symbol], symbol, start_time, end_time)
+            )
+            for symbol in symbols
+        ]
+        clock = (
+            ReplayClock(self._replay_speed)
+            if self._replay_speed is not None
+            else None
         )
-        self.remove_issue(HistoricalFeed.ErrorCode.DOWNLOADING.name)
 
-        # Filter out unnecessary market trades
-        market_trades = [
-            trade
-            for trade in market_trades
-            if start_time <= trade.transaction_time <= end_time
-        ]
-        # Sort all market trades by timestamp
-        market_trades.sort(key=lambda x: x.transaction_time)
+        try:
+            # Downloaded market trades not replayed yet of each symbol
+            pending = {symbol: list[Trade]() for symbol in symbols}
+            downloaded = set[str]()
+            first_trades, last_trades = dict[str, Trade](), dict[str, Trade]()
+            replayed = dict[str, int]()
+            while True:
+                # Trades of the other symbols can only be replayed when the
+                # next chunk of each symbol is known, since it might have
+                # earlier trades
+                for symbol in symbols:
+                    while symbol not in downloaded and not pending[symbol]:
+                        market_trades = await self._next_chunk(queues[symbol])
+                        if market_trades is None:
+                            downloaded.add(symbol)
+                            break
 
-        logging.info(
-            f"Replaying {len(market_trades)} market trades "
-            f"from {start_time} to {end_time}"
-        )
+                        # Filter out unnecessary market trades
+                        market_trades = [
+                            trade
+                            for trade in market_trades
+                            if start_time <= trade.transaction_time <= end_time
+                        ]
+                        # Sort all market trades by timestamp
+                        market_trades.sort(key=lambda x: x.transaction_time)
+                        pending[symbol] = market_trades
+
+                if len(downloaded) == len(symbols) and not any(
+                    pending.values()
+                ):
+                    break
+
+                # Every trade before the last trade of any symbol still being
+                # downloaded could be replayed
+                replay_until = min(
+                    (
+                        pending[symbol][-1].transaction_time
+                        for symbol in symbols
+                        if symbol not in downloaded
+                    ),
+                    default=end_time,
+                )
+                ready = list[list[Trade]]()
+                for symbol in symbols:
+                    n_ready = bisect.bisect_right(
+                        pending[symbol],
+                        replay_until,
+                        key=lambda x: x.transaction_time,
+                    )
+                    if n_ready == 0:
+                        continue
+
+                    market_trades = pending[symbol][:n_ready]
+                    pending[symbol] = pending[symbol][n_ready:]
+                    ready.append(market_trades)
 
-        if len(market_trades) == 0:
+                    first_trades.setdefault(symbol, market_trades[0])
+                    last_trades[symbol] = market_trades[-1]
+                    replayed[symbol] = replayed.get(symbol, 0) + n_ready
+
+                await self._replay(
+                    (
+                        heapq.merge(*ready, key=lambda x: x.transaction_time)
+                        if len(ready) > 1
+                        else ready[0]
+                    ),
+                    clock,
+                )
+
+                # Let the download of the next chunk make progress
+                await asyncio.sleep(0)
+
+            # Raise any error happened during the download
+            for producer in producers:
+                await producer
+
+            for symbol in symbols:
+                logging.info(
+                    f"Replayed {replayed.get(symbol, 0)} {symbol} market "
+                    f"trades from {start_time} to {end_time}"
+                )
+                if symbol not in replayed:
+                    continue
+
+                first_trade, last_trade = (
+                    first_trades[symbol],
+                    last_trades[symbol],
+                )
+                if (
+                    replayed[symbol]
+                    != last_trade.trade_id - first_trade.trade_id + 1
+                ):
+                    logging.warning(
+                        f"Got {replayed[symbol]} {symbol} market trades "
+                        f"from trade id {first_trade.trade_id + 1} "
+                        f"to {last_trade.trade_id}. "
+                        f"Some market trades might be missing!"
+                    )
+        finally:
+            for producer in producers:
+                producer.cancel()
+            self.remove_issue(HistoricalFeed.ErrorCode.DOWNLOADING.name)
             time_manager().reset(admin=self)
-            return
-
-        if (
-            len(market_trades)
-            != market_trades[-1].trade_id - market_trades[0].trade_id + 1
-        ):
-            logging.warning(
-                f"Got {len(market_trades)} market trades "
-                f"from trade id {market_trades[0].trade_id + 1} "
-                f"to {market_trades[-1].trade_id}. "
-                f"Some market trades might be missing!"
+
+    async def _next_chunk(self, queue: asyncio.Queue) -> list[Trade] | None:
+        if queue.empty():
+            self.add_issue(
+                HeartbeatLevel.WARN,
+                HistoricalFeed.ErrorCode.DOWNLOADING.name,
             )
+        market_trades = await queue.get()
+        self.remove_issue(HistoricalFeed.ErrorCode.DOWNLOADING.name)
+        return market_trades
 
-        for market_trade in market_trades:
+    async def _download(
+        self,
+        queue: asyncio.Queue,
+        symbol: str,
+        start_time: datetime,
+        end_time: datetime,
+    ):
+        try:
+            async for market_trades in self._data_source.stream_market_trades(
+                symbol, start_time, end_time
+            ):
+                await queue.put(market_trades)
+            await queue.put(None)
+        except Exception:
+            # Wake up the replay, which then raises the error by awaiting
+            # this task
+            await queue.put(None)
+            raise
+
+    async def _replay(
+        self,
+        market_trades: Iterable[Trade],
+        clock: Union[ReplayClock, None] = None,
+    ):
+        for i, market_trade in enumerate(market_trades):
+            if clock is not None:
+                await clock.wait_until(market_trade.transaction_time)
+            if (
+                self._back_pressure is not None
+                and i % HistoricalFeed.BACK_PRESSURE_INTERVAL
+                == HistoricalFeed.BACK_PRESSURE_INTERVAL - 1
+            ):
+                await self._back_pressure()
             time_manager().use_fake_time(
                 market_trade.transaction_time, admin=self
             )
+            # Market data is sent by its symbol, so that subscribers of one
+            # symbol don't receive the others
             self.events.market_trade.send(
-                self.events.market_trade, market_trade=market_trade
+                market_trade.symbol, market_trade=market_trade
             )
             logging.debug("Received Market Trade: %s", market_trade)
 
             # Calculate our own candlesticks using market trades
-            candlesticks = self._candlestick_generator.on_market_trade(
-                market_trade
-            )
+            candlesticks = self._candlestick_generators[
+                market_trade.symbol
+            ].on_market_trade(market_trade)
             for candlestick in candlesticks:
                 self.events.candlestick.send(
-                    self.events.candlestick,
+                    market_trade.symbol,
                     candlestick=candlestick,
                 )
-        time_manager().reset(admin=self)
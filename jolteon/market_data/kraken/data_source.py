@@ -1,16 +1,20 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from typing import AsyncIterator, Union
 
 import pytz
-import requests
 
 from jolteon.core.side import MarketSide
 from jolteon.market_data.core.trade import Trade
 from jolteon.market_data.data_source import IDataSource
+from jolteon.market_data.trade_chunk_store import TradeChunkStore
 
 
 class KrakenHistoricalDataSource(IDataSource):
+    def __init__(self, store: Union[TradeChunkStore, None] = None):
+        super().__init__(store)
+
     async def download_market_trades(
         self, symbol: str, start_time: datetime, end_time: datetime
     ) -> list[Trade]:
@@ -18,15 +22,39 @@ class KrakenHistoricalDataSource(IDataSource):
         if self.TRADE_CACHE.get(key) is not None:
             return self.TRADE_CACHE[key]
 
+        market_trades = await self._download_with_store(
+            symbol, start_time, end_time, self._download
+        )
+
+        # Save in the cache to reduce calls to Kraken's API
+        self.TRADE_CACHE[key] = market_trades
+        return market_trades
+
+    async def stream_market_trades(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ) -> AsyncIterator[list[Trade]]:
+        async for market_trades in self._stream_with_store(
+            symbol, start_time, end_time, self._download
+        ):
+            yield market_trades
+
+    async def _download(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ) -> list[Trade]:
         market_trades = list[Trade]()
         request_timestamp = start_time.timestamp()
 
+        import requests
+
         while request_timestamp < end_time.timestamp():
             # Start requesting REST API for data
-            response = requests.get(
+            # Don't block the event loop, so that already downloaded market
+            # trades could be replayed meanwhile
+            response = await asyncio.to_thread(
+                requests.get,
                 f"https://api.kraken.com/0/public/Trades?"
                 f"pair={symbol}&"
-                f"since={request_timestamp}"
+                f"since={request_timestamp}",
             )
             if response.status_code != 200:
                 raise Exception(
@@ -102,6 +130,4 @@ class KrakenHistoricalDataSource(IDataSource):
             # Wait a while before making another API call to avoid errors
             await asyncio.sleep(1.0)
 
-        # Save in the cache to reduce calls to Kraken's API
-        self.TRADE_CACHE[key] = market_trades
         return market_trades
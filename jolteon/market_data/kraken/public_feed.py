@@ -2,8 +2,10 @@ import asyncio
 import json
 import logging
 import math
+from collections import defaultdict
 from datetime import datetime
 from enum import Enum
+from typing import Union
 
 import websockets
 
@@ -33,14 +35,19 @@ class PublicFeed(Heartbeater):
     def __init__(self, candlestick_interval_in_seconds: int = 60):
         super().__init__(type(self).__name__, interval_in_seconds=10)
         self.events = Events()
-        self._last_received_trade_id = -math.inf
-        self._candlestick_generator = CandlestickGenerator(
-            interval_in_seconds=candlestick_interval_in_seconds
+        # Trade IDs and candlesticks are tracked for each symbol separately
+        self._last_received_trade_id = defaultdict[str, float](
+            lambda: -math.inf
+        )
+        self._candlestick_generators = defaultdict[str, CandlestickGenerator](
+            lambda: CandlestickGenerator(
+                interval_in_seconds=candlestick_interval_in_seconds
+            )
         )
 
     async def connect(
         self,
-        symbol: str,
+        symbol: Union[str, list[str]],
         max_retries: int = 3,
         retry_interval_in_seconds: int = 5,
     ):
@@ -56,13 +63,16 @@ class PublicFeed(Heartbeater):
                 await asyncio.sleep(retry_interval_in_seconds)
             n_retries += 1
 
-    async def connect_once(self, symbol: str):
+    async def connect_once(self, symbol: Union[str, list[str]]):
         """Establish a connection to the remote service and subscribe to the
-        public market data feed.
+        public market data feed. All symbols share the same connection.
 
+        Args:
+            symbol: One symbol or a list of symbols to subscribe to
         Returns:
             An asyncio task to be waiting for incoming messages
         """
+        symbols = [symbol] if isinstance(symbol, str) else symbol
 
         async with websockets.connect(PublicFeed.PRODUCTION_URI) as websocket:
 
@@ -72,7 +82,7 @@ class PublicFeed(Heartbeater):
                     "params": {
                         "channel": channel_name,
                         "snapshot": True,
-                        "symbol": [symbol],
+                        "symbol": symbols,
                     },
                     "req_id": id_generator().next(),
                 }
@@ -193,20 +203,17 @@ class PublicFeed(Heartbeater):
               "type": "update"
             }
             """
-            assert len(response["data"]) == 1, (
-                "Should only receive " "ticker feed for one symbol"
-            )
-            ticker_json = response["data"][0]
-            self.events.ticker.send(
-                self.events.ticker,
-                bbo=BBO(
-                    symbol=ticker_json["symbol"],
-                    bid_price=ticker_json["bid"],
-                    bid_quantity=ticker_json["bid_qty"],
-                    ask_price=ticker_json["ask"],
-                    ask_quantity=ticker_json["ask_qty"],
-                ),
-            )
+            for ticker_json in response["data"]:
+                self.events.ticker.send(
+                    ticker_json["symbol"],
+                    bbo=BBO(
+                        symbol=ticker_json["symbol"],
+                        bid_price=ticker_json["bid"],
+                        bid_quantity=ticker_json["bid_qty"],
+                        ask_price=ticker_json["ask"],
+                        ask_quantity=ticker_json["ask_qty"],
+                    ),
+                )
         elif message_type == "trade":
             """
             Below is an example of one trade message from Kraken:
@@ -247,14 +254,15 @@ class PublicFeed(Heartbeater):
             for trade_json in response["data"]:
                 # Test if these trades are replay trades after re-connecting
                 # Note: Kraken's trade id is numerical
+                symbol = trade_json["symbol"]
                 trade_id = int(trade_json["trade_id"])
-                if trade_id < self._last_received_trade_id:
+                if trade_id < self._last_received_trade_id[symbol]:
                     continue
 
                 market_trade = Trade(
                     trade_id=trade_json["trade_id"],
                     client_order_id="",
-                    symbol=trade_json["symbol"],
+                    symbol=symbol,
                     maker_order_id="",
                     taker_order_id="",
                     side=MarketSide(trade_json["side"].upper()),
@@ -265,18 +273,20 @@ class PublicFeed(Heartbeater):
                         trade_json["timestamp"]
                     ),
                 )
+                # Market data is sent by its symbol, so that subscribers of
+                # one symbol don't receive the others
                 self.events.market_trade.send(
-                    self.events.market_trade, market_trade=market_trade
+                    symbol, market_trade=market_trade
                 )
-                self._last_received_trade_id = int(market_trade.trade_id)
+                self._last_received_trade_id[symbol] = trade_id
                 logging.debug("Received Market Trade: %s", market_trade)
 
                 # Calculate our own candlesticks using market trades
-                candlesticks = self._candlestick_generator.on_market_trade(
-                    market_trade
-                )
+                candlesticks = self._candlestick_generators[
+                    symbol
+                ].on_market_trade(market_trade)
                 for candlestick in candlesticks:
                     self.events.candlestick.send(
-                        self.events.candlestick,
+                        symbol,
                         candlestick=candlestick,
                     )
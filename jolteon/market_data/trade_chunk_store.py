@@ -0,0 +1,167 @@
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytz
+
+from jolteon.core.time.time_range import TimeRange
+from jolteon.market_data.core.trade import Trade
+
+
+class TradeChunkStore:
+    """
+    Persists downloaded market trades on the local disk, one file per symbol
+    per time chunk (one hour by default). A chunk file is only written once
+    all trades within its time range are downloaded, so an interrupted
+    download could be resumed from the last completed chunk, and subsequent
+    replays are served from the disk instead of the exchange.
+    """
+
+    DEFAULT_ROOT = f"{tempfile.gettempdir()}/jolteon/trades"
+
+    def __init__(
+        self,
+        name: str,
+        root: str = DEFAULT_ROOT,
+        chunk_interval_in_minutes: int = 60,
+    ):
+        """
+        Creates a trade chunk store.
+
+        Args:
+            name: Name of the store, usually the name of the exchange. Chunks
+                  of different stores are saved in different directories.
+            root: Root directory of all stores.
+            chunk_interval_in_minutes: Duration of the time range each chunk
+                                       file covers. It must divide one day.
+        """
+        assert chunk_interval_in_minutes > 0 and (
+            24 * 60 % chunk_interval_in_minutes == 0
+        ), f"Unsupported chunk interval {chunk_interval_in_minutes} minutes!"
+
+        self._directory = os.path.join(root, name)
+        self._chunk_interval = timedelta(minutes=chunk_interval_in_minutes)
+
+    def chunks(
+        self, start_time: datetime, end_time: datetime
+    ) -> list[TimeRange]:
+        """
+        Splits a time range into chunks aligned to the chunk interval. The
+        first and the last chunk might extend beyond the given time range.
+
+        Args:
+            start_time: Start time of the time range
+            end_time: End time of the time range
+        Returns:
+            A list of aligned chunks covering the whole time range
+        """
+        chunk_start = self._floor(start_time)
+        chunks = list[TimeRange]()
+        while chunk_start < end_time:
+            chunks.append(
+                TimeRange(chunk_start, chunk_start + self._chunk_interval)
+            )
+            chunk_start += self._chunk_interval
+        return chunks
+
+    def has(self, symbol: str, chunk: TimeRange) -> bool:
+        """
+        Returns:
+            Whether all trades of the chunk are already saved in the store
+        """
+        return os.path.exists(self._path(symbol, chunk))
+
+    def load(self, symbol: str, chunk: TimeRange) -> list[Trade]:
+        """
+        Loads all trades of a completed chunk from the store.
+
+        Args:
+            symbol: Symbol of the trades
+            chunk: Time range of the chunk
+        Returns:
+            All trades within the chunk sorted by transaction time
+        """
+        import pandas as pd
+
+        # Avoid a circular import with the data source module
+        from jolteon.market_data.data_source import DatabaseDataSource
+
+        df = pd.read_csv(
+            self._path(symbol, chunk),
+            keep_default_na=False,
+            float_precision="round_trip",
+        )
+        return DatabaseDataSource.to_trades(df)
+
+    def save(self, symbol: str, chunk: TimeRange, trades: list[Trade]) -> None:
+        """
+        Saves all trades of a chunk into the store. The chunk file is written
+        atomically, a partially written chunk will never be loaded.
+
+        Args:
+            symbol: Symbol of the trades
+            chunk: Time range of the chunk
+            trades: All trades within the chunk
+        Returns:
+            None
+        """
+        assert all(
+            chunk.start <= trade.transaction_time < chunk.end
+            for trade in trades
+        ), f"Trades shall be within {chunk.start} - {chunk.end}"
+
+        import pandas as pd
+
+        path = self._path(symbol, chunk)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        df = pd.DataFrame(
+            [
+                {
+                    "trade_id": trade.trade_id,
+                    "client_order_id": trade.client_order_id,
+                    "symbol": trade.symbol,
+                    "maker_order_id": trade.maker_order_id,
+                    "taker_order_id": trade.taker_order_id,
+                    "side": trade.side.value,
+                    "price": trade.price,
+                    "fee": trade.fee,
+                    "quantity": trade.quantity,
+                    "transaction_time": trade.transaction_time.timestamp(),
+                }
+                for trade in trades
+            ],
+            columns=[
+                "trade_id",
+                "client_order_id",
+                "symbol",
+                "maker_order_id",
+                "taker_order_id",
+                "side",
+                "price",
+                "fee",
+                "quantity",
+                "transaction_time",
+            ],
+        )
+        df.to_csv(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+
+        logging.info(
+            f"Saved {len(trades)} trades for {symbol} "
+            f"from {chunk.start} to {chunk.end} into {path}"
+        )
+
+    def _floor(self, time: datetime) -> datetime:
+        day = time.replace(hour=0, minute=0, second=0, microsecond=0)
+        return (
+            day + (time - day) // self._chunk_interval * self._chunk_interval
+        )
+
+    def _path(self, symbol: str, chunk: TimeRange) -> str:
+        return os.path.join(
+            self._directory,
+            symbol.replace("/", "-"),
+            f"{chunk.start.astimezone(pytz.utc).strftime('%Y%m%dT%H%M')}.csv",
+        )
@@ -0,0 +1,430 @@
+"""
+Compact binary file of recorded market trades.
+
+    +-----------------------------+
+    | Header (64 bytes)           |
+    +-----------------------------+
+    | Records (33 bytes each)     |  sorted by transaction time
+    +-----------------------------+
+    | Block index (16 bytes each) |  min/max transaction time of each block
+    +-----------------------------+
+
+All numbers are little-endian. The file is read with `numpy.memmap`, hence
+no data is copied until a trade is actually accessed.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Iterator, Union
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from jolteon.core.side import MarketSide
+from jolteon.market_data.core.events import Events
+from jolteon.market_data.core.trade import Trade
+
+
+class TradeFile:
+    """
+    Reads a binary market trade file with zero copies.
+    """
+
+    MAGIC = b"JOLTRADE"
+    VERSION = 1
+
+    HEADER_DTYPE = np.dtype(
+        [
+            ("magic", "S8"),
+            ("version", "<u4"),
+            ("block_size", "<u4"),
+            ("count", "<i8"),
+            ("index_offset", "<i8"),
+            ("symbol", "S32"),
+        ]
+    )
+    RECORD_DTYPE = np.dtype(
+        [
+            ("time", "<i8"),
+            ("price", "<f8"),
+            ("quantity", "<f8"),
+            ("side", "u1"),
+            ("trade_id", "<i8"),
+        ]
+    )
+    INDEX_DTYPE = np.dtype([("min_time", "<i8"), ("max_time", "<i8")])
+
+    SIDES = [MarketSide.UNKNOWN, MarketSide.BUY, MarketSide.SELL]
+    EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+    def __init__(self, path: str):
+        """
+        Opens a binary market trade file.
+
+        Args:
+            path: Path to the binary market trade file
+        """
+        assert TradeFile.is_trade_file(path), f"{path} is not a trade file!"
+
+        header = np.fromfile(path, dtype=TradeFile.HEADER_DTYPE, count=1)[0]
+        assert (
+            header["version"] == TradeFile.VERSION
+        ), f"Unsupported trade file version {header['version']}!"
+
+        self.symbol = header["symbol"].decode()
+        self._block_size = int(header["block_size"])
+        count = int(header["count"])
+
+        # numpy cannot memory map an empty array
+        if count == 0:
+            self.records = np.empty(0, dtype=TradeFile.RECORD_DTYPE)
+            self._index = np.empty(0, dtype=TradeFile.INDEX_DTYPE)
+            return
+
+        self.records = np.memmap(
+            path,
+            dtype=TradeFile.RECORD_DTYPE,
+            mode="r",
+            offset=TradeFile.HEADER_DTYPE.itemsize,
+            shape=(count,),
+        )
+        self._index = np.memmap(
+            path,
+            dtype=TradeFile.INDEX_DTYPE,
+            mode="r",
+            offset=int(header["index_offset"]),
+            shape=(-(-count // self._block_size),),
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def is_trade_file(path: str) -> bool:
+        """
+        Returns:
+            Whether the file is a binary market trade file
+        """
+        if not os.path.isfile(path):
+            return False
+        with open(path, "rb") as f:
+            return f.read(len(TradeFile.MAGIC)) == TradeFile.MAGIC
+
+    def start_time(self) -> datetime:
+        return self.to_datetime(int(self._index["min_time"].min()))
+
+    def end_time(self) -> datetime:
+        return self.to_datetime(int(self._index["max_time"].max()))
+
+    def slice(self, start_time: datetime, end_time: datetime) -> np.ndarray:
+        """
+        Finds all records between start time and end time (both inclusive)
+        without copying them. Only the blocks overlapping the time range are
+        searched.
+
+        Args:
+            start_time: Start time of the market trades
+            end_time: End time of the market trades
+        Returns:
+            A view of the records within the time range
+        """
+        start, end = self.to_ns(start_time), self.to_ns(end_time)
+        first_block = np.searchsorted(self._index["max_time"], start, "left")
+        last_block = np.searchsorted(self._index["min_time"], end, "right")
+        if first_block >= last_block:
+            return self.records[0:0]
+
+        offset = first_block * self._block_size
+        times = self.records["time"][
+            offset : last_block * self._block_size  # noqa: E203
+        ]
+        return self.records[
+            offset
+            + np.searchsorted(times, start, "left") : offset  # noqa: E203
+            + np.searchsorted(times, end, "right")
+        ]
+
+    def iter_blocks(
+        self, start_time: datetime, end_time: datetime
+    ) -> Iterator[np.ndarray]:
+        """
+        Iterates through all records between start time and end time, one
+        block at a time.
+
+        Returns:
+            An iterator of record views
+        """
+        records = self.slice(start_time, end_time)
+        for i in range(0, len(records), self._block_size):
+            yield records[i : i + self._block_size]  # noqa: E203
+
+    def to_trades(self, records: np.ndarray) -> list[Trade]:
+        """
+        Converts records to market trades. Only fields stored in the file are
+        restored, order ids are empty and fee is zero as in a market trade.
+
+        Args:
+            records: Records read from this file
+        Returns:
+            A list of market trades
+        """
+        return [
+            Trade(
+                trade_id=trade_id,
+                client_order_id="",
+                symbol=self.symbol,
+                maker_order_id="",
+                taker_order_id="",
+                side=TradeFile.SIDES[side],
+                price=price,
+                fee=0.0,
+                quantity=quantity,
+                transaction_time=TradeFile.to_datetime(time),
+            )
+            for time, price, quantity, side, trade_id in zip(
+                records["time"].tolist(),
+                records["price"].tolist(),
+                records["quantity"].tolist(),
+                records["side"].tolist(),
+                records["trade_id"].tolist(),
+            )
+        ]
+
+    def to_dataframe(self, records: np.ndarray) -> pd.DataFrame:
+        """
+        Converts records to a DataFrame with the same columns as the
+        `market_trade_feed` table.
+
+        Args:
+            records: Records read from this file
+        Returns:
+            A DataFrame of market trades
+        """
+        return pd.DataFrame(
+            {
+                "trade_id": records["trade_id"],
+                "symbol": self.symbol,
+                "side": np.array([s.value for s in TradeFile.SIDES])[
+                    records["side"]
+                ],
+                "price": records["price"],
+                "quantity": records["quantity"],
+                "transaction_time": pd.to_datetime(records["time"], unit="ns"),
+            }
+        )
+
+    @staticmethod
+    def write(
+        path: str, symbol: str, records: np.ndarray, block_size: int = 4096
+    ) -> None:
+        """
+        Writes records into a binary market trade file.
+
+        Args:
+            path: Path to the binary market trade file
+            symbol: Symbol of all market trades in the file
+            records: Records of RECORD_DTYPE, will be sorted by time
+            block_size: Number of records covered by one index entry
+        Returns:
+            None
+        """
+        writer = TradeFileWriter(path, symbol, block_size)
+        writer.append(np.sort(records, order="time", kind="stable"))
+        writer.close()
+
+    @staticmethod
+    def to_records(trades: Union[list[Trade], pd.DataFrame]) -> np.ndarray:
+        """
+        Converts market trades, either as Trade objects or as rows of the
+        `market_trade_feed` table, to records.
+
+        Args:
+            trades: Market trades
+        Returns:
+            Records of RECORD_DTYPE
+        """
+        if not isinstance(trades, pd.DataFrame):
+            trades = pd.DataFrame(
+                {
+                    "trade_id": [t.trade_id for t in trades],
+                    "side": [t.side.value for t in trades],
+                    "price": [t.price for t in trades],
+                    "quantity": [t.quantity for t in trades],
+                    "transaction_time": [
+                        t.transaction_time.timestamp() for t in trades
+                    ],
+                }
+            )
+
+        records = np.empty(len(trades), dtype=TradeFile.RECORD_DTYPE)
+        # Round to microseconds, which is the precision of datetime
+        records["time"] = (
+            np.round(trades["transaction_time"].to_numpy(np.float64) * 1e6)
+        ).astype(np.int64) * 1000
+        records["price"] = trades["price"].to_numpy(np.float64)
+        records["quantity"] = trades["quantity"].to_numpy(np.float64)
+        records["side"] = (
+            trades["side"]
+            .astype(str)
+            .str.upper()
+            .map({s.value: i for i, s in enumerate(TradeFile.SIDES)})
+            .fillna(0)
+            .to_numpy(np.uint8)
+        )
+        records["trade_id"] = trades["trade_id"].to_numpy(np.int64)
+        return records
+
+    @staticmethod
+    def convert_database(
+        database_name: str,
+        path: str,
+        symbol: Union[str, None] = None,
+        chunk_size: int = 100_000,
+    ) -> int:
+        """
+        Converts the `market_trade_feed` table of a SQLite database into a
+        binary market trade file. The table is read in chunks to bound the
+        memory usage.
+
+        Args:
+            database_name: Path to the SQLite database
+            path: Path to the binary market trade file
+            symbol: Symbol to convert, required if the table has trades of
+                    more than one symbol
+            chunk_size: Number of rows read from the database at once
+        Returns:
+            Number of converted market trades
+        """
+        table_name = Events().market_trade.name
+        conn = sqlite3.connect(database_name)
+        try:
+            symbols = pd.read_sql(
+                f"select distinct symbol from {table_name}", con=conn
+            )["symbol"].tolist()
+            if symbol is None:
+                assert (
+                    len(symbols) <= 1
+                ), f"Require a symbol to convert, found {symbols}"
+                symbol = symbols[0] if symbols else ""
+
+            writer = TradeFileWriter(path, symbol)
+            for df in pd.read_sql(
+                f"select trade_id, side, price, quantity, transaction_time "
+                f"from {table_name} where symbol = ? "
+                f"order by transaction_time asc, trade_id asc",
+                con=conn,
+                params=(symbol,),
+                chunksize=chunk_size,
+            ):
+                writer.append(TradeFile.to_records(df))
+            writer.close()
+        finally:
+            conn.close()
+
+        logging.info(
+            f"Converted {writer.count} market trades for {symbol} "
+            f"from {database_name} into {path}"
+        )
+        return writer.count
+
+    @staticmethod
+    def to_ns(time: datetime) -> int:
+        return (time - TradeFile.EPOCH) // timedelta(microseconds=1) * 1000
+
+    @staticmethod
+    def to_datetime(ns: int) -> datetime:
+        return TradeFile.EPOCH + timedelta(microseconds=ns // 1000)
+
+
+class TradeFileWriter:
+    """
+    Appends time-ordered records to a binary market trade file. The header
+    and the block index are written when the writer is closed.
+    """
+
+    def __init__(self, path: str, symbol: str, block_size: int = 4096):
+        assert block_size > 0
+        assert (
+            len(symbol.encode()) <= TradeFile.HEADER_DTYPE["symbol"].itemsize
+        ), f"Symbol {symbol} is too long!"
+
+        self.count = 0
+        self._path = path
+        self._symbol = symbol
+        self._block_size = block_size
+        self._last_time = np.iinfo(np.int64).min
+        self._file = open(f"{path}.tmp", "wb")
+        self._file.write(bytes(TradeFile.HEADER_DTYPE.itemsize))
+
+    def append(self, records: np.ndarray) -> None:
+        if len(records) == 0:
+            return
+        assert records["time"][0] >= self._last_time and np.all(
+            np.diff(records["time"]) >= 0
+        ), "Records shall be sorted by time"
+
+        self._file.write(records.astype(TradeFile.RECORD_DTYPE).tobytes())
+        self._last_time = records["time"][-1]
+        self.count += len(records)
+
+    def close(self) -> None:
+        index_offset = self._file.tell()
+        self._file.close()
+
+        # Build the block index from the records just written
+        if self.count > 0:
+            times = np.memmap(
+                f"{self._path}.tmp",
+                dtype=TradeFile.RECORD_DTYPE,
+                mode="r",
+                offset=TradeFile.HEADER_DTYPE.itemsize,
+                shape=(self.count,),
+            )["time"]
+            starts = np.arange(0, self.count, self._block_size)
+            index = np.empty(len(starts), dtype=TradeFile.INDEX_DTYPE)
+            index["min_time"] = np.minimum.reduceat(times, starts)
+            index["max_time"] = np.maximum.reduceat(times, starts)
+            del times
+        else:
+            index = np.empty(0, dtype=TradeFile.INDEX_DTYPE)
+
+        header = np.array(
+            [
+                (
+                    TradeFile.MAGIC,
+                    TradeFile.VERSION,
+                    self._block_size,
+                    self.count,
+                    index_offset,
+                    self._symbol.encode(),
+                )
+            ],
+            dtype=TradeFile.HEADER_DTYPE,
+        )
+        with open(f"{self._path}.tmp", "r+b") as f:
+            f.write(header.tobytes())
+            f.seek(index_offset)
+            f.write(index.tobytes())
+
+        # A partially written file will never be read
+        os.replace(f"{self._path}.tmp", self._path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert recorded market trades to a binary trade file"
+    )
+    parser.add_argument("database", help="Path to a SQLite database file")
+    parser.add_argument("output", help="Path to the binary trade file")
+    parser.add_argument("--symbol", help="Symbol of the market trades")
+
+    args = parser.parse_args()
+    count = TradeFile.convert_database(args.database, args.output, args.symbol)
+    print(f"Converted {count} market trades into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
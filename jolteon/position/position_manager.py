@@ -11,6 +11,8 @@ class Position:
     symbol: str
     volume: float
     cash_value: float
+    # Total volume ever bought
+    bought_volume: float = 0.0
 
 
 class PositionManager(SignalSubscriber):
@@ -20,6 +22,13 @@ class PositionManager(SignalSubscriber):
         """
         self.positions = dict[str, Position]()
         self.pnl = float(0.0)
+        # Last market price of each symbol, for marking positions to market
+        self.last_prices = dict[str, float]()
+        self.peak_equity = float(0.0)
+        # Value of each position marked to market, and their sum, updated
+        # only for the symbol traded
+        self._market_values = dict[str, float]()
+        self._market_value = float(0.0)
 
     @subscribe("order_fill")
     def on_fill(self, _: str, trade: Trade):
@@ -29,6 +38,44 @@ class PositionManager(SignalSubscriber):
             self._on_sell(trade.symbol, trade.price, trade.fee, trade.quantity)
         else:
             assert False, f"Trade has an invalid trade side: {trade}"
+        self._update_market_value(trade.symbol)
+        self._update_peak_equity()
+
+    @subscribe("market_trade_feed")
+    def on_market_trade(self, _: str, market_trade: Trade):
+        self.last_prices[market_trade.symbol] = market_trade.price
+        position = self.positions.get(market_trade.symbol)
+        if position is not None:
+            self._update_market_value(market_trade.symbol)
+            if position.volume > 0:
+                self._update_peak_equity()
+
+    def equity(self) -> float:
+        """
+        Returns:
+            PnL with all positions marked to their last market prices, or to
+            their cost if no market price is known
+        """
+        return self.pnl + self._market_value
+
+    def drawdown(self) -> float:
+        """
+        Returns:
+            How far the equity has fallen from its peak
+        """
+        return self.peak_equity - self.equity()
+
+    def _update_market_value(self, symbol: str):
+        position = self.positions[symbol]
+        if symbol in self.last_prices:
+            value = position.volume * self.last_prices[symbol]
+        else:
+            value = position.cash_value
+        self._market_value += value - self._market_values.get(symbol, 0.0)
+        self._market_values[symbol] = value
+
+    def _update_peak_equity(self):
+        self.peak_equity = max(self.peak_equity, self.equity())
 
     def _on_buy(self, symbol: str, price: float, fee: float, quantity: float):
         """
@@ -47,6 +94,7 @@ class PositionManager(SignalSubscriber):
             else Position(symbol, 0.0, 0.0)
         )
         self.positions[symbol].volume += quantity
+        self.positions[symbol].bought_volume += quantity
         self.positions[symbol].cash_value += price * quantity
         self.pnl = self.pnl - price * quantity - fee
 
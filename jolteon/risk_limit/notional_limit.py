@@ -0,0 +1,62 @@
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Union
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.order import Order
+from jolteon.position.position_manager import PositionManager
+from jolteon.risk_limit.risk_limit import IRiskLimit
+
+
+class NotionalLimit(IRiskLimit):
+    """
+    Limits the notional value of orders sent in a sliding window. Market
+    orders are valued at the last market price known by the position manager.
+    """
+
+    def __init__(
+        self,
+        position_manager: PositionManager,
+        max_notional: float,
+        in_seconds: int,
+    ):
+        self.position_manager = position_manager
+        self.max_notional = max_notional
+        self.in_seconds = in_seconds
+        # Time and notional value of sent orders, the oldest first
+        self.orders = deque[tuple[datetime, float]]()
+        self.notional = 0.0
+
+    def can_send(self, order: Union[Order, None] = None):
+        self._update()
+        notional = self._notional_of(order)
+        if notional is None:
+            logging.warning(f"Unable to value {order} without a market price")
+            return False
+        return self.notional + notional <= self.max_notional
+
+    def do_send(self, order: Union[Order, None] = None):
+        self.orders.append(
+            (time_manager().now(), self._notional_of(order) or 0.0)
+        )
+        self.notional += self.orders[-1][1]
+        self._update()
+
+    def _notional_of(self, order: Union[Order, None]) -> Union[float, None]:
+        if order is None:
+            return 0.0
+        price = (
+            order.price
+            if order.price is not None
+            else self.position_manager.last_prices.get(order.symbol)
+        )
+        return None if price is None else price * order.quantity
+
+    def _update(self):
+        expiry = time_manager().now() - timedelta(seconds=self.in_seconds)
+        while self.orders and self.orders[0][0] <= expiry:
+            self.notional -= self.orders.popleft()[1]
+        if not self.orders:
+            # Clear rounding errors accumulated by the running sum
+            self.notional = 0.0
@@ -1,6 +1,9 @@
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Union
 
 from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.order import Order
 from jolteon.risk_limit.risk_limit import IRiskLimit
 
 
@@ -12,21 +15,19 @@ class OrderFrequencyLimit(IRiskLimit):
     def __init__(self, number_of_orders: int, in_seconds: int):
         self.number_of_orders = number_of_orders
         self.in_seconds = in_seconds
-        self.timestamps = list[datetime]()
+        # Time of sent orders, the oldest first
+        self.timestamps = deque[datetime]()
 
-    def can_send(self):
+    def can_send(self, order: Union[Order, None] = None):
         self._update()
         return len(self.timestamps) < self.number_of_orders
 
-    def do_send(self):
+    def do_send(self, order: Union[Order, None] = None):
         now = time_manager().now()
         self.timestamps.append(now)
         self._update()
 
     def _update(self):
-        now = time_manager().now()
-        self.timestamps = [
-            t
-            for t in self.timestamps
-            if (now - t).total_seconds() < self.in_seconds
-        ]
+        expiry = time_manager().now() - timedelta(seconds=self.in_seconds)
+        while self.timestamps and self.timestamps[0] <= expiry:
+            self.timestamps.popleft()
@@ -0,0 +1,101 @@
+from dataclasses import replace
+from typing import Callable, Union
+
+from jolteon.core.event.signal import subscribe
+from jolteon.core.event.signal_subscriber import SignalSubscriber
+from jolteon.core.side import MarketSide
+from jolteon.execution.order_gateway import OrderReject
+from jolteon.market_data.core.order import Order
+from jolteon.market_data.core.trade import Trade
+from jolteon.position.position_manager import PositionManager
+from jolteon.risk_limit.risk_limit import IRiskLimit
+
+
+class MaxPositionLimit(IRiskLimit, SignalSubscriber):
+    """
+    Limits the volume held of each symbol, including buy orders sent but not
+    filled yet. Sell orders are always allowed as they reduce the position.
+
+    Buy orders stop counting once they are completely filled, rejected, or
+    expired without being filled, so the limit shall be connected to these
+    signals.
+    """
+
+    def __init__(self, position_manager: PositionManager, max_volume: float):
+        self.position_manager = position_manager
+        self.max_volume = max_volume
+        # Buy orders sent and not completely filled yet, with their unfilled
+        # quantity
+        self._unfilled_buys = dict[str, Order]()
+
+    def can_send(self, order: Union[Order, None] = None):
+        if order is None or order.side != MarketSide.BUY:
+            return True
+        return (
+            self.volume(order.symbol) + order.quantity
+            <= self.max_volume + 1e-10
+        )
+
+    def do_send(self, order: Union[Order, None] = None):
+        if order is not None and order.side == MarketSide.BUY:
+            self._unfilled_buys[order.client_order_id] = order
+
+    @subscribe("order_fill")
+    def on_fill(self, _: str, trade: Trade):
+        order = self._unfilled_buys.get(trade.client_order_id)
+        if order is None:
+            return
+        quantity = order.quantity - trade.quantity
+        if quantity <= 1e-10:
+            del self._unfilled_buys[trade.client_order_id]
+        else:
+            self._unfilled_buys[trade.client_order_id] = replace(
+                order, quantity=quantity
+            )
+
+    @subscribe("order_reject")
+    def on_reject(self, _: object, reject: OrderReject):
+        self._unfilled_buys.pop(reject.client_order_id, None)
+
+    @subscribe("order_expire")
+    def on_expire(self, _: object, order: Order):
+        self._unfilled_buys.pop(order.client_order_id, None)
+
+    def volume(self, symbol: str) -> float:
+        """
+        Args:
+            symbol: Symbol of the security/cryptocurrency
+        Returns:
+            Volume held plus volume of buy orders not filled yet
+        """
+        position = self.position_manager.positions.get(symbol)
+        return (0.0 if position is None else position.volume) + sum(
+            order.quantity
+            for order in self._unfilled_buys.values()
+            if order.symbol == symbol
+        )
+
+
+class MaxDrawdownLimit(IRiskLimit):
+    """
+    Stops buying once the PnL marked to market falls too far below its peak.
+    Sell orders are always allowed as they reduce the position.
+    """
+
+    def __init__(self, drawdown: Callable[[], float], max_drawdown: float):
+        """
+        Args:
+            drawdown: Returns the current drawdown, e.g.
+                      `PositionManager.drawdown`
+            max_drawdown: Buying stops at this drawdown
+        """
+        self.drawdown = drawdown
+        self.max_drawdown = max_drawdown
+
+    def can_send(self, order: Union[Order, None] = None):
+        if order is not None and order.side == MarketSide.SELL:
+            return True
+        return self.drawdown() < self.max_drawdown
+
+    def do_send(self, order: Union[Order, None] = None):
+        pass
@@ -0,0 +1,39 @@
+import logging
+from typing import Union
+
+from jolteon.market_data.core.order import Order
+from jolteon.risk_limit.risk_limit import IRiskLimit
+
+
+class PreTradeCheck(IRiskLimit):
+    """
+    Checks an order against all risk limits in one pass. Limits are evaluated
+    in the given order and the check stops at the first limit prohibiting the
+    order, so cheap limits shall come first.
+    """
+
+    def __init__(self, limits: list[IRiskLimit]):
+        self.limits = limits
+
+    def check(
+        self, order: Union[Order, None] = None
+    ) -> Union[IRiskLimit, None]:
+        """
+        Args:
+            order: The order about to be sent, if known
+        Returns:
+            The first limit prohibiting the order, or None if the order
+            could be sent
+        """
+        for limit in self.limits:
+            if not limit.can_send(order):
+                logging.info(f"{order} is blocked by {type(limit).__name__}")
+                return limit
+        return None
+
+    def can_send(self, order: Union[Order, None] = None):
+        return self.check(order) is None
+
+    def do_send(self, order: Union[Order, None] = None):
+        for limit in self.limits:
+            limit.do_send(order)
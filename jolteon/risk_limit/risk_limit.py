@@ -1,18 +1,25 @@
 from abc import ABC, abstractmethod
+from typing import Union
+
+from jolteon.market_data.core.order import Order
 
 
 class IRiskLimit(ABC):
     @abstractmethod
-    def can_send(self) -> bool:
+    def can_send(self, order: Union[Order, None] = None) -> bool:
         """
+        Args:
+            order: The order about to be sent, if known
         Returns: Whether an order could be sent out or it would be prohibited
                  by this limit
         """
         raise NotImplementedError  # pragma: no cover
 
     @abstractmethod
-    def do_send(self) -> bool:
+    def do_send(self, order: Union[Order, None] = None) -> bool:
         """
+        Args:
+            order: The order about to be sent, if known
         Returns: Update this limit before actually sending out the order
         """
         raise NotImplementedError  # pragma: no cover
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Union
+
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.order import Order
+from jolteon.risk_limit.risk_limit import IRiskLimit
+
+
+class TokenBucketLimit(IRiskLimit):
+    """
+    Limits the average order rate while allowing short bursts. Every order
+    takes a token from the bucket, and tokens are refilled at a constant rate
+    up to the capacity of the bucket.
+    """
+
+    def __init__(self, tokens_per_second: float, capacity: int):
+        assert tokens_per_second > 0, "Refill rate shall be positive"
+        assert capacity > 0, "Capacity shall be positive"
+        self.tokens_per_second = tokens_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._last_refill_time: Union[datetime, None] = None
+
+    def can_send(self, order: Union[Order, None] = None):
+        self._refill()
+        return self.tokens >= 1.0
+
+    def do_send(self, order: Union[Order, None] = None):
+        self._refill()
+        self.tokens -= 1.0
+
+    def _refill(self):
+        now = time_manager().now()
+        if self._last_refill_time is not None:
+            elapsed = (now - self._last_refill_time).total_seconds()
+            self.tokens = min(
+                float(self.capacity),
+                self.tokens + elapsed * self.tokens_per_second,
+            )
+        self._last_refill_time = now
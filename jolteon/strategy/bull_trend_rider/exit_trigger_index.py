@@ -0,0 +1,120 @@
+import heapq
+from enum import StrEnum
+from itertools import count
+from typing import Iterator
+
+from jolteon.strategy.bull_trend_rider.trade_record import TradeRecord
+
+
+class ExitReason(StrEnum):
+    STOP_LOSS = "STOP_LOSS"
+    TAKE_PROFIT = "TAKE_PROFIT"
+
+
+class ExitTriggerIndex:
+    """
+    Open positions sorted by their stop loss price and by their profit price,
+    so that positions to close at a market price are found without checking
+    every open position.
+
+    Positions are kept in two heaps: the highest stop loss price is the first
+    one crossed by a falling price, and the lowest profit price is the first
+    one crossed by a rising price. A removed position is only dropped from a
+    heap when it reaches the top, or when the heaps are rebuilt.
+    """
+
+    def __init__(self):
+        # A dict is used as an ordered set of open positions
+        self._positions = dict[TradeRecord, None]()
+        self._stop_losses = list[tuple[float, int, TradeRecord]]()
+        self._profits = list[tuple[float, int, TradeRecord]]()
+        self._sequence = count()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[TradeRecord]:
+        return iter(self._positions)
+
+    def __contains__(self, round_trip: TradeRecord) -> bool:
+        return round_trip in self._positions
+
+    def add(self, round_trip: TradeRecord) -> None:
+        """
+        Starts watching the exit prices of an open position. Exit prices are
+        read once, so they shall not be changed afterward.
+
+        Args:
+            round_trip: A position bought but not sold yet
+        Returns:
+            None
+        """
+        if round_trip in self._positions:
+            return
+
+        self._positions[round_trip] = None
+        # Ties are broken by the order of adding positions
+        sequence = next(self._sequence)
+        heapq.heappush(
+            self._stop_losses,
+            (-round_trip.opportunity.stop_loss_price, sequence, round_trip),
+        )
+        heapq.heappush(
+            self._profits,
+            (round_trip.opportunity.profit_price, sequence, round_trip),
+        )
+
+    def remove(self, round_trip: TradeRecord) -> None:
+        """
+        Stops watching a position, usually because it is being sold.
+
+        Args:
+            round_trip: A position added before
+        Returns:
+            None
+        """
+        self._positions.pop(round_trip, None)
+
+        # Rebuild the heaps once they're mostly made of removed positions
+        if len(self._stop_losses) > 2 * len(self._positions) + 16:
+            self._stop_losses = [
+                entry
+                for entry in self._stop_losses
+                if entry[2] in self._positions
+            ]
+            self._profits = [
+                entry for entry in self._profits if entry[2] in self._positions
+            ]
+            heapq.heapify(self._stop_losses)
+            heapq.heapify(self._profits)
+
+    def triggered(
+        self, market_price: float
+    ) -> list[tuple[TradeRecord, ExitReason]]:
+        """
+        Removes and returns positions whose stop loss price is above the
+        market price, followed by positions whose profit price is below the
+        market price. Same as `TradeRecord.should_sell_for_loss` and
+        `TradeRecord.should_sell_for_profit`, but costs O(log n) per
+        triggered position instead of O(n) per market price.
+
+        Args:
+            market_price: Latest market price of the symbol
+        Returns:
+            Positions to close and the reason to close each of them
+        """
+        triggered = list[tuple[TradeRecord, ExitReason]]()
+
+        while self._stop_losses and -self._stop_losses[0][0] > market_price:
+            _, _, round_trip = heapq.heappop(self._stop_losses)
+            if round_trip in self._positions:
+                triggered.append((round_trip, ExitReason.STOP_LOSS))
+                del self._positions[round_trip]
+
+        while self._profits and self._profits[0][0] < market_price:
+            _, _, round_trip = heapq.heappop(self._profits)
+            if round_trip in self._positions:
+                triggered.append((round_trip, ExitReason.TAKE_PROFIT))
+                del self._positions[round_trip]
+
+        return triggered
@@ -1,7 +1,196 @@
+import argparse
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from enum import StrEnum
+from typing import Union
 
-import joblib
-import pandas as pd
+import numpy as np
+
+
+class ModelFormat(StrEnum):
+    # A scikit-learn model saved by joblib, predicted by scikit-learn
+    JOBLIB = "joblib"
+    # A scikit-learn model saved by joblib, predicted by a CompiledForest
+    COMPILED = "compiled"
+    # A directory of arrays saved by CompiledForest.save, memory-mapped
+    FOREST = "forest"
+
+
+class CompiledForest:
+    """
+    A random forest classifier flattened into plain arrays. All trees are
+    walked at the same time with NumPy, which avoids the per call overhead
+    of scikit-learn and makes a single prediction take microseconds.
+    """
+
+    ARRAYS = [
+        "feature_names",
+        "classes",
+        "roots",
+        "features",
+        "thresholds",
+        "children_left",
+        "children_right",
+        "probabilities",
+    ]
+
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        """
+        Args:
+            arrays: Flattened trees, see `from_model`
+        """
+        self.feature_names = [str(name) for name in arrays["feature_names"]]
+        self.classes = arrays["classes"]
+        self._roots = arrays["roots"]
+        self._features = arrays["features"]
+        self._thresholds = arrays["thresholds"]
+        self._children_left = arrays["children_left"]
+        self._children_right = arrays["children_right"]
+        self._probabilities = arrays["probabilities"]
+
+        self._max_depth = self._depth()
+
+    @staticmethod
+    def from_model(model) -> "CompiledForest":
+        """
+        Args:
+            model: A fitted scikit-learn RandomForestClassifier
+        Returns:
+            The flattened forest
+        """
+        features = list[np.ndarray]()
+        thresholds = list[np.ndarray]()
+        children_left = list[np.ndarray]()
+        children_right = list[np.ndarray]()
+        probabilities = list[np.ndarray]()
+        roots = list[int]()
+
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            # A leaf points to itself so that walking further is a no-op
+            children_left.append(
+                np.where(
+                    is_leaf, np.arange(tree.node_count), tree.children_left
+                )
+                + offset
+            )
+            children_right.append(
+                np.where(
+                    is_leaf, np.arange(tree.node_count), tree.children_right
+                )
+                + offset
+            )
+            # Same as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :]
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            probabilities.append(value / normalizer)
+            offset += tree.node_count
+
+        return CompiledForest(
+            {
+                "feature_names": np.array(model.feature_names_in_, dtype=str),
+                "classes": model.classes_,
+                "roots": np.array(roots),
+                "features": np.concatenate(features),
+                "thresholds": np.concatenate(thresholds),
+                "children_left": np.concatenate(children_left),
+                "children_right": np.concatenate(children_right),
+                "probabilities": np.concatenate(probabilities),
+            }
+        )
+
+    def save(self, directory: str) -> None:
+        """
+        Saves every array as an uncompressed .npy file, so that it could be
+        memory-mapped on loading.
+
+        Args:
+            directory: Directory to save the arrays into
+        Returns:
+            None
+        """
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "feature_names": np.array(self.feature_names, dtype=str),
+            "classes": self.classes,
+            "roots": self._roots,
+            "features": self._features,
+            "thresholds": self._thresholds,
+            "children_left": self._children_left,
+            "children_right": self._children_right,
+            "probabilities": self._probabilities,
+        }
+        for name, array in arrays.items():
+            np.save(f"{directory}/{name}.npy", np.asarray(array))
+
+    @staticmethod
+    def load(directory: str, mmap_mode: Union[str, None] = "r"):
+        """
+        Loads arrays saved by `save`. Memory-mapped arrays are backed by the
+        page cache, hence shared by all processes loading the same model.
+
+        Args:
+            directory: Directory of the saved arrays
+            mmap_mode: Mode to memory-map the arrays, None to read them
+        Returns:
+            The flattened forest
+        """
+        return CompiledForest(
+            {
+                name: np.load(f"{directory}/{name}.npy", mmap_mode=mmap_mode)
+                for name in CompiledForest.ARRAYS
+            }
+        )
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Same as RandomForestClassifier.predict
+
+        Args:
+            X: Feature vectors, one row per sample
+        Returns:
+            Predicted class of each sample
+        """
+        # Trees are trained on float32 features
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, np.newaxis]
+        nodes = np.broadcast_to(self._roots, (len(X), len(self._roots)))
+        for _ in range(self._max_depth):
+            go_left = X[rows, self._features[nodes]] <= self._thresholds[nodes]
+            nodes = np.where(
+                go_left,
+                self._children_left[nodes],
+                self._children_right[nodes],
+            )
+
+        probabilities = self._probabilities[nodes].mean(axis=1)
+        return self.classes[np.argmax(probabilities, axis=1)]
+
+    def _depth(self) -> int:
+        """
+        Returns:
+            Number of steps for the deepest leaf to be reached from its root
+        """
+        depth = 0
+        nodes = np.asarray(self._roots)
+        is_leaf = self._children_left[nodes] == nodes
+        while not np.all(is_leaf):
+            nodes = nodes[~is_leaf]
+            nodes = np.concatenate(
+                [self._children_left[nodes], self._children_right[nodes]]
+            )
+            is_leaf = self._children_left[nodes] == nodes
+            depth += 1
+        return depth
 
 
 class ScoreModel:
@@ -9,24 +198,206 @@ class ScoreModel:
     Loads a model file for scoring an opportunity
     """
 
-    def __init__(self, model_name: str):
-        # Load the model file into class
-        script_directory = os.path.dirname(os.path.abspath(__file__))
-        self._model = joblib.load(f"{script_directory}/{model_name}")
+    # Max number of feature vectors to remember the score of
+    MAX_MEMO_SIZE = 4096
+
+    def __init__(
+        self,
+        model_path: str,
+        model_format: ModelFormat = ModelFormat.JOBLIB,
+    ):
+        """
+        Args:
+            model_path: Path to the model, or name of a model next to this
+                        script
+            model_format: How the model is saved and predicted
+        """
+        if not os.path.exists(model_path):
+            script_directory = os.path.dirname(os.path.abspath(__file__))
+            model_path = f"{script_directory}/{model_path}"
+
+        self._model = None
+        self._compiled: Union[CompiledForest, None] = None
+        if model_format == ModelFormat.FOREST:
+            self._compiled = CompiledForest.load(model_path)
+            self.feature_names = self._compiled.feature_names
+        else:
+            # Only import scikit-learn when a pickled model is used
+            import joblib
+
+            self._model = joblib.load(model_path)
+            self.feature_names = list(self._model.feature_names_in_)
+            if model_format == ModelFormat.COMPILED:
+                self._compiled = CompiledForest.from_model(self._model)
+
+        self._memo = OrderedDict[tuple, float]()
+
+    def features(self, score_details: dict) -> np.ndarray:
+        """
+        Converts score details into a feature vector
+
+        Args:
+            score_details: Features of an opportunity keyed by name
+        Returns:
+            Features in the order the model is trained with
+        """
+        return np.array(
+            [float(score_details[name]) for name in self.feature_names]
+        )
 
     def score(self, score_details: dict):
         """
         Generates a score based on the model file
 
         Args:
-            score_details:
+            score_details: Features of an opportunity keyed by name
         Returns:
+            Score of the opportunity
+        """
+        return self.score_batch(self.features(score_details)[np.newaxis])[0]
 
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
         """
-        X_predict = pd.DataFrame([score_details])
-        y_predict = self._model.predict(X_predict)
-        return y_predict[0]
+        Generates scores for many opportunities with one prediction. Scores of
+        feature vectors seen before are reused.
+
+        Args:
+            X: Feature vectors, one row per opportunity
+        Returns:
+            Score of each opportunity
+        """
+        scores = np.empty(len(X))
+        keys = [tuple(row) for row in X.tolist()]
+        missing = list[int]()
+        for i, key in enumerate(keys):
+            if key in self._memo:
+                scores[i] = self._memo[key]
+                self._memo.move_to_end(key)
+            else:
+                missing.append(i)
+
+        if missing:
+            scores[missing] = self._predict(X[missing])
+            for i in missing:
+                self._memo[keys[i]] = scores[i]
+                if len(self._memo) > self.MAX_MEMO_SIZE:
+                    self._memo.popitem(last=False)
+
+        return scores
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        if self._compiled is not None:
+            return self._compiled.predict(X)
+
+        import pandas as pd
+
+        X_predict = pd.DataFrame(X, columns=self.feature_names)
+        return self._model.predict(X_predict)
+
+
+class ScoreModelLoader:
+    """
+    Loads the score model on first use, so that a process never scoring any
+    opportunity doesn't pay for loading it.
+
+    The model could be configured by calling `configure` before its first
+    use, or by environment variables:
+
+        JOLTEON_SCORE_MODEL         Path to the model
+        JOLTEON_SCORE_MODEL_FORMAT  One of joblib (default), compiled and
+                                    forest
+    """
+
+    DEFAULT_MODEL_PATH = "random_forest_model-2024-01-29.joblib"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instance: Union[ScoreModel, None] = None
+        self.model_path = self.DEFAULT_MODEL_PATH
+        self.model_format = ModelFormat.JOBLIB
+        # Time spent on loading the model, None if not loaded yet
+        self.load_time_in_seconds: Union[float, None] = None
+        self.configure()
+
+    def configure(
+        self,
+        model_path: Union[str, None] = None,
+        model_format: Union[ModelFormat, str, None] = None,
+    ) -> None:
+        """
+        Changes the model to load. A loaded model is dropped and the new one
+        will be loaded on its next use.
+
+        Args:
+            model_path: Path to the model, or read from the environment
+            model_format: Format of the model, or read from the environment
+        Returns:
+            None
+        """
+        with self._lock:
+            self.model_path = model_path or os.environ.get(
+                "JOLTEON_SCORE_MODEL", self.DEFAULT_MODEL_PATH
+            )
+            self.model_format = ModelFormat(
+                model_format
+                or os.environ.get(
+                    "JOLTEON_SCORE_MODEL_FORMAT", ModelFormat.JOBLIB
+                )
+            )
+            self._instance = None
+            self.load_time_in_seconds = None
+
+    def get(self) -> ScoreModel:
+        """
+        Returns:
+            The score model, loaded if not yet
+        """
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                self._instance = ScoreModel(self.model_path, self.model_format)
+                self.load_time_in_seconds = time.perf_counter() - start
+                logging.info(
+                    f"Loaded score model {self.model_path} "
+                    f"as {self.model_format} "
+                    f"in {self.load_time_in_seconds:.3f}s"
+                )
+            return self._instance
+
+
+def score_model_loader(singleton=ScoreModelLoader()):
+    return singleton
+
+
+def score_model() -> ScoreModel:
+    return score_model_loader().get()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile a score model into memory-mappable arrays"
+    )
+    parser.add_argument("model", help="Path to a joblib model file")
+    parser.add_argument("output", help="Directory to save the arrays into")
+
+    args = parser.parse_args()
+    CompiledForest.from_model(
+        ScoreModel(args.model, ModelFormat.JOBLIB)._model
+    ).save(args.output)
+
+    # Report how long it takes to load the model in each format
+    for model_path, model_format in [
+        (args.model, ModelFormat.JOBLIB),
+        (args.model, ModelFormat.COMPILED),
+        (args.output, ModelFormat.FOREST),
+    ]:
+        start = time.perf_counter()
+        ScoreModel(model_path, model_format)
+        print(
+            f"Loaded {model_path} as {model_format} "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
 
 
-def score_model(instance=ScoreModel("random_forest_model-2024-01-29.joblib")):
-    return instance
+if __name__ == "__main__":
+    main()
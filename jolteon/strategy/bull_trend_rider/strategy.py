@@ -1,4 +1,7 @@
 import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Union
 
 from jolteon.core.event.signal import signal, subscribe
 from jolteon.core.event.signal_subscriber import SignalSubscriber
@@ -7,10 +10,19 @@ from jolteon.core.id_generator import id_generator
 from jolteon.core.side import MarketSide
 from jolteon.core.time.time_manager import time_manager
 from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import (
+    CandlestickHub,
+    CandlestickView,
+)
 from jolteon.market_data.core.candlestick_list import CandlestickList
 from jolteon.market_data.core.order import Order, OrderType
 from jolteon.market_data.core.trade import Trade
+from jolteon.risk_limit.pre_trade_check import PreTradeCheck
 from jolteon.risk_limit.risk_limit import IRiskLimit
+from jolteon.strategy.bull_trend_rider.exit_trigger_index import (
+    ExitReason,
+    ExitTriggerIndex,
+)
 from jolteon.strategy.bull_trend_rider.strategy_parameters import (
     StrategyParameters,
 )
@@ -28,11 +40,15 @@ from jolteon.strategy.core.patterns.shooting_star.pattern import (
 
 
 class BullTrendRiderStrategy(Heartbeater, SignalSubscriber):
+    # Max number of order ids of completed round trips to remember
+    MAX_COMPLETED_ORDER_IDS = 1024
+
     def __init__(
         self,
         symbol: str,
         risk_limits: list[IRiskLimit],
         parameters: StrategyParameters,
+        hub: Union[CandlestickHub, None] = None,
     ):
         """
         Idea take from the book "How to day-trade for a living",
@@ -52,46 +68,92 @@ class BullTrendRiderStrategy(Heartbeater, SignalSubscriber):
 
         Restrictions:
             1. This strategy only trades one instrument
+
+        Args:
+            symbol: Symbol of the instrument to trade
+            risk_limits: Risk limits to check before placing an order
+            parameters: Parameters of the strategy
+            hub: If set, candlesticks are read from the shared hub instead
+                 of a private copy
         """
         super().__init__(type(self).__name__, interval_in_seconds=10)
         self.symbol = symbol
         self._parameters = parameters
-        self._risk_limits = risk_limits
+        self._pre_trade_check = PreTradeCheck(risk_limits)
 
         # Signals to send out
         self.order_event = signal("order")
         self.opportunity_event = signal("bull_trend_rider_opportunity")
         self.trade_result_event = signal("bull_trend_rider_trade_result")
 
-        # Records of orders and market data
-        self._round_trips = list[TradeRecord]()
-        self._market_history = CandlestickList(
-            max_length=parameters.max_number_of_recent_candlesticks
+        # Records of orders and market data. A round trip is only kept until
+        # it is completed, after which it is sent to the recorder and dropped.
+        self._round_trips_by_order_id = dict[str, TradeRecord]()
+        # Order ids of recently completed round trips, in completion order,
+        # to recognize fills arriving after their round trip is completed
+        self._completed_order_ids = OrderedDict[str, None]()
+        # Positions bought but not sold yet, sorted by their exit prices
+        self._open_positions = ExitTriggerIndex()
+        # Start time of every bull flag we've placed an order for, which is
+        # still in the recent candlesticks
+        self._traded_bull_flags = set[datetime]()
+        self.number_of_completed_round_trips = 0
+        self._market_history: Union[CandlestickList, CandlestickView] = (
+            hub.view(max_length=parameters.max_number_of_recent_candlesticks)
+            if hub
+            else CandlestickList(
+                max_length=parameters.max_number_of_recent_candlesticks
+            )
         )
 
     @subscribe("calculated_candlestick_feed")
     def on_candlestick(self, _: str, candlestick: Candlestick):
         self._market_history.add_candlestick(candlestick)
+        self._prune_traded_bull_flags()
 
         # Run bull flag strategy to make a decision
         self._try_close_positions()
 
-    @subscribe("bull_flag")
-    def on_bull_flag_pattern(self, _: str, pattern: BullFlagPattern):
-        if pattern.result != RecognitionResult.BULL_FLAG:
-            return
+    @subscribe("market_trade_feed")
+    def on_market_trade(self, _: str, market_trade: Trade):
+        # Check exit prices on every market trade instead of waiting for the
+        # candlestick to be updated
+        self._try_close_positions(market_price=market_trade.price)
 
-        opportunity = TradeOpportunity(
-            pattern=pattern,
-            history=self._market_history,
-            params=self._parameters,
-        )
+    def on_bull_flag_pattern(self, sender: str, pattern: BullFlagPattern):
+        self.on_bull_flag_patterns(sender, [pattern])
 
-        self.opportunity_event.send(
-            self.opportunity_event, opportunity=opportunity
-        )
+    @subscribe("bull_flag_batch")
+    def on_bull_flag_patterns(self, _: str, patterns: list[BullFlagPattern]):
+        """
+        Grades all bull flag patterns found on the same candlestick with one
+        prediction, and then buys the good opportunities.
 
-        self._try_buy(opportunity)
+        Args:
+            _: Unique identifier of the sender
+            patterns: Bull flag patterns of the same candlestick
+
+        Returns:
+            None
+        """
+        opportunities = [
+            TradeOpportunity(
+                pattern=pattern,
+                history=self._market_history,
+                params=self._parameters,
+                grade=False,
+            )
+            for pattern in patterns
+            if pattern.result == RecognitionResult.BULL_FLAG
+        ]
+        TradeOpportunity.grade_all(opportunities)
+
+        for opportunity in opportunities:
+            self.opportunity_event.send(
+                self.opportunity_event, opportunity=opportunity
+            )
+
+            self._try_buy(opportunity)
 
     @subscribe("shooting_star")
     def on_shooting_star_pattern(self, _: str, pattern: ShootingStarPattern):
@@ -111,49 +173,105 @@ class BullTrendRiderStrategy(Heartbeater, SignalSubscriber):
 
     @subscribe("order_fill")
     def on_fill(self, _: str, trade: Trade):
-        def _matching_trip_in(order_field: str) -> TradeRecord | None:
-            return next(
-                (
-                    trip
-                    for trip in self._round_trips
-                    if getattr(trip, order_field)
-                    and getattr(trip, order_field).client_order_id
-                    == trade.client_order_id
-                ),
-                None,
+        found_round_trip = self._round_trips_by_order_id.get(
+            trade.client_order_id
+        )
+        if (
+            found_round_trip is None
+            and trade.client_order_id in self._completed_order_ids
+        ):
+            # Partial fills, or fills received from both the websocket and
+            # the REST API, might arrive after the round trip is completed
+            logging.warning(
+                f"Ignored a {trade.side.lower()} trade of a completed "
+                f"round trip: {trade}"
             )
+            return
+        assert (
+            found_round_trip is not None
+        ), f"No order located for a {trade.side.lower()} trade: {trade}"
+        logging.info(f"Received {trade} for {vars(found_round_trip)}")
 
         if trade.side == MarketSide.BUY:
-            found_round_trip = _matching_trip_in("buy_order")
-            logging.info(f"Received {trade} for {vars(found_round_trip)}")
-            assert (
-                found_round_trip is not None
-            ), f"No buy order located for a buy trade: {trade}"
-
             found_round_trip.buy_trades.append(trade)
-            if found_round_trip.completed():
-                self.trade_result_event.send(
-                    self.trade_result_event,
-                    round_trip=found_round_trip,
-                )
-
+            if not found_round_trip.sell_order:
+                self._open_positions.add(found_round_trip)
         elif trade.side == MarketSide.SELL:
-            found_round_trip = _matching_trip_in("sell_order")
-            logging.info(f"Received {trade} for {vars(found_round_trip)}")
-
-            assert (
-                found_round_trip is not None
-            ), f"No sell order located for a sell trade: {trade}"
-
             found_round_trip.sell_trades.append(trade)
-            if found_round_trip.completed():
-                self.trade_result_event.send(
-                    self.trade_result_event,
-                    round_trip=found_round_trip,
-                )
         else:
             assert False, f"Unexpected trade: {trade}"
 
+        if found_round_trip.completed():
+            self.trade_result_event.send(
+                self.trade_result_event,
+                round_trip=found_round_trip,
+            )
+            self._remove_round_trip(found_round_trip)
+
+    def _add_round_trip(self, round_trip: TradeRecord) -> None:
+        """
+        Index a round trip by its orders, so that fills could be matched
+        without searching all round trips.
+
+        Args:
+            round_trip: A new round trip
+        Returns:
+            None
+        """
+        for order in (round_trip.buy_order, round_trip.sell_order):
+            if order:
+                self._round_trips_by_order_id[
+                    order.client_order_id
+                ] = round_trip
+        if round_trip.buy_trades and not round_trip.sell_order:
+            self._open_positions.add(round_trip)
+        self._traded_bull_flags.add(
+            round_trip.opportunity.bull_flag_pattern.start
+        )
+
+    def _remove_round_trip(self, round_trip: TradeRecord) -> None:
+        """
+        Drop a completed round trip, which is already sent to the recorder.
+
+        Args:
+            round_trip: A completed round trip
+        Returns:
+            None
+        """
+        for order in (round_trip.buy_order, round_trip.sell_order):
+            if (
+                order
+                and self._round_trips_by_order_id.get(order.client_order_id)
+                is round_trip
+            ):
+                del self._round_trips_by_order_id[order.client_order_id]
+            if order:
+                self._completed_order_ids[order.client_order_id] = None
+        while (
+            len(self._completed_order_ids)
+            > BullTrendRiderStrategy.MAX_COMPLETED_ORDER_IDS
+        ):
+            self._completed_order_ids.popitem(last=False)
+        self._open_positions.remove(round_trip)
+        self.number_of_completed_round_trips += 1
+
+    def _prune_traded_bull_flags(self) -> None:
+        """
+        Forget traded bull flags older than the recent candlesticks, which
+        could not be found again.
+
+        Returns:
+            None
+        """
+        if not self._traded_bull_flags or len(self._market_history) == 0:
+            return
+
+        oldest = self._market_history[0].start_time
+        if min(self._traded_bull_flags) < oldest:
+            self._traded_bull_flags = {
+                start for start in self._traded_bull_flags if start >= oldest
+            }
+
     def _try_buy(self, opportunity: TradeOpportunity) -> bool:
         # Don't buy if opportunity is not good enough
         if not opportunity or not opportunity.good(
@@ -162,23 +280,22 @@ class BullTrendRiderStrategy(Heartbeater, SignalSubscriber):
             return False
 
         # Don't buy if we've already placed an order for the same bull flag
-        for bull_flag_trip in self._round_trips:
-            if (
-                bull_flag_trip.opportunity.bull_flag_pattern.start
-                == opportunity.bull_flag_pattern.start
-            ):
-                return False
+        if opportunity.bull_flag_pattern.start in self._traded_bull_flags:
+            return False
+        # Nor if the bull flag is too old to tell whether it has been traded
+        if (
+            len(self._market_history) > 0
+            and opportunity.bull_flag_pattern.start
+            < self._market_history[0].start_time
+        ):
+            return False
 
         assert (
             opportunity.stop_loss_price > 0.0
         ), "Stop loss price must be positive!"
 
-        for limit in self._risk_limits:
-            if not limit.can_send():
-                return False
-
         buy_order = Order(
-            client_order_id=str(id_generator().next()),
+            client_order_id="",
             order_type=OrderType.MARKET_ORDER,
             symbol=self.symbol,
             price=None,
@@ -186,7 +303,12 @@ class BullTrendRiderStrategy(Heartbeater, SignalSubscriber):
             side=MarketSide.BUY,
             creation_time=time_manager().now(),
         )
-        self._round_trips.append(
+        if not self._pre_trade_check.can_send(buy_order):
+            return False
+        # Only take an id for orders actually sent
+        buy_order.client_order_id = str(id_generator().next())
+
+        self._add_round_trip(
             TradeRecord(
                 opportunity=opportunity,
                 buy_order=buy_order,
@@ -201,65 +323,64 @@ class BullTrendRiderStrategy(Heartbeater, SignalSubscriber):
 
         return True
 
-    def _try_close_positions(self, force: bool = False) -> None:
-        if len(self._round_trips) == 0:
+    def _try_close_positions(
+        self, force: bool = False, market_price: Union[float, None] = None
+    ) -> None:
+        if len(self._open_positions) == 0:
             return
 
-        for round_trip in self._round_trips:
-            # Skip if sell order has been placed
-            if round_trip.sell_order:
-                continue
-
-            # Skip if buy orders has not been confirmed yet
-            if not round_trip.buy_trades:
-                continue
-
-            assert (
-                round_trip.buy_order
-            ), "Buy order has to be placed before sending a sell order!"
-
-            sell_order = Order(
-                client_order_id=str(id_generator().next()),
-                order_type=OrderType.MARKET_ORDER,
-                symbol=round_trip.buy_order.symbol,
-                price=None,
-                quantity=round_trip.buy_order.quantity,
-                side=MarketSide.SELL,
-                creation_time=time_manager().now(),
-            )
+        if market_price is None:
+            market_price = self._market_history[-1].close
 
-            latest_market_price = self._market_history[-1].close
-            if round_trip.should_sell_for_loss(latest_market_price):
+        for round_trip, reason in self._open_positions.triggered(market_price):
+            sell_order = self._create_sell_order(round_trip)
+            if reason == ExitReason.STOP_LOSS:
                 # crossed stop loss line, we need sell for limiting losses
                 logging.warning(
                     f"Placed {sell_order} for limiting loss "
                     f"when last market trade is at "
-                    f"{latest_market_price} "
+                    f"{market_price} "
                     f"and our trade record is "
                     f"{vars(round_trip)}."
                 )
-
-                round_trip.sell_order = sell_order
-                self._send_order(sell_order)
-            elif round_trip.should_sell_for_profit(latest_market_price):
+            else:
                 # crossed profit line, we need sell for profit
                 logging.info(
                     f"Placed {sell_order} for profit "
                     f"with expectations to be traded near "
-                    f"{latest_market_price}."
+                    f"{market_price}."
                 )
+            self._close_position(round_trip, sell_order)
 
-                round_trip.sell_order = sell_order
-                self._send_order(sell_order)
-            elif force:
+        if force:
+            # Positions are closed while iterating
+            for round_trip in list(self._open_positions):
+                sell_order = self._create_sell_order(round_trip)
                 logging.info(f"Placed {sell_order} for other reasons.")
+                self._close_position(round_trip, sell_order)
 
-                round_trip.sell_order = sell_order
-                self._send_order(sell_order)
-            else:
-                continue
+    @staticmethod
+    def _create_sell_order(round_trip: TradeRecord) -> Order:
+        assert (
+            round_trip.buy_order
+        ), "Buy order has to be placed before sending a sell order!"
+
+        return Order(
+            client_order_id=str(id_generator().next()),
+            order_type=OrderType.MARKET_ORDER,
+            symbol=round_trip.buy_order.symbol,
+            price=None,
+            quantity=round_trip.buy_order.quantity,
+            side=MarketSide.SELL,
+            creation_time=time_manager().now(),
+        )
+
+    def _close_position(self, round_trip: TradeRecord, sell_order: Order):
+        round_trip.sell_order = sell_order
+        self._round_trips_by_order_id[sell_order.client_order_id] = round_trip
+        self._open_positions.remove(round_trip)
+        self._send_order(sell_order)
 
     def _send_order(self, order):
-        for limit in self._risk_limits:
-            limit.do_send()
+        self._pre_trade_check.do_send(order)
         self.order_event.send(self.order_event, order=order)
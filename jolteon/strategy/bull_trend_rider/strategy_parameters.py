@@ -21,3 +21,8 @@ class StrategyParameters:
     atr_factor: float = 3.0
     # Percentage of order cost that will be charged by the exchange as fee
     fee_percentage: float = 0.0026
+    # Maximum volume held of each symbol, including buy orders not filled yet
+    max_position_volume: float = 0.001
+    # Stop buying once the PnL marked to market falls this much below its
+    # peak, in the quote currency
+    max_drawdown: float = 50.0
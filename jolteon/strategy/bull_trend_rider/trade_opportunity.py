@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from typing import Union
 
+import numpy as np
+
+from jolteon.market_data.core.candlestick_hub import CandlestickView
 from jolteon.market_data.core.candlestick_list import CandlestickList
 from jolteon.strategy.bull_trend_rider.models.score_model import score_model
 from jolteon.strategy.bull_trend_rider.strategy_parameters import (
@@ -21,9 +24,18 @@ class TradeOpportunity(TradeOpportunityCore):
     def __init__(
         self,
         pattern: BullFlagPattern,
-        history: CandlestickList,
+        history: Union[CandlestickList, CandlestickView],
         params: StrategyParameters,
+        grade: bool = True,
     ):
+        """
+        Args:
+            pattern: The bull flag pattern found
+            history: All current/previous candlesticks for this opportunity
+            params: Parameters for bull flag strategy
+            grade: Whether to score the opportunity now. Otherwise, it could
+                   be scored later with other opportunities in a batch.
+        """
         super().__init__(
             score=0.0,
             stop_loss_price=0.0,
@@ -49,21 +61,54 @@ class TradeOpportunity(TradeOpportunityCore):
         self.profit_price += self.profit_price * params.fee_percentage
         self.profit_price += self.expected_trade_price * params.fee_percentage
 
-        self.score = self._grade(history, params)
+        self.score_details = self._build_score_details(history)
+        if grade:
+            self.score = score_model().score(self.score_details)
 
-    def _grade(
-        self, history: CandlestickList, params: StrategyParameters
-    ) -> float:
+    @staticmethod
+    def grade_all(opportunities: list["TradeOpportunity"]) -> None:
         """
-        Based on all characteristics of the opportunity, assign a grade to the
-        trade opportunity.
+        Scores many opportunities with one prediction of the model.
 
         Args:
-            history: All current/previous candlesticks for this opportunity
-            params: Parameters for bull flag strategy.
+            opportunities: Opportunities created with `grade=False`
         Returns:
             None
         """
+        if not opportunities:
+            return
+
+        model = score_model()
+        if len(opportunities) == 1:
+            # Same score without building a batch
+            opportunity = opportunities[0]
+            opportunity.score = model.score(opportunity.score_details)
+            return
+
+        scores = model.score_batch(
+            np.array(
+                [
+                    model.features(opportunity.score_details)
+                    for opportunity in opportunities
+                ]
+            )
+        )
+        for opportunity, score in zip(opportunities, scores):
+            opportunity.score = float(score)
+
+    def _build_score_details(
+        self,
+        history: Union[CandlestickList, CandlestickView],
+    ) -> dict:
+        """
+        Based on all characteristics of the opportunity, build the features
+        to grade the trade opportunity.
+
+        Args:
+            history: All current/previous candlesticks for this opportunity
+        Returns:
+            Features of the opportunity keyed by name
+        """
         previous_candlesticks = [
             candlestick
             for candlestick in history.candlesticks
@@ -75,14 +120,14 @@ class TradeOpportunity(TradeOpportunityCore):
         #######################
         # Build Score Details #
         #######################
-        self.score_details = {}
+        score_details: dict = {}
 
         # The percentage of bullish candlesticks in history
         is_bullish = [
             candlestick.is_bullish() for candlestick in previous_candlesticks
         ]
         prev_bullish_pct = sum(is_bullish) / max(1e-10, len(is_bullish))
-        self.score_details["prev_bullish_pct"] = prev_bullish_pct
+        score_details["prev_bullish_pct"] = prev_bullish_pct
 
         # Min/Max return percentage of candlesticks in history
         change_percentages = [
@@ -90,32 +135,29 @@ class TradeOpportunity(TradeOpportunityCore):
             for candlestick in previous_candlesticks
         ]
         if len(change_percentages) == 0:
-            self.score_details["prev_vs_bull_flag_return_pct"] = 0.0
+            score_details["prev_vs_bull_flag_return_pct"] = 0.0
         else:
-            self.score_details["prev_vs_bull_flag_return_pct"] = (
+            score_details["prev_vs_bull_flag_return_pct"] = (
                 max(change_percentages)
                 / self.bull_flag_pattern.bull_flag.return_percentage()
             )
 
         # Whether the bull flag candlesticks reaches a new high
         if len(change_percentages) == 0:
-            self.score_details["is_bull_flag_new_high"] = False
+            score_details["is_bull_flag_new_high"] = False
         else:
-            self.score_details[
+            score_details[
                 "is_bull_flag_new_high"
             ] = self.bull_flag_pattern.bull_flag.close > max(
                 [x.high for x in previous_candlesticks]
             )
 
         # Volume
-        self.score_details[
+        score_details[
             "volume_change_pct"
         ] = self.bull_flag_pattern.bull_flag.volume / max(
             1e-10,
             previous_candlesticks[-1].volume,
         )
 
-        ###############
-        # Build Score #
-        ###############
-        return score_model().score(self.score_details)
+        return score_details
@@ -1,7 +1,15 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Union
+
 from jolteon.core.event.signal import signal, subscribe
 from jolteon.core.event.signal_subscriber import SignalSubscriber
 from jolteon.core.health_monitor.heartbeat import Heartbeater
+from jolteon.core.time.time_manager import time_manager
 from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import (
+    CandlestickHub,
+    CandlestickView,
+)
 from jolteon.market_data.core.candlestick_list import CandlestickList
 from jolteon.strategy.core.patterns.bull_flag.parameters import (
     BullFlagParameters,
@@ -11,49 +19,161 @@ from jolteon.strategy.core.patterns.bull_flag.pattern import (
     RecognitionResult,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class BullFlagRecognizer(Heartbeater, SignalSubscriber):
-    def __init__(self, params: BullFlagParameters):
+    def __init__(
+        self,
+        params: BullFlagParameters,
+        hub: Union[CandlestickHub, None] = None,
+    ):
         super().__init__(type(self).__name__, interval_in_seconds=10)
         self.bull_flag_signal = signal("bull_flag")
+        # All bull flag patterns found on the same candlestick
+        self.bull_flag_batch_signal = signal("bull_flag_batch")
         self._params = params
-        self._all_candlesticks = CandlestickList(
-            max_length=params.max_number_of_recent_candlesticks
+        self._all_candlesticks: Union[CandlestickList, CandlestickView] = (
+            hub.view(max_length=params.max_number_of_recent_candlesticks)
+            if hub
+            else CandlestickList(
+                max_length=params.max_number_of_recent_candlesticks
+            )
         )
+        # Whether a candlestick is extremely bullish, keyed by its start time
+        self._extremely_bullish = dict[datetime, bool]()
+        self._cached_params = params
 
     def on_candlesticks(self, sender: str, candlesticks: list[Candlestick]):
         for candlestick in candlesticks:
             self.on_candlestick(sender, candlestick)
 
     @subscribe("calculated_candlestick_feed")
-    def on_candlestick(self, _: str, candlestick: Candlestick):
+    def on_candlestick(self, sender: str, candlestick: Candlestick):
         if (
             self._all_candlesticks.add_candlestick(candlestick)
             == CandlestickList.AddResult.APPENDED
         ):
-            self._detect()
+            self._detect(sender)
 
-    def _detect(self):
-        # Try search back N candlesticks and see if a bull flag pattern could
-        # be found.
-        completed_candlesticks = [
-            c for c in self._all_candlesticks.candlesticks if c.is_completed()
-        ]
-        for i in range(0, len(completed_candlesticks)):
-            index = len(completed_candlesticks) - 1 - i
-            pattern = self._is_bull_flag_pattern(
-                candlesticks=completed_candlesticks[index:]
-            )
+    def _detect(self, sender: str):
+        # Patterns are sent by the sender of the candlesticks, which is the
+        # symbol of the candlesticks
+        # Completed candlesticks always come before the incomplete ones,
+        # hence only the tail of the history needs to be checked.
+        now = time_manager().now()
+        history = self._all_candlesticks
+        number_of_completed = len(history)
+        while number_of_completed > 0 and not history[
+            number_of_completed - 1
+        ].is_completed(now):
+            number_of_completed -= 1
+
+        # Only suffixes of the completed candlesticks with enough pre bull
+        # flag candlesticks and a short enough consolidation period could
+        # form a pattern. Same as a full backward scan, shorter suffixes are
+        # checked first.
+        pre = self._params.max_number_of_pre_bull_flag_candlesticks
+        first_bull_flag_index = max(
+            pre,
+            number_of_completed
+            - 1
+            - self._params.max_number_of_consolidation_candlesticks,
+        )
+        patterns = list[BullFlagPattern]()
+        for index in range(
+            number_of_completed - 2, first_bull_flag_index - 1, -1
+        ):
+            pattern = self._is_bull_flag_pattern_at(index, number_of_completed)
             # Only send valid bull flag pattern to gain some performance boost.
             if pattern and (
                 self._params.verbose
                 or pattern.result == RecognitionResult.BULL_FLAG
             ):
-                self.bull_flag_signal.send(
-                    self.bull_flag_signal, pattern=pattern
-                )
+                self.bull_flag_signal.send(sender, pattern=pattern)
+                patterns.append(pattern)
+
+        # Patterns of one candlestick are also sent together, so that they
+        # could be graded in a batch
+        if patterns:
+            self.bull_flag_batch_signal.send(sender, patterns=patterns)
+
+    def _is_bull_flag_pattern_at(
+        self, index: int, end: int
+    ) -> BullFlagPattern | None:
+        """
+        Same as `_is_bull_flag_pattern`, but for the candlesticks in history
+        starting from the pre bull flag candlesticks of the bull flag
+        candlestick at `index` and ending before `end`.
+
+        Args:
+            index: Index of the bull flag candlestick in history
+            end: Index after the last consolidation candlestick in history
+        Returns:
+            A Pattern object on why we think it is a bull flag pattern.
+        """
+        history = self._all_candlesticks
+        bull_flag_candlestick = history[index]
+
+        starts_extremely_bullish = self._starts_extremely_bullish(index)
+        if not starts_extremely_bullish and not self._params.verbose:
+            # The pattern would never be sent
+            return None
+
+        pattern = BullFlagPattern(
+            bull_flag_candlestick=bull_flag_candlestick,
+            consolidation_period_candlesticks=[
+                history[i] for i in range(index + 1, end)
+            ],
+        )
+
+        if not starts_extremely_bullish:
+            pattern.result = RecognitionResult.NO_EXTREME_BULLISH
+            return pattern
+
+        # Check if there is a consolidation period
+        if (
+            pattern.consolidation_max_ratio
+            > self._params.consolidation_period_threshold_cutoff
+        ):
+            pattern.result = RecognitionResult.NO_CONSOLIDATION_PERIOD
+            return pattern
+
+        pattern.result = RecognitionResult.BULL_FLAG
+        return pattern
+
+    def _starts_extremely_bullish(self, index: int) -> bool:
+        """
+        Whether the candlestick at `index` is extremely bullish compared to
+        all its pre bull flag candlesticks. Completed candlesticks never
+        change, so the result is cached until the candlestick leaves the
+        history.
+        """
+        history = self._all_candlesticks
+        if self._cached_params is not self._params:
+            self._extremely_bullish.clear()
+            self._cached_params = self._params
+
+        # Drop candlesticks no longer in the history
+        oldest_start_time = history[0].start_time
+        while self._extremely_bullish:
+            start_time = next(iter(self._extremely_bullish))
+            if start_time >= oldest_start_time:
+                break
+            del self._extremely_bullish[start_time]
 
-        return
+        bull_flag_candlestick = history[index]
+        key = bull_flag_candlestick.start_time
+        if key not in self._extremely_bullish:
+            pre = self._params.max_number_of_pre_bull_flag_candlesticks
+            self._extremely_bullish[key] = all(
+                self._is_extremely_bullish(
+                    current=bull_flag_candlestick, previous=history[i]
+                )
+                for i in range(index - pre, index)
+            )
+        return self._extremely_bullish[key]
 
     def _is_bull_flag_pattern(
         self, candlesticks: list[Candlestick]
@@ -141,3 +261,119 @@ class BullFlagRecognizer(Heartbeater, SignalSubscriber):
             > self._params.extreme_bullish_return_pct
         )
         return cond1 and cond2
+
+
+def recognize_bull_flags(
+    df: "pd.DataFrame", params: BullFlagParameters
+) -> "pd.DataFrame":
+    """
+    Batch counterpart of BullFlagRecognizer. Every candlestick is considered
+    completed as soon as the next one arrives, same as in a replay.
+
+    Args:
+        df: Completed candlesticks with `start_time`, `end_time`, `open` and
+            `close` columns, sorted by time
+        params: Parameters for recognizing a bull flag
+    Returns:
+        One row per pattern sent by BullFlagRecognizer in the same order,
+        with the positions of the bull flag and the last consolidation
+        candlesticks in `df`
+    """
+    import numpy as np
+    import pandas as pd
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    columns = [
+        "start",
+        "end",
+        "bull_flag_index",
+        "end_index",
+        "bull_flag_body",
+        "consolidation_max_ratio",
+        "result",
+    ]
+    pre = params.max_number_of_pre_bull_flag_candlesticks
+    # The recognizer also keeps the incomplete candlestick in its history
+    max_consolidation = min(
+        params.max_number_of_consolidation_candlesticks,
+        params.max_number_of_recent_candlesticks - pre - 2,
+    )
+    n = len(df)
+    if n < pre + 2 or max_consolidation < 1:
+        return pd.DataFrame(columns=columns)
+
+    open = df["open"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+    body = np.abs(open - close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return_pct = np.where(open == 0.0, 0.0, (close - open) / open)
+
+    # Position of each possible bull flag candlestick
+    bull_flag_index = np.arange(pre, n - 1)
+    bull_flag_body = close[bull_flag_index] - open[bull_flag_index]
+
+    # Same as BullFlagRecognizer, a bull flag candlestick without any pre
+    # bull flag candlesticks is always extremely bullish
+    extremely_bullish = np.ones(len(bull_flag_index), dtype=bool)
+    if pre > 0:
+        previous_body = sliding_window_view(body, pre)[: n - 1 - pre]
+        extremely_bullish &= (
+            return_pct[bull_flag_index] > params.extreme_bullish_return_pct
+        ) & np.all(
+            body[bull_flag_index, np.newaxis]
+            > previous_body * params.extreme_bullish_threshold,
+            axis=1,
+        )
+
+    # Bodies of the next `max_consolidation` candlesticks after each
+    # possible bull flag candlestick, NaN beyond the last one
+    consolidation_body = sliding_window_view(
+        np.append(body[1:], np.full(max_consolidation, np.nan)),
+        max_consolidation,
+    )[bull_flag_index]
+    end_index = bull_flag_index[:, np.newaxis] + np.arange(
+        1, max_consolidation + 1
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        consolidation_max_ratio = np.where(
+            np.abs(bull_flag_body[:, np.newaxis]) < 1e-10,
+            # Same as BullFlagPattern, only the last candlestick counts
+            # if the bull flag candlestick has no body
+            np.where(consolidation_body < 1e-10, 0.0, np.inf),
+            np.fmax(np.fmax.accumulate(consolidation_body, axis=1), 0.0)
+            / np.abs(bull_flag_body[:, np.newaxis]),
+        )
+
+    result = np.where(
+        extremely_bullish[:, np.newaxis],
+        np.where(
+            consolidation_max_ratio
+            > params.consolidation_period_threshold_cutoff,
+            RecognitionResult.NO_CONSOLIDATION_PERIOD.value,
+            RecognitionResult.BULL_FLAG.value,
+        ),
+        RecognitionResult.NO_EXTREME_BULLISH.value,
+    )
+
+    selected = end_index < n
+    if not params.verbose:
+        selected &= result == RecognitionResult.BULL_FLAG.value
+    rows, offsets = np.nonzero(selected)
+    # Shorter patterns ending at the same candlestick are sent first
+    order = np.lexsort((-rows, end_index[rows, offsets]))
+    rows, offsets = rows[order], offsets[order]
+
+    start_time = df["start_time"].to_numpy()
+    end_time = df["end_time"].to_numpy()
+    return pd.DataFrame(
+        {
+            "start": start_time[bull_flag_index[rows]],
+            "end": end_time[end_index[rows, offsets]],
+            "bull_flag_index": bull_flag_index[rows],
+            "end_index": end_index[rows, offsets],
+            "bull_flag_body": bull_flag_body[rows],
+            "consolidation_max_ratio": consolidation_max_ratio[rows, offsets],
+            "result": result[rows, offsets],
+        },
+        columns=columns,
+    )
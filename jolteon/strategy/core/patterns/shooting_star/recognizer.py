@@ -1,4 +1,4 @@
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 from jolteon.core.event.signal import signal, subscribe
 from jolteon.core.event.signal_subscriber import SignalSubscriber
@@ -11,6 +11,9 @@ from jolteon.strategy.core.patterns.shooting_star.pattern import (
     ShootingStarPattern,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class ShootingStarRecognizer(Heartbeater, SignalSubscriber):
     def __init__(self, params: ShootingStarParameters):
@@ -23,18 +26,18 @@ class ShootingStarRecognizer(Heartbeater, SignalSubscriber):
     def on_candlestick(self, sender: str, candlestick: Candlestick):
         # Check last candlestick
         if self._last_candlestick and self._last_candlestick.is_completed():
-            self._detect_shooting_star(self._last_candlestick)
+            self._detect_shooting_star(sender, self._last_candlestick)
             # Once a candlestick is checked we no longer store it
             self._last_candlestick = None
 
         # Check current candlestick
         if candlestick.is_completed():
             # Once a candlestick is checked we no longer store it
-            self._detect_shooting_star(candlestick)
+            self._detect_shooting_star(sender, candlestick)
         else:
             self._last_candlestick = candlestick
 
-    def _detect_shooting_star(self, candlestick: Candlestick):
+    def _detect_shooting_star(self, sender: str, candlestick: Candlestick):
         """
         A shooting star is a specific candlestick pattern in technical analysis
         that is generally considered a bearish reversal pattern.
@@ -81,8 +84,10 @@ class ShootingStarRecognizer(Heartbeater, SignalSubscriber):
             and upper_shadow_ratio >= self._params.min_upper_shadow_ratio
             and 0 < lower_shadow_ratio < self._params.max_lower_shadow_ratio
         ):
+            # Patterns are sent by the sender of the candlesticks, which is
+            # the symbol of the candlesticks
             self.shooting_star_signal.send(
-                self.shooting_star_signal,
+                sender,
                 pattern=ShootingStarPattern(
                     shooting_star=candlestick,
                     body_ratio=body_ratio,
@@ -93,3 +98,51 @@ class ShootingStarRecognizer(Heartbeater, SignalSubscriber):
             return True
 
         return False
+
+
+def recognize_shooting_stars(
+    df: "pd.DataFrame", params: ShootingStarParameters
+) -> "pd.DataFrame":
+    """
+    Batch counterpart of ShootingStarRecognizer.
+
+    Args:
+        df: Completed candlesticks with `start_time`, `open`, `high`, `low`
+            and `close` columns
+        params: Parameters for recognizing a shooting star
+    Returns:
+        One row per shooting star, with its position in `df`
+    """
+    import numpy as np
+    import pandas as pd
+
+    open = df["open"].to_numpy(dtype=float)
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+
+    body = np.abs(open - close)
+    body_ratio = body / np.maximum(0.01, high - low)
+    upper_shadow_ratio = (high - np.maximum(open, close)) / np.maximum(
+        0.01, body
+    )
+    lower_shadow_ratio = (np.minimum(open, close) - low) / np.maximum(
+        0.01, high - low
+    )
+
+    (index,) = np.nonzero(
+        (0 < body_ratio)
+        & (body_ratio < params.max_body_ratio)
+        & (upper_shadow_ratio >= params.min_upper_shadow_ratio)
+        & (0 < lower_shadow_ratio)
+        & (lower_shadow_ratio < params.max_lower_shadow_ratio)
+    )
+    return pd.DataFrame(
+        {
+            "start": df["start_time"].to_numpy()[index],
+            "index": index,
+            "body_ratio": body_ratio[index],
+            "upper_shadow_ratio": upper_shadow_ratio[index],
+            "lower_shadow_ratio": lower_shadow_ratio[index],
+        }
+    )
@@ -13,12 +13,21 @@ import numpy as np
 import pandas as pd
 
 from jolteon.core.market import Market
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_generator import (
+    CandlestickGenerator,
+)
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.data_source import DatabaseDataSource
 from jolteon.strategy.bull_trend_rider.strategy_parameters import (
     StrategyParameters,
 )
 from jolteon.strategy.core.patterns.bull_flag.parameters import (
     BullFlagParameters,
 )
+from jolteon.strategy.core.patterns.bull_flag.recognizer import (
+    recognize_bull_flags,
+)
 
 
 def graceful_exit(signum, frame):
@@ -35,11 +44,26 @@ async def train():
     parser = argparse.ArgumentParser(description="Jolteon Trading Engine")
     parser.add_argument("--train-db", help="Path to a SQLite database file")
     parser.add_argument("--exchange", help="Name of the exchange")
+    parser.add_argument(
+        "--symbol",
+        default="BTC/USD",
+        help="Symbol to train on, e.g. BTC/USD",
+    )
+    parser.add_argument(
+        "--patterns-only",
+        action="store_true",
+        help="Only sweep pattern parameters on candlesticks of the training "
+        "database without replaying the strategy",
+    )
 
     # Access the arguments
     args = parser.parse_args()
     train_db = args.train_db
 
+    if args.patterns_only:
+        await train_patterns(train_db, args.symbol)
+        return
+
     # Instantiate the correct market's application instance
     market = Market.parse(args.exchange)
     if market == Market.KRAKEN:
@@ -51,7 +75,7 @@ async def train():
             f"Application is not implemented for market {args.exchange}"
         )
 
-    symbol = "BTC/USD"
+    symbol = args.symbol
 
     # Start Hyper Parameters Setup
     train_result = list[dict]()
@@ -99,5 +123,91 @@ async def train():
     df.to_sql(name="train_result", con=conn, if_exists="replace", index=False)
 
 
+async def train_patterns(train_db: str, symbol: str = "BTC/USD"):
+    """
+    Sweep bull flag parameters with the batch recognizer. Candlesticks are
+    built once per interval, so each set of parameters only costs a scan over
+    arrays instead of a full replay.
+
+    Args:
+        train_db: Path to a database with historical market trades
+        symbol: Symbol of the market trades to build candlesticks from
+    Returns:
+        None
+    """
+    data_source = DatabaseDataSource(train_db)
+    trades = await data_source.download_market_trades(
+        symbol, data_source.start_time(), data_source.end_time()
+    )
+    # The database may contain market trades of other symbols
+    trades = [trade for trade in trades if trade.symbol == symbol]
+
+    train_result = list[dict]()
+    for minute in range(1, 6):
+        df = build_candlesticks(trades, interval_in_seconds=minute * 60)
+        if len(df) == 0:
+            continue
+        # Return of the candlestick after each candlestick
+        next_return_pct = (df["close"].shift(-1) / df["close"] - 1).to_numpy()
+
+        for bull_flag_pct in np.arange(0.0005, 0.00201, 0.0002):
+            for consolidate_pct in np.arange(0.1, 0.301, 0.1):
+                bull_flag_params = BullFlagParameters(
+                    extreme_bullish_return_pct=bull_flag_pct,
+                    consolidation_period_threshold_cutoff=consolidate_pct,
+                )
+                patterns = recognize_bull_flags(df, bull_flag_params)
+
+                result = {
+                    **vars(bull_flag_params),
+                    "candlestick_interval_in_seconds": minute * 60,
+                    "number_of_bull_flags": len(patterns),
+                    "mean_next_return_pct": np.nanmean(
+                        next_return_pct[patterns["end_index"].to_numpy()]
+                    )
+                    if len(patterns) > 0
+                    else np.nan,
+                }
+                train_result.append(result)
+
+                print(f"Training Patterns: {result}")
+                logging.info(f"Training Patterns: {result}")
+
+    # Save result into a database
+    conn = sqlite3.connect(f"{tempfile.gettempdir()}/train_result.sqlite")
+    df = pd.DataFrame(train_result)
+    df.to_sql(
+        name="pattern_train_result",
+        con=conn,
+        if_exists="replace",
+        index=False,
+    )
+
+
+def build_candlesticks(
+    trades: list[Trade], interval_in_seconds: int
+) -> pd.DataFrame:
+    """
+    Build candlesticks from market trades the same way as a replay.
+
+    Args:
+        trades: Market trades sorted by time
+        interval_in_seconds: Duration of each candlestick
+    Returns:
+        Completed candlesticks, the last incomplete one is dropped
+    """
+    generator = CandlestickGenerator(interval_in_seconds)
+    candlesticks = list[Candlestick]()
+    for trade in trades:
+        for candlestick in generator.on_market_trade(trade):
+            # The same candlestick is returned until it is completed
+            if not candlesticks or candlesticks[-1] is not candlestick:
+                candlesticks.append(candlestick)
+
+    return pd.DataFrame(
+        [vars(candlestick) for candlestick in candlesticks[:-1]]
+    )
+
+
 if __name__ == "__main__":
     asyncio.run(train())
@@ -0,0 +1,128 @@
+import unittest
+from datetime import datetime, timedelta
+
+import pytz
+
+from jolteon.app.backtest import BacktestRunner
+from jolteon.core.event.signal import signal
+from jolteon.core.event.signal_manager import SignalManager
+from jolteon.core.id_generator import id_generator
+from jolteon.core.side import MarketSide
+from jolteon.core.time.time_manager import time_manager
+from jolteon.execution.kraken.mock_execution_service import (
+    MockExecutionService,
+)
+from jolteon.market_data.core.order import Order, OrderType
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.data_source import IDataSource
+
+
+class FakeApplication:
+    """
+    Replays market trades and places one order on each of them, filled by
+    the mock execution service.
+    """
+
+    def __init__(self, prices: list[float]):
+        self.start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        self.market_trades = [
+            Trade(
+                trade_id=i,
+                client_order_id="",
+                symbol="BTC/USD",
+                maker_order_id="",
+                taker_order_id="",
+                side=MarketSide.BUY,
+                price=price,
+                fee=0.0,
+                quantity=1.0,
+                transaction_time=self.start_time + timedelta(seconds=i),
+            )
+            for i, price in enumerate(prices)
+        ]
+        self.execution_service = MockExecutionService()
+        self.order_event = signal("order")
+
+    async def run_local_replay(self, db: str):
+        self.execution_service.connect()
+        IDataSource.TRADE_CACHE[("BTC/USD", db)] = self.market_trades
+        with time_manager():
+            for market_trade in self.market_trades:
+                time_manager().use_fake_time(
+                    market_trade.transaction_time, admin=self
+                )
+                self.order_event.send(
+                    self.order_event,
+                    order=Order(
+                        client_order_id=str(id_generator().next()),
+                        order_type=OrderType.MARKET_ORDER,
+                        symbol=market_trade.symbol,
+                        price=None,
+                        quantity=0.1,
+                        side=MarketSide.BUY,
+                        creation_time=market_trade.transaction_time,
+                    ),
+                )
+        SignalManager.disconnect_all()
+        return 1.0
+
+
+class TestBacktestRunner(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        SignalManager.disconnect_all()
+        id_generator().reset()
+
+    async def test_run(self):
+        result = await BacktestRunner().run(
+            FakeApplication([40000.0, 40001.0]), "unittest.sqlite"
+        )
+
+        self.assertEqual(
+            ["1", "5"], [x.client_order_id for x in result.orders]
+        )
+        self.assertEqual(
+            [(2, "1"), (6, "5")],
+            [(x.trade_id, x.client_order_id) for x in result.fills],
+        )
+        self.assertEqual(1.0, result.pnl)
+        self.assertEqual(64, len(result.fingerprint))
+        self.assertEqual(
+            BacktestRunner.fingerprint(result), result.fingerprint
+        )
+
+    async def test_same_fingerprint_of_repeated_runs(self):
+        # Ids left over by other code don't change the result
+        id_generator().next()
+        first = await BacktestRunner().run(
+            FakeApplication([40000.0, 40001.0]), "unittest.sqlite"
+        )
+        second = await BacktestRunner().run(
+            FakeApplication([40000.0, 40001.0]), "unittest.sqlite"
+        )
+        self.assertEqual(first.fingerprint, second.fingerprint)
+
+        # Fills at different prices
+        third = await BacktestRunner().run(
+            FakeApplication([40000.0, 40002.0]), "unittest.sqlite"
+        )
+        self.assertNotEqual(first.fingerprint, third.fingerprint)
+
+    async def test_trade_cache_is_scoped(self):
+        IDataSource.TRADE_CACHE[("previous",)] = []
+        try:
+            await BacktestRunner().run(
+                FakeApplication([40000.0]), "unittest.sqlite"
+            )
+
+            self.assertEqual([("previous",)], list(IDataSource.TRADE_CACHE))
+        finally:
+            IDataSource.TRADE_CACHE.pop(("previous",))
+
+    async def test_fake_time_in_use(self):
+        with time_manager():
+            time_manager().use_fake_time(datetime.now(tz=pytz.utc), self)
+
+            with self.assertRaises(RuntimeError):
+                await BacktestRunner().run(
+                    FakeApplication([40000.0]), "unittest.sqlite"
+                )
@@ -2,11 +2,13 @@ import os
 import tempfile
 import unittest
 from datetime import datetime
+from functools import partial
 from unittest.mock import MagicMock, patch, AsyncMock
 
 import pytz
 
 from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.data_source import IDataSource
 from jolteon.strategy.bull_trend_rider.strategy_parameters import (
     StrategyParameters,
 )
@@ -26,8 +28,6 @@ class TestApplication(unittest.IsolatedAsyncioTestCase):
 
         from jolteon.app.coinbase import CoinbaseApplication
 
-        CoinbaseApplication.THREAD_SYNC_INTERVAL = 0.01
-
         self.application = CoinbaseApplication(
             symbol=self.symbol,
             database_name=f"{tempfile.gettempdir()}/unittest.sqlite",
@@ -77,6 +77,9 @@ class TestApplication(unittest.IsolatedAsyncioTestCase):
         )
         mock_data_source.download_market_trades = AsyncMock()
         mock_data_source.download_market_trades.return_value = list[Trade]()
+        mock_data_source.stream_market_trades = partial(
+            IDataSource.stream_market_trades, mock_data_source
+        )
 
         await self.application.run_local_replay("/tmp/unittest.sqlite")
 
@@ -1,13 +1,25 @@
+import asyncio
 import os
 import tempfile
+import threading
+import time
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
 from unittest.mock import MagicMock, patch, AsyncMock
 
 import pytz
 
+from jolteon.core.side import MarketSide
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.events import Events
 from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.data_source import IDataSource
 from jolteon.position.position_manager import Position
+from jolteon.risk_limit.position_limit import (
+    MaxDrawdownLimit,
+    MaxPositionLimit,
+)
 from jolteon.strategy.bull_trend_rider.strategy_parameters import (
     StrategyParameters,
 )
@@ -26,8 +38,6 @@ class TestApplication(unittest.IsolatedAsyncioTestCase):
 
         from jolteon.app.kraken import KrakenApplication
 
-        KrakenApplication.THREAD_SYNC_INTERVAL = 0.01
-
         self.application = KrakenApplication(
             symbol=self.symbol,
             database_name=f"{tempfile.gettempdir()}/unittest.sqlite",
@@ -66,6 +76,9 @@ class TestApplication(unittest.IsolatedAsyncioTestCase):
         )
         mock_data_source.download_market_trades = AsyncMock()
         mock_data_source.download_market_trades.return_value = list[Trade]()
+        mock_data_source.stream_market_trades = partial(
+            IDataSource.stream_market_trades, mock_data_source
+        )
 
         await self.application.run_local_replay("/tmp/unittest.sqlite")
 
@@ -90,6 +103,22 @@ class TestApplication(unittest.IsolatedAsyncioTestCase):
             self.symbol, start_time, end_time
         )
 
+    @patch("jolteon.app.kraken.HistoricalFeed")
+    async def test_run_replay_at_speed(self, MockFeed):
+        mock_feed = self.create_mock_feed(MockFeed)
+        self.application._replay_speed = 10.0
+
+        start_time = datetime(2023, 1, 1, tzinfo=pytz.utc)
+        end_time = start_time + timedelta(seconds=1)
+        await self.application.run_replay(start_time, end_time)
+
+        self.assertEqual(10.0, MockFeed.call_args.kwargs["replay_speed"])
+        mock_feed.connect.assert_called_once_with(
+            self.symbol, start_time, end_time
+        )
+        # Recorded data is saved periodically, the same as running live
+        self.mock_signal_recorder.enable_auto_save.assert_called_once()
+
     @patch("jolteon.app.kraken.PublicFeed")
     async def test_run(self, MockFeed):
         mock_feed = self.create_mock_feed(MockFeed)
@@ -99,3 +128,134 @@ class TestApplication(unittest.IsolatedAsyncioTestCase):
 
         # Ensure the live feed connection is called with the correct arguments
         mock_feed.connect.assert_called_once_with(self.symbol)
+
+    @patch.dict(os.environ, {"KRAKEN_API_KEY": "api_key"})
+    @patch.dict(os.environ, {"KRAKEN_API_SECRET": "api_secret"})
+    @patch("jolteon.app.kraken.PublicFeed")
+    async def test_run_multiple_symbols(self, MockFeed):
+        mock_feed = self.create_mock_feed(MockFeed)
+
+        from jolteon.app.kraken import KrakenApplication
+
+        application = KrakenApplication(
+            symbol=["BTC-USD", "ETH-USD"],
+            database_name=f"{tempfile.gettempdir()}/unittest.sqlite",
+            logfile_name=f"{tempfile.gettempdir()}/unittest.log",
+            strategy_params=StrategyParameters(),
+        )
+        application._signal_recorder = self.mock_signal_recorder
+
+        # Send one candlestick of ETH/USD while the application is running
+        candlestick = Candlestick(
+            start=datetime(2024, 1, 1, tzinfo=pytz.utc),
+            duration_in_seconds=60,
+        )
+        mock_feed.connect.side_effect = lambda *_: Events().candlestick.send(
+            "ETH/USD", candlestick=candlestick
+        )
+
+        await application.start()
+
+        # One market data connection is shared by all symbols
+        mock_feed.connect.assert_called_once_with(["BTC/USD", "ETH/USD"])
+
+        # Each pipeline only receives market data of its own symbol
+        pipelines = application._pipelines
+        self.assertEqual(["BTC/USD", "ETH/USD"], list(pipelines.keys()))
+        self.assertEqual(
+            0, len(pipelines["BTC/USD"].candlestick_hub.candlesticks)
+        )
+        self.assertEqual(
+            1, len(pipelines["ETH/USD"].candlestick_hub.candlesticks)
+        )
+
+        # Position limits of all pipelines share the positions of the app
+        for pipeline in pipelines.values():
+            limits = pipeline.strategy._pre_trade_check.limits
+            self.assertEqual(
+                [application._position_manager],
+                [
+                    x.position_manager
+                    for x in limits
+                    if isinstance(x, MaxPositionLimit)
+                ],
+            )
+            self.assertEqual(
+                [application._position_manager.drawdown],
+                [
+                    x.drawdown
+                    for x in limits
+                    if isinstance(x, MaxDrawdownLimit)
+                ],
+            )
+
+    @patch.dict(os.environ, {"KRAKEN_API_KEY": "api_key"})
+    @patch.dict(os.environ, {"KRAKEN_API_SECRET": "api_secret"})
+    @patch("jolteon.app.kraken.PublicFeed")
+    async def test_run_shards(self, MockFeed):
+        mock_feed = self.create_mock_feed(MockFeed)
+
+        from jolteon.app.kraken import KrakenApplication
+
+        application = KrakenApplication(
+            symbol=["BTC-USD", "ETH-USD"],
+            database_name=f"{tempfile.gettempdir()}/unittest.sqlite",
+            logfile_name=f"{tempfile.gettempdir()}/unittest.log",
+            strategy_params=StrategyParameters(),
+            shards=2,
+        )
+        application._signal_recorder = self.mock_signal_recorder
+
+        def send_market_trades(*_):
+            for i, symbol in enumerate(["BTC/USD", "ETH/USD", "ETH/USD"]):
+                Events().market_trade.send(
+                    symbol,
+                    market_trade=Trade(
+                        trade_id=i,
+                        client_order_id="",
+                        symbol=symbol,
+                        maker_order_id="",
+                        taker_order_id="",
+                        side=MarketSide.BUY,
+                        price=1.0,
+                        fee=0.0,
+                        quantity=1.0,
+                        transaction_time=datetime.now(tz=pytz.utc),
+                    ),
+                )
+
+        mock_feed.connect.side_effect = send_market_trades
+
+        await application.start()
+
+        # Strategies are traded by the worker processes
+        self.assertEqual({}, application._pipelines)
+        self.assertEqual({0: 1, 1: 2}, application._shard_coordinator.stopped)
+
+    @patch("jolteon.app.kraken.PublicFeed")
+    async def test_request_stop(self, MockFeed):
+        mock_feed = self.create_mock_feed(MockFeed)
+
+        async def receive_forever(*_):
+            await asyncio.sleep(3600)
+
+        mock_feed.connect.side_effect = receive_forever
+
+        # Stop from another thread, e.g. a signal handler
+        threading.Timer(0.1, self.application.request_stop).start()
+        started_at = time.monotonic()
+        await self.application.start()
+
+        self.assertLess(time.monotonic() - started_at, 1)
+        self.mock_signal_recorder.stop_recording.assert_called_once()
+
+    @patch("jolteon.app.kraken.PublicFeed")
+    async def test_market_data_error(self, MockFeed):
+        mock_feed = self.create_mock_feed(MockFeed)
+        mock_feed.connect.side_effect = Exception("Connection lost")
+
+        with self.assertRaises(Exception):
+            await self.application.start()
+
+        # Recorded data is still saved
+        self.mock_signal_recorder.stop_recording.assert_called_once()
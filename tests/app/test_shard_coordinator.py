@@ -0,0 +1,387 @@
+import asyncio
+import multiprocessing
+import queue
+import time
+import unittest
+from collections import deque
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytz
+
+from jolteon.app.shard_coordinator import ShardCoordinator
+from jolteon.app.shard_worker import ShardConfig, ShardWorker
+from jolteon.core.event.signal_manager import SignalManager
+from jolteon.core.health_monitor.heartbeat import Heartbeat, HeartbeatLevel
+from jolteon.core.id_generator import id_generator
+from jolteon.core.side import MarketSide
+from jolteon.core.time.time_manager import time_manager
+from jolteon.execution.kraken.mock_execution_service import (
+    MockExecutionService,
+)
+from jolteon.market_data.core.order import Order, OrderType
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.core.trade_ring_buffer import TradeRingBuffer
+from jolteon.market_data.data_source import IDataSource
+from jolteon.position.position_manager import PositionManager
+from jolteon.strategy.bull_trend_rider.strategy_parameters import (
+    StrategyParameters,
+)
+from jolteon.strategy.core.patterns.bull_flag.parameters import (
+    BullFlagParameters,
+)
+from jolteon.strategy.core.patterns.shooting_star.parameters import (
+    ShootingStarParameters,
+)
+
+
+class TestShardCoordinator(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.symbols = ["BTC/USD", "ETH/USD", "SOL/USD"]
+        self.config = ShardConfig(
+            candlestick_interval_in_seconds=60,
+            bull_flag_params=BullFlagParameters(),
+            shooting_star_params=ShootingStarParameters(),
+            strategy_params=StrategyParameters(),
+            execution_service_type=MockExecutionService,
+            replay=True,
+        )
+        self.start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+
+    async def asyncTearDown(self):
+        SignalManager.disconnect_all()
+        id_generator().reset()
+
+    def create_trade(self, i: int, symbol: str, side=MarketSide.UNKNOWN):
+        return Trade(
+            trade_id=i,
+            client_order_id="",
+            symbol=symbol,
+            maker_order_id="",
+            taker_order_id="",
+            side=side,
+            price=40000.0 + i,
+            fee=0.0,
+            quantity=1.0,
+            transaction_time=self.start_time + timedelta(seconds=i),
+        )
+
+    async def test_split_symbols(self):
+        coordinator = ShardCoordinator(self.symbols, n_shards=2)
+        self.assertEqual(
+            [["BTC/USD", "SOL/USD"], ["ETH/USD"]], coordinator.shard_symbols
+        )
+
+        # At most one shard per symbol
+        coordinator = ShardCoordinator(self.symbols, n_shards=5)
+        self.assertEqual(3, len(coordinator.shard_symbols))
+
+    async def test_trade_in_worker_processes(self):
+        coordinator = ShardCoordinator(self.symbols, n_shards=2)
+        coordinator.connect()
+        coordinator.start(self.config)
+
+        for i in range(90):
+            coordinator.on_market_trade(
+                "", self.create_trade(i, self.symbols[i % 3])
+            )
+        await coordinator.stop()
+
+        self.assertEqual({0: 60, 1: 30}, coordinator.stopped)
+        self.assertEqual(1, len(coordinator._issues))
+
+    async def test_worker_process_exits(self):
+        coordinator = ShardCoordinator(self.symbols, n_shards=2)
+        coordinator.start(
+            ShardConfig(
+                candlestick_interval_in_seconds=60,
+                bull_flag_params=BullFlagParameters(),
+                shooting_star_params=ShootingStarParameters(),
+                strategy_params=StrategyParameters(),
+            )
+        )
+        await coordinator.stop()
+
+        self.assertEqual({0: 0, 1: 0}, coordinator.stopped)
+        self.assertEqual(
+            HeartbeatLevel.CRITICAL, coordinator._issues[-1].level
+        )
+        self.assertTrue(
+            coordinator._issues[-1].message.startswith(
+                ShardCoordinator.ErrorCode.SHARD_EXITED.value
+            )
+        )
+
+    @patch.object(ShardCoordinator, "STOP_TIMEOUT_IN_SECONDS", 0.1)
+    async def test_terminate_worker_not_stopping(self):
+        coordinator = ShardCoordinator(["BTC/USD"], n_shards=1)
+        # A worker which is alive but never reads market trades or stops
+        context = multiprocessing.get_context("spawn")
+        process = context.Process(target=time.sleep, args=(60,), daemon=True)
+        process.start()
+        coordinator._outbox = context.Queue()
+        coordinator._processes.append(process)
+
+        await asyncio.wait_for(coordinator.stop(), timeout=10)
+
+        self.assertFalse(process.is_alive())
+        self.assertEqual({0: 0}, coordinator.stopped)
+        self.assertEqual(
+            HeartbeatLevel.CRITICAL, coordinator._issues[-1].level
+        )
+        self.assertTrue(
+            coordinator._issues[-1].message.startswith(
+                ShardCoordinator.ErrorCode.SHARD_TERMINATED.value
+            )
+        )
+
+    async def test_share_account_drawdown(self):
+        position_manager = PositionManager()
+        position_manager.connect()
+        coordinator = ShardCoordinator(
+            self.symbols, n_shards=2, position_manager=position_manager
+        )
+        coordinator._account_drawdown = multiprocessing.Value("d", 0.0)
+
+        # Fills of one shard change the drawdown checked by every shard
+        coordinator._on_message(
+            ShardWorker.Message.FILL,
+            self.create_trade(10, "ETH/USD", MarketSide.BUY),
+        )
+        market_trade = self.create_trade(0, "ETH/USD", MarketSide.SELL)
+        position_manager.on_market_trade("", market_trade)
+        self.assertEqual(10.0, position_manager.drawdown())
+        coordinator.on_market_trade("", market_trade)
+        self.assertEqual(10.0, coordinator._account_drawdown.value)
+
+    async def test_forward_fills_and_heartbeats(self):
+        coordinator = ShardCoordinator(self.symbols, n_shards=2)
+        position_manager = PositionManager()
+        position_manager.connect()
+        heartbeats = list[Heartbeat]()
+
+        def on_heartbeat(_, heartbeat: Heartbeat):
+            heartbeats.append(heartbeat)
+
+        coordinator.heartbeat_signal().connect(on_heartbeat)
+
+        coordinator._on_message(
+            ShardWorker.Message.FILL,
+            self.create_trade(1, "ETH/USD", MarketSide.BUY),
+        )
+        coordinator._on_message(
+            ShardWorker.Message.HEARTBEAT,
+            Heartbeat(sender="Shard-1/MockExecutionService"),
+        )
+        coordinator._on_message(ShardWorker.Message.STOPPED, (1, 10))
+
+        self.assertEqual(1.0, position_manager.positions["ETH/USD"].volume)
+        self.assertEqual(
+            ["Shard-1/MockExecutionService"], [x.sender for x in heartbeats]
+        )
+        self.assertEqual({1: 10}, coordinator.stopped)
+
+    async def test_queue_market_trades_while_ring_buffer_is_full(self):
+        coordinator = ShardCoordinator(["BTC/USD"], n_shards=1)
+        # Attach a small ring buffer without starting the worker
+        producer = TradeRingBuffer(["BTC/USD"], capacity=2)
+        consumer = TradeRingBuffer(["BTC/USD"], name=producer.name)
+        coordinator._ring_buffers.append(producer)
+        coordinator._pending_trades.append(deque[Trade]())
+        self.addCleanup(producer.release)
+        self.addCleanup(consumer.release)
+
+        # Never waits for the worker
+        for i in range(5):
+            coordinator.on_market_trade("", self.create_trade(i, "BTC/USD"))
+        self.assertEqual(2, len(producer))
+        self.assertEqual(3, len(coordinator._pending_trades[0]))
+
+        # Queued market trades are forwarded as the worker reads
+        received = consumer.get()
+        drain = asyncio.create_task(coordinator.drain())
+        while not drain.done():
+            received.extend(consumer.get())
+            await asyncio.sleep(0.001)
+        received.extend(consumer.get())
+
+        self.assertEqual(
+            [self.create_trade(i, "BTC/USD") for i in range(5)], received
+        )
+        self.assertEqual(0, len(coordinator._pending_trades[0]))
+        self.assertEqual(1, len(coordinator._issues))
+
+    @patch.object(ShardCoordinator, "STALL_TIMEOUT_IN_SECONDS", 0.01)
+    async def test_stalled_worker(self):
+        coordinator = ShardCoordinator(["BTC/USD"], n_shards=1)
+        producer = TradeRingBuffer(["BTC/USD"], capacity=1)
+        coordinator._ring_buffers.append(producer)
+        coordinator._pending_trades.append(deque[Trade]())
+        self.addCleanup(producer.release)
+
+        for i in range(3):
+            coordinator.on_market_trade("", self.create_trade(i, "BTC/USD"))
+        await asyncio.wait_for(coordinator.drain(), timeout=1)
+
+        # Market trades of a stalled shard are dropped
+        self.assertEqual({0}, coordinator._stalled)
+        self.assertEqual(0, len(coordinator._pending_trades[0]))
+        self.assertEqual(HeartbeatLevel.ERROR, coordinator._issues[-1].level)
+        self.assertTrue(
+            coordinator._issues[-1].message.startswith(
+                ShardCoordinator.ErrorCode.SHARD_STALLED.value
+            )
+        )
+        coordinator.on_market_trade("", self.create_trade(3, "BTC/USD"))
+        self.assertEqual(0, len(coordinator._pending_trades[0]))
+
+
+class TestShardWorker(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.symbols = ["BTC/USD", "ETH/USD"]
+        self.ring_buffer = TradeRingBuffer(self.symbols)
+        self.outbox = queue.Queue()
+        self.worker = ShardWorker(
+            ShardConfig(
+                candlestick_interval_in_seconds=60,
+                bull_flag_params=BullFlagParameters(),
+                shooting_star_params=ShootingStarParameters(),
+                strategy_params=StrategyParameters(),
+                execution_service_type=MockExecutionService,
+                replay=True,
+                index=1,
+                n_shards=2,
+                symbols=self.symbols,
+                ring_buffer_name=self.ring_buffer.name,
+            ),
+            self.outbox,
+        )
+
+    async def asyncTearDown(self):
+        self.ring_buffer.release()
+        SignalManager.disconnect_all()
+        id_generator().reset()
+
+    async def test_run(self):
+        start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        for i in range(120):
+            self.ring_buffer.put(
+                Trade(
+                    trade_id=i,
+                    client_order_id="",
+                    symbol=self.symbols[i % 2],
+                    maker_order_id="",
+                    taker_order_id="",
+                    side=MarketSide.BUY,
+                    price=40000.0,
+                    fee=0.0,
+                    quantity=1.0,
+                    transaction_time=start_time + timedelta(seconds=i),
+                )
+            )
+        self.ring_buffer.close()
+
+        await self.worker.run()
+
+        messages = [self.outbox.get() for _ in range(self.outbox.qsize())]
+        self.assertEqual((ShardWorker.Message.STOPPED, (1, 120)), messages[-1])
+        self.assertFalse(time_manager().is_using_fake_time())
+        for pipeline in self.worker.pipelines.values():
+            self.assertEqual(2, len(pipeline.candlestick_hub.candlesticks))
+
+        # Ids of different shards never collide
+        self.assertEqual(2, id_generator().next())
+        self.assertEqual(4, id_generator().next())
+
+    async def test_cache_last_batch_of_market_trades(self):
+        start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        batches = [
+            [
+                Trade(
+                    trade_id=i,
+                    client_order_id="",
+                    symbol=self.symbols[0],
+                    maker_order_id="",
+                    taker_order_id="",
+                    side=MarketSide.BUY,
+                    price=40000.0 + i,
+                    fee=0.0,
+                    quantity=1.0,
+                    transaction_time=start_time + timedelta(seconds=i),
+                )
+                for i in range(j * 10, j * 10 + 10)
+            ]
+            for j in range(2)
+        ]
+        keys = [
+            (
+                self.symbols[0],
+                batch[0].transaction_time,
+                batch[-1].transaction_time,
+            )
+            for batch in batches
+        ]
+        self.addCleanup(IDataSource.TRADE_CACHE.pop, keys[1], None)
+        for batch in batches:
+            self.worker._cache_market_trades(batch)
+
+        # Market trades before the last batch are not cached, so orders
+        # are filled at different prices than in a single process
+        self.assertNotIn(keys[0], IDataSource.TRADE_CACHE)
+        self.assertEqual(batches[1], IDataSource.TRADE_CACHE[keys[1]])
+        order = Order(
+            client_order_id="1",
+            order_type=OrderType.MARKET_ORDER,
+            symbol=self.symbols[0],
+            price=None,
+            quantity=1.0,
+            side=MarketSide.BUY,
+            creation_time=batches[1][5].transaction_time,
+        )
+        self.assertEqual(
+            40015.0,
+            MockExecutionService._get_closest_market_trade_price(order),
+        )
+
+    async def test_check_account_drawdown(self):
+        account_drawdown = multiprocessing.Value("d", 0.0)
+        worker = ShardWorker(
+            replace(self.worker._config, strategy_params=StrategyParameters()),
+            self.outbox,
+            account_drawdown,
+        )
+        buy = Order(
+            client_order_id="1",
+            order_type=OrderType.MARKET_ORDER,
+            symbol=self.symbols[0],
+            price=None,
+            quantity=0.0001,
+            side=MarketSide.BUY,
+            creation_time=datetime(2024, 1, 1, tzinfo=pytz.utc),
+        )
+        pre_trade_check = worker.pipelines[
+            self.symbols[0]
+        ].strategy._pre_trade_check
+        self.assertTrue(pre_trade_check.can_send(buy))
+
+        # Drawdown of other shards stops buying in this shard
+        account_drawdown.value = StrategyParameters().max_drawdown
+        self.assertFalse(pre_trade_check.can_send(buy))
+
+    async def test_forward_heartbeats(self):
+        self.worker.on_heartbeat(None, Heartbeat(sender=self.worker._name))
+        self.worker.on_heartbeat(
+            None,
+            Heartbeat(
+                level=HeartbeatLevel.WARN,
+                sender="HistoricalFeed",
+                message="DOWNLOADING",
+            ),
+        )
+
+        _, heartbeat = self.outbox.get()
+        self.assertEqual("Shard-1", heartbeat.sender)
+        _, heartbeat = self.outbox.get()
+        self.assertEqual("Shard-1/HistoricalFeed", heartbeat.sender)
+        self.assertEqual(HeartbeatLevel.WARN, heartbeat.level)
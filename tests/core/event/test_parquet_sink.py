@@ -0,0 +1,106 @@
+import atexit
+import os
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+from jolteon.core.event.parquet_sink import ParquetSink
+from jolteon.core.event.signal import signal
+from jolteon.core.event.signal_recorder import SignalRecorder
+
+
+class TestParquetSink(unittest.TestCase):
+    def setUp(self):
+        self.sink = ParquetSink("parquet")
+        self.day1 = datetime(2024, 1, 1, 12, tzinfo=pytz.utc)
+        self.day2 = datetime(2024, 1, 2, 12, tzinfo=pytz.utc)
+        self.sink.write(
+            "market_trade_feed",
+            pd.DataFrame(
+                {
+                    "trade_id": [1, 2],
+                    "side": ["BUY", "SELL"],
+                    "price": [100.0, 101.0],
+                    "transaction_time": [
+                        self.day1.timestamp(),
+                        self.day2.timestamp(),
+                    ],
+                    "timestamp": [
+                        self.day1.timestamp(),
+                        self.day2.timestamp(),
+                    ],
+                }
+            ),
+        )
+
+    def test_write_partitions_by_day(self):
+        self.assertEqual(
+            ["date=2024-01-01", "date=2024-01-02"],
+            sorted(os.listdir("parquet/signal=market_trade_feed")),
+        )
+
+    def test_read_keeps_column_types(self):
+        df = ParquetSink.read("parquet", "market_trade_feed")
+
+        self.assertEqual(2, len(df))
+        self.assertEqual("int64", df["trade_id"].dtype)
+        self.assertEqual("float64", df["price"].dtype)
+        self.assertEqual(pd.Timestamp(self.day1), df["timestamp"][0])
+        self.assertEqual(pd.Timestamp(self.day2), df["transaction_time"][1])
+
+    def test_read_selected_columns(self):
+        df = ParquetSink.read(
+            "parquet", "market_trade_feed", columns=["trade_id", "price"]
+        )
+        self.assertEqual(["trade_id", "price"], list(df.columns))
+
+    def test_read_time_range(self):
+        df = ParquetSink.read(
+            "parquet",
+            "market_trade_feed",
+            start_time=datetime(2024, 1, 2, tzinfo=pytz.utc),
+        )
+        self.assertEqual([2], df["trade_id"].tolist())
+
+        df = ParquetSink.read(
+            "parquet",
+            "market_trade_feed",
+            end_time=datetime(2024, 1, 1, 12),
+        )
+        self.assertEqual([1], df["trade_id"].tolist())
+
+    def test_read_files_with_different_columns(self):
+        self.sink.write(
+            "market_trade_feed",
+            pd.DataFrame(
+                {
+                    "trade_id": [3],
+                    "fee": [0.1],
+                    "timestamp": [self.day2.timestamp()],
+                }
+            ),
+        )
+        df = ParquetSink.read("parquet", "market_trade_feed")
+
+        self.assertEqual([1, 2, 3], sorted(df["trade_id"].tolist()))
+        self.assertEqual(1, df["fee"].notna().sum())
+
+    def test_read_missing_signal(self):
+        self.assertTrue(ParquetSink.read("parquet", "unknown").empty)
+
+
+class TestSignalRecorderWithParquet(unittest.TestCase):
+    def test_save_as_parquet(self):
+        signal_c = signal("signal_c")
+        recorder = SignalRecorder("recorder.sqlite", parquet_directory="out")
+        recorder.start_recording()
+
+        signal_c.send(signal_c, message={"a": 1, "b": {"c": "x"}})
+        recorder.stop_recording()
+        atexit.unregister(recorder.stop_recording)
+
+        df = ParquetSink.read("out", "signal_c")
+        self.assertEqual([1], df["a"].tolist())
+        self.assertEqual(["x"], df["b.c"].tolist())
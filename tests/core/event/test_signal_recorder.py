@@ -3,6 +3,7 @@ import os
 import random
 import sqlite3
 import tempfile
+import threading
 import unittest
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
@@ -131,6 +132,44 @@ class TestSignalRecorder(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(event_a3, expected_event_a)
         self.assertEqual(event_b3, expected_event_b)
 
+    @freeze_time("2024-01-01 00:00:30 UTC")
+    async def test_handle_payload_sent_by_symbol(self):
+        class Payload:
+            PRIMARY_KEY = "payload_id"
+
+            def __init__(self, payload_id: int):
+                self.payload_id = payload_id
+
+        # Payloads of different symbols may share the same primary key
+        self.signal_a.send("BTC/USD", payload=Payload(1))
+        self.signal_a.send("ETH/USD", payload=Payload(1))
+        self.signal_a.send("ETH/USD", payload=Payload(1))
+
+        self.assertEqual(
+            [
+                {
+                    "payload_id": 1,
+                    "symbol": "BTC/USD",
+                    "timestamp": 1704067230.0,
+                },
+                {
+                    "payload_id": 1,
+                    "symbol": "ETH/USD",
+                    "timestamp": 1704067230.0,
+                },
+            ],
+            self.signal_recorder._events["signal_a"],
+        )
+
+    async def test_skip_batch_payload(self):
+        self.signal_recorder.start_recording()
+
+        # Payloads of a batch are recorded when they are sent one by one
+        with self.assertNoLogs(level="ERROR"):
+            self.signal_a.send(self.signal_a, payloads=[{"payload": 1}])
+
+        self.assertNotIn("signal_a", self.signal_recorder._events)
+
     async def test_handle_signal_payload_has_no_primary_key(self):
         class SomeEnum(Enum):
             A = 1
@@ -385,6 +424,61 @@ class TestSignalRecorder(unittest.IsolatedAsyncioTestCase):
         await asyncio.sleep(0.2)
         mock_to_sql.assert_called_once()
 
+    @patch("pandas.DataFrame.to_sql")
+    async def test_auto_save_in_another_thread(self, mock_to_sql):
+        saving_threads = []
+
+        def to_sql(*args, **kwargs):
+            saving_threads.append(threading.current_thread().name)
+            # Signals received while saving are kept for the next save
+            self.signal_a.send(self.signal_a, message={"payload": "Signal B"})
+
+        mock_to_sql.side_effect = to_sql
+
+        self.signal_recorder.enable_auto_save(auto_save_interval=0.1)
+        self.signal_a.send(self.signal_a, message={"payload": "Signal A"})
+        await asyncio.sleep(0.15)
+
+        self.assertEqual(1, len(saving_threads))
+        self.assertTrue(saving_threads[0].startswith("SignalRecorder"))
+        self.assertEqual(1, len(self.signal_recorder._events["signal_a"]))
+
+    @patch("pandas.DataFrame.to_sql")
+    async def test_stop_recording_after_saving_in_progress(self, mock_to_sql):
+        saves = []
+
+        def to_sql(*args, **kwargs):
+            saves.append(("start", threading.current_thread().name))
+            sleep(0.1)
+            saves.append(("end", threading.current_thread().name))
+
+        mock_to_sql.side_effect = to_sql
+
+        self.signal_recorder.enable_auto_save(auto_save_interval=0.01)
+        self.signal_a.send(self.signal_a, message={"payload": "Signal A"})
+        await asyncio.sleep(0.05)
+        self.signal_a.send(self.signal_a, message={"payload": "Signal B"})
+
+        # The auto save is still running
+        self.assertEqual(1, len(saves))
+        self.signal_recorder.stop_recording()
+
+        # The last save starts after the previous one ends, in the same
+        # thread
+        self.assertEqual(
+            ["start", "end", "start", "end"], [x for x, _ in saves]
+        )
+        self.assertEqual(1, len({name for _, name in saves}))
+        self.assertTrue(saves[0][1].startswith("SignalRecorder"))
+        self.assertIsNone(self.signal_recorder._save_executor)
+
+        # Recording could start again
+        self.signal_recorder.start_recording()
+        self.signal_recorder.enable_auto_save(auto_save_interval=0.01)
+        self.signal_a.send(self.signal_a, message={"payload": "Signal C"})
+        await asyncio.sleep(0.05)
+        self.assertEqual(5, len(saves))
+
     @patch(
         "pandas.DataFrame.to_sql",
         side_effect=[Exception("Other Error"), MagicMock()],
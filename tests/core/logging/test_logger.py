@@ -110,6 +110,26 @@ class TestLogging(unittest.IsolatedAsyncioTestCase):
 
                 self.assert_number_of_logging(2, conn)
 
+    async def test_db_logger_from_another_thread(self):
+        with self.assertLogs(level="DEBUG"):
+            setup_global_logger(
+                logging.DEBUG, logfile_db=self.database_filepath
+            )
+            logging.info("Info Message")
+            await asyncio.sleep(1.01)
+
+            # Threads without an event loop hand the delayed flush over to
+            # the event loop
+            thread = threading.Thread(
+                target=logging.warning, args=("Warning Message",)
+            )
+            thread.start()
+            thread.join()
+            await asyncio.sleep(1.01)
+
+            with closing(sqlite3.connect(self.database_filepath)) as conn:
+                self.assert_number_of_logging(2, conn)
+
     async def test_db_logger_flush_with_no_logging(self):
         """
         Makes sure that the application could gracefully shut down even when
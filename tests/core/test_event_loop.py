@@ -0,0 +1,61 @@
+import asyncio
+import importlib.util
+import os
+import unittest
+from unittest.mock import patch
+
+from jolteon.core.event_loop import EVENT_LOOP_ENV_VARIABLE, EventLoop, run
+
+
+class TestEventLoop(unittest.TestCase):
+    def test_parse_enum_value(self):
+        self.assertEqual(EventLoop.AUTO, EventLoop.parse("auto"))
+        self.assertEqual(EventLoop.ASYNCIO, EventLoop.parse("ASYNCIO"))
+        self.assertEqual(EventLoop.UVLOOP, EventLoop.parse("uvloop"))
+
+        with self.assertRaises(RuntimeError) as context:
+            EventLoop.parse("unknown_loop")
+
+        self.assertEqual(
+            "Unsupported event loop unknown_loop",
+            str(context.exception),
+        )
+
+    def test_parse_from_environment(self):
+        with patch.dict(os.environ, {EVENT_LOOP_ENV_VARIABLE: "auto"}):
+            self.assertEqual(EventLoop.AUTO, EventLoop.parse(None))
+            # The CLI takes precedence over the environment variable
+            self.assertEqual(EventLoop.ASYNCIO, EventLoop.parse("asyncio"))
+
+        with patch.dict(os.environ, clear=True):
+            self.assertEqual(EventLoop.ASYNCIO, EventLoop.parse(None))
+
+    def test_run(self):
+        async def main():
+            await asyncio.sleep(0)
+            return EventLoop.current()
+
+        self.assertEqual(EventLoop.ASYNCIO, run(main(), EventLoop.ASYNCIO))
+        self.assertEqual(EventLoop.available()[-1], run(main(), "auto"))
+
+    @unittest.skipIf(
+        importlib.util.find_spec("uvloop") is None, "uvloop is not installed"
+    )
+    def test_run_uvloop(self):
+        async def main():
+            return EventLoop.current()
+
+        self.assertIn(EventLoop.UVLOOP, EventLoop.available())
+        self.assertEqual(EventLoop.UVLOOP, run(main(), EventLoop.UVLOOP))
+
+    def test_run_uvloop_not_installed(self):
+        async def main():
+            return EventLoop.current()
+
+        with patch("importlib.util.find_spec", return_value=None):
+            self.assertEqual([EventLoop.ASYNCIO], EventLoop.available())
+            self.assertEqual(EventLoop.ASYNCIO, run(main(), EventLoop.AUTO))
+
+        with patch.dict("sys.modules", {"uvloop": None}):
+            with self.assertRaises(RuntimeError):
+                run(main(), EventLoop.UVLOOP)
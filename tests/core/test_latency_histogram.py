@@ -0,0 +1,35 @@
+import math
+import unittest
+
+from jolteon.core.latency_histogram import LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_empty(self):
+        histogram = LatencyHistogram("test")
+        self.assertEqual(0, histogram.count)
+        self.assertTrue(math.isnan(histogram.mean()))
+        self.assertTrue(math.isnan(histogram.percentile(50)))
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram("test")
+        for _ in range(90):
+            histogram.add(0.0008)
+        for _ in range(10):
+            histogram.add(0.3)
+
+        self.assertEqual(100, histogram.count)
+        self.assertAlmostEqual(0.03072, histogram.mean())
+        # Upper bound of the bucket
+        self.assertEqual(0.001, histogram.percentile(50))
+        self.assertEqual(0.001, histogram.percentile(90))
+        # Never more than the max latency
+        self.assertEqual(0.3, histogram.percentile(99))
+        self.assertEqual(0.0008, histogram.summary()["min"])
+        self.assertEqual(0.3, histogram.summary()["max"])
+
+    def test_latency_above_all_buckets(self):
+        histogram = LatencyHistogram("test")
+        histogram.add(100.0)
+        self.assertEqual(1, histogram.counts[-1])
+        self.assertEqual(100.0, histogram.percentile(50))
@@ -0,0 +1,62 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+
+import pytz
+
+from jolteon.core.time.replay_clock import ReplayClock
+
+
+class TestReplayClock(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        self.loop = asyncio.get_running_loop()
+
+    async def test_wait_until(self):
+        clock = ReplayClock(speed=100)
+        started_at = self.loop.time()
+        for i in range(4):
+            await clock.wait_until(self.start_time + timedelta(seconds=i))
+
+        # 3 seconds of replay time at 100x
+        self.assertAlmostEqual(0.03, self.loop.time() - started_at, delta=0.02)
+
+    async def test_catch_up_without_waiting(self):
+        clock = ReplayClock(speed=1)
+        await clock.wait_until(self.start_time)
+        await asyncio.sleep(0.05)
+
+        started_at = self.loop.time()
+        await clock.wait_until(self.start_time + timedelta(seconds=0.01))
+        self.assertLess(self.loop.time() - started_at, 0.01)
+
+    async def test_other_tasks_run_while_waiting(self):
+        clock = ReplayClock(speed=1)
+        ticks = list[int]()
+
+        async def tick():
+            for i in range(3):
+                ticks.append(i)
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(tick())
+        await clock.wait_until(self.start_time)
+        await clock.wait_until(self.start_time + timedelta(seconds=0.05))
+        await task
+
+        self.assertEqual([0, 1, 2], ticks)
+
+    def test_parse(self):
+        self.assertIsNone(ReplayClock.parse(None))
+        self.assertIsNone(ReplayClock.parse("MAX"))
+        self.assertEqual(1.0, ReplayClock.parse("1"))
+        self.assertEqual(10.0, ReplayClock.parse("10x"))
+        self.assertEqual(0.5, ReplayClock.parse("0.5X"))
+
+        for value in ["fast", "0", "-1x"]:
+            with self.assertRaises(RuntimeError) as context:
+                ReplayClock.parse(value)
+
+            self.assertEqual(
+                f"Unsupported replay speed {value}", str(context.exception)
+            )
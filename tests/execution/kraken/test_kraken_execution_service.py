@@ -1,12 +1,17 @@
 import asyncio
 import os
+import threading
+from dataclasses import replace
 from datetime import datetime
+from functools import partial
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import patch, MagicMock
 
 import pytz
 
 from jolteon.core.side import MarketSide
+from jolteon.execution.kraken.mock_private_feed import MockPrivateFeedServer
+from jolteon.execution.order_gateway import OrderReject
 from jolteon.market_data.core.order import Order, OrderType
 from jolteon.market_data.core.trade import Trade
 
@@ -28,7 +33,7 @@ class TestExecutionService(IsolatedAsyncioTestCase):
         from jolteon.execution.kraken.execution_service import ExecutionService
 
         self.execution_service = ExecutionService(
-            dry_run=False, poll_interval=0.1
+            dry_run=False, poll_interval=0.1, private_feed_uri=None
         )
         self.mock_order = Order(
             client_order_id="123",
@@ -113,6 +118,7 @@ class TestExecutionService(IsolatedAsyncioTestCase):
             },
         }
         self.fills = list[Trade]()
+        self.rejects = list[OrderReject]()
         self.execution_service.order_fill_event.connect(self.on_fill)
 
     async def asyncTearDown(self):
@@ -121,29 +127,63 @@ class TestExecutionService(IsolatedAsyncioTestCase):
     def on_fill(self, _: str, trade: Trade):
         self.fills.append(trade)
 
-    async def test_on_create_order(self):
-        with patch("requests.post", new_callable=MagicMock) as mock_post:
-            mock_post.return_value = MagicMock()
-            mock_post.return_value.status_code = 200
-            mock_post.return_value.json.return_value = (
-                self.create_order_response
-            )
+    def on_reject(self, _: str, reject: OrderReject):
+        self.rejects.append(reject)
+
+    def record_issue_change(self, method, *args):
+        self.issue_changes.append((threading.get_ident(), args[-1]))
+        return method(*args)
 
+    def mock_post(self, query_orders_status_code: int = 200):
+        def post(url: str, **_):
+            response = MagicMock()
+            if url.endswith("/AddOrder"):
+                response.status_code = 200
+                response.json.return_value = self.create_order_response
+            elif url.endswith("/GetWebSocketsToken"):
+                response.status_code = 200
+                response.json.return_value = {
+                    "error": [],
+                    "result": {"token": MockPrivateFeedServer().token},
+                }
+            else:
+                response.status_code = query_orders_status_code
+                response.json.return_value = (
+                    self.closed_orders_response
+                    if query_orders_status_code == 200
+                    else {}
+                )
+            return response
+
+        return patch(
+            "requests.Session.post", new_callable=MagicMock, side_effect=post
+        )
+
+    @staticmethod
+    def calls_to(mock_post: MagicMock, uri_path: str):
+        return [
+            call
+            for call in mock_post.call_args_list
+            if call[0][0].endswith(uri_path)
+        ]
+
+    async def test_on_create_order(self):
+        with self.mock_post() as mock_post:
             # Act
             self.execution_service.on_order(self, self.mock_order)
 
+            # Order is sent without blocking the caller
+            self.assertEqual(0, len(self.execution_service.order_history))
+            await self.execution_service.order_gateway.join()
+
             # Assert
-            mock_post.assert_called_once()
+            self.assertEqual(1, len(self.calls_to(mock_post, "/AddOrder")))
             self.assertEqual(1, len(self.execution_service.order_history))
             self.assertEqual(
                 self.execution_service.order_history["123"], self.mock_order
             )
-
-        with patch("requests.post", new_callable=MagicMock) as mock_post:
-            mock_post.return_value = MagicMock()
-            mock_post.return_value.status_code = 200
-            mock_post.return_value.json.return_value = (
-                self.closed_orders_response
+            self.assertEqual(
+                1, self.execution_service.order_gateway.latency.count
             )
 
             await asyncio.sleep(self.execution_service._poll_interval + 0.01)
@@ -173,31 +213,263 @@ class TestExecutionService(IsolatedAsyncioTestCase):
                 datetime.fromtimestamp(1688082549.3138, tz=pytz.utc),
             )
 
+            # Completely filled orders are not tracked anymore
+            self.assertEqual({}, self.execution_service._unfilled_orders)
+            self.assertEqual({}, self.execution_service._filled_quantity)
+
     async def test_poll_trades_fail(self):
-        with patch("requests.post", new_callable=MagicMock) as mock_post:
-            mock_post.return_value = MagicMock()
-            mock_post.return_value.status_code = 200
-            mock_post.return_value.json.return_value = (
-                self.create_order_response
+        expired = list[Order]()
+
+        def on_expire(_, order: Order):
+            expired.append(order)
+
+        self.execution_service.order_expire_event.connect(on_expire)
+        with self.mock_post(query_orders_status_code=400) as mock_post:
+            # Act, and trades are polled once the order is acknowledged
+            self.execution_service.on_order(self, self.mock_order)
+            await self.execution_service.order_gateway.join()
+
+            # When get fills fail, it will automatically send another poll
+            # request after _poll_interval second, for 5 more times
+            await asyncio.sleep(self.execution_service._poll_interval * 5.5)
+            self.assertEqual(6, len(self.calls_to(mock_post, "/QueryOrders")))
+
+            await asyncio.sleep(self.execution_service._poll_interval * 2)
+            self.assertEqual(6, len(self.calls_to(mock_post, "/QueryOrders")))
+
+        # Fills of the order are abandoned
+        self.assertEqual([self.mock_order], expired)
+        self.assertEqual({}, self.execution_service._unfilled_orders)
+        self.assertEqual({}, self.execution_service._filled_quantity)
+
+    async def test_order_rejected(self):
+        self.issue_changes = list[tuple[int, str]]()
+        for name in ("add_issue", "remove_issue"):
+            method = getattr(self.execution_service, name)
+            setattr(
+                self.execution_service,
+                name,
+                partial(self.record_issue_change, method),
             )
+        self.execution_service.order_gateway.order_reject_event.connect(
+            self.on_reject
+        )
+        self.create_order_response = {"error": ["EOrder:Insufficient funds"]}
 
-            # Act
+        with self.mock_post() as mock_post:
+            self.execution_service.on_order(self, self.mock_order)
+            await self.execution_service.order_gateway.join()
+
+            self.assertEqual(1, len(self.calls_to(mock_post, "/AddOrder")))
+            self.assertEqual(0, len(self.calls_to(mock_post, "/QueryOrders")))
+
+        self.assertEqual(1, len(self.rejects))
+        self.assertEqual("123", self.rejects[0].client_order_id)
+        self.assertEqual(0, len(self.execution_service.order_history))
+        self.assertEqual({}, self.execution_service._filled_quantity)
+
+        # Issues are only changed in the thread of the event loop
+        await asyncio.sleep(0)
+        self.assertEqual(
+            {threading.get_ident()},
+            {ident for ident, _ in self.issue_changes},
+        )
+        self.assertIn(
+            "CREATE_ORDER_FAILURE",
+            [x.message for x in self.execution_service._issues],
+        )
+
+        with self.mock_post():
+            self.create_order_response = {"error": [], "result": {}}
+            self.execution_service.on_order(self, self.mock_order)
+            await self.execution_service.order_gateway.join()
+            await asyncio.sleep(0)
+
+        self.assertEqual(
+            {threading.get_ident()},
+            {ident for ident, _ in self.issue_changes},
+        )
+        self.assertNotIn(
+            "CREATE_ORDER_FAILURE",
+            [x.message for x in self.execution_service._issues],
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "KRAKEN_API_KEY": "api_key",
+            "KRAKEN_API_SECRET": KRAKEN_API_TEST_SECRET,
+        },
+    )
+    async def create_execution_service_with_private_feed(self):
+        from jolteon.execution.kraken.execution_service import ExecutionService
+
+        self.server = MockPrivateFeedServer()
+        self.addAsyncCleanup(self.server.stop)
+        self.execution_service = ExecutionService(
+            dry_run=False,
+            poll_interval=0.1,
+            private_feed_uri=await self.server.start(),
+            reconcile_delay=0.2,
+        )
+        self.execution_service.order_fill_event.connect(self.on_fill)
+
+    async def test_fills_pushed_by_private_feed(self):
+        await self.create_execution_service_with_private_feed()
+
+        with self.mock_post() as mock_post:
+            self.execution_service.on_order(self, self.mock_order)
+            await self.server.wait_for_subscription()
+            await self.server.send_execution(
+                order_id="THVRQM-33VKH-UCI7BS",
+                order_userref=123,
+                last_qty=1.0,
+                last_price=30010.0,
+                fee=26.2,
+            )
+            await asyncio.sleep(0.1)
+
+            self.assertEqual(1, len(self.fills))
+            self.assertEqual("123", self.fills[0].client_order_id)
+            self.assertEqual("BTC-USD", self.fills[0].symbol)
+            self.assertEqual(MarketSide.BUY, self.fills[0].side)
+            self.assertEqual(30010.0, self.fills[0].price)
+            self.assertEqual(26.2, self.fills[0].fee)
+            self.assertEqual(1.0, self.fills[0].quantity)
+
+            # No need to reconcile fills when all are pushed
+            await asyncio.sleep(self.execution_service._reconcile_delay)
+            self.assertEqual(0, len(self.calls_to(mock_post, "/QueryOrders")))
+            self.assertEqual(1, len(self.fills))
+
+    async def test_stop(self):
+        await self.create_execution_service_with_private_feed()
+
+        with self.mock_post():
+            self.execution_service.on_order(self, self.mock_order)
+            await self.server.wait_for_subscription()
+            private_feed_task = self.execution_service._private_feed_task
+            order_gateway_task = self.execution_service.order_gateway._worker
+            self.assertIsNotNone(self.execution_service._client._session)
+
+            self.execution_service.stop()
+            await asyncio.wait([private_feed_task, order_gateway_task])
+
+        self.assertTrue(private_feed_task.cancelled())
+        self.assertTrue(order_gateway_task.cancelled())
+        self.assertIsNone(self.execution_service._private_feed_task)
+        self.assertIsNone(self.execution_service._fill_poller_task)
+        self.assertIsNone(self.execution_service.order_gateway._worker)
+        self.assertIsNone(self.execution_service._client._session)
+
+    async def test_reconcile_missing_fills(self):
+        await self.create_execution_service_with_private_feed()
+
+        with self.mock_post() as mock_post:
             self.execution_service.on_order(self, self.mock_order)
+            await self.server.wait_for_subscription()
+            await self.server.send_execution(
+                order_id="THVRQM-33VKH-UCI7BS",
+                order_userref=123,
+                last_qty=0.5,
+                last_price=30010.0,
+            )
+            await asyncio.sleep(0.1)
+            self.assertEqual(1, len(self.fills))
 
-        with patch("requests.post", new_callable=MagicMock) as mock_post:
-            tiny_time_advance = 1e-10
+            # Polling only sends the quantity not pushed by the websocket
+            await asyncio.sleep(self.execution_service._reconcile_delay)
+            self.assertEqual(1, len(self.calls_to(mock_post, "/QueryOrders")))
+            self.assertEqual(2, len(self.fills))
+            self.assertEqual(0.5, self.fills[1].quantity)
+            self.assertEqual(27732.0, self.fills[1].price)
 
-            mock_post.return_value = MagicMock()
-            mock_post.return_value.status_code = 400
-            mock_post.return_value.json.return_value = {}
+            # Late executions of a completely filled order are ignored
+            await self.server.send_execution(
+                order_id="THVRQM-33VKH-UCI7BS",
+                order_userref=123,
+                last_qty=0.5,
+                last_price=30010.0,
+            )
+            await asyncio.sleep(0.1)
+            self.assertEqual(2, len(self.fills))
 
-            for i in range(0, 6):
-                # When get fills fail, it will automatically send another poll
-                # request after _poll_interval second
-                mock_post.reset_mock()
-                await asyncio.sleep(self.execution_service._poll_interval)
-                mock_post.assert_called_once()
+    async def test_poll_outstanding_orders_together(self):
+        # Orders acknowledged within the reconcile delay are polled together
+        await self.create_execution_service_with_private_feed()
+        orders = [
+            replace(self.mock_order, client_order_id=str(i), price=100 + i)
+            for i in range(3)
+        ]
+        closed_order = self.closed_orders_response["result"][
+            "THVRQM-33VKH-UCI7BS"
+        ]
 
-            mock_post.reset_mock()
-            await asyncio.sleep(tiny_time_advance)
-            mock_post.assert_not_called()
+        def post(url: str, data: dict, **_):
+            response = MagicMock()
+            response.status_code = 200
+            if url.endswith("/AddOrder"):
+                response.json.return_value = {
+                    "error": [],
+                    "result": {"txid": [f"TXID-{data['userref']}"]},
+                }
+            elif url.endswith("/GetWebSocketsToken"):
+                response.json.return_value = {
+                    "error": [],
+                    "result": {"token": self.server.token},
+                }
+            else:
+                response.json.return_value = {
+                    "error": [],
+                    "result": {
+                        transaction_id: {
+                            **closed_order,
+                            "vol_exec": "1.0",
+                            "price": transaction_id[-1],
+                        }
+                        for transaction_id in data["txid"].split(",")
+                    },
+                }
+            return response
+
+        with patch(
+            "requests.Session.post", new_callable=MagicMock, side_effect=post
+        ) as mock_post:
+            for order in orders:
+                self.execution_service.on_order(self, order)
+            await self.execution_service.order_gateway.join()
+            await asyncio.sleep(self.execution_service._reconcile_delay + 0.1)
+
+            query_orders = self.calls_to(mock_post, "/QueryOrders")
+            self.assertEqual(1, len(query_orders))
+            self.assertEqual(
+                "TXID-0,TXID-1,TXID-2", query_orders[0][1]["data"]["txid"]
+            )
+
+        self.assertEqual(3, len(self.fills))
+        for i, fill in enumerate(self.fills):
+            self.assertEqual(str(i), fill.client_order_id)
+            self.assertEqual(float(i), fill.price)
+            self.assertEqual(1.0, fill.quantity)
+
+    def test_batch_pending_fills(self):
+        pending_fills = [
+            self.execution_service.PendingFill(
+                order=self.mock_order,
+                transaction_ids=[f"TXID-{i}"] * (i % 3 + 1),
+                poll_after=0,
+            )
+            for i in range(60)
+        ]
+
+        batches = self.execution_service._batch_pending_fills(pending_fills)
+
+        self.assertEqual(
+            pending_fills, [fill for batch in batches for fill in batch]
+        )
+        for batch in batches:
+            self.assertLessEqual(
+                sum(len(fill.transaction_ids) for fill in batch),
+                self.execution_service.MAX_TRANSACTION_IDS_PER_QUERY,
+            )
+        self.assertEqual(3, len(batches))
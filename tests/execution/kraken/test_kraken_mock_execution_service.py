@@ -1,4 +1,5 @@
 import uuid
+from dataclasses import replace
 from datetime import datetime
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import MagicMock, patch
@@ -16,6 +17,7 @@ from jolteon.market_data.data_source import IDataSource
 
 class TestMockExecutionService(IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
+        IDataSource.TRADE_CACHE.clear()
         self.fills = list[Trade]()
         self.execution_service = MockExecutionService()
         self.execution_service.order_fill_event.connect(self.on_fill)
@@ -30,7 +32,7 @@ class TestMockExecutionService(IsolatedAsyncioTestCase):
         )
 
     async def asyncTearDown(self):
-        pass
+        IDataSource.TRADE_CACHE.clear()
 
     def on_fill(self, _: str, trade: Trade):
         self.fills.append(trade)
@@ -102,3 +104,40 @@ class TestMockExecutionService(IsolatedAsyncioTestCase):
 
         self.assertEqual(len(self.fills), 1)
         self.assertEqual(self.fills[0].fee, 50000 * 0.0001 * 0.0026)
+
+    async def test_on_order_with_cache_of_other_symbols(self):
+        def create_trade(symbol: str, price: float):
+            return Trade(
+                trade_id=1,
+                client_order_id="",
+                symbol=symbol,
+                maker_order_id=str(uuid.uuid4()),
+                taker_order_id=str(uuid.uuid4()),
+                side=MarketSide.BUY,
+                price=price,
+                fee=0.0,
+                quantity=1.0,
+                transaction_time=self.mock_order.creation_time,
+            )
+
+        timestamp = self.mock_order.creation_time.timestamp()
+        IDataSource.TRADE_CACHE[("ETH/USD", timestamp)] = [
+            create_trade("ETH/USD", 3000.0),
+        ]
+        IDataSource.TRADE_CACHE[("BTC/USD", timestamp)] = [
+            create_trade("BTC/USD", 50000.0),
+        ]
+        IDataSource.TRADE_CACHE[("SOL/USD", timestamp)] = [
+            create_trade("SOL/USD", 100.0),
+        ]
+
+        self.execution_service.on_order(self, self.mock_order)
+        self.execution_service.on_order(
+            self, replace(self.mock_order, symbol="SOL/USD")
+        )
+
+        self.assertEqual(len(self.fills), 2)
+        self.assertEqual(self.fills[0].symbol, "BTC/USD")
+        self.assertEqual(self.fills[0].price, 50000.0)
+        self.assertEqual(self.fills[1].symbol, "SOL/USD")
+        self.assertEqual(self.fills[1].price, 100.0)
@@ -0,0 +1,200 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from jolteon.core.side import MarketSide
+from jolteon.execution.kraken.mock_private_feed import MockPrivateFeedServer
+from jolteon.execution.kraken.private_feed import PrivateFeed
+from jolteon.execution.kraken.rest_client import KrakenRESTClient
+from jolteon.market_data.core.trade import Trade
+
+
+class TestPrivateFeed(IsolatedAsyncioTestCase):
+    # KRAKEN_API_SECRET comes from Kraken's API documentation. It is not a real
+    # one.
+    KRAKEN_API_TEST_SECRET = (
+        "kQH5HW/8p1uGOVjbgWA7FunAmGO8lsSUXNsu3eow76sz84Q18"
+        "fWxnyRzBHCd3pd5nE9qa99HAZtuZuj6F1huXg=="
+    )
+
+    @patch.dict(
+        os.environ,
+        {
+            "KRAKEN_API_KEY": "api_key",
+            "KRAKEN_API_SECRET": KRAKEN_API_TEST_SECRET,
+        },
+    )
+    async def asyncSetUp(self):
+        self.server = MockPrivateFeedServer()
+        self.uri = await self.server.start()
+        self.private_feed = PrivateFeed(
+            KrakenRESTClient(), self.on_execution, uri=self.uri
+        )
+        self.executions = list[tuple[str, Trade]]()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    def on_execution(self, exchange_order_id: str, trade: Trade):
+        self.executions.append((exchange_order_id, trade))
+
+    @staticmethod
+    def mock_token(token: str):
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"error": [], "result": {"token": token}}
+        return patch("requests.Session.post", return_value=response)
+
+    def test_decode_execution(self):
+        self.private_feed._decode_message(
+            {
+                "channel": "executions",
+                "type": "update",
+                "data": [
+                    MockPrivateFeedServer.execution(
+                        order_id="OK4GJX-KSTLS-7DZZO5",
+                        order_userref=3,
+                        last_qty=0.0001,
+                        last_price=26999.7,
+                        side="sell",
+                        trade_id=365573,
+                        fee=0.0432,
+                        timestamp="2023-09-22T10:33:05.709993Z",
+                    ),
+                    {
+                        "order_id": "OK4GJX-KSTLS-7DZZO5",
+                        "exec_type": "filled",
+                        "order_status": "filled",
+                    },
+                ],
+            }
+        )
+
+        self.assertEqual(1, len(self.executions))
+        exchange_order_id, trade = self.executions[0]
+        self.assertEqual("OK4GJX-KSTLS-7DZZO5", exchange_order_id)
+        self.assertEqual(365573, trade.trade_id)
+        self.assertEqual("3", trade.client_order_id)
+        self.assertEqual("BTC/USD", trade.symbol)
+        self.assertEqual(MarketSide.SELL, trade.side)
+        self.assertEqual(26999.7, trade.price)
+        self.assertEqual(0.0432, trade.fee)
+        self.assertEqual(0.0001, trade.quantity)
+        self.assertEqual(
+            datetime(2023, 9, 22, 10, 33, 5, 709993, tzinfo=timezone.utc),
+            trade.transaction_time,
+        )
+
+    def test_decode_error(self):
+        self.private_feed._decode_message({"error": "EAPI:Invalid token"})
+
+        self.assertEqual(0, len(self.executions))
+        self.assertFalse(self.private_feed.subscribed)
+        self.assertEqual(
+            PrivateFeed.ErrorCode.CONNECTION_LOST.value,
+            self.private_feed._issues[-1].message,
+        )
+
+    async def test_receive_executions(self):
+        with self.mock_token(self.server.token) as mock_post:
+            task = asyncio.create_task(self.private_feed.connect_once())
+            await self.server.wait_for_subscription()
+
+        self.assertTrue(
+            mock_post.call_args[0][0].endswith("/GetWebSocketsToken")
+        )
+
+        await self.server.send_execution(
+            order_id="OK4GJX-KSTLS-7DZZO5",
+            order_userref=3,
+            last_qty=0.5,
+            last_price=100.0,
+        )
+        await asyncio.sleep(0.1)
+
+        self.assertTrue(self.private_feed.subscribed)
+        self.assertEqual(1, len(self.executions))
+        self.assertEqual(0.5, self.executions[0][1].quantity)
+        task.cancel()
+
+    async def test_invalid_token(self):
+        with self.mock_token("invalid-token"):
+            task = asyncio.create_task(self.private_feed.connect_once())
+            await asyncio.sleep(0.1)
+
+        await self.server.send_execution(
+            order_id="OK4GJX-KSTLS-7DZZO5",
+            order_userref=3,
+            last_qty=0.5,
+            last_price=100.0,
+        )
+        await asyncio.sleep(0.1)
+
+        self.assertFalse(self.private_feed.subscribed)
+        self.assertEqual(0, len(self.executions))
+        self.assertEqual(
+            PrivateFeed.ErrorCode.CONNECTION_LOST.value,
+            self.private_feed._issues[-1].message,
+        )
+        task.cancel()
+
+    async def test_reconnect_with_backoff(self):
+        n_attempts = 7
+        # Fails to connect until cancelled
+        side_effect = [ConnectionRefusedError()] * (n_attempts - 1) + [
+            asyncio.CancelledError()
+        ]
+        with patch.object(
+            self.private_feed, "connect_once", side_effect=side_effect
+        ) as mock_connect_once, patch(
+            "asyncio.sleep", new_callable=AsyncMock
+        ) as mock_sleep:
+            with self.assertRaises(asyncio.CancelledError):
+                await self.private_feed.connect(
+                    retry_interval_in_seconds=1,
+                    max_retry_interval_in_seconds=10,
+                )
+
+        # Keeps reconnecting, with exponentially increasing delays
+        self.assertEqual(n_attempts, mock_connect_once.call_count)
+        self.assertEqual(
+            [1, 2, 4, 8, 10, 10],
+            [call.args[0] for call in mock_sleep.call_args_list],
+        )
+
+        # The disconnection is reported once
+        self.assertEqual(
+            [PrivateFeed.ErrorCode.CONNECTION_LOST.value],
+            [x.message for x in self.private_feed._issues if x.message],
+        )
+
+    async def test_reset_backoff_after_subscription(self):
+        def connect_once():
+            # Subscribed before the connection is lost
+            self.private_feed._decode_message({"method": "subscribe"})
+            raise ConnectionResetError()
+
+        side_effect = [
+            ConnectionRefusedError(),
+            ConnectionRefusedError(),
+            connect_once,
+            asyncio.CancelledError(),
+        ]
+
+        async def connect_once_or_raise():
+            effect = side_effect.pop(0)
+            if callable(effect):
+                effect()
+            raise effect
+
+        with patch.object(
+            self.private_feed, "connect_once", connect_once_or_raise
+        ), patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            with self.assertRaises(asyncio.CancelledError):
+                await self.private_feed.connect(retry_interval_in_seconds=1)
+
+        self.assertEqual(
+            [1, 2, 1], [call.args[0] for call in mock_sleep.call_args_list]
+        )
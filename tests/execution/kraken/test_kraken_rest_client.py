@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from freezegun import freeze_time
+
+from jolteon.execution.kraken.rest_client import KrakenRESTClient
+
+
+@patch.dict(
+    os.environ,
+    {
+        "KRAKEN_API_KEY": "api_key",
+        # Comes from Kraken's API documentation. It is not a real one.
+        "KRAKEN_API_SECRET": "kQH5HW/8p1uGOVjbgWA7FunAmGO8lsSUXNsu3eow76sz84Q18"
+        "fWxnyRzBHCd3pd5nE9qa99HAZtuZuj6F1huXg==",
+    },
+)
+class TestKrakenRESTClient(unittest.IsolatedAsyncioTestCase):
+    def test_signature(self):
+        client = KrakenRESTClient()
+        signature = client._create_signature(
+            "/0/private/AddOrder",
+            {
+                "nonce": "1616492376594",
+                "ordertype": "limit",
+                "pair": "XBTUSD",
+                "price": 37500,
+                "type": "buy",
+                "volume": 1.25,
+            },
+        )
+        self.assertEqual(
+            "4/dpxb3iT4tp/ZCVEwSnEsLxx0bqyhLpdfOpc6fn7OR8+UClSV5n9E6aSS8MPtnRf"
+            "p32bAb0nmbRn6H8ndwLUQ==",
+            signature,
+        )
+
+    @freeze_time("2024-01-01 00:00:00 UTC")
+    def test_send_requests_with_one_session(self):
+        client = KrakenRESTClient(timeout=(1.0, 2.0))
+        with patch("requests.Session") as MockSession:
+            session = MockSession.return_value
+            session.post.return_value = MagicMock(status_code=200)
+
+            client.send_request("/0/private/AddOrder", {})
+            client.send_request("/0/private/AddOrder", {})
+            client.send_request("/0/private/QueryOrders", {})
+
+            MockSession.assert_called_once()
+            self.assertEqual(3, session.post.call_count)
+
+            # Nonces are increasing even in the same millisecond
+            nonces = [
+                int(call.kwargs["data"]["nonce"])
+                for call in session.post.call_args_list
+            ]
+            self.assertEqual([nonces[0], nonces[0] + 1, nonces[0] + 2], nonces)
+            for call in session.post.call_args_list:
+                self.assertEqual((1.0, 2.0), call.kwargs["timeout"])
+
+            self.assertEqual(2, client.latency["/0/private/AddOrder"].count)
+            self.assertEqual(1, client.latency["/0/private/QueryOrders"].count)
+
+            client.close()
+            session.close.assert_called_once()
+
+    async def test_send_request_async(self):
+        client = KrakenRESTClient()
+        with patch("requests.Session") as MockSession:
+            session = MockSession.return_value
+            session.post.return_value = MagicMock(status_code=200)
+
+            response = await client.send_request_async(
+                "/0/private/QueryOrders", {}
+            )
+
+            self.assertIs(session.post.return_value, response)
+
+    def test_send_requests_in_order_of_nonces(self):
+        client = KrakenRESTClient()
+        with patch("requests.Session") as MockSession:
+            received_nonces = list[int]()
+
+            def post(*_, data: dict, **__):
+                # A slow request doesn't let later nonces overtake it
+                time.sleep(0.001)
+                received_nonces.append(int(data["nonce"]))
+                return MagicMock(status_code=200)
+
+            MockSession.return_value.post.side_effect = post
+
+            threads = [
+                threading.Thread(
+                    target=client.send_request,
+                    args=("/0/private/QueryOrders", {}),
+                )
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(8, len(received_nonces))
+            self.assertEqual(sorted(received_nonces), received_nonces)
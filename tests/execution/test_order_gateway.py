@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+import unittest
+from datetime import datetime
+
+from jolteon.core.side import MarketSide
+from jolteon.execution.order_gateway import (
+    OrderAck,
+    OrderGateway,
+    OrderReject,
+)
+from jolteon.market_data.core.order import Order, OrderType
+
+
+class TestOrderGateway(unittest.IsolatedAsyncioTestCase):
+    @staticmethod
+    def create_order(client_order_id: str):
+        return Order(
+            client_order_id=client_order_id,
+            order_type=OrderType.MARKET_ORDER,
+            symbol="BTC-USD",
+            price=None,
+            quantity=1.0,
+            side=MarketSide.BUY,
+            creation_time=datetime(2024, 1, 1),
+        )
+
+    def send(self, order: Order) -> list[str]:
+        time.sleep(0.05)
+        if order.client_order_id == "bad":
+            raise RuntimeError("Insufficient funds")
+        self.sent.append(order.client_order_id)
+        return [f"tx-{order.client_order_id}"]
+
+    def on_ack(self, _: str, ack: OrderAck):
+        self.acks.append(ack)
+
+    def on_reject(self, _: str, reject: OrderReject):
+        self.rejects.append(reject)
+
+    async def asyncSetUp(self):
+        self.sent = list[str]()
+        self.acks = list[OrderAck]()
+        self.rejects = list[OrderReject]()
+        self.gateway = OrderGateway(self.send)
+        self.gateway.order_ack_event.connect(self.on_ack)
+        self.gateway.order_reject_event.connect(self.on_reject)
+
+    async def asyncTearDown(self):
+        self.gateway.stop()
+        self.gateway.order_ack_event.disconnect(self.on_ack)
+        self.gateway.order_reject_event.disconnect(self.on_reject)
+
+    async def test_submit_does_not_block(self):
+        start = time.perf_counter()
+        self.gateway.submit(self.create_order("1"))
+        self.gateway.submit(self.create_order("bad"))
+        self.gateway.submit(self.create_order("2"))
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+        # The event loop keeps running while orders are being sent
+        await asyncio.sleep(0.01)
+        self.assertEqual([], self.acks)
+
+        await self.gateway.join()
+        self.assertEqual(["1", "2"], self.sent)
+        self.assertEqual(
+            ["1", "2"], [ack.client_order_id for ack in self.acks]
+        )
+        self.assertEqual(["tx-1"], self.acks[0].exchange_order_ids)
+        self.assertEqual("Insufficient funds", self.rejects[0].reason)
+        self.assertEqual(3, self.gateway.latency.count)
+        self.assertLessEqual(0.05, self.gateway.latency.min)
+
+    async def test_submit_from_another_thread(self):
+        self.gateway.submit(self.create_order("1"))
+        thread = threading.Thread(
+            target=self.gateway.submit, args=(self.create_order("2"),)
+        )
+        thread.start()
+        thread.join()
+
+        await asyncio.sleep(0.01)
+        await self.gateway.join()
+        self.assertEqual(["1", "2"], self.sent)
@@ -1,7 +1,7 @@
 import os
 import unittest
 from datetime import timedelta
-from unittest.mock import patch, MagicMock, Mock
+from unittest.mock import patch, Mock
 
 from jolteon.core.time.time_manager import time_manager
 from jolteon.market_data.coinbase.data_source import (
@@ -82,7 +82,7 @@ class TestHistoricalFeed(unittest.IsolatedAsyncioTestCase):
         self.data_source._client.get_market_trades.return_value = {
             "trades": [],
         }
-        time_manager().use_fake_time = MagicMock()
+        self.enterContext(patch.object(time_manager(), "use_fake_time"))
         IDataSource.TRADE_CACHE.clear()
 
         # Connect
@@ -0,0 +1,88 @@
+import math
+import statistics
+import unittest
+from datetime import datetime, timedelta
+
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.indicator.indicator_calculator import (
+    IndicatorCalculator,
+    RollingStatistics,
+)
+
+
+class CloseCalculator(IndicatorCalculator):
+    def __init__(self):
+        super().__init__("unittest_close")
+
+    def update(self, candlestick: Candlestick):
+        return candlestick.close if candlestick.close > 0 else None
+
+
+class TestIndicatorCalculator(unittest.TestCase):
+    def setUp(self):
+        self.received = []
+        self.calculator = CloseCalculator()
+        self.calculator.event.connect(self.on_close)
+
+    def tearDown(self):
+        self.calculator.event.disconnect(self.on_close)
+
+    def on_close(self, _: str, unittest_close: float):
+        self.received.append(unittest_close)
+
+    def send(self, minute: int, close: float):
+        self.calculator.on_candlestick(
+            "unittest",
+            Candlestick(
+                start=datetime(2024, 1, 1) + timedelta(minutes=minute),
+                duration_in_seconds=60,
+                open=close,
+                high=close,
+                low=close,
+                close=close,
+            ),
+        )
+
+    def test_update_with_completed_candlesticks(self):
+        self.send(0, 1)
+        self.assertEqual([], self.received)
+
+        # Updates of the same candlestick are merged
+        self.send(1, 2)
+        self.send(1, 3)
+        self.assertEqual([1], self.received)
+
+        self.send(2, 4)
+        self.assertEqual([1, 3], self.received)
+
+    def test_skip_empty_result(self):
+        self.send(0, -1)
+        self.send(1, 2)
+        self.send(2, 3)
+        self.assertEqual([2], self.received)
+
+
+class TestRollingStatistics(unittest.TestCase):
+    def test_sliding_window(self):
+        values = [40000 + (i * 7919 % 101) / 10 for i in range(100)]
+        rolling = RollingStatistics(period=10)
+        for i, value in enumerate(values):
+            rolling.add(value)
+            window = values[max(0, i - 9) : i + 1]  # noqa: E203
+            self.assertAlmostEqual(statistics.mean(window), rolling.mean)
+            self.assertAlmostEqual(
+                statistics.pstdev(window), rolling.std(), places=6
+            )
+            if len(window) > 1:
+                self.assertAlmostEqual(
+                    statistics.stdev(window), rolling.std(ddof=1), places=6
+                )
+
+        self.assertTrue(rolling.is_full())
+
+    def test_std_of_insufficient_values(self):
+        rolling = RollingStatistics(period=3)
+        self.assertTrue(math.isnan(rolling.std()))
+        rolling.add(1.0)
+        self.assertTrue(math.isnan(rolling.std(ddof=1)))
+        self.assertEqual(0.0, rolling.std())
@@ -0,0 +1,125 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.indicator.bollinger_bands import (
+    BollingerBandsCalculator,
+    calculate_bollinger_bands,
+)
+from jolteon.market_data.core.indicator.ema import EMACalculator, calculate_ema
+from jolteon.market_data.core.indicator.macd import (
+    MACDCalculator,
+    calculate_macd,
+)
+from jolteon.market_data.core.indicator.obv import OBVCalculator, calculate_obv
+from jolteon.market_data.core.indicator.sma import SMACalculator, calculate_sma
+from jolteon.market_data.core.indicator.volatility import (
+    VolatilityCalculator,
+    calculate_volatility,
+)
+from jolteon.market_data.core.indicator.vwap import (
+    VWAPCalculator,
+    calculate_vwap,
+)
+
+
+class TestIndicators(unittest.TestCase):
+    def setUp(self):
+        random.seed(7)
+        self.candlesticks = []
+        close = 40000.0
+        for i in range(200):
+            open = close
+            close = open * (1 + random.gauss(0, 0.002))
+            self.candlesticks.append(
+                Candlestick(
+                    start=datetime(2024, 1, 1) + timedelta(minutes=i),
+                    duration_in_seconds=60,
+                    open=open,
+                    high=max(open, close) + random.uniform(0, 10),
+                    low=min(open, close) - random.uniform(0, 10),
+                    close=close,
+                    volume=random.uniform(0, 5),
+                )
+            )
+        # The last candlestick is incomplete and never used
+        self.df = pd.DataFrame(
+            [vars(c) for c in self.candlesticks[:-1]],
+        )
+
+    def stream(self, calculator, field_names):
+        received = []
+
+        def on_indicator(_, **kwargs):
+            (payload,) = kwargs.values()
+            received.append([getattr(payload, n) for n in field_names])
+
+        calculator.event.connect(on_indicator)
+        try:
+            for candlestick in self.candlesticks:
+                calculator.on_candlestick("unittest", candlestick)
+        finally:
+            calculator.event.disconnect(on_indicator)
+        return np.array(received)
+
+    def assert_same(self, streamed: np.ndarray, batch):
+        batch = batch.to_numpy().reshape(len(self.df), -1)
+        # Streaming values are only sent once the indicator is ready
+        batch = batch[~np.isnan(batch).any(axis=1)]
+        self.assertEqual(batch.shape, streamed.shape)
+        np.testing.assert_allclose(streamed, batch, rtol=1e-9, atol=1e-9)
+
+    def test_sma(self):
+        self.assert_same(
+            self.stream(SMACalculator(period=20), ["sma"]),
+            calculate_sma(self.df, period=20),
+        )
+
+    def test_ema(self):
+        self.assert_same(
+            self.stream(EMACalculator(period=20), ["ema"]),
+            calculate_ema(self.df, period=20),
+        )
+
+    def test_vwap(self):
+        self.assert_same(
+            self.stream(VWAPCalculator(), ["vwap"]),
+            calculate_vwap(self.df),
+        )
+
+    def test_bollinger_bands(self):
+        self.assert_same(
+            self.stream(
+                BollingerBandsCalculator(period=20),
+                ["middle", "upper", "lower"],
+            ),
+            calculate_bollinger_bands(self.df, period=20),
+        )
+
+    def test_macd(self):
+        streamed = self.stream(
+            MACDCalculator(), ["macd", "signal", "histogram"]
+        )
+        self.assertEqual(len(self.df) - 26 - 9 + 2, len(streamed))
+        self.assert_same(streamed, calculate_macd(self.df))
+
+    def test_volatility(self):
+        self.assert_same(
+            self.stream(VolatilityCalculator(period=20), ["volatility"]),
+            calculate_volatility(self.df, period=20),
+        )
+
+    def test_obv(self):
+        self.assert_same(
+            self.stream(OBVCalculator(), ["obv"]), calculate_obv(self.df)
+        )
+
+    def test_obv_values(self):
+        self.df = pd.DataFrame(
+            {"close": [10, 11, 11, 9], "volume": [1.0, 2.0, 3.0, 4.0]}
+        )
+        self.assertEqual([0, 2, 2, -2], calculate_obv(self.df).tolist())
@@ -0,0 +1,118 @@
+import unittest
+from datetime import datetime, timedelta
+
+import pytz
+
+from jolteon.core.event.signal import signal
+from jolteon.market_data.core.candlestick import Candlestick
+from jolteon.market_data.core.candlestick_hub import CandlestickHub
+from jolteon.market_data.core.candlestick_list import CandlestickList
+from jolteon.market_data.core.indicator.rsi import RSICalculator
+from jolteon.market_data.core.indicator.sma import SMACalculator
+
+
+class TestCandlestickHub(unittest.TestCase):
+    def setUp(self):
+        self.hub = CandlestickHub("BTC/USD", 60)
+        self.start = datetime(2024, 1, 1, tzinfo=pytz.utc)
+
+    def create_candlestick(self, minute: int, close: float = 100.0):
+        return Candlestick(
+            start=self.start + timedelta(minutes=minute),
+            duration_in_seconds=60,
+            open=100.0,
+            high=max(100.0, close),
+            low=min(100.0, close),
+            close=close,
+        )
+
+    def test_views_share_candlesticks(self):
+        short_view = self.hub.view(max_length=2)
+        long_view = self.hub.view(max_length=5)
+
+        candlesticks = [self.create_candlestick(i) for i in range(4)]
+        for candlestick in candlesticks:
+            short_view.add_candlestick(candlestick)
+            long_view.add_candlestick(candlestick)
+
+        self.assertEqual(4, len(self.hub.candlesticks))
+        self.assertEqual(2, len(short_view))
+        self.assertTrue(short_view.is_full())
+        self.assertEqual(candlesticks[2:], list(short_view.candlesticks))
+        self.assertEqual(candlesticks[2], short_view[0])
+        self.assertEqual(candlesticks[3], short_view[-1])
+        self.assertEqual(candlesticks[1:3], long_view[1:3])
+        self.assertFalse(long_view.is_full())
+        with self.assertRaises(IndexError):
+            _ = short_view[2]
+
+    def test_add_candlestick_once_per_update(self):
+        view_a = self.hub.view(max_length=3)
+        view_b = self.hub.view(max_length=3)
+
+        candlestick = self.create_candlestick(0)
+        self.assertEqual(
+            CandlestickList.AddResult.APPENDED,
+            view_a.add_candlestick(candlestick),
+        )
+        self.assertEqual(
+            CandlestickList.AddResult.APPENDED,
+            view_b.add_candlestick(candlestick),
+        )
+
+        # The candlestick generator resends the same object once updated
+        candlestick.add_trade(101.0, 1.0, self.start + timedelta(seconds=1))
+        self.assertEqual(
+            CandlestickList.AddResult.MERGED,
+            view_b.add_candlestick(candlestick),
+        )
+        self.assertEqual(
+            CandlestickList.AddResult.MERGED,
+            view_a.add_candlestick(candlestick),
+        )
+        self.assertEqual(1, len(self.hub.candlesticks))
+
+    def test_atr(self):
+        view = self.hub.view(max_length=3)
+        candlestick_list = CandlestickList(max_length=3)
+        for i, close in enumerate([100, 105, 98, 110, 103]):
+            candlestick = self.create_candlestick(i, close)
+            view.add_candlestick(candlestick)
+            candlestick_list.add_candlestick(candlestick)
+
+        # A longer view makes the hub keep more candlesticks
+        self.hub.view(max_length=10)
+        self.assertAlmostEqual(candlestick_list.atr(), view.atr())
+        self.assertAlmostEqual(candlestick_list.atr(2), view.atr(2))
+
+    def test_indicator_created_once(self):
+        rsi = self.hub.indicator(RSICalculator, period=3)
+        self.assertIs(rsi, self.hub.indicator(RSICalculator, period=3))
+        self.assertIsNot(rsi, self.hub.indicator(RSICalculator, period=5))
+        self.assertIsNot(rsi, self.hub.indicator(SMACalculator, period=3))
+
+    def test_indicators_read_from_hub(self):
+        received = []
+
+        def on_rsi(_, rsi):
+            received.append(rsi.rsi)
+
+        feed = signal("calculated_candlestick_feed")
+        rsi_signal = signal("rsi")
+        rsi = self.hub.indicator(RSICalculator, period=2)
+        private_rsi = RSICalculator(period=2)
+        self.hub.connect()
+        private_rsi.connect()
+        rsi_signal.connect(on_rsi)
+        try:
+            for i, close in enumerate([100, 102, 101, 104, 103, 106]):
+                feed.send(feed, candlestick=self.create_candlestick(i, close))
+        finally:
+            feed.disconnect(rsi.on_candlestick)
+            feed.disconnect(private_rsi.on_candlestick)
+            rsi_signal.disconnect(on_rsi)
+
+        # Both calculators send the same RSI values
+        self.assertEqual(6, len(received))
+        self.assertEqual(received[0::2], received[1::2])
+        self.assertEqual(4, self.hub.candlesticks.candlesticks.maxlen)
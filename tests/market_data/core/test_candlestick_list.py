@@ -1,3 +1,5 @@
+import math
+import random
 import unittest
 from datetime import datetime, timedelta
 
@@ -7,6 +9,7 @@ from jolteon.market_data.core.candlestick import Candlestick
 from jolteon.market_data.core.candlestick_list import (
     CandlestickList,
 )
+from jolteon.strategy.core.algorithms import calculate_atr
 
 
 class TestCandlestickList(unittest.TestCase):
@@ -105,3 +108,98 @@ class TestCandlestickList(unittest.TestCase):
 
         self.assertTrue(isinstance(atr_result, float))
         self.assertAlmostEqual(atr_result, 6.6666666666666667)
+
+    def test_atr_matches_full_calculation(self):
+        random.seed(42)
+        candlestick_list = CandlestickList(max_length=20)
+        start = datetime(2022, 1, 1, tzinfo=pytz.utc)
+        close = 100.0
+        for i in range(100):
+            # Merge a few updates into each candlestick before moving on
+            for _ in range(random.randint(1, 3)):
+                open = close
+                close = open + random.uniform(-5, 5)
+                candlestick_list.add_candlestick(
+                    Candlestick(
+                        start=start + timedelta(minutes=i),
+                        duration_in_seconds=60,
+                        open=open,
+                        high=max(open, close) + random.uniform(0, 2),
+                        low=min(open, close) - random.uniform(0, 2),
+                        close=close,
+                    )
+                )
+
+            for period in range(1, len(candlestick_list) + 1):
+                self.assertAlmostEqual(
+                    calculate_atr(list(candlestick_list.candlesticks), period),
+                    candlestick_list.atr(period),
+                )
+            self.assertAlmostEqual(
+                calculate_atr(
+                    list(candlestick_list.candlesticks), len(candlestick_list)
+                ),
+                candlestick_list.atr(),
+            )
+
+    def test_atr_with_nan(self):
+        candlestick_list = CandlestickList(max_length=5)
+        for i in range(5):
+            candlestick_list.add_candlestick(
+                Candlestick(
+                    start=datetime(2022, 1, 1, 1, i, tzinfo=pytz.utc),
+                    duration_in_seconds=60,
+                    open=100,
+                    high=math.nan if i == 1 else 110,
+                    low=90,
+                    close=100,
+                )
+            )
+
+        self.assertTrue(math.isnan(candlestick_list.atr()))
+        self.assertAlmostEqual(candlestick_list.atr(period=4), 15.0)
+
+    def test_wilder_atr(self):
+        candlestick_list = CandlestickList(max_length=3, wilder_atr_period=2)
+        true_ranges = [10, 20, 6]
+        close = 100
+        candlestick_list.add_candlestick(
+            Candlestick(
+                start=datetime(2022, 1, 1, 1, 0, tzinfo=pytz.utc),
+                duration_in_seconds=60,
+                open=close,
+                high=close,
+                low=close,
+                close=close,
+            )
+        )
+        self.assertTrue(math.isnan(candlestick_list.wilder_atr()))
+
+        for i, true_range in enumerate(true_ranges):
+            candlestick = Candlestick(
+                start=datetime(2022, 1, 1, 1, i + 1, tzinfo=pytz.utc),
+                duration_in_seconds=60,
+                open=close,
+                high=close + true_range,
+                low=close,
+                close=close,
+            )
+            # An update of the same candlestick shall be replaced
+            candlestick_list.add_candlestick(
+                Candlestick(
+                    start=candlestick.start_time,
+                    duration_in_seconds=60,
+                    open=close,
+                    high=close + 1000,
+                    low=close,
+                    close=close,
+                )
+            )
+            candlestick_list.add_candlestick(candlestick)
+
+        # (10 + 20) / 2 = 15, then (15 * 1 + 6) / 2 = 10.5
+        self.assertAlmostEqual(candlestick_list.wilder_atr(), 10.5)
+
+    def test_wilder_atr_not_enabled(self):
+        with self.assertRaises(AssertionError):
+            CandlestickList(max_length=5).wilder_atr()
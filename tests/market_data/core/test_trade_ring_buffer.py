@@ -0,0 +1,88 @@
+import unittest
+from datetime import datetime, timedelta
+
+import pytz
+
+from jolteon.core.side import MarketSide
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.core.trade_ring_buffer import TradeRingBuffer
+
+
+class TestTradeRingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.symbols = ["BTC/USD", "ETH/USD"]
+        self.producer = TradeRingBuffer(self.symbols, capacity=4)
+        self.consumer = TradeRingBuffer(self.symbols, name=self.producer.name)
+        self.start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+
+    def tearDown(self):
+        self.consumer.release()
+        self.producer.release()
+
+    def create_trade(self, i: int):
+        return Trade(
+            trade_id=i,
+            client_order_id="",
+            symbol=self.symbols[i % 2],
+            maker_order_id="",
+            taker_order_id="",
+            side=MarketSide.BUY if i % 2 else MarketSide.SELL,
+            price=40000.0 + i * 0.1,
+            fee=0.0,
+            quantity=0.001 * i,
+            transaction_time=self.start_time
+            + timedelta(seconds=i, microseconds=123),
+        )
+
+    def test_put_and_get(self):
+        trades = [self.create_trade(i) for i in range(3)]
+        for trade in trades:
+            self.producer.put(trade)
+
+        self.assertEqual(4, self.consumer.capacity)
+        self.assertEqual(3, len(self.consumer))
+        self.assertEqual(trades[:2], self.consumer.get(max_count=2))
+        self.assertEqual(trades[2:], self.consumer.get())
+        self.assertEqual([], self.consumer.get())
+        self.assertEqual(0, len(self.producer))
+
+    def test_wrap_around(self):
+        trades = [self.create_trade(i) for i in range(10)]
+        received = list[Trade]()
+        for trade in trades:
+            self.producer.put(trade)
+            if len(self.producer) == self.producer.capacity:
+                received.extend(self.consumer.get(max_count=3))
+        received.extend(self.consumer.get())
+
+        self.assertEqual(trades, received)
+
+    def test_put_waits_for_consumer(self):
+        for i in range(4):
+            self.producer.put(self.create_trade(i))
+
+        with self.assertRaises(TimeoutError):
+            self.producer.put(self.create_trade(4), timeout=0.01)
+
+        # Nothing is overwritten
+        self.assertEqual(
+            [self.create_trade(i) for i in range(4)], self.consumer.get()
+        )
+
+    def test_try_put(self):
+        for i in range(4):
+            self.assertTrue(self.producer.try_put(self.create_trade(i)))
+        self.assertFalse(self.producer.try_put(self.create_trade(4)))
+
+        self.assertEqual(1, len(self.consumer.get(max_count=1)))
+        self.assertTrue(self.producer.try_put(self.create_trade(4)))
+        self.assertEqual(
+            [self.create_trade(i) for i in range(1, 5)], self.consumer.get()
+        )
+
+    def test_close(self):
+        self.producer.put(self.create_trade(0))
+        self.producer.close()
+
+        self.assertTrue(self.consumer.is_closed())
+        self.assertEqual(1, len(self.consumer.get()))
@@ -8,6 +8,7 @@ from jolteon.market_data.core.trade import Trade
 from jolteon.market_data.data_source import IDataSource
 from jolteon.market_data.historical_feed import HistoricalFeed
 from jolteon.market_data.kraken.data_source import KrakenHistoricalDataSource
+from jolteon.market_data.trade_chunk_store import TradeChunkStore
 
 
 class TestHistoricalFeed(unittest.IsolatedAsyncioTestCase):
@@ -61,7 +62,7 @@ class TestHistoricalFeed(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(self.candlesticks), 2)
 
     async def test_connect_with_empty_trades(self):
-        time_manager().use_fake_time = MagicMock()
+        self.enterContext(patch.object(time_manager(), "use_fake_time"))
         IDataSource.TRADE_CACHE.clear()
 
         # Set up test parameters
@@ -88,7 +89,7 @@ class TestHistoricalFeed(unittest.IsolatedAsyncioTestCase):
         time_manager().use_fake_time.assert_called_once()
 
     async def test_response_with_last_timestamp_equals_request_timestamp(self):
-        time_manager().use_fake_time = MagicMock()
+        self.enterContext(patch.object(time_manager(), "use_fake_time"))
         IDataSource.TRADE_CACHE.clear()
 
         # Set up test parameters
@@ -119,3 +120,163 @@ class TestHistoricalFeed(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(len(self.market_trades), 1)
         self.assertEqual(len(self.candlesticks), 1)
+
+
+class TestKrakenHistoricalDataSource(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        IDataSource.TRADE_CACHE.clear()
+        self.symbol = "BTC/USD"
+        self.start_time = datetime(2023, 1, 1, 1, tzinfo=timezone.utc)
+        self.end_time = datetime(2023, 1, 1, 3, tzinfo=timezone.utc)
+        self.store = TradeChunkStore("kraken", root=".")
+        self.data_source = KrakenHistoricalDataSource(store=self.store)
+
+    def mock_get(self, url: str):
+        # One trade every 30 minutes, returned one page at a time
+        symbol = url.split("pair=")[1].split("&")[0]
+        since = float(url.split("since=")[1])
+        trade_time = (since // 1800 + 1) * 1800 - 1
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {
+            "error": [],
+            "result": {
+                symbol: [
+                    [
+                        50000.0,
+                        1.0,
+                        trade_time,
+                        "b",
+                        "m",
+                        "",
+                        int(trade_time),
+                    ]
+                ],
+                "last": trade_time * 1e9,
+            },
+        }
+        return response
+
+    @patch("asyncio.sleep")
+    async def test_download_saves_completed_chunks(self, _):
+        with patch("requests.get", side_effect=self.mock_get) as mock_get:
+            trades = await self.data_source.download_market_trades(
+                self.symbol, self.start_time, self.end_time
+            )
+
+        self.assertEqual(4, len(trades))
+        self.assertEqual(8, mock_get.call_count)
+        for chunk in self.store.chunks(self.start_time, self.end_time):
+            self.assertTrue(self.store.has(self.symbol, chunk))
+
+        # Trades are served from the store in the next replay
+        IDataSource.TRADE_CACHE.clear()
+        with patch("requests.get", side_effect=self.mock_get) as mock_get:
+            trades_from_store = await self.data_source.download_market_trades(
+                self.symbol, self.start_time, self.end_time
+            )
+
+        mock_get.assert_not_called()
+        self.assertEqual(trades, trades_from_store)
+
+    @patch("asyncio.sleep")
+    async def test_download_resumes_from_last_completed_chunk(self, _):
+        first_chunk = self.store.chunks(self.start_time, self.end_time)[0]
+        self.store.save(self.symbol, first_chunk, [])
+
+        with patch("requests.get", side_effect=self.mock_get) as mock_get:
+            trades = await self.data_source.download_market_trades(
+                self.symbol, self.start_time, self.end_time
+            )
+
+        self.assertEqual(2, len(trades))
+        self.assertEqual(4, mock_get.call_count)
+        self.assertTrue(
+            all(t.transaction_time >= first_chunk.end for t in trades)
+        )
+
+    @patch("asyncio.sleep")
+    async def test_download_does_not_save_partial_chunks(self, _):
+        end_time = self.end_time - timedelta(minutes=10)
+        with patch("requests.get", side_effect=self.mock_get):
+            await self.data_source.download_market_trades(
+                self.symbol, self.start_time, end_time
+            )
+
+        chunks = self.store.chunks(self.start_time, end_time)
+        self.assertTrue(self.store.has(self.symbol, chunks[0]))
+        self.assertFalse(self.store.has(self.symbol, chunks[1]))
+
+    @patch("asyncio.sleep")
+    async def test_stream_yields_one_chunk_at_a_time(self, _):
+        self.data_source.STREAM_CACHE_SIZE = 1
+        chunks = self.store.chunks(self.start_time, self.end_time)
+
+        streamed = []
+        with patch("requests.get", side_effect=self.mock_get):
+            async for trades in self.data_source.stream_market_trades(
+                self.symbol, self.start_time, self.end_time
+            ):
+                streamed.append(trades)
+
+        self.assertEqual(len(chunks), len(streamed))
+        for chunk, trades in zip(chunks, streamed):
+            self.assertEqual(2, len(trades))
+            self.assertTrue(
+                all(
+                    chunk.start <= t.transaction_time < chunk.end
+                    for t in trades
+                )
+            )
+
+        # Only the most recent chunk is kept in the cache
+        self.assertEqual(
+            [(self.symbol, chunks[-1].start, chunks[-1].end, "stream")],
+            list(IDataSource.TRADE_CACHE.keys()),
+        )
+
+    @patch("asyncio.sleep")
+    async def test_stream_caches_chunks_per_symbol(self, _):
+        self.data_source.STREAM_CACHE_SIZE = 1
+        chunks = self.store.chunks(self.start_time, self.end_time)
+
+        with patch("requests.get", side_effect=self.mock_get):
+            btc_stream = self.data_source.stream_market_trades(
+                "BTC/USD", self.start_time, self.end_time
+            )
+            eth_stream = self.data_source.stream_market_trades(
+                "ETH/USD", self.start_time, self.end_time
+            )
+            # Replay both symbols side by side
+            for _ in chunks:
+                await anext(btc_stream)
+                await anext(eth_stream)
+
+        # The most recent chunk of every symbol is kept in the cache
+        self.assertEqual(
+            [
+                ("BTC/USD", chunks[-1].start, chunks[-1].end, "stream"),
+                ("ETH/USD", chunks[-1].start, chunks[-1].end, "stream"),
+            ],
+            sorted(IDataSource.TRADE_CACHE.keys()),
+        )
+
+    @patch("asyncio.sleep")
+    async def test_stream_does_not_cache_partial_chunks_as_ranges(self, _):
+        end_time = self.end_time - timedelta(minutes=10)
+        chunks = self.store.chunks(self.start_time, end_time)
+
+        with patch("requests.get", side_effect=self.mock_get):
+            async for _ in self.data_source.stream_market_trades(
+                self.symbol, self.start_time, end_time
+            ):
+                pass
+
+        # The last chunk is partial and has to be downloaded again
+        with patch("requests.get", side_effect=self.mock_get) as mock_get:
+            trades = await self.data_source.download_market_trades(
+                self.symbol, chunks[-1].start, chunks[-1].end
+            )
+
+        self.assertEqual(4, mock_get.call_count)
+        self.assertEqual(2, len(trades))
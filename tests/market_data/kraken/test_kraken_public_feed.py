@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest.mock import Mock, AsyncMock, patch
 
@@ -261,6 +262,33 @@ class TestPublicFeed(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(6, self.feed.events.market_trade.send.call_count)
         self.assertEqual(15, self.feed.events.candlestick.send.call_count)
 
+    @patch("websockets.connect")
+    async def test_multiple_symbols(self, mock_connect):
+        # Trade ids of different symbols are independent
+        eth_feed = TestPublicFeed.trade_feed_1.replace("BTC/USD", "ETH/USD")
+        mock_websocket = await self.create_mock_websocket(
+            mock_connect, [TestPublicFeed.trade_feed_2, eth_feed]
+        )
+
+        await self.feed.connect(["BTC/USD", "ETH/USD"], max_retries=0)
+
+        # Assertions
+        subscriptions = [
+            json.loads(call.args[0])
+            for call in mock_websocket.__aenter__.return_value.send.mock_calls
+        ]
+        self.assertEqual(2, len(subscriptions))
+        for subscription in subscriptions:
+            self.assertEqual(
+                ["BTC/USD", "ETH/USD"], subscription["params"]["symbol"]
+            )
+
+        senders = [
+            call.args[0]
+            for call in self.feed.events.market_trade.send.mock_calls
+        ]
+        self.assertEqual(["BTC/USD"] * 3 + ["ETH/USD"] * 3, senders)
+
     @patch("websockets.connect")
     async def test_ticker_feed(self, mock_connect):
         mock_websocket = await self.create_mock_websocket(
@@ -0,0 +1,197 @@
+import asyncio
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytz
+
+from jolteon.core.side import MarketSide
+from jolteon.core.time.time_manager import time_manager
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.data_source import IDataSource
+from jolteon.market_data.historical_feed import HistoricalFeed
+
+
+class FakeStreamingDataSource(IDataSource):
+    def __init__(self, chunks: list[list[Trade]], error: bool = False):
+        super().__init__()
+        self.chunks = chunks
+        self.error = error
+        self.yielded = 0
+
+    async def download_market_trades(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ):
+        return sum(self.chunks, [])
+
+    async def stream_market_trades(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ):
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            self.yielded += 1
+            yield chunk
+        if self.error:
+            raise Exception("Download failed")
+
+
+class FakeMultiSymbolDataSource(FakeStreamingDataSource):
+    def __init__(self, chunks: dict[str, list[list[Trade]]]):
+        super().__init__([])
+        self.chunks_by_symbol = chunks
+
+    async def stream_market_trades(
+        self, symbol: str, start_time: datetime, end_time: datetime
+    ):
+        for chunk in self.chunks_by_symbol[symbol]:
+            await asyncio.sleep(0)
+            self.yielded += 1
+            yield chunk
+
+
+class TestHistoricalFeed(unittest.IsolatedAsyncioTestCase):
+    def on_market_trade(self, sender: str, market_trade: Trade):
+        self.senders.append(sender)
+        self.market_trades.append(market_trade)
+        # Number of chunks already downloaded when each trade is replayed
+        self.yielded.append(self.data_source.yielded)
+
+    async def asyncSetUp(self):
+        self.market_trades = []
+        self.senders = []
+        self.yielded = []
+        self.start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        self.end_time = self.start_time + timedelta(hours=1)
+        self.chunks = [
+            [self.create_trade(i * 10 + j) for j in range(10)]
+            for i in range(6)
+        ]
+
+    def create_trade(self, i: int, symbol: str = "BTC/USD"):
+        return Trade(
+            trade_id=i,
+            client_order_id="",
+            symbol=symbol,
+            maker_order_id="",
+            taker_order_id="",
+            side=MarketSide.BUY,
+            price=40000.0 + i,
+            fee=0.0,
+            quantity=1.0,
+            transaction_time=self.start_time + timedelta(seconds=i),
+        )
+
+    def create_feed(
+        self, data_source: IDataSource, prefetch_chunks=2, replay_speed=None
+    ):
+        self.data_source = data_source
+        feed = HistoricalFeed(
+            data_source,
+            prefetch_chunks=prefetch_chunks,
+            replay_speed=replay_speed,
+        )
+        feed.events.market_trade.connect(self.on_market_trade)
+        return feed
+
+    async def test_replay_chunks_in_order(self):
+        feed = self.create_feed(FakeStreamingDataSource(self.chunks))
+        await feed.connect("BTC/USD", self.start_time, self.end_time)
+
+        self.assertEqual(sum(self.chunks, []), self.market_trades)
+        self.assertFalse(time_manager().is_using_fake_time())
+
+    async def test_replay_overlaps_download(self):
+        feed = self.create_feed(
+            FakeStreamingDataSource(self.chunks), prefetch_chunks=1
+        )
+        await feed.connect("BTC/USD", self.start_time, self.end_time)
+
+        # The first trade is replayed before all chunks are downloaded, and
+        # the download never runs too far ahead of the replay.
+        self.assertLess(self.yielded[0], len(self.chunks))
+        for i, yielded in enumerate(self.yielded):
+            self.assertLessEqual(yielded, i // 10 + 3)
+
+    async def test_replay_at_speed(self):
+        feed = self.create_feed(
+            FakeStreamingDataSource(self.chunks), replay_speed=1000
+        )
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        await feed.connect("BTC/USD", self.start_time, self.end_time)
+        elapsed = loop.time() - started_at
+
+        # 59 seconds of market trades at 1000x
+        self.assertEqual(sum(self.chunks, []), self.market_trades)
+        self.assertGreaterEqual(elapsed, 0.059)
+        self.assertLess(elapsed, 0.5)
+        self.assertFalse(time_manager().is_using_fake_time())
+
+    @patch.object(HistoricalFeed, "BACK_PRESSURE_INTERVAL", 4)
+    async def test_replay_with_back_pressure(self):
+        feed = self.create_feed(FakeStreamingDataSource(self.chunks))
+        replayed_before_wait = list[int]()
+
+        async def wait():
+            replayed_before_wait.append(len(self.market_trades))
+
+        feed.use_back_pressure(wait)
+        await feed.connect("BTC/USD", self.start_time, self.end_time)
+
+        # Waits after every 4 market trades of each chunk
+        self.assertEqual(sum(self.chunks, []), self.market_trades)
+        self.assertEqual(
+            [i * 10 + j for i in range(6) for j in (3, 7)],
+            replayed_before_wait,
+        )
+
+    async def test_replay_filters_and_sorts_each_chunk(self):
+        chunks = [list(reversed(chunk)) for chunk in self.chunks]
+        feed = self.create_feed(FakeStreamingDataSource(chunks))
+        await feed.connect(
+            "BTC/USD", self.start_time, self.start_time + timedelta(seconds=9)
+        )
+
+        self.assertEqual(self.chunks[0], self.market_trades)
+
+    async def test_download_error_is_raised(self):
+        feed = self.create_feed(
+            FakeStreamingDataSource(self.chunks, error=True)
+        )
+        with self.assertRaises(Exception):
+            await feed.connect("BTC/USD", self.start_time, self.end_time)
+
+        self.assertEqual(sum(self.chunks, []), self.market_trades)
+        self.assertFalse(time_manager().is_using_fake_time())
+
+    async def test_replay_multiple_symbols_in_time_order(self):
+        # ETH/USD trades fall in between BTC/USD trades, and are downloaded
+        # in chunks of a different size
+        eth_trades = [
+            replace(self.create_trade(i, "ETH/USD"), trade_id=100 + i)
+            for i in range(5, 60, 10)
+        ]
+        feed = self.create_feed(
+            FakeMultiSymbolDataSource(
+                {
+                    "BTC/USD": self.chunks,
+                    "ETH/USD": [eth_trades[:4], eth_trades[4:]],
+                }
+            )
+        )
+        await feed.connect(
+            ["BTC/USD", "ETH/USD"], self.start_time, self.end_time
+        )
+
+        self.assertEqual(66, len(self.market_trades))
+        self.assertEqual(
+            sorted(
+                self.market_trades,
+                key=lambda trade: trade.transaction_time,
+            ),
+            self.market_trades,
+        )
+        self.assertEqual(
+            [trade.symbol for trade in self.market_trades], self.senders
+        )
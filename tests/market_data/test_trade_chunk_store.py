@@ -0,0 +1,91 @@
+import os
+import unittest
+from datetime import datetime, timedelta
+
+import pytz
+
+from jolteon.core.side import MarketSide
+from jolteon.core.time.time_range import TimeRange
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.trade_chunk_store import TradeChunkStore
+
+
+class TestTradeChunkStore(unittest.TestCase):
+    def setUp(self):
+        self.store = TradeChunkStore("unittest", root=".")
+        self.chunk = TimeRange(
+            datetime(2024, 1, 1, 1, tzinfo=pytz.utc),
+            datetime(2024, 1, 1, 2, tzinfo=pytz.utc),
+        )
+        self.trades = [
+            Trade(
+                trade_id=i,
+                client_order_id="",
+                symbol="BTC/USD",
+                maker_order_id="",
+                taker_order_id="",
+                side=MarketSide.BUY if i % 2 else MarketSide.SELL,
+                price=40000.0 + i,
+                fee=0.0,
+                quantity=0.1 * i,
+                transaction_time=self.chunk.start + timedelta(minutes=i),
+            )
+            for i in range(1, 4)
+        ]
+
+    def test_chunks_are_aligned(self):
+        chunks = self.store.chunks(
+            datetime(2024, 1, 1, 1, 30, tzinfo=pytz.utc),
+            datetime(2024, 1, 1, 3, 0, tzinfo=pytz.utc),
+        )
+        self.assertEqual(2, len(chunks))
+        self.assertEqual(self.chunk.start, chunks[0].start)
+        self.assertEqual(self.chunk.end, chunks[0].end)
+        self.assertEqual(self.chunk.end, chunks[1].start)
+        self.assertEqual(
+            datetime(2024, 1, 1, 3, 0, tzinfo=pytz.utc), chunks[1].end
+        )
+
+    def test_chunks_with_custom_interval(self):
+        store = TradeChunkStore("unittest", chunk_interval_in_minutes=15)
+        chunks = store.chunks(
+            datetime(2024, 1, 1, 1, 20, tzinfo=pytz.utc),
+            datetime(2024, 1, 1, 1, 31, tzinfo=pytz.utc),
+        )
+        self.assertEqual(2, len(chunks))
+        self.assertEqual(
+            datetime(2024, 1, 1, 1, 15, tzinfo=pytz.utc), chunks[0].start
+        )
+        self.assertEqual(
+            datetime(2024, 1, 1, 1, 45, tzinfo=pytz.utc), chunks[1].end
+        )
+
+    def test_unsupported_chunk_interval(self):
+        with self.assertRaises(AssertionError):
+            TradeChunkStore("unittest", chunk_interval_in_minutes=7)
+
+    def test_save_and_load(self):
+        self.assertFalse(self.store.has("BTC/USD", self.chunk))
+
+        self.store.save("BTC/USD", self.chunk, self.trades)
+
+        self.assertTrue(self.store.has("BTC/USD", self.chunk))
+        self.assertTrue(
+            os.path.exists("unittest/BTC-USD/20240101T0100.csv"),
+        )
+        self.assertEqual(self.trades, self.store.load("BTC/USD", self.chunk))
+
+    def test_save_and_load_empty_chunk(self):
+        self.store.save("BTC/USD", self.chunk, [])
+
+        self.assertTrue(self.store.has("BTC/USD", self.chunk))
+        self.assertEqual([], self.store.load("BTC/USD", self.chunk))
+
+    def test_save_trades_outside_chunk(self):
+        with self.assertRaises(AssertionError):
+            self.store.save(
+                "BTC/USD",
+                TimeRange(self.chunk.end, self.chunk.end + timedelta(hours=1)),
+                self.trades,
+            )
+        self.assertFalse(os.path.exists("unittest/BTC-USD"))
@@ -0,0 +1,221 @@
+import sqlite3
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from jolteon.core.side import MarketSide
+from jolteon.market_data.core.trade import Trade
+from jolteon.market_data.data_source import DatabaseDataSource
+from jolteon.market_data.trade_file import TradeFile
+
+
+class TestTradeFile(unittest.TestCase):
+    def setUp(self):
+        self.start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        self.trades = [
+            Trade(
+                trade_id=i,
+                client_order_id="",
+                symbol="BTC/USD",
+                maker_order_id="",
+                taker_order_id="",
+                side=MarketSide.BUY if i % 2 else MarketSide.SELL,
+                price=40000.0 + i * 0.1,
+                fee=0.0,
+                quantity=0.001 * i,
+                transaction_time=self.start_time
+                + timedelta(seconds=i, microseconds=123),
+            )
+            for i in range(100)
+        ]
+        TradeFile.write(
+            "trades.bin",
+            "BTC/USD",
+            TradeFile.to_records(self.trades),
+            block_size=8,
+        )
+
+    def test_write_and_read(self):
+        trade_file = TradeFile("trades.bin")
+
+        self.assertTrue(TradeFile.is_trade_file("trades.bin"))
+        self.assertIsInstance(trade_file.records, np.memmap)
+        self.assertEqual("BTC/USD", trade_file.symbol)
+        self.assertEqual(100, len(trade_file))
+        self.assertEqual(self.trades, trade_file.to_trades(trade_file.records))
+        self.assertEqual(
+            self.trades[0].transaction_time, trade_file.start_time()
+        )
+        self.assertEqual(
+            self.trades[-1].transaction_time, trade_file.end_time()
+        )
+
+    def test_write_unsorted_records(self):
+        TradeFile.write(
+            "unsorted.bin",
+            "BTC/USD",
+            TradeFile.to_records(list(reversed(self.trades))),
+            block_size=8,
+        )
+        trade_file = TradeFile("unsorted.bin")
+        self.assertEqual(self.trades, trade_file.to_trades(trade_file.records))
+
+    def test_slice(self):
+        trade_file = TradeFile("trades.bin")
+
+        records = trade_file.slice(
+            self.trades[13].transaction_time,
+            self.trades[42].transaction_time,
+        )
+        self.assertEqual(self.trades[13:43], trade_file.to_trades(records))
+        self.assertEqual(
+            0, len(trade_file.slice(self.start_time, self.start_time))
+        )
+        self.assertEqual(
+            0,
+            len(
+                trade_file.slice(
+                    self.start_time + timedelta(hours=1),
+                    self.start_time + timedelta(hours=2),
+                )
+            ),
+        )
+
+    def test_iter_blocks(self):
+        trade_file = TradeFile("trades.bin")
+
+        blocks = list(
+            trade_file.iter_blocks(
+                self.start_time, self.start_time + timedelta(seconds=19.5)
+            )
+        )
+        self.assertEqual([8, 8, 4], [len(block) for block in blocks])
+        self.assertEqual(
+            self.trades[:20],
+            sum([trade_file.to_trades(block) for block in blocks], []),
+        )
+
+    def test_empty_file(self):
+        TradeFile.write("empty.bin", "BTC/USD", TradeFile.to_records([]))
+        trade_file = TradeFile("empty.bin")
+
+        self.assertEqual(0, len(trade_file))
+        self.assertEqual(
+            0,
+            len(
+                trade_file.slice(
+                    self.start_time, self.start_time + timedelta(hours=1)
+                )
+            ),
+        )
+
+    def test_not_a_trade_file(self):
+        with open("text.txt", "w") as f:
+            f.write("Hello World")
+
+        self.assertFalse(TradeFile.is_trade_file("text.txt"))
+        self.assertFalse(TradeFile.is_trade_file("missing.bin"))
+        with self.assertRaises(AssertionError):
+            TradeFile("text.txt")
+
+    def test_to_dataframe(self):
+        trade_file = TradeFile("trades.bin")
+        df = trade_file.to_dataframe(trade_file.records[:2])
+
+        self.assertEqual(["SELL", "BUY"], df["side"].tolist())
+        self.assertEqual([0, 1], df["trade_id"].tolist())
+        self.assertEqual(
+            pd.Timestamp("2024-01-01 00:00:01.000123"),
+            df["transaction_time"][1],
+        )
+
+    def test_convert_database(self):
+        df = pd.DataFrame(
+            [
+                {
+                    "trade_id": trade.trade_id,
+                    "client_order_id": "",
+                    "symbol": trade.symbol,
+                    "maker_order_id": "",
+                    "taker_order_id": "",
+                    "side": trade.side.value,
+                    "price": trade.price,
+                    "fee": 0.0,
+                    "quantity": trade.quantity,
+                    "transaction_time": trade.transaction_time.timestamp(),
+                }
+                for trade in reversed(self.trades)
+            ]
+        )
+        conn = sqlite3.connect("replay.sqlite")
+        df.to_sql("market_trade_feed", con=conn, index=False)
+        conn.close()
+
+        count = TradeFile.convert_database(
+            "replay.sqlite", "converted.bin", chunk_size=30
+        )
+
+        self.assertEqual(100, count)
+        trade_file = TradeFile("converted.bin")
+        self.assertEqual(self.trades, trade_file.to_trades(trade_file.records))
+
+
+class TestDatabaseDataSourceWithTradeFile(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        self.trades = [
+            Trade(
+                trade_id=i,
+                client_order_id="",
+                symbol="BTC/USD",
+                maker_order_id="",
+                taker_order_id="",
+                side=MarketSide.BUY,
+                price=40000.0,
+                fee=0.0,
+                quantity=1.0,
+                transaction_time=self.start_time + timedelta(seconds=i),
+            )
+            for i in range(10)
+        ]
+        TradeFile.write(
+            "trades.bin",
+            "BTC/USD",
+            TradeFile.to_records(self.trades),
+            block_size=4,
+        )
+        self.data_source = DatabaseDataSource("trades.bin")
+
+    async def test_start_and_end_time(self):
+        self.assertEqual(self.start_time, self.data_source.start_time())
+        self.assertEqual(
+            self.trades[-1].transaction_time, self.data_source.end_time()
+        )
+
+    async def test_download_market_trades(self):
+        trades = await self.data_source.download_market_trades(
+            "BTC/USD", self.start_time, self.start_time + timedelta(seconds=5)
+        )
+        self.assertEqual(self.trades[:6], trades)
+
+    async def test_stream_market_trades(self):
+        chunks = [
+            chunk
+            async for chunk in self.data_source.stream_market_trades(
+                "BTC/USD", self.start_time, self.trades[-1].transaction_time
+            )
+        ]
+        self.assertEqual([4, 4, 2], [len(chunk) for chunk in chunks])
+        self.assertEqual(self.trades, sum(chunks, []))
+
+    async def test_open_on_first_read(self):
+        # Nothing is read when the data source is created
+        data_source = DatabaseDataSource("later.bin")
+        TradeFile.write(
+            "later.bin", "BTC/USD", TradeFile.to_records(self.trades)
+        )
+
+        self.assertEqual(self.start_time, data_source.start_time())
@@ -111,3 +111,51 @@ class TestPositionManager(unittest.IsolatedAsyncioTestCase):
             AssertionError,
             "^Trade has an invalid trade side",
         )
+
+    async def test_drawdown(self):
+        position_manager = PositionManager()
+        position_manager.on_market_trade(
+            "_", self.create_trade(MarketSide.BUY, "BTC", 10.0, 1.0)
+        )
+        position_manager.on_fill(
+            "_", self.create_trade(MarketSide.BUY, "BTC", 10.0, 2.0)
+        )
+        # Buying only costs the fee
+        self.assertEqual(-1.0, position_manager.equity())
+        self.assertEqual(1.0, position_manager.drawdown())
+
+        position_manager.on_market_trade(
+            "_", self.create_trade(MarketSide.SELL, "BTC", 15.0, 1.0)
+        )
+        self.assertEqual(9.0, position_manager.peak_equity)
+        self.assertEqual(0.0, position_manager.drawdown())
+
+        position_manager.on_market_trade(
+            "_", self.create_trade(MarketSide.SELL, "BTC", 12.0, 1.0)
+        )
+        self.assertEqual(6.0, position_manager.drawdown())
+        self.assertEqual(2.0, position_manager.positions["BTC"].bought_volume)
+
+    async def test_equity_of_several_symbols(self):
+        position_manager = PositionManager()
+        position_manager.on_fill(
+            "_", self.create_trade(MarketSide.BUY, "BTC", 10.0, 2.0)
+        )
+        position_manager.on_fill(
+            "_", self.create_trade(MarketSide.BUY, "ETH", 5.0, 1.0)
+        )
+        # Marked to cost until a market price is known
+        self.assertEqual(-2.0, position_manager.equity())
+
+        position_manager.on_market_trade(
+            "_", self.create_trade(MarketSide.BUY, "ETH", 7.0, 1.0)
+        )
+        position_manager.on_market_trade(
+            "_", self.create_trade(MarketSide.BUY, "SOL", 100.0, 1.0)
+        )
+        self.assertEqual(0.0, position_manager.equity())
+
+        position_manager.on_fill(
+            "_", self.create_trade(MarketSide.SELL, "ETH", 7.0, 1.0)
+        )
+        self.assertEqual(-1.0, position_manager.equity())
@@ -0,0 +1,56 @@
+import unittest
+from datetime import datetime
+
+from freezegun import freeze_time
+
+from jolteon.core.side import MarketSide
+from jolteon.market_data.core.order import Order, OrderType
+from jolteon.position.position_manager import PositionManager
+from jolteon.risk_limit.notional_limit import NotionalLimit
+
+
+class TestNotionalLimit(unittest.TestCase):
+    @staticmethod
+    def create_order(price, quantity: float):
+        return Order(
+            client_order_id="1",
+            order_type=OrderType.MARKET_ORDER,
+            symbol="BTC-USD",
+            price=price,
+            quantity=quantity,
+            side=MarketSide.BUY,
+            creation_time=datetime(2022, 1, 1),
+        )
+
+    def setUp(self):
+        self.position_manager = PositionManager()
+        self.limit = NotionalLimit(
+            self.position_manager, max_notional=1000.0, in_seconds=10
+        )
+
+    @freeze_time("2022-01-01 00:00:00 UTC")
+    def test_can_send(self):
+        order = self.create_order(price=100.0, quantity=6.0)
+        self.assertTrue(self.limit.can_send(order))
+        self.limit.do_send(order)
+        self.assertEqual(600.0, self.limit.notional)
+        self.assertFalse(self.limit.can_send(order))
+        self.assertTrue(self.limit.can_send(self.create_order(100.0, 4.0)))
+
+        # Expired orders no longer count
+        with freeze_time("2022-01-01 00:00:10 UTC"):
+            self.assertTrue(self.limit.can_send(order))
+            self.assertEqual(0, len(self.limit.orders))
+            self.assertEqual(0.0, self.limit.notional)
+
+    @freeze_time("2022-01-01 00:00:00 UTC")
+    def test_market_order_valued_at_last_price(self):
+        order = self.create_order(price=None, quantity=2.0)
+
+        # Can't value a market order without any market price
+        self.assertFalse(self.limit.can_send(order))
+
+        self.position_manager.last_prices["BTC-USD"] = 600.0
+        self.assertFalse(self.limit.can_send(order))
+        self.position_manager.last_prices["BTC-USD"] = 500.0
+        self.assertTrue(self.limit.can_send(order))
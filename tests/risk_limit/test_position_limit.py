@@ -0,0 +1,147 @@
+import unittest
+from datetime import datetime
+
+from jolteon.core.side import MarketSide
+from jolteon.execution.order_gateway import OrderReject
+from jolteon.market_data.core.order import Order, OrderType
+from jolteon.market_data.core.trade import Trade
+from jolteon.position.position_manager import PositionManager
+from jolteon.risk_limit.position_limit import (
+    MaxDrawdownLimit,
+    MaxPositionLimit,
+)
+
+
+class TestPositionLimit(unittest.TestCase):
+    @staticmethod
+    def create_order(
+        side: MarketSide, quantity: float = 1.0, client_order_id: str = "1"
+    ):
+        return Order(
+            client_order_id=client_order_id,
+            order_type=OrderType.MARKET_ORDER,
+            symbol="BTC-USD",
+            price=None,
+            quantity=quantity,
+            side=side,
+            creation_time=datetime(2022, 1, 1),
+        )
+
+    @staticmethod
+    def create_trade(
+        side: MarketSide,
+        price: float,
+        quantity: float = 1.0,
+        client_order_id: str = "1",
+    ):
+        return Trade(
+            trade_id=1,
+            client_order_id=client_order_id,
+            symbol="BTC-USD",
+            maker_order_id="1",
+            taker_order_id="2",
+            side=side,
+            price=price,
+            fee=0.0,
+            quantity=quantity,
+            transaction_time=datetime(2022, 1, 1),
+        )
+
+    def setUp(self):
+        self.position_manager = PositionManager()
+
+    def fill(self, limit: MaxPositionLimit, trade: Trade):
+        self.position_manager.on_fill("_", trade)
+        limit.on_fill("_", trade)
+
+    def test_max_position(self):
+        limit = MaxPositionLimit(self.position_manager, max_volume=2.0)
+        buys = [
+            self.create_order(MarketSide.BUY, client_order_id=str(i))
+            for i in range(2)
+        ]
+        sell = self.create_order(MarketSide.SELL, client_order_id="2")
+
+        for buy in buys:
+            limit.do_send(buy)
+        # Orders not filled yet count toward the position
+        self.assertEqual(2.0, limit.volume("BTC-USD"))
+        self.assertFalse(limit.can_send(buys[0]))
+        self.assertTrue(limit.can_send(sell))
+
+        # Partially filled
+        self.fill(
+            limit,
+            self.create_trade(MarketSide.BUY, 10.0, 0.5, client_order_id="0"),
+        )
+        self.assertEqual(2.0, limit.volume("BTC-USD"))
+        for buy in buys:
+            self.fill(
+                limit,
+                self.create_trade(
+                    MarketSide.BUY,
+                    10.0,
+                    0.5 if buy.client_order_id == "0" else 1.0,
+                    client_order_id=buy.client_order_id,
+                ),
+            )
+        self.assertEqual(2.0, limit.volume("BTC-USD"))
+        self.assertFalse(limit.can_send(buys[0]))
+        self.assertEqual({}, limit._unfilled_buys)
+
+        self.fill(
+            limit,
+            self.create_trade(MarketSide.SELL, 10.0, client_order_id="2"),
+        )
+        self.assertEqual(1.0, limit.volume("BTC-USD"))
+        self.assertTrue(limit.can_send(buys[0]))
+
+    def test_rejected_and_expired_buys(self):
+        limit = MaxPositionLimit(self.position_manager, max_volume=2.0)
+        buys = [
+            self.create_order(MarketSide.BUY, client_order_id=str(i))
+            for i in range(3)
+        ]
+        limit.do_send(buys[0])
+        limit.do_send(buys[1])
+        self.assertFalse(limit.can_send(buys[2]))
+
+        # A rejected buy will never be filled and frees its capacity
+        limit.on_reject(
+            "_",
+            OrderReject(
+                client_order_id="0", reason="", latency_in_seconds=0.0
+            ),
+        )
+        self.assertEqual(1.0, limit.volume("BTC-USD"))
+        self.assertTrue(limit.can_send(buys[2]))
+
+        # So is the unfilled quantity of an expired buy
+        self.fill(
+            limit,
+            self.create_trade(MarketSide.BUY, 10.0, 0.25, client_order_id="1"),
+        )
+        limit.on_expire("_", buys[1])
+        self.assertEqual(0.25, limit.volume("BTC-USD"))
+
+    def test_max_drawdown(self):
+        limit = MaxDrawdownLimit(
+            self.position_manager.drawdown, max_drawdown=5.0
+        )
+        buy = self.create_order(MarketSide.BUY)
+        sell = self.create_order(MarketSide.SELL)
+
+        self.position_manager.on_fill(
+            "_", self.create_trade(MarketSide.BUY, 100.0)
+        )
+        self.position_manager.on_market_trade(
+            "_", self.create_trade(MarketSide.BUY, 110.0)
+        )
+        self.assertTrue(limit.can_send(buy))
+
+        self.position_manager.on_market_trade(
+            "_", self.create_trade(MarketSide.SELL, 105.0)
+        )
+        self.assertFalse(limit.can_send(buy))
+        self.assertFalse(limit.can_send())
+        self.assertTrue(limit.can_send(sell))
@@ -0,0 +1,35 @@
+import unittest
+from unittest.mock import MagicMock, call
+
+from jolteon.risk_limit.pre_trade_check import PreTradeCheck
+
+
+class TestPreTradeCheck(unittest.TestCase):
+    @staticmethod
+    def create_mock_limit(allow_order: bool):
+        mock_limit = MagicMock()
+        mock_limit.can_send.return_value = allow_order
+        return mock_limit
+
+    def test_check_stops_at_first_blocking_limit(self):
+        limits = [
+            self.create_mock_limit(allow_order=True),
+            self.create_mock_limit(allow_order=False),
+            self.create_mock_limit(allow_order=False),
+        ]
+        check = PreTradeCheck(limits)
+
+        self.assertIs(limits[1], check.check("order"))
+        self.assertFalse(check.can_send("order"))
+        limits[0].can_send.assert_has_calls([call("order"), call("order")])
+        limits[2].can_send.assert_not_called()
+
+    def test_do_send_updates_all_limits(self):
+        limits = [self.create_mock_limit(allow_order=True) for _ in range(2)]
+        check = PreTradeCheck(limits)
+
+        self.assertIsNone(check.check("order"))
+        self.assertTrue(check.can_send("order"))
+        check.do_send("order")
+        for limit in limits:
+            limit.do_send.assert_called_once_with("order")
@@ -0,0 +1,30 @@
+import unittest
+
+from freezegun import freeze_time
+
+from jolteon.risk_limit.token_bucket_limit import TokenBucketLimit
+
+
+class TestTokenBucketLimit(unittest.TestCase):
+    @freeze_time("2022-01-01 00:00:00 UTC")
+    def test_burst_then_refill(self):
+        limit = TokenBucketLimit(tokens_per_second=0.5, capacity=3)
+
+        # A full bucket allows a burst
+        for _ in range(3):
+            self.assertTrue(limit.can_send())
+            limit.do_send()
+        self.assertFalse(limit.can_send())
+
+        # One token is refilled every 2 seconds
+        with freeze_time("2022-01-01 00:00:01 UTC"):
+            self.assertFalse(limit.can_send())
+        with freeze_time("2022-01-01 00:00:02 UTC"):
+            self.assertTrue(limit.can_send())
+            limit.do_send()
+            self.assertFalse(limit.can_send())
+
+        # Never refilled over its capacity
+        with freeze_time("2022-01-01 01:00:00 UTC"):
+            self.assertTrue(limit.can_send())
+            self.assertEqual(3.0, limit.tokens)
@@ -0,0 +1,111 @@
+import random
+import unittest
+from datetime import datetime
+
+from jolteon.core.side import MarketSide
+from jolteon.market_data.core.order import Order, OrderType
+from jolteon.strategy.bull_trend_rider.exit_trigger_index import (
+    ExitReason,
+    ExitTriggerIndex,
+)
+from jolteon.strategy.bull_trend_rider.trade_record import TradeRecord
+from jolteon.strategy.core.trade_opportunity import TradeOpportunityCore
+
+
+class TestExitTriggerIndex(unittest.TestCase):
+    @staticmethod
+    def create_round_trip(stop_loss_price: float, profit_price: float):
+        # noinspection PyTypeChecker
+        return TradeRecord(
+            opportunity=TradeOpportunityCore(
+                score=1.0,
+                stop_loss_price=stop_loss_price,
+                profit_price=profit_price,
+            ),
+            buy_order=Order(
+                client_order_id="123",
+                order_type=OrderType.MARKET_ORDER,
+                symbol="BTC-USD",
+                side=MarketSide.BUY,
+                price=None,
+                quantity=1,
+                creation_time=datetime(2024, 1, 1, 0, 0, 0),
+            ),
+        )
+
+    def setUp(self):
+        self.index = ExitTriggerIndex()
+        self.low = self.create_round_trip(90.0, 110.0)
+        self.high = self.create_round_trip(95.0, 105.0)
+        self.index.add(self.low)
+        self.index.add(self.high)
+
+    def test_nothing_triggered(self):
+        self.assertEqual([], self.index.triggered(100.0))
+        self.assertEqual([], self.index.triggered(95.0))
+        self.assertEqual([], self.index.triggered(105.0))
+        self.assertEqual([self.low, self.high], list(self.index))
+
+    def test_stop_loss_triggered(self):
+        self.assertEqual(
+            [(self.high, ExitReason.STOP_LOSS)], self.index.triggered(94.0)
+        )
+        self.assertEqual(
+            [(self.low, ExitReason.STOP_LOSS)], self.index.triggered(80.0)
+        )
+        self.assertEqual(0, len(self.index))
+        self.assertEqual([], self.index.triggered(200.0))
+
+    def test_take_profit_triggered(self):
+        self.assertEqual(
+            [
+                (self.high, ExitReason.TAKE_PROFIT),
+                (self.low, ExitReason.TAKE_PROFIT),
+            ],
+            self.index.triggered(120.0),
+        )
+        self.assertEqual(0, len(self.index))
+
+    def test_removed_positions_not_triggered(self):
+        self.index.remove(self.high)
+        self.assertNotIn(self.high, self.index)
+        self.assertEqual([], self.index.triggered(94.0))
+        self.assertEqual(
+            [(self.low, ExitReason.TAKE_PROFIT)], self.index.triggered(120.0)
+        )
+
+    def test_same_exits_as_trade_records(self):
+        rng = random.Random(0)
+        open_positions = [self.low, self.high]
+        for _ in range(1000):
+            if rng.random() < 0.3:
+                stop_loss_price = rng.uniform(80.0, 100.0)
+                round_trip = self.create_round_trip(
+                    stop_loss_price, stop_loss_price + rng.uniform(1.0, 20.0)
+                )
+                self.index.add(round_trip)
+                open_positions.append(round_trip)
+            elif open_positions and rng.random() < 0.1:
+                round_trip = open_positions.pop(
+                    rng.randrange(len(open_positions))
+                )
+                self.index.remove(round_trip)
+
+            market_price = rng.uniform(75.0, 125.0)
+            expected = [
+                round_trip
+                for round_trip in open_positions
+                if round_trip.should_sell_for_loss(market_price)
+                or round_trip.should_sell_for_profit(market_price)
+            ]
+            triggered = self.index.triggered(market_price)
+
+            self.assertCountEqual(
+                expected, [round_trip for round_trip, _ in triggered]
+            )
+            open_positions = [
+                round_trip
+                for round_trip in open_positions
+                if round_trip not in expected
+            ]
+            self.assertEqual(len(open_positions), len(self.index))
@@ -0,0 +1,153 @@
+import os
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+
+from jolteon.strategy.bull_trend_rider.models.score_model import (
+    CompiledForest,
+    ModelFormat,
+    ScoreModel,
+    ScoreModelLoader,
+    main,
+)
+
+MODEL_NAME = "random_forest_model-2024-01-29.joblib"
+
+
+class TestScoreModel(unittest.TestCase):
+    def setUp(self):
+        self.model = ScoreModel(MODEL_NAME)
+        self.compiled_model = ScoreModel(MODEL_NAME, ModelFormat.COMPILED)
+
+        # Random features plus features right at the split thresholds
+        rng = np.random.default_rng(0)
+        forest = self.model._model
+        self.X = np.column_stack(
+            [
+                rng.uniform(0.0, 1.0, 1000),
+                rng.uniform(-5.0, 5.0, 1000),
+                rng.integers(0, 2, 1000),
+                rng.uniform(0.0, 10.0, 1000),
+            ]
+        )
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            for feature, threshold in zip(tree.feature, tree.threshold):
+                if feature >= 0:
+                    row = self.X[len(self.X) % 1000].copy()
+                    row[feature] = threshold
+                    self.X = np.vstack([self.X, row])
+
+    def test_compiled_forest_same_as_model(self):
+        compiled = CompiledForest.from_model(self.model._model)
+
+        np.testing.assert_array_equal(
+            self.model._predict(self.X), compiled.predict(self.X)
+        )
+
+    def test_score(self):
+        score_details = dict(
+            zip(self.model.feature_names, [0.5, 1.0, True, 2.0])
+        )
+        self.assertEqual(
+            self.model.score(score_details),
+            self.compiled_model.score(score_details),
+        )
+        self.assertEqual(
+            self.model.score_batch(self.X[:10])[3],
+            self.model.score(dict(zip(self.model.feature_names, self.X[3]))),
+        )
+
+    def test_score_batch_memoizes_features(self):
+        with patch.object(
+            self.compiled_model,
+            "_predict",
+            wraps=self.compiled_model._predict,
+        ) as mock_predict:
+            scores = self.compiled_model.score_batch(self.X[:20])
+            self.assertEqual(1, mock_predict.call_count)
+            self.assertEqual(20, len(mock_predict.call_args[0][0]))
+
+            np.testing.assert_array_equal(
+                scores, self.compiled_model.score_batch(self.X[:20])
+            )
+            self.assertEqual(1, mock_predict.call_count)
+
+            self.compiled_model.score_batch(self.X[10:30])
+            self.assertEqual(2, mock_predict.call_count)
+            self.assertEqual(10, len(mock_predict.call_args[0][0]))
+
+    def test_memo_size(self):
+        self.compiled_model.MAX_MEMO_SIZE = 10
+
+        scores = self.compiled_model.score_batch(self.X[:50])
+
+        self.assertEqual(10, len(self.compiled_model._memo))
+        np.testing.assert_array_equal(self.model._predict(self.X[:50]), scores)
+
+
+class TestCompiledForest(unittest.TestCase):
+    def test_save_and_load(self):
+        model = ScoreModel(MODEL_NAME)
+        CompiledForest.from_model(model._model).save("forest")
+
+        forest = CompiledForest.load("forest")
+
+        self.assertIsInstance(forest._thresholds, np.memmap)
+        self.assertEqual(model.feature_names, forest.feature_names)
+        X = np.random.default_rng(0).uniform(0.0, 2.0, (100, 4))
+        np.testing.assert_array_equal(model._predict(X), forest.predict(X))
+
+        forest_model = ScoreModel("forest", ModelFormat.FOREST)
+        np.testing.assert_array_equal(
+            model._predict(X), forest_model._predict(X)
+        )
+
+
+class TestScoreModelLoader(unittest.TestCase):
+    def test_load_on_first_use(self):
+        loader = ScoreModelLoader()
+        self.assertIsNone(loader._instance)
+        self.assertIsNone(loader.load_time_in_seconds)
+        self.assertEqual(ModelFormat.JOBLIB, loader.model_format)
+
+        model = loader.get()
+
+        self.assertIs(model, loader.get())
+        self.assertIsNone(model._compiled)
+        self.assertLess(0.0, loader.load_time_in_seconds)
+
+    def test_configure(self):
+        CompiledForest.from_model(ScoreModel(MODEL_NAME)._model).save("forest")
+        loader = ScoreModelLoader()
+        model = loader.get()
+
+        loader.configure("forest", "forest")
+
+        self.assertIsNone(loader.load_time_in_seconds)
+        self.assertIsNot(model, loader.get())
+        self.assertIsNone(loader.get()._model)
+
+    @patch.dict(
+        os.environ,
+        {
+            "JOLTEON_SCORE_MODEL": MODEL_NAME,
+            "JOLTEON_SCORE_MODEL_FORMAT": "compiled",
+        },
+    )
+    def test_configure_from_environment(self):
+        loader = ScoreModelLoader()
+
+        self.assertEqual(MODEL_NAME, loader.model_path)
+        self.assertEqual(ModelFormat.COMPILED, loader.model_format)
+        self.assertIsNotNone(loader.get()._compiled)
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_main(self, mock_stdout):
+        with patch("sys.argv", ["score_model", MODEL_NAME, "forest"]):
+            main()
+
+        self.assertTrue(os.path.exists("forest/thresholds.npy"))
+        self.assertEqual(3, len(mock_stdout.getvalue().splitlines()))
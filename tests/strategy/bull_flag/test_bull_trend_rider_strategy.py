@@ -1,6 +1,7 @@
 import unittest
 from copy import copy
 from datetime import datetime, timedelta
+from itertools import islice
 from unittest.mock import MagicMock, call, patch, Mock
 
 import pytz
@@ -11,6 +12,7 @@ from jolteon.market_data.core.candlestick import Candlestick
 from jolteon.market_data.core.candlestick_list import CandlestickList
 from jolteon.market_data.core.order import Order, OrderType
 from jolteon.market_data.core.trade import Trade
+from jolteon.risk_limit.pre_trade_check import PreTradeCheck
 from jolteon.strategy.bull_trend_rider.strategy import (
     BullTrendRiderStrategy,
 )
@@ -28,7 +30,6 @@ from jolteon.strategy.core.patterns.bull_flag.pattern import (
 from jolteon.strategy.core.patterns.shooting_star.pattern import (
     ShootingStarPattern,
 )
-from jolteon.strategy.core.trade_opportunity import TradeOpportunityCore
 
 
 class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
@@ -51,7 +52,12 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
         self.orders = list[Order]()
         self.opportunities = list[TradeOpportunity]()
 
-    def create_trade_record(self, stop_loss_price: float, profit_price: float):
+    def create_trade_record(
+        self,
+        stop_loss_price: float,
+        profit_price: float,
+        client_order_id: str = "mock_id",
+    ):
         trade_record = TradeRecord(
             opportunity=TradeOpportunity(
                 pattern=self.bull_flag_pattern,
@@ -60,6 +66,7 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
             ),
         )
         trade_record.buy_order = self.create_mock_order(MarketSide.BUY)
+        trade_record.buy_order.client_order_id = client_order_id
         trade_record.buy_trades.append(
             self.create_mock_trade(1.0, MarketSide.BUY)
         )
@@ -197,23 +204,83 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(1, len(self.orders))
         self.assertEqual(2, len(self.opportunities))
 
+    async def test_grade_opportunities_in_batch(self):
+        patterns = [
+            BullFlagPattern(
+                bull_flag_candlestick=self.market_history[i],
+                consolidation_period_candlesticks=list(
+                    islice(self.market_history.candlesticks, i + 1, None)
+                ),
+            )
+            for i in [4, 6]
+        ]
+        opportunities = [
+            TradeOpportunity(
+                pattern=pattern,
+                history=self.market_history,
+                params=self.strategy._parameters,
+                grade=False,
+            )
+            for pattern in patterns
+        ]
+        TradeOpportunity.grade_all(opportunities)
+
+        self.assertEqual(
+            [
+                TradeOpportunity(
+                    pattern=pattern,
+                    history=self.market_history,
+                    params=self.strategy._parameters,
+                ).score
+                for pattern in patterns
+            ],
+            [opportunity.score for opportunity in opportunities],
+        )
+
+    @patch("jolteon.strategy.bull_trend_rider.trade_opportunity.score_model")
+    async def test_buy_on_bull_flag_batch(self, mock_score_model):
+        model = mock_score_model.return_value
+        model.features.return_value = [0.0]
+        model.score_batch.return_value = [1.0, 1.0]
+        patterns = [
+            self.bull_flag_pattern,
+            self.create_bull_flag_pattern(
+                self.market_history, RecognitionResult.NO_CONSOLIDATION_PERIOD
+            ),
+            BullFlagPattern(
+                bull_flag_candlestick=self.market_history[4],
+                consolidation_period_candlesticks=list(
+                    islice(self.market_history.candlesticks, 5, None)
+                ),
+            ),
+        ]
+        patterns[2].result = RecognitionResult.BULL_FLAG
+
+        self.strategy.on_bull_flag_patterns("mock_sender", patterns)
+
+        # Bull flags of the same candlestick are graded with one prediction
+        model.score_batch.assert_called_once()
+        # Patterns other than bull flags are not opportunities
+        self.assertEqual(2, len(self.opportunities))
+        self.assertEqual(2, len(self.orders))
+
     async def test_sell_for_limit_loss_on_candlestick(self):
         # Arrange
-        self.strategy._round_trips.append(
+        self.strategy._add_round_trip(
             self.create_trade_record(
                 stop_loss_price=0.5 + 1e-10, profit_price=1.0
             )
         )
 
-        self.assertEqual(1, len(self.strategy._round_trips))
-        self.assertFalse(self.strategy._round_trips[0].completed())
+        self.assertEqual(1, len(self.strategy._open_positions))
+        self.assertFalse(next(iter(self.strategy._open_positions)).completed())
 
         # Act
         self.strategy.on_candlestick("mock_sender", self.next_candlestick(0.5))
 
         # Assert
         self.assertTrue(self.strategy.order_event.has_receivers_for(ANY))
-        self.assertEqual(1, len(self.strategy._round_trips))
+        self.assertEqual(0, len(self.strategy._open_positions))
 
         sell_order = self.orders[-1]
         self.assertEqual(1, len(self.orders))
@@ -233,25 +300,30 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
         # Arrange
 
         # 1st round trip doesn't need to be closed yet
-        self.strategy._round_trips.append(
-            self.create_trade_record(stop_loss_price=0.1, profit_price=1.0)
+        self.strategy._add_round_trip(
+            self.create_trade_record(
+                stop_loss_price=0.1, profit_price=1.0, client_order_id="1"
+            )
         )
         # 2nd round trip needs to be closed
-        self.strategy._round_trips.append(
+        self.strategy._add_round_trip(
             self.create_trade_record(
-                stop_loss_price=0.5 + 1e-10, profit_price=1.0
+                stop_loss_price=0.5 + 1e-10,
+                profit_price=1.0,
+                client_order_id="2",
             )
         )
 
-        self.assertEqual(2, len(self.strategy._round_trips))
-        self.assertFalse(self.strategy._round_trips[0].completed())
-        self.assertFalse(self.strategy._round_trips[1].completed())
+        self.assertEqual(2, len(self.strategy._open_positions))
+        for round_trip in self.strategy._open_positions:
+            self.assertFalse(round_trip.completed())
 
         # Act
         self.strategy.on_candlestick("mock_sender", self.next_candlestick(0.5))
 
         # Assert
         self.assertEqual(1, len(self.orders))
+        self.assertEqual(1, len(self.strategy._open_positions))
 
         sell_order = self.orders[-1]
         self.assertNotEqual("mock_id", sell_order.client_order_id)
@@ -266,20 +338,20 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
 
     async def test_sell_for_profit_on_candlestick(self):
         # Arrange
-        self.strategy._round_trips.append(
+        self.strategy._add_round_trip(
             self.create_trade_record(
                 stop_loss_price=1.0, profit_price=1.5 - 1e-10
             )
         )
-        self.assertEqual(1, len(self.strategy._round_trips))
-        self.assertFalse(self.strategy._round_trips[0].completed())
+        self.assertEqual(1, len(self.strategy._open_positions))
+        self.assertFalse(next(iter(self.strategy._open_positions)).completed())
 
         # Act
         self.strategy.on_candlestick("mock_sender", self.next_candlestick(1.5))
 
         # Assert
         self.assertTrue(self.strategy.order_event.has_receivers_for(ANY))
-        self.assertEqual(1, len(self.strategy._round_trips))
+        self.assertEqual(0, len(self.strategy._open_positions))
 
         sell_order = self.orders[-1]
         self.assertEqual(1, len(self.orders))
@@ -293,13 +365,31 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
             datetime(2024, 1, 1, tzinfo=pytz.utc), sell_order.creation_time
         )
 
+    async def test_sell_on_market_trade(self):
+        # Arrange
+        self.strategy._add_round_trip(
+            self.create_trade_record(stop_loss_price=0.9, profit_price=1.5)
+        )
+
+        # Act
+        self.strategy.on_market_trade("mock_sender", self.create_mock_trade(1))
+        self.assertEqual(0, len(self.orders))
+        self.strategy.on_market_trade(
+            "mock_sender", self.create_mock_trade(0.8)
+        )
+
+        # Assert, no candlestick is needed to close the position
+        self.assertEqual(1, len(self.orders))
+        self.assertEqual(MarketSide.SELL, self.orders[-1].side)
+        self.assertEqual(0, len(self.strategy._open_positions))
+
     async def test_sell_for_shooting_star(self):
         # Arrange
-        self.strategy._round_trips.append(
+        self.strategy._add_round_trip(
             self.create_trade_record(stop_loss_price=-1e4, profit_price=1e4)
         )
-        self.assertEqual(1, len(self.strategy._round_trips))
-        self.assertFalse(self.strategy._round_trips[0].completed())
+        self.assertEqual(1, len(self.strategy._open_positions))
+        self.assertFalse(next(iter(self.strategy._open_positions)).completed())
 
         # Act
         self.strategy.on_shooting_star_pattern(
@@ -314,7 +404,7 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
 
         # Assert
         self.assertTrue(self.strategy.order_event.has_receivers_for(ANY))
-        self.assertEqual(1, len(self.strategy._round_trips))
+        self.assertEqual(0, len(self.strategy._open_positions))
 
         sell_order = self.orders[-1]
         self.assertEqual(1, len(self.orders))
@@ -330,15 +420,19 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
 
     async def test_sell_multiple_times_for_shooting_star(self):
         # Arrange
-        self.strategy._round_trips.append(
-            self.create_trade_record(stop_loss_price=-1e4, profit_price=1e4)
+        self.strategy._add_round_trip(
+            self.create_trade_record(
+                stop_loss_price=-1e4, profit_price=1e4, client_order_id="1"
+            )
         )
-        self.strategy._round_trips.append(
-            self.create_trade_record(stop_loss_price=-1e4, profit_price=1e4)
+        self.strategy._add_round_trip(
+            self.create_trade_record(
+                stop_loss_price=-1e4, profit_price=1e4, client_order_id="2"
+            )
         )
-        self.assertEqual(2, len(self.strategy._round_trips))
-        self.assertFalse(self.strategy._round_trips[0].completed())
-        self.assertFalse(self.strategy._round_trips[1].completed())
+        self.assertEqual(2, len(self.strategy._open_positions))
+        for round_trip in self.strategy._open_positions:
+            self.assertFalse(round_trip.completed())
 
         # Act
         self.strategy.on_shooting_star_pattern(
@@ -361,7 +455,7 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
         )
         trade_record.buy_trades.clear()
         trade_record.sell_trades.clear()
-        self.strategy._round_trips.append(trade_record)
+        self.strategy._add_round_trip(trade_record)
 
         # Buys
         self.strategy.on_fill(
@@ -376,13 +470,13 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
 
         # Assert
         self.assertTrue(self.strategy.order_event.has_receivers_for(ANY))
-        self.assertEqual(1, len(self.strategy._round_trips))
-        self.assertEqual(3, len(self.strategy._round_trips[0].buy_trades))
+        self.assertEqual([trade_record], list(self.strategy._open_positions))
+        self.assertEqual(3, len(trade_record.buy_trades))
 
         # Sells
-        self.strategy._round_trips[0].sell_order = self.create_mock_order(
-            MarketSide.SELL
-        )
+        sell_order = self.create_mock_order(MarketSide.SELL)
+        sell_order.quantity = 3.0
+        self.strategy._close_position(trade_record, sell_order)
         self.strategy.on_fill(
             "mock_sender",
             BullTrendRiderStrategyTest.create_mock_trade(1.0, MarketSide.SELL),
@@ -396,18 +490,70 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
             BullTrendRiderStrategyTest.create_mock_trade(1.2, MarketSide.SELL),
         )
 
+        # Completed round trips are sent out and dropped
+        self.assertTrue(trade_record.completed())
+        self.assertEqual({}, self.strategy._round_trips_by_order_id)
+        self.assertEqual(0, len(self.strategy._open_positions))
+        self.assertEqual(1, self.strategy.number_of_completed_round_trips)
+
+        # A late fill of the completed round trip is ignored
+        with self.assertLogs(level="WARNING"):
+            self.strategy.on_fill(
+                "mock_sender",
+                BullTrendRiderStrategyTest.create_mock_trade(
+                    1.3, MarketSide.SELL
+                ),
+            )
+        self.assertEqual(3, len(trade_record.sell_trades))
+
+    async def test_completed_order_ids_are_bounded(self):
+        for i in range(BullTrendRiderStrategy.MAX_COMPLETED_ORDER_IDS + 1):
+            trade_record = self.create_trade_record(
+                profit_price=1.1, stop_loss_price=0.9, client_order_id=str(i)
+            )
+            self.strategy._remove_round_trip(trade_record)
+
+        self.assertEqual(
+            BullTrendRiderStrategy.MAX_COMPLETED_ORDER_IDS,
+            len(self.strategy._completed_order_ids),
+        )
+        self.assertNotIn("0", self.strategy._completed_order_ids)
+
+    async def test_prune_traded_bull_flags(self):
+        self.strategy._add_round_trip(
+            self.create_trade_record(stop_loss_price=0.5, profit_price=2.0)
+        )
+        self.assertEqual(1, len(self.strategy._traded_bull_flags))
+
+        # The bull flag is still in the recent candlesticks
+        self.strategy.on_candlestick("mock_sender", self.next_candlestick(1.0))
+        self.assertEqual(1, len(self.strategy._traded_bull_flags))
+
+        for i in range(1, 10):
+            self.strategy.on_candlestick(
+                "mock_sender",
+                Candlestick(
+                    self.create_mock_timestamp() + timedelta(minutes=i),
+                    duration_in_seconds=60,
+                    open=10,
+                    low=9,
+                    close=10,
+                    high=11,
+                    volume=100,
+                ),
+            )
+        self.assertEqual(0, len(self.strategy._traded_bull_flags))
+
     async def test_buy_order_blocked_by_risk_limits(self):
+        opportunity = self.create_trade_record(
+            stop_loss_price=0.1, profit_price=10
+        ).opportunity
+        opportunity.score = 1.0
+
         # Risk Limit allows all
         mock_limit = self.create_mock_limit(allow_order=False)
-        self.strategy._risk_limits = [mock_limit]
-        # noinspection PyTypeChecker
-        self.strategy._try_buy(
-            opportunity=TradeOpportunityCore(
-                score=1.0,
-                stop_loss_price=0.1,
-                profit_price=10,
-            ),
-        )
+        self.strategy._pre_trade_check = PreTradeCheck([mock_limit])
+        self.strategy._try_buy(opportunity=opportunity)
         self.assertEqual(0, len(self.orders))
         mock_limit.do_send.assert_not_called()
 
@@ -415,34 +561,29 @@ class BullTrendRiderStrategyTest(unittest.IsolatedAsyncioTestCase):
 
         mock_limit = MagicMock()
         mock_limit.can_send.return_value = True
-        self.strategy._risk_limits = [mock_limit]
-        # noinspection PyTypeChecker
-        self.strategy._try_buy(
-            opportunity=TradeOpportunityCore(
-                score=1.0,
-                stop_loss_price=0.1,
-                profit_price=10,
-            ),
-        )
+        self.strategy._pre_trade_check = PreTradeCheck([mock_limit])
+        self.strategy._try_buy(opportunity=opportunity)
         self.assertEqual(1, len(self.orders))
         mock_limit.do_send.assert_called_once()
 
     async def test_sell_order_not_blocked_by_risk_limits(self):
         mock_limit = self.create_mock_limit(allow_order=False)
-        self.strategy._risk_limits = [mock_limit]
+        self.strategy._pre_trade_check = PreTradeCheck([mock_limit])
 
         trade_record = self.create_trade_record(
             profit_price=1.1, stop_loss_price=0.9
         )
-        self.strategy._round_trips.append(trade_record)
-        self.strategy._round_trips.append(copy(trade_record))
-        self.strategy._round_trips.append(copy(trade_record))
+        self.strategy._add_round_trip(trade_record)
+        self.strategy._add_round_trip(copy(trade_record))
+        self.strategy._add_round_trip(copy(trade_record))
 
         self.strategy._try_close_positions()
         self.assertEqual(3, len(self.orders))
-        mock_limit.do_send.assert_has_calls([call(), call(), call()])
+        mock_limit.do_send.assert_has_calls(
+            [call(order) for order in self.orders]
+        )
 
         # Invoke the function again won't create more orders
         self.strategy._try_close_positions()
         self.assertEqual(3, len(self.orders))
-        mock_limit.do_send.assert_has_calls([call(), call(), call()])
+        self.assertEqual(3, mock_limit.do_send.call_count)
@@ -1,10 +1,13 @@
 import math
+import random
 import unittest
 from datetime import datetime, timedelta
 
+import pandas as pd
 import pytz
 from freezegun import freeze_time
 
+from jolteon.core.time.time_manager import time_manager
 from jolteon.market_data.core.candlestick import Candlestick
 from jolteon.strategy.core.patterns.bull_flag.parameters import (
     BullFlagParameters,
@@ -15,6 +18,7 @@ from jolteon.strategy.core.patterns.bull_flag.pattern import (
 )
 from jolteon.strategy.core.patterns.bull_flag.recognizer import (
     BullFlagRecognizer,
+    recognize_bull_flags,
 )
 
 
@@ -71,6 +75,22 @@ class TestRecognizer(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(1, len(self.patterns))
         self.assertEqual(RecognitionResult.BULL_FLAG, self.patterns[0].result)
 
+    def test_bull_flag_batch(self):
+        batches = list[list[BullFlagPattern]]()
+
+        def handle_batch(_: str, patterns: list[BullFlagPattern]):
+            batches.append(patterns)
+
+        self.pattern_recognizer.bull_flag_batch_signal.connect(handle_batch)
+        self.pattern_recognizer._params = BullFlagParameters(verbose=True)
+        self.pattern_recognizer.on_candlesticks("_", self.candlesticks)
+
+        # Batches hold the same patterns sent one by one, and empty batches
+        # are not sent
+        self.assertEqual(self.patterns, sum(batches, []))
+        self.assertTrue(all(batches))
+        self.pattern_recognizer.bull_flag_batch_signal.disconnect(handle_batch)
+
     def test_bull_flag_with_2_pre_candlesticks_fail(self):
         self.pattern_recognizer._params = BullFlagParameters(
             verbose=True, max_number_of_pre_bull_flag_candlesticks=2
@@ -195,3 +215,143 @@ class TestRecognizer(unittest.IsolatedAsyncioTestCase):
         self.pattern_recognizer.on_candlestick("_", self.candlesticks[-1])
         self.pattern_recognizer.on_candlestick("_", self.candlesticks[-1])
         self.assertLessEqual(0, len(self.patterns))
+
+    def random_candlesticks(self, n: int) -> list[Candlestick]:
+        random.seed(0)
+        candlesticks = list[Candlestick]()
+        for i in range(n):
+            open = random.uniform(90, 110)
+            candlesticks.append(
+                Candlestick(
+                    self.start_time + timedelta(minutes=i),
+                    duration_in_seconds=60,
+                    open=open,
+                    high=120,
+                    close=open + random.choice([-20, -1, 0, 1, 5, 20]),
+                    low=80,
+                )
+            )
+        return candlesticks
+
+    def replay(
+        self,
+        recognizer: BullFlagRecognizer,
+        candlesticks: list[Candlestick],
+        delays: list[timedelta],
+    ):
+        time_manager().claim_admin(self)
+        try:
+            for i, candlestick in enumerate(candlesticks):
+                time_manager().use_fake_time(
+                    candlestick.start_time + delays[i % len(delays)],
+                    admin=self,
+                )
+                recognizer.on_candlestick("_", candlestick)
+        finally:
+            time_manager().reset(admin=self)
+
+    async def test_same_patterns_as_full_scan(self):
+        candlesticks = self.random_candlesticks(100)
+        for verbose in [True, False]:
+            self.params = BullFlagParameters(
+                verbose=verbose,
+                max_number_of_pre_bull_flag_candlesticks=2,
+                max_number_of_consolidation_candlesticks=4,
+                max_number_of_recent_candlesticks=10,
+            )
+            # Both recognizers send the same signal, hence run one by one
+            full_scan = FullScanBullFlagRecognizer(self.params)
+            recognizer = BullFlagRecognizer(self.params)
+            results = list[list[BullFlagPattern]]()
+            for pattern_recognizer in [full_scan, recognizer]:
+                self.patterns = list[BullFlagPattern]()
+                # The last candlestick is incomplete, and the one before is
+                # only completed half of the time
+                self.replay(
+                    pattern_recognizer,
+                    candlesticks,
+                    [timedelta(seconds=30), timedelta(seconds=65)],
+                )
+                results.append(self.patterns)
+
+            expected, actual = results
+            self.assertLess(0, len(expected))
+            self.assertEqual(expected, actual)
+
+    async def test_same_patterns_as_batch(self):
+        candlesticks = self.random_candlesticks(100)
+        # The last candlestick is never completed in the replay
+        df = pd.DataFrame([vars(c) for c in candlesticks[:-1]])
+
+        for pre, recent, verbose in [
+            (0, 15, False),
+            (1, 6, True),
+            (2, 15, True),
+            (2, 15, False),
+        ]:
+            self.params = BullFlagParameters(
+                verbose=verbose,
+                max_number_of_pre_bull_flag_candlesticks=pre,
+                max_number_of_recent_candlesticks=recent,
+            )
+            self.patterns = list[BullFlagPattern]()
+            recognizer = BullFlagRecognizer(self.params)
+            self.replay(recognizer, candlesticks, [timedelta(0)])
+
+            result = recognize_bull_flags(df, self.params)
+            self.assertLess(0, len(result))
+            self.assertEqual(
+                [
+                    (
+                        pattern.start,
+                        pattern.end,
+                        pattern.bull_flag_body,
+                        pattern.consolidation_max_ratio,
+                        pattern.result,
+                    )
+                    for pattern in self.patterns
+                ],
+                list(
+                    zip(
+                        result["start"],
+                        result["end"],
+                        result["bull_flag_body"],
+                        result["consolidation_max_ratio"],
+                        result["result"],
+                    )
+                ),
+            )
+
+    def test_batch_without_enough_candlesticks(self):
+        df = pd.DataFrame([vars(c) for c in self.candlesticks[0:2]])
+        self.assertTrue(recognize_bull_flags(df, self.params).empty)
+
+        df = pd.DataFrame([vars(c) for c in self.candlesticks[0:3]])
+        result = recognize_bull_flags(df, self.params)
+        self.assertEqual([1], result["bull_flag_index"].tolist())
+        self.assertEqual([2], result["end_index"].tolist())
+        self.assertEqual(
+            [RecognitionResult.BULL_FLAG], result["result"].tolist()
+        )
+
+
+class FullScanBullFlagRecognizer(BullFlagRecognizer):
+    """
+    Checks every suffix of the completed candlesticks, which is how bull flag
+    patterns were detected before being done incrementally.
+    """
+
+    def _detect(self, sender: str):
+        completed_candlesticks = [
+            c for c in self._all_candlesticks.candlesticks if c.is_completed()
+        ]
+        for i in range(0, len(completed_candlesticks)):
+            index = len(completed_candlesticks) - 1 - i
+            pattern = self._is_bull_flag_pattern(
+                candlesticks=completed_candlesticks[index:]
+            )
+            if pattern and (
+                self._params.verbose
+                or pattern.result == RecognitionResult.BULL_FLAG
+            ):
+                self.bull_flag_signal.send(sender, pattern=pattern)
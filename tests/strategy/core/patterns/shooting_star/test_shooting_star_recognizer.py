@@ -1,9 +1,12 @@
+import random
 import unittest
 from datetime import datetime, timedelta
 
+import pandas as pd
 import pytz
 from freezegun import freeze_time
 
+from jolteon.core.time.time_manager import time_manager
 from jolteon.market_data.core.candlestick import Candlestick
 from jolteon.strategy.core.patterns.shooting_star.parameters import (
     ShootingStarParameters,
@@ -13,6 +16,7 @@ from jolteon.strategy.core.patterns.shooting_star.pattern import (
 )
 from jolteon.strategy.core.patterns.shooting_star.recognizer import (
     ShootingStarRecognizer,
+    recognize_shooting_stars,
 )
 
 
@@ -97,3 +101,54 @@ class TestRecognizer(unittest.IsolatedAsyncioTestCase):
     def test_shooting_star_equal_open_close_small_upper_shadows(self):
         self.pattern_recognizer.on_candlestick("_", self.candlesticks[1])
         self.assertEqual(0, len(self.patterns))
+
+    def test_same_patterns_as_batch(self):
+        random.seed(0)
+        candlesticks = list[Candlestick]()
+        for i in range(200):
+            open = random.uniform(1.0, 1.1)
+            close = open + random.uniform(-0.01, 0.01)
+            candlesticks.append(
+                Candlestick(
+                    self.start_time + timedelta(minutes=i),
+                    duration_in_seconds=60,
+                    open=open,
+                    high=max(open, close) + random.uniform(0.0, 0.2),
+                    low=min(open, close) - random.uniform(0.0, 0.02),
+                    close=close,
+                )
+            )
+
+        # A candlestick is completed when the next one starts
+        time_manager().claim_admin(self)
+        try:
+            for candlestick in candlesticks:
+                time_manager().use_fake_time(
+                    candlestick.start_time, admin=self
+                )
+                self.pattern_recognizer.on_candlestick("_", candlestick)
+        finally:
+            time_manager().reset(admin=self)
+
+        df = pd.DataFrame([vars(c) for c in candlesticks[:-1]])
+        result = recognize_shooting_stars(df, self.params)
+        self.assertLess(0, len(result))
+        self.assertEqual(
+            [
+                (
+                    pattern.shooting_star.start_time,
+                    pattern.body_ratio,
+                    pattern.upper_shadow_ratio,
+                    pattern.lower_shadow_ratio,
+                )
+                for pattern in self.patterns
+            ],
+            list(
+                zip(
+                    result["start"],
+                    result["body_ratio"],
+                    result["upper_shadow_ratio"],
+                    result["lower_shadow_ratio"],
+                )
+            ),
+        )
@@ -1,5 +1,7 @@
 import argparse
+import os
 import signal
+import subprocess
 import sys
 import unittest
 from datetime import datetime
@@ -8,6 +10,7 @@ from unittest.mock import patch, AsyncMock
 
 import pytz
 
+import jolteon
 from jolteon.cli import main
 
 
@@ -20,6 +23,10 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
             replay_end="2024-01-02T00:00:00",
             replay_db="",
             exchange="Coinbase",
+            symbol=["BTC-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=False,
         ),
     )
     async def test_main_run_coinbase_replay(self, mock_args, MockApplication):
@@ -48,6 +55,10 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
             replay_end="",
             replay_db="/tmp/unittest.sqlite",
             exchange="Coinbase",
+            symbol=["BTC-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=False,
         ),
     )
     async def test_main_run_coinbase_replay_2(
@@ -85,6 +96,10 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
             replay_end="2024-01-02T00:00:00",
             replay_db="",
             exchange="Kraken",
+            symbol=["BTC-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=False,
         ),
     )
     async def test_main_run_kraken_replay(self, mock_args, MockApplication):
@@ -113,6 +128,10 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
             replay_end="",
             replay_db="/tmp/unittest.sqlite",
             exchange="Kraken",
+            symbol=["BTC-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=False,
         ),
     )
     async def test_main_run_kraken_replay_2(
@@ -149,6 +168,10 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
             replay_end="2024-01-02T00:00:00",
             replay_db="",
             exchange="Mock",
+            symbol=["BTC-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=False,
         ),
     )
     async def test_main_run_mock_exchange_replay(self, mock_args):
@@ -168,6 +191,10 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
             replay_end="",
             replay_db="",
             exchange="Coinbase",
+            symbol=["BTC-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=False,
         ),
     )
     async def test_main_run_coinbase_live(self, mock_args, MockApplication):
@@ -195,6 +222,10 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
             replay_end="",
             replay_db="",
             exchange="Kraken",
+            symbol=["BTC-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=False,
         ),
     )
     async def test_main_run_kraken_live(self, mock_args, MockApplication):
@@ -214,6 +245,39 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(1, mock_app.start.call_count)
         self.assertEqual("", captured_output.getvalue().split("\n")[-1])
 
+    @patch("jolteon.app.kraken.KrakenApplication")
+    @patch(
+        "argparse.ArgumentParser.parse_args",
+        return_value=argparse.Namespace(
+            replay_start="",
+            replay_end="",
+            replay_db="",
+            exchange="Kraken",
+            symbol=["BTC-USD", "ETH-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=False,
+        ),
+    )
+    async def test_main_run_multiple_symbols(self, mock_args, MockApplication):
+        mock_app = MockApplication.return_value
+        mock_app.start = AsyncMock()
+        mock_app.start.return_value = 1.0
+
+        # Redirect stdout to capture output
+        captured_output = StringIO()
+        sys.stdout = captured_output
+
+        await main()
+
+        # Reset stdout
+        sys.stdout = sys.__stdout__
+
+        self.assertEqual(
+            ["BTC-USD", "ETH-USD"], MockApplication.call_args.args[0]
+        )
+        self.assertEqual(1, mock_app.start.call_count)
+
     async def test_graceful_exit(self):
         # Redirect stdout to capture output
         captured_output = StringIO()
@@ -233,3 +297,67 @@ class TestCryptoTradingEngineCLI(unittest.IsolatedAsyncioTestCase):
                 captured_output.getvalue(),
             )
             self.assertEqual(1, mock_exit.call_count)
+
+    def test_import_without_heavy_modules(self):
+        # Import in a new interpreter, other tests already imported pandas
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, jolteon.cli; "
+                "print(sorted({'pandas', 'pyarrow', 'sklearn'} "
+                "& set(sys.modules)))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(jolteon.__file__)),
+        )
+        self.assertEqual("[]", result.stdout.strip())
+
+    @patch("jolteon.cli.main")
+    @patch("jolteon.cli.run")
+    def test_run_main_with_event_loop(self, mock_run, mock_main):
+        from jolteon.cli import run_main
+
+        with patch("sys.argv", ["jolteon", "--event-loop", "uvloop"]):
+            run_main()
+
+        mock_main.assert_called_once()
+        self.assertEqual("uvloop", mock_run.call_args.args[1])
+
+    @patch("jolteon.app.backtest.BacktestRunner")
+    @patch("jolteon.app.kraken.KrakenApplication")
+    @patch(
+        "argparse.ArgumentParser.parse_args",
+        return_value=argparse.Namespace(
+            replay_start="2024-01-01T00:00:00",
+            replay_end="2024-01-02T00:00:00",
+            replay_db="",
+            exchange="Kraken",
+            symbol=["BTC-USD"],
+            shards=1,
+            replay_speed="max",
+            fingerprint=True,
+        ),
+    )
+    async def test_main_run_replay_with_fingerprint(
+        self, mock_args, MockApplication, MockBacktestRunner
+    ):
+        mock_runner = MockBacktestRunner.return_value
+        mock_runner.run = AsyncMock()
+        mock_runner.run.return_value.pnl = 1.0
+        mock_runner.run.return_value.fingerprint = "abc"
+
+        # Redirect stdout to capture output
+        captured_output = StringIO()
+        sys.stdout = captured_output
+
+        await main()
+
+        # Reset stdout
+        sys.stdout = sys.__stdout__
+
+        mock_runner.run.assert_called_once()
+        self.assertIn("Fingerprint: abc\n", captured_output.getvalue())
+        self.assertIn("PnL: 1.0\n", captured_output.getvalue())
@@ -1,9 +1,14 @@
 import argparse
+import sqlite3
 import sys
 import unittest
+from datetime import datetime, timedelta
 from io import StringIO
 from unittest.mock import patch, AsyncMock
 
+import pandas as pd
+import pytz
+
 
 class TestCryptoTradingEngineTraining(unittest.IsolatedAsyncioTestCase):
     @patch("jolteon.app.kraken.KrakenApplication")
@@ -12,6 +17,8 @@ class TestCryptoTradingEngineTraining(unittest.IsolatedAsyncioTestCase):
         return_value=argparse.Namespace(
             train_db="",
             exchange="Kraken",
+            symbol="BTC/USD",
+            patterns_only=False,
         ),
     )
     @patch("asyncio.sleep", return_value=None)
@@ -48,6 +55,8 @@ class TestCryptoTradingEngineTraining(unittest.IsolatedAsyncioTestCase):
         return_value=argparse.Namespace(
             train_db="",
             exchange="Coinbase",
+            symbol="BTC/USD",
+            patterns_only=False,
         ),
     )
     @patch("asyncio.sleep", return_value=None)
@@ -77,3 +86,88 @@ class TestCryptoTradingEngineTraining(unittest.IsolatedAsyncioTestCase):
         # For example, check if the connect methods were called
         self.assertLess(1, mock_app.run_local_replay.call_count)
         self.assertEqual(captured_output.getvalue().split("\n")[-1], "")
+
+    @patch(
+        "argparse.ArgumentParser.parse_args",
+        return_value=argparse.Namespace(
+            train_db="train.sqlite",
+            exchange="Kraken",
+            symbol="BTC/USD",
+            patterns_only=True,
+        ),
+    )
+    @patch("tempfile.gettempdir", return_value=".")
+    async def test_main_training_patterns_only(self, mock_tempdir, mock_args):
+        self.create_train_db("train.sqlite")
+
+        from jolteon.train import train
+
+        with patch("jolteon.app.kraken.KrakenApplication") as MockApplication:
+            with patch("sys.stdout", new_callable=StringIO):
+                await train()
+            MockApplication.assert_not_called()
+
+        conn = sqlite3.connect("train_result.sqlite")
+        result = pd.read_sql("select * from pattern_train_result", con=conn)
+        conn.close()
+        self.assertEqual(5 * 8 * 3, len(result))
+        self.assertLess(0, result["number_of_bull_flags"].sum())
+
+    @patch("tempfile.gettempdir", return_value=".")
+    async def test_train_patterns_of_symbol(self, mock_tempdir):
+        from jolteon.train import train_patterns
+
+        async def train_result(train_db: str) -> pd.DataFrame:
+            with patch("sys.stdout", new_callable=StringIO):
+                await train_patterns(train_db, "ETH/USD")
+            conn = sqlite3.connect("train_result.sqlite")
+            result = pd.read_sql(
+                "select * from pattern_train_result", con=conn
+            )
+            conn.close()
+            return result
+
+        self.create_train_db("eth.sqlite", "ETH/USD")
+        self.create_train_db("mixed.sqlite", "ETH/USD")
+        self.create_train_db("mixed.sqlite", "BTC/USD", price_offset=1000.0)
+
+        # Market trades of other symbols are ignored
+        expected = await train_result("eth.sqlite")
+        actual = await train_result("mixed.sqlite")
+        self.assertLess(0, expected["number_of_bull_flags"].sum())
+        pd.testing.assert_frame_equal(expected, actual)
+
+    @staticmethod
+    def create_train_db(
+        database_name: str, symbol: str = "BTC/USD", price_offset=0.0
+    ):
+        # A trade every 20 seconds, and a jump every 10 minutes
+        start_time = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        df = pd.DataFrame(
+            {
+                "trade_id": range(300),
+                "client_order_id": "",
+                "symbol": symbol,
+                "maker_order_id": "",
+                "taker_order_id": "",
+                "side": "BUY",
+                "price": [
+                    40000.0
+                    + price_offset
+                    + 100 * (i // 30)
+                    + (i % 3) * (50.0 if i // 3 % 10 == 5 else 1.0)
+                    for i in range(300)
+                ],
+                "fee": 0.0,
+                "quantity": 1.0,
+                "transaction_time": [
+                    (start_time + timedelta(seconds=20 * i)).timestamp()
+                    for i in range(300)
+                ],
+            }
+        )
+        conn = sqlite3.connect(database_name)
+        df.to_sql(
+            "market_trade_feed", con=conn, index=False, if_exists="append"
+        )
+        conn.close()